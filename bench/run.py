@@ -0,0 +1,371 @@
+"""Benchmark the gallery's real code paths on a synthetic library.
+
+Builds (or reuses) a ``bench.synth`` library, indexes it into a scratch
+``gallery.sqlite`` through the real ``WriteQueue`` and times:
+
+* ``cold_scan`` (first index) and ``delta_scan`` (no-op + 1 % touched);
+* ``list_images`` first page + 5-page cursor walk for every sort key and
+  direction, and for the common filters;
+* ``neighbors``, ``vocab_lookup`` (tags / prompts / words);
+* ``thumbs.request`` cold (generate) and warm (cache hit);
+* ``bulk_set_favorite`` / ``bulk_edit_tags`` on 1 000 ids.
+
+Results are JSON (one record per case with runs / min / median / p95 in
+milliseconds plus environment info).  ``--baseline`` compares medians
+against an earlier result file and exits 1 when any case is more than
+``--threshold`` percent slower.
+
+    python -m bench.run --size 10k --out bench_10k.json
+    python -m bench.run --size 10k --baseline bench_10k.json --threshold 15
+    python -m bench.run --size 100k --tuning large
+
+``bench.tuning`` sweeps the ``sqlite_tuning`` profiles with the same cases.
+
+Run from the plugin root with ComfyUI stopped; nothing touches the real
+``gallery_data``.  Sizes: ``10k``, ``100k``, ``500k`` or a plain number.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+from bench import synth  # noqa: E402
+
+SIZES = {"10k": 10_000, "100k": 100_000, "500k": 500_000}
+DEFAULT_THRESHOLD_PCT = 10.0
+RESULT_SCHEMA = 1
+
+
+class _Barrier:
+    """No-op LOW op: once it runs, every LOW op enqueued before it has too."""
+
+    def apply(self, conn) -> None:
+        return None
+
+
+def _drain(wq, priority: int) -> None:
+    wq.enqueue_write(priority, _Barrier()).result(timeout=None)
+
+
+class Bench:
+    def __init__(self, *, work: Path, lib: Path, count: int, repeat: int) -> None:
+        from gallery import db, repo
+
+        self.work = work
+        self.lib = lib
+        self.count = count
+        self.repeat = repeat
+        self.results: List[Dict[str, Any]] = []
+        self.db_path = work / "gallery.sqlite"
+        for suffix in ("", "-wal", "-shm"):
+            p = Path(str(self.db_path) + suffix)
+            if p.exists():
+                p.unlink()
+        conn = db.connect_write(self.db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        self.wq = repo.WriteQueue(self.db_path)
+        self.wq.start()
+        self.wq.enqueue_write(repo.HIGH, repo.EnsureFolderOp(
+            path=lib.resolve().as_posix(), kind="output", removable=0,
+            display_name="bench",
+        )).result(timeout=10)
+        rconn = db.connect_read(self.db_path)
+        try:
+            rid = rconn.execute(
+                "SELECT id FROM folder WHERE parent_id IS NULL").fetchone()[0]
+        finally:
+            rconn.close()
+        self.root = {"id": int(rid), "path": lib.resolve().as_posix(),
+                     "kind": "output"}
+
+    def close(self) -> None:
+        self.wq.stop(timeout=5.0)
+
+    # -- timing ---------------------------------------------------------------
+
+    def case(self, name: str, fn: Callable[[], Any], *, repeat: Optional[int] = None,
+             setup: Optional[Callable[[], Any]] = None, **extra: Any) -> None:
+        runs: List[float] = []
+        for _ in range(repeat or self.repeat):
+            if setup is not None:
+                setup()
+            t0 = time.perf_counter()
+            fn()
+            runs.append((time.perf_counter() - t0) * 1000.0)
+        ordered = sorted(runs)
+        rec = {
+            "case": name,
+            "runs": len(runs),
+            "min_ms": round(ordered[0], 3),
+            "median_ms": round(statistics.median(ordered), 3),
+            "p95_ms": round(ordered[min(len(ordered) - 1,
+                                        int(0.95 * len(ordered)))], 3),
+            **extra,
+        }
+        self.results.append(rec)
+        print(f"  {name:<48} median {rec['median_ms']:>10.2f} ms "
+              f"(min {rec['min_ms']:.2f}, n={rec['runs']})", flush=True)
+
+    # -- suites ---------------------------------------------------------------
+
+    def scans(self) -> None:
+        from gallery import indexer, repo
+
+        def _cold() -> None:
+            indexer.cold_scan(self.root, db_path=self.db_path, write_queue=self.wq)
+            _drain(self.wq, repo.LOW)
+
+        self.case("cold_scan", _cold, repeat=1, files=self.count)
+
+        def _delta() -> None:
+            indexer.delta_scan(self.root, db_path=self.db_path, write_queue=self.wq)
+            _drain(self.wq, repo.LOW)
+
+        self.case("delta_scan/noop", _delta)
+        files = sorted(self.lib.rglob("*.png"))
+        touched = random.Random(1).sample(files, max(1, len(files) // 100))
+
+        def _touch() -> None:
+            bump = time.time_ns()
+            for p in touched:
+                os.utime(p, ns=(bump, bump))
+
+        self.case("delta_scan/1pct_touched", _delta, setup=_touch,
+                  touched=len(touched))
+
+    def listing(self) -> None:
+        from gallery import repo, vocab
+
+        for key in sorted(repo._VALID_SORT_KEYS):
+            for direction in ("desc", "asc"):
+                sort = repo.SortSpec(key=key, dir=direction)
+                self.case(f"list_images/sort={key}:{direction}/page1",
+                          lambda s=sort: repo.list_images(
+                              db_path=self.db_path, sort=s, projection="grid"))
+                self.case(f"list_images/sort={key}:{direction}/5pages",
+                          lambda s=sort: self._walk(s, None, 5))
+
+        head = synth.vocabulary(0)[:3]
+        tag = "keep"
+        filters = {
+            "favorite=yes": repo.FilterSpec(favorite="yes"),
+            "tag": repo.FilterSpec(tags_and=(tag,)),
+            "prompt_and_2": repo.FilterSpec(prompts_and=tuple(
+                vocab.normalize_prompt(", ".join(head[:2])))),
+            "prompt_rare": repo.FilterSpec(prompts_and=tuple(
+                vocab.normalize_prompt(synth.vocabulary(0)[-1]))),
+            "name_contains": repo.FilterSpec(name="_00042"),
+            "model": repo.FilterSpec(model="dreamshaper_8"),
+            "folder_recursive": repo.FilterSpec(
+                folder_id=int(self.root["id"]), recursive=True),
+            "prompt_substring": repo.FilterSpec(
+                prompt_match_mode="string", prompt_substrings=("cinematic",)),
+        }
+        for label, flt in filters.items():
+            self.case(f"list_images/filter={label}/5pages",
+                      lambda f=flt: self._walk(repo.SortSpec(), f, 5))
+
+    def _walk(self, sort, flt, pages: int) -> None:
+        from gallery import repo
+
+        cursor = None
+        for _ in range(pages):
+            page = repo.list_images(db_path=self.db_path, filter=flt, sort=sort,
+                                    cursor=cursor, projection="grid")
+            cursor = page.next_cursor
+            if cursor is None:
+                return
+
+    def _sample_ids(self, n: int) -> List[int]:
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            ids = [r[0] for r in conn.execute("SELECT id FROM image ORDER BY id")]
+        finally:
+            conn.close()
+        return random.Random(2).sample(ids, min(n, len(ids)))
+
+    def lookups(self) -> None:
+        from gallery import repo
+
+        ids = self._sample_ids(50)
+        for key in ("time", "name"):
+            sort = repo.SortSpec(key=key)
+            self.case(f"neighbors/sort={key}/x{len(ids)}",
+                      lambda s=sort: [repo.neighbors(i, db_path=self.db_path, sort=s)
+                                      for i in ids])
+        for kind, prefix in (("tags", "k"), ("prompts", "ma"), ("prompts", "ka"),
+                             ("words", "be")):
+            self.case(f"vocab_lookup/{kind}/{prefix}",
+                      lambda k=kind, p=prefix: repo.vocab_lookup(
+                          db_path=self.db_path, kind=k, prefix=p))
+        self.case("vocab_lookup/prompts/contains",
+                  lambda: repo.vocab_lookup(db_path=self.db_path, kind="prompts",
+                                            prefix="ri", match_mode="contains"))
+
+    def thumbnails(self) -> None:
+        from gallery import thumbs
+
+        ids = self._sample_ids(200)
+        tdir = self.work / "thumbs"
+
+        def _reset() -> None:
+            shutil.rmtree(tdir, ignore_errors=True)
+            tdir.mkdir()
+
+        def _all() -> None:
+            for i in ids:
+                thumbs.request(i, db_path=self.db_path, thumbs_dir=tdir,
+                               write_queue=self.wq)
+
+        self.case(f"thumbs/cold/x{len(ids)}", _all, setup=_reset, repeat=1)
+        self.case(f"thumbs/warm/x{len(ids)}", _all)
+
+    def bulk(self) -> None:
+        import gallery as gallery_mod
+        from gallery import repo, service
+
+        ids = tuple(self._sample_ids(1000))
+        sel = repo.SelectionSpec(mode="explicit", explicit_ids=ids)
+        gallery_mod._write_queue = self.wq
+        try:
+            flip = iter(range(10_000))
+            self.case(f"bulk/favorite/x{len(ids)}",
+                      lambda: service.bulk_set_favorite(
+                          sel, next(flip) % 2 == 0, db_path=self.db_path))
+            self.case(f"bulk/tags_add_remove/x{len(ids)}",
+                      lambda: (service.bulk_edit_tags(
+                          sel, ["bench-tag"], [], db_path=self.db_path),
+                          service.bulk_edit_tags(
+                          sel, [], ["bench-tag"], db_path=self.db_path)))
+        finally:
+            gallery_mod._write_queue = None
+
+
+def _set_tuning(raw: str) -> Dict[str, Any]:
+    from gallery import db
+
+    spec: Any = raw
+    if raw.lstrip().startswith("{"):
+        spec = json.loads(raw)
+    return db.set_tuning(spec)
+
+
+def _environment(count: int, seed: int) -> Dict[str, Any]:
+    from gallery import db
+
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "images": count,
+        "seed": seed,
+        "sqlite_tuning": db.tuning(),
+        "at": int(time.time()),
+    }
+
+
+def compare(current: Sequence[Dict[str, Any]], baseline: Sequence[Dict[str, Any]],
+            threshold_pct: float) -> List[Dict[str, Any]]:
+    """Cases whose median grew by more than ``threshold_pct`` percent."""
+    base = {r["case"]: r for r in baseline}
+    out = []
+    for rec in current:
+        old = base.get(rec["case"])
+        if old is None or not old.get("median_ms"):
+            continue
+        delta = (rec["median_ms"] - old["median_ms"]) / old["median_ms"] * 100.0
+        if delta > threshold_pct:
+            out.append({"case": rec["case"], "baseline_ms": old["median_ms"],
+                        "median_ms": rec["median_ms"],
+                        "delta_pct": round(delta, 1)})
+    return out
+
+
+_SUITES = ("scans", "listing", "lookups", "thumbnails", "bulk")
+
+
+def main(argv: Sequence[str] = ()) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--size", default="10k",
+                    help="10k | 100k | 500k | <number of images>")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--work-dir", type=Path,
+                    default=Path(tempfile.gettempdir()) / "xyz_gallery_bench")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", default="",
+                    help="comma list of suites: " + ",".join(_SUITES))
+    ap.add_argument("--out", type=Path)
+    ap.add_argument("--baseline", type=Path)
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PCT,
+                    help="regression threshold in percent (median vs baseline)")
+    ap.add_argument("--tuning", default="default",
+                    help="sqlite_tuning profile name or JSON object")
+    args = ap.parse_args(list(argv) or None)
+    print(f"sqlite tuning: {_set_tuning(args.tuning)}")
+
+    count = SIZES.get(args.size.lower()) or int(args.size)
+    suites = [s for s in (args.only.split(",") if args.only else _SUITES) if s]
+    unknown = set(suites) - set(_SUITES)
+    if unknown:
+        ap.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+    if suites and suites[0] != "scans" and "scans" not in suites:
+        suites.insert(0, "scans")  # everything else reads the indexed DB
+
+    work = args.work_dir / f"n{count}_s{args.seed}"
+    work.mkdir(parents=True, exist_ok=True)
+    lib = work / "library"
+    t0 = time.perf_counter()
+    synth.build_library(lib, count, seed=args.seed)
+    print(f"library ready: {count} images under {lib} "
+          f"({time.perf_counter() - t0:.1f} s)", flush=True)
+
+    bench = Bench(work=work, lib=lib, count=count, repeat=max(1, args.repeat))
+    try:
+        for name in suites:
+            print(f"[{name}]", flush=True)
+            getattr(bench, name)()
+    finally:
+        bench.close()
+
+    doc = {"schema": RESULT_SCHEMA,
+           "environment": _environment(count, args.seed),
+           "results": bench.results}
+    if args.out is not None:
+        args.out.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        print(f"results → {args.out}")
+    if args.baseline is None:
+        return 0
+    base = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if base.get("environment", {}).get("images") != count:
+        print("warning: baseline was recorded at a different library size")
+    regressions = compare(bench.results, base.get("results", []), args.threshold)
+    for r in regressions:
+        print(f"REGRESSION {r['case']}: {r['baseline_ms']} → {r['median_ms']} ms "
+              f"(+{r['delta_pct']} %)")
+    if not regressions:
+        print(f"no regressions over {args.threshold} %")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
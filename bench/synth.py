@@ -0,0 +1,191 @@
+"""Synthetic ComfyUI-style image library for ``bench.run``.
+
+Writes real (tiny) PNGs whose ``prompt`` / ``workflow`` tEXt chunks look
+like ComfyUI's — ``CheckpointLoaderSimple`` → ``CLIPTextEncode`` ×2 →
+``KSampler`` — so the indexer runs its real metadata / vocab path.
+Prompt tokens are drawn from a fixed vocabulary with a Zipf-like rank
+distribution (a few very common quality tags, a long tail of subjects),
+and ~20 % of files carry an ``xyz_gallery.tags`` mirror chunk.
+
+Everything is derived from ``seed``: the same ``(count, seed)`` produces
+byte-identical files, and a manifest lets a second run reuse the tree.
+
+    python -m bench.synth --count 10000 --dest /tmp/xyz_bench/lib_10k
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import itertools
+import json
+import os
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+MANIFEST_NAME = ".bench_manifest.json"
+# Bump when the generated content changes so stale trees are rebuilt.
+GENERATOR_VERSION = 1
+FILES_PER_DIR = 1000
+
+_HEAD_TOKENS: Tuple[str, ...] = (
+    "masterpiece", "best quality", "high quality", "absurdres", "1girl",
+    "solo", "looking at viewer", "smile", "outdoors", "detailed background",
+    "cinematic lighting", "portrait", "upper body", "long hair", "blue sky",
+    "night", "city", "forest", "sunset", "depth of field",
+)
+_NEGATIVE: Tuple[str, ...] = (
+    "lowres", "bad anatomy", "bad hands", "text", "error", "missing fingers",
+    "extra digit", "cropped", "worst quality", "low quality", "jpeg artifacts",
+    "signature", "watermark", "blurry",
+)
+_SYLLABLES: Tuple[str, ...] = (
+    "ka", "ri", "mo", "ten", "sa", "lu", "vor", "ne", "shi", "ta", "ar",
+    "el", "dri", "qu", "on", "mi", "zel", "po", "ra", "fen",
+)
+_MODELS: Tuple[str, ...] = (
+    "sd_xl_base_1.0.safetensors", "dreamshaper_8.safetensors",
+    "juggernautXL_v9.safetensors", "ponyDiffusionV6XL.safetensors",
+    "realisticVision_v51.safetensors", "flux1-dev-fp8.safetensors",
+)
+_SAMPLERS: Tuple[str, ...] = ("euler", "euler_ancestral", "dpmpp_2m", "dpmpp_sde")
+_SCHEDULERS: Tuple[str, ...] = ("normal", "karras", "exponential")
+_USER_TAGS: Tuple[str, ...] = (
+    "keep", "wip", "portfolio", "reference", "lora-test", "upscale",
+    "character", "landscape", "reject", "print",
+)
+# Epoch of the oldest file; one synthetic file per ~90 s after it.
+_BASE_EPOCH = 1_700_000_000
+
+
+def vocabulary(seed: int, size: int = 4000) -> List[str]:
+    """Head quality tags followed by deterministic one/two-word tail tokens."""
+    rng = random.Random(seed ^ 0x5EED)
+    words = set()
+    while len(words) < size // 2:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    tail = sorted(words)
+    rng.shuffle(tail)
+    pairs = [f"{a} {b}" for a, b in zip(tail, reversed(tail))]
+    return list(_HEAD_TOKENS) + list(itertools.chain(*zip(tail, pairs)))[:size]
+
+
+def _zipf_cum(n: int, s: float = 1.07) -> List[float]:
+    return list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def _pick(rng: random.Random, vocab: Sequence[str], cum: Sequence[float], k: int) -> List[str]:
+    out: List[str] = []
+    seen = set()
+    total = cum[-1]
+    while len(out) < k:
+        tok = vocab[bisect.bisect_left(cum, rng.random() * total)]
+        if tok not in seen:
+            seen.add(tok)
+            out.append(tok)
+    return out
+
+
+def _api_prompt(positive: str, negative: str, model: str, seed: int,
+                rng: random.Random) -> Dict[str, dict]:
+    return {
+        "4": {"class_type": "CheckpointLoaderSimple",
+              "inputs": {"ckpt_name": model}},
+        "5": {"class_type": "EmptyLatentImage",
+              "inputs": {"width": 1024, "height": 1024, "batch_size": 1}},
+        "6": {"class_type": "CLIPTextEncode",
+              "inputs": {"text": positive, "clip": ["4", 1]}},
+        "7": {"class_type": "CLIPTextEncode",
+              "inputs": {"text": negative, "clip": ["4", 1]}},
+        "3": {"class_type": "KSampler", "inputs": {
+            "seed": seed, "steps": rng.choice((20, 25, 30)),
+            "cfg": rng.choice((5.0, 6.5, 7.0, 8.0)),
+            "sampler_name": rng.choice(_SAMPLERS),
+            "scheduler": rng.choice(_SCHEDULERS), "denoise": 1.0,
+            "model": ["4", 0], "positive": ["6", 0], "negative": ["7", 0],
+            "latent_image": ["5", 0],
+        }},
+        "8": {"class_type": "VAEDecode",
+              "inputs": {"samples": ["3", 0], "vae": ["4", 2]}},
+        "9": {"class_type": "SaveImage",
+              "inputs": {"filename_prefix": "ComfyUI", "images": ["8", 0]}},
+    }
+
+
+def _ui_workflow(api: Dict[str, dict]) -> Dict[str, object]:
+    # Shape-only stand-in for the UI graph: the indexer only records that
+    # it exists (``workflow_present``), but its size matters for parsing.
+    nodes = [
+        {"id": int(k), "type": v["class_type"], "pos": [int(k) * 220, 80],
+         "size": [315, 98], "widgets_values": [
+             x for x in v["inputs"].values() if not isinstance(x, list)]}
+        for k, v in api.items()
+    ]
+    return {"last_node_id": 9, "last_link_id": 9, "nodes": nodes,
+            "links": [], "groups": [], "config": {}, "version": 0.4}
+
+
+def _read_manifest(dest: Path) -> Dict[str, object]:
+    try:
+        return json.loads((dest / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def build_library(dest: Path, count: int, *, seed: int = 0) -> Dict[str, object]:
+    """Create (or reuse) ``count`` PNGs under ``dest``; returns the manifest."""
+    dest = Path(dest)
+    want = {"generator": GENERATOR_VERSION, "count": int(count), "seed": int(seed)}
+    have = _read_manifest(dest)
+    if all(have.get(k) == v for k, v in want.items()):
+        return have
+    dest.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    vocab = vocabulary(seed)
+    cum = _zipf_cum(len(vocab))
+    neg = ", ".join(_NEGATIVE)
+    # Pixels are irrelevant to the benchmarks; one small noise tile keeps
+    # thumbnail generation honest without inflating the library on disk.
+    tile = Image.effect_noise((48, 48), 64).convert("RGB")
+    for i in range(count):
+        sub = dest / f"batch_{i // FILES_PER_DIR:04d}"
+        if i % FILES_PER_DIR == 0:
+            sub.mkdir(exist_ok=True)
+        positive = ", ".join(_pick(rng, vocab, cum, rng.randint(8, 30)))
+        api = _api_prompt(positive, neg, rng.choice(_MODELS),
+                          rng.randrange(2 ** 32), rng)
+        info = PngInfo()
+        info.add_text("prompt", json.dumps(api))
+        info.add_text("workflow", json.dumps(_ui_workflow(api)))
+        if rng.random() < 0.2:
+            info.add_text("xyz_gallery.tags", ",".join(
+                rng.sample(_USER_TAGS, rng.randint(1, 3))))
+            if rng.random() < 0.3:
+                info.add_text("xyz_gallery.favorite", "1")
+        path = sub / f"ComfyUI_{i:07d}_.png"
+        tile.save(path, format="PNG", pnginfo=info, compress_level=1)
+        ts = _BASE_EPOCH + i * 90
+        os.utime(path, (ts, ts))
+    manifest = {**want, "files_per_dir": FILES_PER_DIR,
+                "vocab_head": list(_HEAD_TOKENS[:5])}
+    (dest / MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+    return manifest
+
+
+def main(argv: Sequence[str] = ()) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--count", type=int, required=True)
+    ap.add_argument("--dest", type=Path, required=True)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(list(argv) or None)
+    print(json.dumps(build_library(args.dest, args.count, seed=args.seed)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,112 @@
+"""Compare ``sqlite_tuning`` profiles on one synthetic library.
+
+Each profile gets a fresh ``gallery.sqlite`` (so ``page_size`` applies),
+then the scan / listing / lookup cases from ``bench.run``.  Prints one row
+per case with the median per profile, relative to the first profile, and
+optionally writes the table as JSON.
+
+    python -m bench.tuning --size 100k
+    python -m bench.tuning --size 10k --profiles default,large \\
+        --extra '{"profile": "large", "page_size": 8192}'
+
+The OS page cache is shared between profiles; the library is warmed by
+the first profile's cold scan, so compare the read cases, not cold_scan.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+from bench import run as _run  # noqa: E402
+from bench import synth  # noqa: E402
+
+_SUITES = ("scans", "listing", "lookups")
+
+
+def sweep(lib: Path, work: Path, count: int, specs: Sequence[Any],
+          repeat: int) -> Dict[str, Dict[str, float]]:
+    """``{case: {label: median_ms}}`` for every tuning spec."""
+    from gallery import db
+
+    table: Dict[str, Dict[str, float]] = {}
+    for spec in specs:
+        label = spec if isinstance(spec, str) else json.dumps(spec, sort_keys=True)
+        db.set_tuning(spec)
+        print(f"== {label}: {db.tuning()}", flush=True)
+        bench = _run.Bench(work=work, lib=lib, count=count, repeat=repeat)
+        try:
+            for suite in _SUITES:
+                getattr(bench, suite)()
+        finally:
+            bench.close()
+        for rec in bench.results:
+            table.setdefault(rec["case"], {})[label] = rec["median_ms"]
+    db.set_tuning("default")
+    return table
+
+
+def _print_table(table: Dict[str, Dict[str, float]], labels: List[str]) -> None:
+    width = max(len(c) for c in table)
+    head = "".join(f"{lb[:14]:>16}" for lb in labels)
+    print(f"\n{'case':<{width}}{head}")
+    for case, row in table.items():
+        base = row.get(labels[0])
+        cells = []
+        for lb in labels:
+            v = row.get(lb)
+            if v is None:
+                cells.append(f"{'-':>16}")
+            elif base and lb != labels[0]:
+                cells.append(f"{v:>9.2f} {v / base:>5.2f}x")
+            else:
+                cells.append(f"{v:>16.2f}")
+        print(f"{case:<{width}}{''.join(cells)}")
+
+
+def main(argv: Sequence[str] = ()) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--size", default="10k")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--profiles", default="small,default,large")
+    ap.add_argument("--extra", action="append", default=[],
+                    help="additional JSON tuning object (repeatable)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--work-dir", type=Path,
+                    default=Path(tempfile.gettempdir()) / "xyz_gallery_bench")
+    ap.add_argument("--out", type=Path)
+    args = ap.parse_args(list(argv) or None)
+
+    count = _run.SIZES.get(args.size.lower()) or int(args.size)
+    specs: List[Any] = [p for p in args.profiles.split(",") if p]
+    specs += [json.loads(x) for x in args.extra]
+    from gallery import db
+    for spec in specs:
+        db.parse_tuning(spec)  # fail before building anything
+
+    work = args.work_dir / f"n{count}_s{args.seed}"
+    work.mkdir(parents=True, exist_ok=True)
+    lib = work / "library"
+    synth.build_library(lib, count, seed=args.seed)
+    table = sweep(lib, work, count, specs, max(1, args.repeat))
+    labels = [s if isinstance(s, str) else json.dumps(s, sort_keys=True)
+              for s in specs]
+    _print_table(table, labels)
+    if args.out is not None:
+        args.out.write_text(json.dumps(
+            {"environment": _run._environment(count, args.seed),
+             "profiles": labels, "median_ms": table}, indent=2),
+            encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -9,7 +9,10 @@ fill in. No routes, no DB schema, no background threads yet.
 from __future__ import annotations
 
 import logging
+import threading
+import time
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 logger = logging.getLogger("xyz.gallery")
 
@@ -20,6 +23,10 @@ DB_PATH: Path = DATA_DIR / "gallery.sqlite"
 
 _initialized: bool = False
 _write_queue = None  # gallery.repo.WriteQueue, lazily created in start_background_services()
+_startup_lock = threading.Lock()
+_startup: Dict[str, Any] = {
+    "state": "idle", "phase": None, "error": None, "phases_ms": {},
+}
 
 
 def _ensure_data_layout() -> None:
@@ -49,6 +56,126 @@ def start_background_services() -> None:
     _metadata_sync.start_metadata_sync_worker(
         db_path=DB_PATH, write_queue=_write_queue,
     )
+    _start_posting_index()
+    _start_config_listener()
+    _start_similar_index()
+    _start_bulk_jobs()
+    from . import maintenance as _maintenance
+    _maintenance.start_maintenance(db_path=DB_PATH, write_queue=_write_queue)
+    from . import folders as _folders
+    _apply_content_hash_rate(_folders._load_config(DATA_DIR))
+
+
+def _start_bulk_jobs() -> None:
+    from . import bulk_jobs as _bulk_jobs
+    from . import folders as _folders
+
+    raw = _folders._load_config(DATA_DIR).get(
+        "bulk_job_workers", _bulk_jobs.DEFAULT_WORKERS)
+    try:
+        workers = int(raw)
+    except (TypeError, ValueError):
+        logger.warning("invalid bulk_job_workers=%r; using default", raw)
+        workers = _bulk_jobs.DEFAULT_WORKERS
+    _bulk_jobs.start(db_path=DB_PATH, write_queue=_write_queue, workers=workers)
+
+
+def _posting_index_bytes(cfg: dict) -> int:
+    raw = cfg.get("posting_index_max_mb", 64)
+    try:
+        max_mb = float(raw)
+    except (TypeError, ValueError):
+        logger.warning("invalid posting_index_max_mb=%r; index disabled", raw)
+        max_mb = 0
+    return int(max_mb * 1024 * 1024)
+
+
+_posting_index_applied: Optional[int] = None
+
+
+def _start_posting_index() -> None:
+    global _posting_index_applied
+    from . import folders as _folders
+    from . import postings as _postings
+
+    cfg = _folders._load_config(DATA_DIR)
+    _posting_index_applied = _posting_index_bytes(cfg)
+    _postings.enable(db_path=DB_PATH, max_bytes=_posting_index_applied)
+
+
+def _start_similar_index() -> None:
+    from . import similar as _similar
+
+    _similar.enable(db_path=DB_PATH)
+
+
+def _start_config_listener() -> None:
+    # After the posting index: the listener compares against the size it
+    # was enabled with.
+    from . import folders as _folders
+
+    _apply_slow_query_ms(_folders._load_config(DATA_DIR))
+    _folders.add_config_listener(_on_config_changed)
+
+
+def _apply_slow_query_ms(cfg: dict) -> None:
+    from . import db as _db
+
+    raw = cfg.get("slow_query_ms", 0)
+    try:
+        _db.set_slow_query_ms(float(raw or 0))
+    except (TypeError, ValueError):
+        logger.warning("invalid slow_query_ms=%r; slow-query log off", raw)
+        _db.set_slow_query_ms(0)
+
+
+def _apply_sqlite_tuning(cfg: dict) -> None:
+    from . import db as _db
+
+    raw = cfg.get("sqlite_tuning", "default")
+    try:
+        applied = _db.set_tuning(raw)
+    except ValueError as exc:
+        logger.warning("invalid sqlite_tuning=%r (%s); using default", raw, exc)
+        applied = _db.set_tuning("default")
+    logger.debug("sqlite tuning: %s", applied)
+
+
+def _apply_content_hash_rate(cfg: dict) -> None:
+    # Starts / retunes / stops the hasher; only once the WriteQueue is up.
+    from . import hasher as _hasher
+
+    raw = cfg.get("content_hash_mb_per_sec", _hasher.DEFAULT_MB_PER_SEC)
+    try:
+        rate = float(raw or 0)
+    except (TypeError, ValueError):
+        logger.warning("invalid content_hash_mb_per_sec=%r; using default", raw)
+        rate = _hasher.DEFAULT_MB_PER_SEC
+    if rate <= 0:
+        _hasher.stop_hasher()
+    elif _hasher.status()["running"]:
+        _hasher.set_rate(rate)
+    elif _write_queue is not None:
+        _hasher.start_hasher(db_path=DB_PATH, write_queue=_write_queue,
+                             mb_per_sec=rate)
+
+
+def _on_config_changed(data_dir, cfg: dict) -> None:
+    # The posting index is only re-enabled when its size knob changes:
+    # re-enabling drops the built index, so unrelated preference writes
+    # must not touch it.
+    global _posting_index_applied
+    if Path(data_dir) != DATA_DIR:
+        return
+    _apply_slow_query_ms(cfg)
+    _apply_sqlite_tuning(cfg)
+    _apply_content_hash_rate(cfg)
+    max_bytes = _posting_index_bytes(cfg)
+    if max_bytes == _posting_index_applied:
+        return
+    from . import postings as _postings
+    _posting_index_applied = max_bytes
+    _postings.enable(db_path=DB_PATH, max_bytes=max_bytes)
 
 
 def stop_background_services() -> None:
@@ -56,6 +183,14 @@ def stop_background_services() -> None:
     # Reverse startup order: stop producers before the WriteQueue closes.
     from . import metadata_sync as _metadata_sync
     _metadata_sync.stop_metadata_sync_worker()
+    from . import hasher as _hasher
+    _hasher.stop_hasher()
+    from . import similar as _similar
+    _similar.disable()
+    from . import maintenance as _maintenance
+    _maintenance.stop_maintenance()
+    from . import bulk_jobs as _bulk_jobs
+    _bulk_jobs.stop()
     from . import watcher as _watcher
     _watcher.stop_heartbeat()
     _watcher.stop_file_watchers()
@@ -63,54 +198,156 @@ def stop_background_services() -> None:
     _thumbs.stop_touch_flusher()
     if _write_queue is not None:
         _write_queue.stop()
+    from . import folders as _folders
+    _folders.remove_config_listener(_on_config_changed)
+    from . import postings as _postings
+    _postings.disable()
+
+
+def startup_status() -> Dict[str, Any]:
+    """``state`` (idle / warming / ready / failed), current ``phase``, timings.
+
+    ``error`` set with ``state == "ready"`` means a phase after ``roots``
+    (vocab rebuild / first scan) failed; the gallery still serves.
+    """
+    with _startup_lock:
+        return {
+            "state": _startup["state"],
+            "phase": _startup["phase"],
+            "error": _startup["error"],
+            "phases_ms": dict(_startup["phases_ms"]),
+        }
+
+
+def _set_startup(**fields: Any) -> None:
+    with _startup_lock:
+        _startup.update(fields)
+
+
+def _run_phase(name: str, fn) -> None:
+    _set_startup(phase=name)
+    t0 = time.perf_counter()
+    try:
+        fn()
+    finally:
+        ms = round((time.perf_counter() - t0) * 1000.0, 1)
+        with _startup_lock:
+            _startup["phases_ms"][name] = ms
+
+
+def _migrate() -> None:
+    from . import db as _db
+    from . import folders as _folders
+
+    # Tuning first: a fresh file takes its page_size from the first
+    # connection, an existing one is rebuilt here while nothing else
+    # has it open.
+    _apply_sqlite_tuning(_folders._load_config(DATA_DIR))
+    conn = _db.connect_write(DB_PATH)
+    try:
+        _db.migrate(conn)
+        _db.apply_page_size(conn)
+    finally:
+        conn.close()
+
+
+def _seed_roots() -> None:
+    # T05: seed default `output` / `input` rows + materialise an empty
+    # gallery_config.json. Must run AFTER start_background_services()
+    # because the seed write goes through the WriteQueue (the only
+    # legal write path; PROJECT_STATE §4 #15 / AI_RULES R5.5).
+    from . import folders as _folders
+
+    _folders.ensure_default_roots(
+        db_path=DB_PATH,
+        data_dir=DATA_DIR,
+        write_queue=_write_queue,
+    )
+
+
+def _rebuild_vocab() -> None:
+    from . import indexer as _indexer
+
+    _indexer.maybe_rebuild_prompt_vocab_from_config(
+        db_path=DB_PATH,
+        data_dir=DATA_DIR,
+        write_queue=_write_queue,
+    )
+
+
+def _start_scan_and_watchers() -> None:
+    # T07: kick off the first-run full index of every registered root
+    # in a daemon thread. Must run AFTER ensure_default_roots so the
+    # root rows exist.
+    from . import indexer as _indexer
+    from . import watcher as _watcher
+
+    _indexer.schedule_cold_scan_all(
+        db_path=DB_PATH,
+        write_queue=_write_queue,
+    )
+    _watcher.start_file_watchers(db_path=DB_PATH, write_queue=_write_queue)
+    _watcher.start_heartbeat(db_path=DB_PATH, write_queue=_write_queue)
+
+
+def _bring_up() -> None:
+    # Background phase: everything that touches the DB or spawns daemons.
+    # Routes answer 503 ``warming`` until the roots are seeded; the vocab
+    # rebuild (minutes on upgrade) and the first scan run after that.
+    t0 = time.perf_counter()
+    ready = False
+    try:
+        _run_phase("migrate", _migrate)
+        _run_phase("services", start_background_services)
+        _run_phase("roots", _seed_roots)
+        _set_startup(state="ready")
+        ready = True
+        _run_phase("vocab", _rebuild_vocab)
+        _run_phase("scan_watchers", _start_scan_and_watchers)
+    except Exception as exc:
+        # ``phase`` is left pointing at the step that failed.
+        logger.exception("XYZ Gallery background start-up failed")
+        if ready:
+            # Already serving: keep serving, just surface the error.
+            _set_startup(error=str(exc))
+        else:
+            _set_startup(state="failed", error=str(exc))
+        return
+    _set_startup(phase=None)
+    timings = startup_status()["phases_ms"]
+    logger.info(
+        "XYZ Gallery ready in %.0f ms (%s)",
+        (time.perf_counter() - t0) * 1000.0 + timings.get("setup", 0.0),
+        ", ".join(f"{k} {v:.0f} ms" for k, v in timings.items()),
+    )
 
 
 def setup(app=None) -> None:
-    """Idempotent assembly hook. Safe to call multiple times."""
+    """Idempotent assembly hook. Safe to call multiple times.
+
+    Only the data directory and route registration happen on the caller's
+    (ComfyUI boot) thread; migration, services, root seeding, the vocab
+    rebuild and the first scan run on ``xyz-gallery-startup`` — see
+    :func:`startup_status`.
+    """
     global _initialized
+    t0 = time.perf_counter()
     _ensure_data_layout()
     if not _initialized:
         from server import PromptServer  # local import: avoid module-load coupling
-        from . import db as _db
-        from . import folders as _folders
         from . import routes as _routes
 
-        _conn = _db.connect_write(DB_PATH)
-        try:
-            _db.migrate(_conn)
-        finally:
-            _conn.close()
+        _set_startup(state="warming", phase="setup", error=None, phases_ms={})
         _routes.register(PromptServer.instance)
-        start_background_services()
-        # T05: seed default `output` / `input` rows + materialise an empty
-        # gallery_config.json. Must run AFTER start_background_services()
-        # because the seed write goes through the WriteQueue (the only
-        # legal write path; PROJECT_STATE §4 #15 / AI_RULES R5.5).
-        _folders.ensure_default_roots(
-            db_path=DB_PATH,
-            data_dir=DATA_DIR,
-            write_queue=_write_queue,
-        )
-        from . import indexer as _indexer
-        _indexer.maybe_rebuild_prompt_vocab_from_config(
-            db_path=DB_PATH,
-            data_dir=DATA_DIR,
-            write_queue=_write_queue,
-        )
-        # T07: kick off the first-run full index of every registered root
-        # in a daemon thread. Must run AFTER ensure_default_roots so the
-        # root rows exist; scan itself is non-blocking — NFR-1 budget
-        # (PROJECT_STATE §5 "启动被 gallery 阻塞 ≤ 50 ms") only counts
-        # the thread-start cost, not the walk.
-        _indexer.schedule_cold_scan_all(
-            db_path=DB_PATH,
-            write_queue=_write_queue,
-        )
-        from . import watcher as _watcher
-        _watcher.start_file_watchers(db_path=DB_PATH, write_queue=_write_queue)
-        _watcher.start_heartbeat(db_path=DB_PATH, write_queue=_write_queue)
         _initialized = True
-        logger.info("XYZ Gallery initialized (data dir: %s)", DATA_DIR)
+        with _startup_lock:
+            _startup["phases_ms"]["setup"] = round(
+                (time.perf_counter() - t0) * 1000.0, 1)
+        threading.Thread(
+            target=_bring_up, name="xyz-gallery-startup", daemon=True,
+        ).start()
+        logger.info("XYZ Gallery routes up; warming in background (data dir: %s)",
+                    DATA_DIR)
 
 
 __all__ = [
@@ -118,6 +355,7 @@ __all__ = [
     "THUMBS_DIR",
     "DB_PATH",
     "setup",
+    "startup_status",
     "start_background_services",
     "stop_background_services",
 ]
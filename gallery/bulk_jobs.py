@@ -0,0 +1,535 @@
+"""XYZ Image Gallery — persisted, resumable bulk move / delete jobs.
+
+``service.execute_move`` / ``execute_delete`` used to run a whole plan in the
+HTTP request's executor thread with the plan held only in memory.  A plan is
+now a ``bulk_job`` row plus one ``bulk_job_row`` per image (schema v7):
+
+  * :func:`create` persists it in one WriteQueue op; :func:`submit` hands the
+    id to a small pool of daemon workers so the POST can return at once.
+  * Runners (registered per ``kind`` by :mod:`service`) walk the pending rows
+    and report every outcome to a :class:`Checkpoint`, which batches the
+    ``bulk_job_row`` updates into one write op per ``CHECKPOINT_ROWS``.
+  * :func:`start` re-queues every ``queued`` / ``running`` job it finds, so
+    a restart resumes at the first row not yet checkpointed.  Runners must
+    treat rows as idempotent: a row may have been applied just before the
+    crash without its checkpoint.
+  * Progress stays on the ``bulk.progress`` / ``bulk.completed`` events that
+    feed :mod:`job_registry`; waiting jobs are listed there as ``queued``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from . import db as _db
+from . import job_registry as _jr
+from . import repo as _repo
+
+logger = logging.getLogger("xyz.gallery.bulk_jobs")
+
+__all__ = [
+    "DEFAULT_WORKERS",
+    "MAX_WORKERS",
+    "CHECKPOINT_ROWS",
+    "JobRow",
+    "Job",
+    "Checkpoint",
+    "JobInterrupted",
+    "register_runner",
+    "create",
+    "submit",
+    "run_inline",
+    "get_job",
+    "is_running",
+    "start",
+    "stop",
+]
+
+DEFAULT_WORKERS: int = 1
+MAX_WORKERS: int = 4
+CHECKPOINT_ROWS: int = 100
+# Finished jobs (and their failed rows) are pruned on start after this long.
+_FINISHED_TTL_SEC: int = 7 * 24 * 3600
+_OP_TIMEOUT_SEC: float = 120.0
+
+
+@dataclass
+class JobRow:
+    seq: int
+    image_id: int
+    src: str
+    dst: Optional[str] = None
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    actor: str
+    params: Dict[str, Any]
+    total: int
+    # Rows finished (ok or failed) by earlier runs.
+    done: int
+    # Still pending, ascending ``seq``.
+    rows: List[JobRow] = field(default_factory=list)
+    # ``{"id", "code", "message"}`` for every failed row so far.
+    failed: List[dict] = field(default_factory=list)
+
+
+Runner = Callable[[Job, "Checkpoint"], Optional[dict]]
+_runners: Dict[str, Runner] = {}
+
+
+def register_runner(kind: str, fn: Runner) -> None:
+    """``fn(job, ckpt)`` returns the result dict, or ``None`` if it stopped early."""
+    _runners[str(kind)] = fn
+
+
+# -- write ops --------------------------------------------------------------
+
+class _CreateJobOp:
+    def __init__(
+        self, *, job_id: str, kind: str, actor: str,
+        params: Dict[str, Any], rows: Sequence[JobRow],
+    ):
+        self.job_id = str(job_id)
+        self.kind = str(kind)
+        self.actor = str(actor)
+        self.params = json.dumps(params or {})
+        self.rows = [
+            (self.job_id, int(r.seq), int(r.image_id), str(r.src), r.dst)
+            for r in rows
+        ]
+
+    def apply(self, conn) -> None:
+        now = int(time.time())
+        conn.execute(
+            "INSERT INTO bulk_job(id, kind, state, actor, params, total, "
+            "created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+            (self.job_id, self.kind, self.actor, self.params,
+             len(self.rows), now, now),
+        )
+        conn.executemany(
+            "INSERT INTO bulk_job_row(job_id, seq, image_id, src, dst) "
+            "VALUES (?, ?, ?, ?, ?)",
+            self.rows,
+        )
+
+
+class _CheckpointOp:
+    def __init__(
+        self, job_id: str, ok_seqs: List[int],
+        failed: List[Tuple[int, str, str]],
+    ):
+        self.job_id = str(job_id)
+        self.ok_seqs = list(ok_seqs)
+        self.failed = list(failed)
+
+    def apply(self, conn) -> None:
+        conn.executemany(
+            "UPDATE bulk_job_row SET state = 'done' "
+            "WHERE job_id = ? AND seq = ?",
+            [(self.job_id, s) for s in self.ok_seqs],
+        )
+        conn.executemany(
+            "UPDATE bulk_job_row SET state = 'failed', code = ?, message = ? "
+            "WHERE job_id = ? AND seq = ?",
+            [(c, m, self.job_id, s) for s, c, m in self.failed],
+        )
+        conn.execute(
+            "UPDATE bulk_job SET state = 'running', done = done + ?, "
+            "failed = failed + ?, updated_at = ? WHERE id = ?",
+            (len(self.ok_seqs) + len(self.failed), len(self.failed),
+             int(time.time()), self.job_id),
+        )
+
+
+class _FinishJobOp:
+    def __init__(self, job_id: str, state: str):
+        self.job_id = str(job_id)
+        self.state = str(state)
+
+    def apply(self, conn) -> None:
+        conn.execute(
+            "UPDATE bulk_job SET state = ?, updated_at = ? WHERE id = ?",
+            (self.state, int(time.time()), self.job_id),
+        )
+        # Failed rows stay for ``get_job``; the rest is dead weight.
+        conn.execute(
+            "DELETE FROM bulk_job_row WHERE job_id = ? AND state != 'failed'",
+            (self.job_id,),
+        )
+
+
+class _PruneJobsOp:
+    def __init__(self, before: int):
+        self.before = int(before)
+
+    def apply(self, conn) -> None:
+        dead = "SELECT id FROM bulk_job WHERE state IN ('done', 'failed') " \
+               "AND updated_at < ?"
+        conn.execute(
+            f"DELETE FROM bulk_job_row WHERE job_id IN ({dead})",
+            (self.before,),
+        )
+        conn.execute(
+            "DELETE FROM bulk_job WHERE state IN ('done', 'failed') "
+            "AND updated_at < ?",
+            (self.before,),
+        )
+
+
+# -- checkpointing ----------------------------------------------------------
+
+class Checkpoint:
+    """Collects row outcomes for one run and persists them in batches.
+
+    Writes are fire-and-forget at ``MID`` (FIFO behind the row's own data
+    op, so a checkpoint never lands before the change it records);
+    :meth:`wait` flushes and blocks on the last one.
+    """
+
+    def __init__(
+        self, job: Job, *, db_path: Path, write_queue: Any,
+        stop: Optional[threading.Event] = None,
+        every: int = CHECKPOINT_ROWS,
+    ):
+        self.job = job
+        self.db_path = Path(db_path)
+        self.write_queue = write_queue
+        self.processed = int(job.done)
+        self._stop = stop
+        self._every = max(1, int(every))
+        self._ok: List[int] = []
+        self._failed: List[Tuple[int, str, str]] = []
+        self._last: Optional[Future] = None
+
+    @property
+    def stopping(self) -> bool:
+        """True once the runner pool is shutting down; stop at a row boundary."""
+        return self._stop is not None and self._stop.is_set()
+
+    def sleep(self, seconds: float) -> bool:
+        """Back off for ``seconds``; True if the pool began shutting down."""
+        if self._stop is None:
+            time.sleep(seconds)
+            return False
+        return self._stop.wait(seconds)
+
+    def ok(self, row: JobRow) -> None:
+        self._ok.append(int(row.seq))
+        self.processed += 1
+        self._maybe_flush()
+
+    def fail(self, row: JobRow, code: str, message: str) -> None:
+        self._failed.append((int(row.seq), str(code), str(message)))
+        self.job.failed.append(
+            {"id": int(row.image_id), "code": str(code), "message": str(message)},
+        )
+        self.processed += 1
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self._ok) + len(self._failed) >= self._every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._ok and not self._failed:
+            return
+        op = _CheckpointOp(self.job.job_id, self._ok, self._failed)
+        self._ok, self._failed = [], []
+        self._last = self.write_queue.enqueue_write(_repo.MID, op)
+
+    def wait(self) -> None:
+        self.flush()
+        if self._last is not None:
+            self._last.result(timeout=_OP_TIMEOUT_SEC)
+            self._last = None
+
+
+# -- persistence ------------------------------------------------------------
+
+def create(
+    *,
+    job_id: str,
+    kind: str,
+    actor: str,
+    params: Dict[str, Any],
+    rows: Sequence[JobRow],
+    write_queue: Any,
+) -> None:
+    """Persist a job and its rows (state ``queued``); blocks until committed."""
+    write_queue.enqueue_write(
+        _repo.MID,
+        _CreateJobOp(
+            job_id=job_id, kind=kind, actor=actor, params=params, rows=rows,
+        ),
+    ).result(timeout=_OP_TIMEOUT_SEC)
+
+
+def _load(db_path: Path, job_id: str) -> Optional[Job]:
+    conn = _db.connect_read(db_path)
+    try:
+        head = conn.execute(
+            "SELECT kind, actor, params, total FROM bulk_job WHERE id = ?",
+            (str(job_id),),
+        ).fetchone()
+        if head is None:
+            return None
+        rows = conn.execute(
+            "SELECT seq, image_id, src, dst, state, code, message "
+            "FROM bulk_job_row WHERE job_id = ? ORDER BY seq",
+            (str(job_id),),
+        ).fetchall()
+    finally:
+        conn.close()
+    try:
+        params = json.loads(head["params"] or "{}")
+    except ValueError:
+        params = {}
+    pending: List[JobRow] = []
+    failed: List[dict] = []
+    for r in rows:
+        if r["state"] == "pending":
+            pending.append(JobRow(
+                seq=int(r["seq"]), image_id=int(r["image_id"]),
+                src=str(r["src"]), dst=r["dst"],
+            ))
+        elif r["state"] == "failed":
+            failed.append({
+                "id": int(r["image_id"]),
+                "code": str(r["code"] or "internal"),
+                "message": str(r["message"] or ""),
+            })
+    total = int(head["total"])
+    return Job(
+        job_id=str(job_id),
+        kind=str(head["kind"]),
+        actor=str(head["actor"]),
+        params=params if isinstance(params, dict) else {},
+        total=total,
+        done=total - len(pending),
+        rows=pending,
+        failed=failed,
+    )
+
+
+def get_job(*, db_path: Path, job_id: str) -> Optional[Dict[str, Any]]:
+    """Status row for ``job_id`` (``None`` if unknown or already pruned)."""
+    conn = _db.connect_read(db_path)
+    try:
+        row = conn.execute(
+            "SELECT id, kind, state, total, done, failed, created_at, "
+            "updated_at FROM bulk_job WHERE id = ?",
+            (str(job_id),),
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {
+        "job_id": str(row["id"]),
+        "kind": str(row["kind"]),
+        "state": str(row["state"]),
+        "total": int(row["total"]),
+        "done": int(row["done"]),
+        "failed": int(row["failed"]),
+        "created_at": int(row["created_at"]),
+        "updated_at": int(row["updated_at"]),
+    }
+
+
+# -- execution --------------------------------------------------------------
+
+def _ensure_runners() -> None:
+    if not _runners:
+        from . import service  # noqa: F401 — registers the move/delete runners
+
+
+def _run(
+    job_id: str, *, db_path: Path, write_queue: Any,
+    stop: Optional[threading.Event],
+) -> Optional[dict]:
+    job = _load(db_path, job_id)
+    if job is None:
+        raise KeyError(f"bulk job {job_id} not found")
+    _ensure_runners()
+    runner = _runners.get(job.kind)
+    if runner is None:
+        raise ValueError(f"no runner for bulk job kind {job.kind!r}")
+    ckpt = Checkpoint(job, db_path=db_path, write_queue=write_queue, stop=stop)
+    try:
+        result = runner(job, ckpt)
+    except Exception:
+        if ckpt.stopping:
+            # Shutdown pulled the WriteQueue from under us; resume next start.
+            logger.warning("bulk job %s interrupted by shutdown", job_id)
+            return None
+        from . import service as _service
+
+        try:
+            ckpt.wait()
+            write_queue.enqueue_write(
+                _repo.MID, _FinishJobOp(job_id, "failed"),
+            ).result(timeout=_OP_TIMEOUT_SEC)
+        finally:
+            # Clients wait on ``bulk.completed`` for the job id; a crashed
+            # runner must end it too (this also drops the registry entry).
+            _service._emit_bulk_completed({
+                "plan_id": job_id,
+                "bulk_id": job_id,
+                "done": ckpt.processed,
+                "total": job.total,
+                "kind": job.kind,
+                "failed": list(job.failed),
+                "error": "internal",
+            })
+        raise
+    ckpt.wait()
+    if result is None:
+        logger.info(
+            "bulk job %s paused at %d/%d rows", job_id, ckpt.processed, job.total,
+        )
+        return None
+    write_queue.enqueue_write(
+        _repo.MID, _FinishJobOp(job_id, "done"),
+    ).result(timeout=_OP_TIMEOUT_SEC)
+    return result
+
+
+class JobInterrupted(RuntimeError):
+    """:func:`run_inline` returned before the job finished.
+
+    Its unfinished rows are still pending in ``bulk_job_row``; the job is
+    ``running`` and :func:`start` resumes it.
+    """
+
+    def __init__(self, job_id: str):
+        super().__init__(
+            f"bulk job {job_id} was interrupted; it resumes on next start")
+        self.job_id = str(job_id)
+
+
+def run_inline(job_id: str, *, db_path: Path, write_queue: Any) -> dict:
+    """Run a persisted job to completion on the calling thread.
+
+    Raises :class:`JobInterrupted` if the runner paused instead.
+    """
+    out = _run(job_id, db_path=Path(db_path), write_queue=write_queue, stop=None)
+    if out is None:
+        raise JobInterrupted(job_id)
+    return out
+
+
+# -- worker pool ------------------------------------------------------------
+
+_lock = threading.Lock()
+_stop = threading.Event()
+_jobs: "queue.Queue[Optional[str]]" = queue.Queue()
+_threads: List[threading.Thread] = []
+_claimed: Set[str] = set()
+_db_path: Optional[Path] = None
+_write_queue: Any = None
+
+
+def is_running() -> bool:
+    with _lock:
+        return bool(_threads) and not _stop.is_set()
+
+
+def submit(job_id: str, *, kind: str, total: int, done: int = 0) -> None:
+    """Queue a persisted job for the worker pool (no-op if already queued)."""
+    jid = str(job_id)
+    with _lock:
+        if not _threads or _stop.is_set():
+            raise RuntimeError("bulk job runner is not started")
+        if jid in _claimed:
+            return
+        _claimed.add(jid)
+    _jr.queue_bulk(jid, kind=kind, done=done, total=total)
+    _jobs.put(jid)
+
+
+def _worker() -> None:
+    while True:
+        jid = _jobs.get()
+        if jid is None or _stop.is_set():
+            return
+        try:
+            _run(jid, db_path=_db_path, write_queue=_write_queue, stop=_stop)
+        except Exception:
+            logger.exception("bulk job %s failed", jid)
+        finally:
+            with _lock:
+                _claimed.discard(jid)
+
+
+def start(
+    *, db_path: Path, write_queue: Any, workers: int = DEFAULT_WORKERS,
+) -> int:
+    """Start the pool (idempotent) and resume unfinished jobs; returns how many."""
+    global _db_path, _write_queue, _jobs
+    n = max(1, min(int(workers), MAX_WORKERS))
+    with _lock:
+        if _threads:
+            return 0
+        _stop.clear()
+        _jobs = queue.Queue()
+        _claimed.clear()
+        _db_path = Path(db_path)
+        _write_queue = write_queue
+        for i in range(n):
+            t = threading.Thread(
+                target=_worker, name=f"xyz-gallery-bulk-job-{i}", daemon=True,
+            )
+            t.start()
+            _threads.append(t)
+
+    write_queue.enqueue_write(
+        _repo.LOW, _PruneJobsOp(int(time.time()) - _FINISHED_TTL_SEC),
+    )
+    conn = _db.connect_read(db_path)
+    try:
+        pending = conn.execute(
+            "SELECT id, kind, total, done FROM bulk_job "
+            "WHERE state IN ('queued', 'running') ORDER BY created_at, id",
+        ).fetchall()
+    finally:
+        conn.close()
+    for row in pending:
+        logger.info(
+            "resuming bulk %s job %s at %d/%d",
+            row["kind"], row["id"], int(row["done"]), int(row["total"]),
+        )
+        submit(
+            str(row["id"]), kind=str(row["kind"]),
+            total=int(row["total"]), done=int(row["done"]),
+        )
+    return len(pending)
+
+
+def stop(timeout: float = 2.0) -> bool:
+    """Stop the pool; running jobs pause at a row boundary and resume on start."""
+    with _lock:
+        threads = list(_threads)
+        if not threads:
+            return True
+        _stop.set()
+        for _ in threads:
+            _jobs.put(None)
+    deadline = time.monotonic() + float(timeout)
+    for t in threads:
+        t.join(timeout=max(0.0, deadline - time.monotonic()))
+    joined = not any(t.is_alive() for t in threads)
+    with _lock:
+        _threads.clear()
+        _claimed.clear()
+    return joined
@@ -14,11 +14,18 @@ Out of scope (intentionally deferred, per AI_RULES R1.2 / R6.3 / R6.4):
 
 from __future__ import annotations
 
+import logging
 import sqlite3
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Callable, Dict, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
 
 from . import folder_header as _folder_header
+from . import metrics as _metrics
+
+logger = logging.getLogger("xyz.gallery.db")
 
 __all__ = [
     "connect_read",
@@ -26,14 +33,100 @@ __all__ = [
     "migrate",
     "MIGRATIONS",
     "SCHEMA_VERSION",
+    "set_slow_query_ms",
+    "slow_query_ms",
+    "slow_queries",
+    "TUNING_PROFILES",
+    "parse_tuning",
+    "set_tuning",
+    "tuning",
+    "apply_page_size",
 ]
 
 
 # -- PRAGMA -----------------------------------------------------------------
 
-_MMAP_BYTES = 256 * 1024 * 1024
 _BUSY_TIMEOUT_MS = 5000
 
+_MIB = 1024 * 1024
+
+# ``sqlite_tuning`` in gallery_config.json: a profile name, or an object
+# with ``profile`` plus any explicit overrides.  Read connections are
+# short-lived, so ``cache_size`` mostly helps the writer and long scans;
+# reads lean on ``mmap_size`` (the OS page cache outlives the connection).
+TUNING_PROFILES: Dict[str, Dict[str, Any]] = {
+    "small": {
+        "cache_size_mb": 8, "mmap_size_mb": 64, "page_size": 4096,
+        "wal_autocheckpoint": 1000, "temp_store": "default",
+    },
+    "default": {
+        "cache_size_mb": 32, "mmap_size_mb": 256, "page_size": 4096,
+        "wal_autocheckpoint": 1000, "temp_store": "memory",
+    },
+    "large": {
+        "cache_size_mb": 256, "mmap_size_mb": 2048, "page_size": 4096,
+        "wal_autocheckpoint": 4000, "temp_store": "memory",
+    },
+}
+
+_TEMP_STORE = {"default": 0, "file": 1, "memory": 2}
+_TUNING_LIMITS = {
+    "cache_size_mb": (1, 64 * 1024),
+    "mmap_size_mb": (0, 64 * 1024),
+    "wal_autocheckpoint": (0, 1_000_000),
+}
+
+_tuning: Dict[str, Any] = dict(TUNING_PROFILES["default"], profile="default")
+
+
+def parse_tuning(raw: Any) -> Dict[str, Any]:
+    """Validate a ``sqlite_tuning`` config value into a full setting dict.
+
+    Raises ``ValueError`` on an unknown profile / key or an out-of-range value.
+    """
+    if raw is None or raw == "":
+        raw = "default"
+    if isinstance(raw, str):
+        raw = {"profile": raw}
+    if not isinstance(raw, dict):
+        raise ValueError("sqlite_tuning must be a profile name or an object")
+    name = str(raw.get("profile", "default"))
+    if name not in TUNING_PROFILES:
+        raise ValueError(f"unknown sqlite_tuning profile: {name!r}")
+    out: Dict[str, Any] = dict(TUNING_PROFILES[name], profile=name)
+    for key, value in raw.items():
+        if key == "profile":
+            continue
+        if key not in out:
+            raise ValueError(f"unknown sqlite_tuning key: {key!r}")
+        if key == "temp_store":
+            if value not in _TEMP_STORE:
+                raise ValueError(f"temp_store must be one of {sorted(_TEMP_STORE)}")
+            out[key] = value
+            continue
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"sqlite_tuning.{key} must be an integer")
+        if key == "page_size":
+            if value < 512 or value > 65536 or value & (value - 1):
+                raise ValueError("page_size must be a power of two in 512..65536")
+        else:
+            lo, hi = _TUNING_LIMITS[key]
+            if not lo <= value <= hi:
+                raise ValueError(f"sqlite_tuning.{key} must be in {lo}..{hi}")
+        out[key] = value
+    return out
+
+
+def set_tuning(raw: Any) -> Dict[str, Any]:
+    """Validate and apply to connections opened from now on; returns it."""
+    global _tuning
+    _tuning = parse_tuning(raw)
+    return dict(_tuning)
+
+
+def tuning() -> Dict[str, Any]:
+    return dict(_tuning)
+
 
 def _register_sqlite_functions(conn: sqlite3.Connection) -> None:
     """Per-connection helpers (folder sort label, etc.)."""
@@ -45,28 +138,195 @@ def _register_sqlite_functions(conn: sqlite3.Connection) -> None:
 
 
 def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    t = _tuning
+    # Only takes effect on a brand-new (empty) file; existing DBs change
+    # page size through :func:`apply_page_size`.
+    conn.execute(f"PRAGMA page_size = {int(t['page_size'])}")
     # Order matters: WAL must be set before heavy reads/writes touch the file.
     conn.execute("PRAGMA journal_mode = WAL")
     conn.execute("PRAGMA synchronous = NORMAL")
-    conn.execute("PRAGMA temp_store = MEMORY")
-    conn.execute(f"PRAGMA mmap_size = {_MMAP_BYTES}")
+    conn.execute(f"PRAGMA temp_store = {_TEMP_STORE[t['temp_store']]}")
+    conn.execute(f"PRAGMA mmap_size = {int(t['mmap_size_mb']) * _MIB}")
+    conn.execute(f"PRAGMA cache_size = {-int(t['cache_size_mb']) * 1024}")
+    conn.execute(f"PRAGMA wal_autocheckpoint = {int(t['wal_autocheckpoint'])}")
     conn.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS}")
 
 
+def apply_page_size(conn: sqlite3.Connection) -> bool:
+    """Rebuild the file at the tuned ``page_size`` if it differs.
+
+    WAL pins the page size, so this drops to rollback journaling for one
+    ``VACUUM`` and back.  Needs the DB to itself (start-up, before the
+    writer starts).  Returns True if the file was rebuilt.
+    """
+    want = int(_tuning["page_size"])
+    (have,) = conn.execute("PRAGMA page_size").fetchone()
+    if int(have) == want:
+        return False
+    if conn.in_transaction:
+        conn.commit()
+    t0 = time.perf_counter()
+    conn.execute("PRAGMA journal_mode = DELETE")
+    try:
+        conn.execute(f"PRAGMA page_size = {want}")
+        conn.execute("VACUUM")
+    except sqlite3.OperationalError as exc:
+        logger.warning("page_size %d not applied (VACUUM failed: %s)", want, exc)
+        return False
+    finally:
+        conn.execute("PRAGMA journal_mode = WAL")
+    logger.info("gallery.sqlite rebuilt with page_size=%d (was %d) in %.1f s",
+                want, int(have), time.perf_counter() - t0)
+    return True
+
+
 # -- Connection factories ---------------------------------------------------
 
 _PathLike = Union[str, Path]
 
 
-def connect_read(path: _PathLike) -> sqlite3.Connection:
-    """Open a short-lived read connection. WAL allows many of these concurrently."""
-    conn = sqlite3.connect(str(path))
+def connect_read(
+    path: _PathLike, *, check_same_thread: bool = True,
+) -> sqlite3.Connection:
+    """Open a short-lived read connection. WAL allows many of these concurrently.
+
+    ``check_same_thread=False`` is only for a connection that is handed
+    between executor threads but never used by two at once (the export
+    cursor in ``repo``).  With :func:`set_slow_query_ms` on, the
+    connection also carries the slow-statement trace.
+    """
+    if _slow_query_ms > 0:
+        conn = sqlite3.connect(
+            str(path), check_same_thread=check_same_thread,
+            factory=_TracedConnection,
+        )
+        conn._install_trace(str(path))
+    else:
+        conn = sqlite3.connect(str(path), check_same_thread=check_same_thread)
     _apply_pragmas(conn)
     conn.row_factory = sqlite3.Row
     _register_sqlite_functions(conn)
     return conn
 
 
+# -- Opt-in slow-statement trace (read connections) -------------------------
+#
+# Python's sqlite3 has no profile hook, so a statement is timed from its
+# trace callback (statement start) by the progress handler, which SQLite
+# calls every ``_TRACE_PROGRESS_OPS`` VM instructions while it runs —
+# including while the caller steps the cursor.  Statements that finish in
+# fewer instructions never pay more than the trace callback.  A statement
+# flagged slow is reported when the next one starts or the connection
+# closes, with its ``EXPLAIN QUERY PLAN`` from a separate connection.
+
+_TRACE_PROGRESS_OPS = 1000
+_SLOW_LOG_KEEP = 50
+_SQL_LOG_MAX_CHARS = 2000
+
+_slow_query_ms: float = 0.0
+_slow_log: Deque[Dict[str, Any]] = deque(maxlen=_SLOW_LOG_KEEP)
+_slow_log_lock = threading.Lock()
+
+_metrics.describe(
+    "xyz_gallery_sql_slow_total", "counter",
+    "Read statements that ran past the slow-query threshold.",
+)
+
+
+def set_slow_query_ms(ms: float) -> None:
+    """Trace read connections opened from now on; ``<= 0`` turns it off."""
+    global _slow_query_ms
+    _slow_query_ms = max(0.0, float(ms))
+
+
+def slow_query_ms() -> float:
+    return _slow_query_ms
+
+
+def slow_queries() -> List[Dict[str, Any]]:
+    """Most recent slow statements, newest first (bounded ring)."""
+    with _slow_log_lock:
+        return list(reversed(_slow_log))
+
+
+def _explain(path: str, sql: str) -> List[str]:
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            _register_sqlite_functions(conn)
+            rows = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as exc:
+        return [f"(plan unavailable: {exc})"]
+    depth: Dict[int, int] = {0: 0}
+    out: List[str] = []
+    for node_id, parent, _unused, detail in rows:
+        d = depth.get(int(parent), 0)
+        depth[int(node_id)] = d + 1
+        out.append("  " * d + str(detail))
+    return out
+
+
+def _record_slow(path: str, sql: str, elapsed_s: float) -> None:
+    entry = {
+        "at": int(time.time()),
+        "ms": round(elapsed_s * 1000.0, 1),
+        "sql": sql[:_SQL_LOG_MAX_CHARS],
+        "plan": _explain(path, sql),
+    }
+    with _slow_log_lock:
+        _slow_log.append(entry)
+    _metrics.inc("xyz_gallery_sql_slow_total")
+    logger.warning(
+        "slow read statement (>= %.1f ms): %s\n  plan: %s",
+        entry["ms"], entry["sql"], " | ".join(entry["plan"]),
+    )
+
+
+class _TracedConnection(sqlite3.Connection):
+    """Read connection that times each statement via trace + progress hooks."""
+
+    def _install_trace(self, path: str) -> None:
+        self._trace_path = path
+        self._trace_sql: Optional[str] = None
+        self._trace_t0 = 0.0
+        self._trace_elapsed = 0.0
+        self._trace_slow = False
+        self.set_trace_callback(self._on_statement)
+        self.set_progress_handler(self._on_progress, _TRACE_PROGRESS_OPS)
+
+    def _on_statement(self, sql: str) -> None:
+        if sql.startswith("--"):
+            return  # trigger sub-statements
+        self._finish_statement()
+        self._trace_sql = sql
+        self._trace_t0 = time.perf_counter()
+        self._trace_elapsed = 0.0
+
+    def _on_progress(self) -> int:
+        if self._trace_sql is not None:
+            self._trace_elapsed = time.perf_counter() - self._trace_t0
+            if 0 < _slow_query_ms <= self._trace_elapsed * 1000.0:
+                self._trace_slow = True
+        return 0
+
+    def _finish_statement(self) -> None:
+        sql, slow = self._trace_sql, self._trace_slow
+        self._trace_sql = None
+        self._trace_slow = False
+        if slow and sql is not None:
+            try:
+                _record_slow(self._trace_path, sql, self._trace_elapsed)
+            except Exception:  # noqa: BLE001 — diagnostics must not fail reads
+                logger.exception("slow statement report failed")
+
+    def close(self) -> None:
+        if getattr(self, "_trace_path", None) is not None:
+            self._finish_statement()
+        super().close()
+
+
 def connect_write(path: _PathLike) -> sqlite3.Connection:
     """Open an exclusive writer-side connection.
 
@@ -288,9 +548,123 @@ def _migrate_v6(conn: sqlite3.Connection) -> None:
     conn.executescript(_V6_DDL)
 
 
+# -- Schema v7 — persisted bulk move / delete jobs (``bulk_jobs``) ------------
+
+_V7_DDL = """
+CREATE TABLE IF NOT EXISTS bulk_job (
+    id            TEXT PRIMARY KEY,
+    kind          TEXT NOT NULL,
+    state         TEXT NOT NULL DEFAULT 'queued',
+    actor         TEXT NOT NULL DEFAULT 'unknown',
+    params        TEXT NOT NULL DEFAULT '{}',
+    total         INTEGER NOT NULL DEFAULT 0,
+    done          INTEGER NOT NULL DEFAULT 0,
+    failed        INTEGER NOT NULL DEFAULT 0,
+    created_at    INTEGER NOT NULL,
+    updated_at    INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_bulk_job_state ON bulk_job(state);
+
+CREATE TABLE IF NOT EXISTS bulk_job_row (
+    job_id        TEXT NOT NULL REFERENCES bulk_job(id) ON DELETE CASCADE,
+    seq           INTEGER NOT NULL,
+    image_id      INTEGER NOT NULL,
+    src           TEXT NOT NULL,
+    dst           TEXT,
+    state         TEXT NOT NULL DEFAULT 'pending',
+    code          TEXT,
+    message       TEXT,
+    PRIMARY KEY (job_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+def _migrate_v7(conn: sqlite3.Connection) -> None:
+    conn.executescript(_V7_DDL)
+
+
+# -- Schema v8 — incremental auto-vacuum (``maintenance``) --------------------
+
+def _migrate_v8(conn: sqlite3.Connection) -> None:
+    # auto_vacuum can only be switched on an existing file by a full
+    # VACUUM, which needs free disk of about the DB's size.  If that fails
+    # the DB keeps working in NONE mode; maintenance then skips the
+    # incremental vacuum step instead of blocking start-up.
+    (mode,) = conn.execute("PRAGMA auto_vacuum").fetchone()
+    if int(mode) == 2:
+        return
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    t0 = time.perf_counter()
+    try:
+        conn.execute("VACUUM")
+    except sqlite3.OperationalError as exc:
+        logger.warning("auto_vacuum=INCREMENTAL not applied (VACUUM failed: %s)", exc)
+        return
+    logger.info("gallery.sqlite rebuilt with auto_vacuum=INCREMENTAL in %.1f s",
+                time.perf_counter() - t0)
+
+
+# -- Schema v9 — content hashes (``hasher``) ---------------------------------
+
+# ``content_hash`` is filled lazily by ``hasher``.  The trigger is the one
+# place that keeps it honest: any writer that changes a row's on-disk
+# fingerprint (re-index upsert, sync refresh, relocate …) drops the hash,
+# and the hasher picks the row up again through the pending index.
+_V9_DDL = """
+CREATE INDEX IF NOT EXISTS idx_image_content_hash
+    ON image(content_hash) WHERE content_hash IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_image_hash_pending
+    ON image(id) WHERE content_hash IS NULL;
+
+CREATE TRIGGER IF NOT EXISTS trg_image_content_hash_stale
+AFTER UPDATE OF file_size, mtime_ns ON image
+WHEN NEW.content_hash IS NOT NULL
+ AND (OLD.file_size IS NOT NEW.file_size OR OLD.mtime_ns IS NOT NEW.mtime_ns)
+BEGIN
+    UPDATE image SET content_hash = NULL WHERE id = NEW.id;
+END;
+"""
+
+
+def _migrate_v9(conn: sqlite3.Connection) -> None:
+    conn.executescript(_V9_DDL)
+
+
+# -- Schema v10 — perceptual hashes (``similar``) ----------------------------
+
+# ``phash`` is a 64-bit dHash of the 320 px thumbnail, stored as a signed
+# INTEGER.  Written by ``thumbs`` whenever it encodes a thumbnail; cleared
+# on the same fingerprint change as ``content_hash``.
+_V10_DDL = """
+CREATE INDEX IF NOT EXISTS idx_image_phash_pending
+    ON image(id) WHERE phash IS NULL;
+
+CREATE TRIGGER IF NOT EXISTS trg_image_phash_stale
+AFTER UPDATE OF file_size, mtime_ns ON image
+WHEN NEW.phash IS NOT NULL
+ AND (OLD.file_size IS NOT NEW.file_size OR OLD.mtime_ns IS NOT NEW.mtime_ns)
+BEGIN
+    UPDATE image SET phash = NULL WHERE id = NEW.id;
+END;
+"""
+
+
+def _migrate_v10(conn: sqlite3.Connection) -> None:
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(image)")}
+    if "phash" not in cols:
+        conn.execute("ALTER TABLE image ADD COLUMN phash INTEGER")
+    conn.executescript(_V10_DDL)
+
+
 # -- Migration framework ----------------------------------------------------
 
-# Forward-only ledger. ``6`` = word_token / image_word_token (§11 F04 word).
+# Forward-only ledger. ``6`` = word_token / image_word_token (§11 F04 word);
+# ``7`` = bulk_job / bulk_job_row checkpoints; ``8`` = auto_vacuum=INCREMENTAL;
+# ``9`` = content_hash indexes + staleness trigger; ``10`` = ``image.phash``.
 # FTS5 / T28 will append later steps (see module docstring).
 MIGRATIONS: Dict[int, Callable[[sqlite3.Connection], None]] = {
     1: _migrate_v1,
@@ -299,6 +673,10 @@ MIGRATIONS: Dict[int, Callable[[sqlite3.Connection], None]] = {
     4: _migrate_v4,
     5: _migrate_v5,
     6: _migrate_v6,
+    7: _migrate_v7,
+    8: _migrate_v8,
+    9: _migrate_v9,
+    10: _migrate_v10,
 }
 
 SCHEMA_VERSION: int = max(MIGRATIONS)
@@ -22,11 +22,13 @@ Out of scope (deferred, per AI_RULES R1.2 / R4.3):
 
 from __future__ import annotations
 
+import copy
 import json
 import logging
 import os
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from . import db as _db
 from . import repo as _repo
@@ -43,6 +45,9 @@ __all__ = [
     "get_gallery_preferences",
     "patch_gallery_preferences",
     "normalize_download_variant",
+    "prompt_stopwords",
+    "add_config_listener",
+    "remove_config_listener",
 ]
 
 _PathLike = Union[str, Path]
@@ -70,6 +75,18 @@ _DEFAULT_CONFIG: Dict[str, Any] = {
     "download_basename_prefix": "",
     "developer_mode": False,
     "theme": "dark",
+    # In-memory vocab posting lists (``postings``); 0 disables, SQL only.
+    "posting_index_max_mb": 64,
+    # Worker threads for persisted bulk move / delete jobs (``bulk_jobs``).
+    "bulk_job_workers": 1,
+    # Log read statements slower than this (ms) with their query plan; 0 = off.
+    "slow_query_ms": 0,
+    # SQLite connection tuning: "small" | "default" | "large", or an object
+    # {"profile": ..., "cache_size_mb", "mmap_size_mb", "page_size",
+    #  "wal_autocheckpoint", "temp_store"} — see ``db.TUNING_PROFILES``.
+    "sqlite_tuning": "default",
+    # Read budget of the background content hasher (``hasher``); 0 = off.
+    "content_hash_mb_per_sec": 32,
     "filter_visibility": {
         "name": True,
         "metadata_presence": True,
@@ -100,10 +117,46 @@ def _config_path(data_dir: Path) -> Path:
     return Path(data_dir) / CONFIG_FILENAME
 
 
-def _load_config(data_dir: Path) -> Dict[str, Any]:
-    p = _config_path(data_dir)
+# Parsed config per file, keyed by path and validated against the file's
+# ``(mtime_ns, size)`` on every read: the hot readers (prompt stopwords on
+# every ``index_one`` / detail serialisation) pay one ``stat`` instead of a
+# read + ``json.load``.  ``_save_config`` refreshes the entry in place, so
+# in-process writes are visible immediately and fan out to listeners.
+_config_lock = threading.Lock()
+# path → (stamp, merged config, derived prompt-stopword set)
+_config_cache: Dict[str, Tuple[Optional[Tuple[int, int]], Dict[str, Any], frozenset]] = {}
+_config_listeners: List[Callable[[Path, Dict[str, Any]], None]] = []
+
+
+def add_config_listener(fn: Callable[[Path, Dict[str, Any]], None]) -> None:
+    """Call ``fn(data_dir, cfg)`` whenever a cached config changes.
+
+    Fired after ``_save_config`` and when a stat notices an outside edit
+    (never for the first load).  ``cfg`` is a private copy.  Runs on the
+    thread that saw the change — keep it cheap.
+    """
+    with _config_lock:
+        if fn not in _config_listeners:
+            _config_listeners.append(fn)
+
+
+def remove_config_listener(fn: Callable[[Path, Dict[str, Any]], None]) -> None:
+    with _config_lock:
+        if fn in _config_listeners:
+            _config_listeners.remove(fn)
+
+
+def _config_stamp(p: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(p)
+    except OSError:
+        return None
+    return (int(st.st_mtime_ns), int(st.st_size))
+
+
+def _read_config_file(p: Path) -> Dict[str, Any]:
     if not p.exists():
-        return dict(_DEFAULT_CONFIG)
+        return copy.deepcopy(_DEFAULT_CONFIG)
     try:
         with p.open("r", encoding="utf-8") as f:
             data = json.load(f)
@@ -112,8 +165,12 @@ def _load_config(data_dir: Path) -> Dict[str, Any]:
         # to defaults and log. The original file is left in place so a human
         # can recover it (C-10).
         logger.exception("failed to read %s; using defaults", p)
-        return dict(_DEFAULT_CONFIG)
-    merged = dict(_DEFAULT_CONFIG)
+        return copy.deepcopy(_DEFAULT_CONFIG)
+    return _merge_defaults(data)
+
+
+def _merge_defaults(data: Any) -> Dict[str, Any]:
+    merged = copy.deepcopy(_DEFAULT_CONFIG)
     if isinstance(data, dict):
         merged.update(data)
     if not isinstance(merged.get("roots"), list):
@@ -121,6 +178,54 @@ def _load_config(data_dir: Path) -> Dict[str, Any]:
     return merged
 
 
+def _stopwords_of(cfg: Dict[str, Any]) -> frozenset:
+    words = cfg.get("prompt_stopwords")
+    if not isinstance(words, list) or not words:
+        return frozenset()
+    return frozenset(str(w).strip().lower() for w in words if str(w).strip())
+
+
+def _install_config(
+    p: Path, stamp: Optional[Tuple[int, int]], cfg: Dict[str, Any], *,
+    notify: bool,
+) -> Tuple[Optional[Tuple[int, int]], Dict[str, Any], frozenset]:
+    entry = (stamp, cfg, _stopwords_of(cfg))
+    with _config_lock:
+        _config_cache[str(p)] = entry
+        listeners = list(_config_listeners) if notify else []
+    for fn in listeners:
+        try:
+            fn(p.parent, copy.deepcopy(cfg))
+        except Exception:
+            logger.exception("config listener %r failed", fn)
+    return entry
+
+
+def _config_entry(
+    data_dir: _PathLike,
+) -> Tuple[Optional[Tuple[int, int]], Dict[str, Any], frozenset]:
+    p = _config_path(Path(data_dir))
+    stamp = _config_stamp(p)
+    with _config_lock:
+        hit = _config_cache.get(str(p))
+    if hit is not None and hit[0] == stamp:
+        return hit
+    # Stat before read: if the file changes mid-read we cache the newer
+    # body under the older stamp, and the next call simply re-reads.
+    return _install_config(p, stamp, _read_config_file(p),
+                           notify=hit is not None)
+
+
+def _load_config(data_dir: Path) -> Dict[str, Any]:
+    """Merged config (defaults + file) — a private copy callers may mutate."""
+    return copy.deepcopy(_config_entry(data_dir)[1])
+
+
+def prompt_stopwords(data_dir: _PathLike) -> frozenset:
+    """``prompt_stopwords`` as a lower-cased set, cached with the config (T15)."""
+    return _config_entry(data_dir)[2]
+
+
 def _save_config(data_dir: Path, cfg: Dict[str, Any]) -> None:
     # write-temp + os.replace for crash-safety (mirrors the C-6 pattern that
     # T17 will use for PNG chunks; doing it here too keeps the on-disk file
@@ -130,6 +235,8 @@ def _save_config(data_dir: Path, cfg: Dict[str, Any]) -> None:
     with tmp.open("w", encoding="utf-8") as f:
         json.dump(cfg, f, indent=2, ensure_ascii=False)
     os.replace(tmp, p)
+    _install_config(p, _config_stamp(p), _merge_defaults(copy.deepcopy(cfg)),
+                    notify=True)
 
 
 # -- helpers ----------------------------------------------------------------
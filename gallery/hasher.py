@@ -0,0 +1,246 @@
+"""XYZ Image Gallery — lazy background content hashing (``image.content_hash``).
+
+The indexer leaves ``content_hash`` NULL (SPEC: "computed lazily"); this
+daemon (``xyz-gallery-hasher``) fills it.  It walks the rows still
+missing a hash in id order (``idx_image_hash_pending``), hashes batches
+of files on a small thread pool and stores them with one LOW
+:class:`repo.SetContentHashesOp` per batch.  The op only writes rows whose
+``(file_size, mtime_ns)`` still match what was hashed, and schema v9's
+trigger clears a hash whenever that fingerprint changes, so a stored hash
+always describes the current file bytes.
+
+Hash: BLAKE2b-128 over the whole file, hex-encoded — in the stdlib, fast
+enough to be disk-bound, and stable across installs (no optional
+dependency deciding the format).  Reads are throttled to
+``content_hash_mb_per_sec`` from ``gallery_config.json`` (``0`` turns
+the hasher off) so a first pass over a large library does not compete
+with generation or browsing for disk bandwidth.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import db as _db
+from . import repo as _repo
+
+logger = logging.getLogger("xyz.gallery.hasher")
+
+__all__ = [
+    "hash_file",
+    "start_hasher",
+    "stop_hasher",
+    "set_rate",
+    "wake",
+    "status",
+]
+
+DEFAULT_MB_PER_SEC = 32.0
+_BATCH = 128
+_WORKERS = 2
+_CHUNK = 1024 * 1024
+# Sleep between passes once nothing is pending (``wake`` cuts it short).
+_IDLE_POLL_SEC = 60.0
+_WRITE_TIMEOUT_SEC = 60.0
+
+
+class _Throttle:
+    """Token bucket shared by the pool workers; ``rate <= 0`` = unlimited."""
+
+    def __init__(self, bytes_per_sec: float) -> None:
+        self._lock = threading.Lock()
+        self._rate = float(bytes_per_sec)
+        self._allowance = 0.0
+        self._last = time.monotonic()
+
+    def set_rate(self, bytes_per_sec: float) -> None:
+        with self._lock:
+            self._rate = float(bytes_per_sec)
+
+    def consume(self, n: int, stop: Optional[threading.Event] = None) -> None:
+        with self._lock:
+            if self._rate <= 0:
+                return
+            now = time.monotonic()
+            # At most one second of burst.
+            self._allowance = min(
+                self._rate, self._allowance + (now - self._last) * self._rate)
+            self._last = now
+            self._allowance -= n
+            wait = -self._allowance / self._rate if self._allowance < 0 else 0.0
+        if wait > 0:
+            if stop is not None:
+                stop.wait(wait)
+            else:
+                time.sleep(wait)
+
+
+def hash_file(path: Any, throttle: Optional[_Throttle] = None,
+              stop: Optional[threading.Event] = None) -> str:
+    """Hex BLAKE2b-128 of the file's bytes (raises ``OSError``)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+            if throttle is not None:
+                throttle.consume(len(chunk), stop)
+            if stop is not None and stop.is_set():
+                raise InterruptedError("hasher stopping")
+    return h.hexdigest()
+
+
+class _Hasher:
+    def __init__(self, *, db_path: Path, write_queue: Any, mb_per_sec: float) -> None:
+        self._db_path = Path(db_path)
+        self._write_queue = write_queue
+        self._throttle = _Throttle(mb_per_sec * 1024 * 1024)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thr: Optional[threading.Thread] = None
+        # Unreadable files, keyed by id → fingerprint, so one missing file
+        # is not retried every pass until the indexer catches up with it.
+        self._failed: Dict[int, Tuple[int, int]] = {}
+        self.hashed_total = 0
+        self.bytes_total = 0
+        self.last_pass_at: Optional[int] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thr = threading.Thread(
+            target=self._loop, name="xyz-gallery-hasher", daemon=True,
+        )
+        self._thr.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thr is not None:
+            self._thr.join(timeout=timeout)
+            self._thr = None
+
+    def _pending(self, after_id: int) -> List[Tuple[int, str, int, int]]:
+        conn = _db.connect_read(self._db_path)
+        try:
+            rows = conn.execute(
+                "SELECT id, path, file_size, mtime_ns FROM image "
+                "WHERE content_hash IS NULL AND id > ? ORDER BY id LIMIT ?",
+                (after_id, _BATCH),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            (int(r[0]), str(r[1]), int(r[2] or 0), int(r[3] or 0)) for r in rows
+        ]
+
+    def _hash_one(self, row: Tuple[int, str, int, int]) -> Optional[Tuple[int, str, int, int]]:
+        iid, path, size, mtime_ns = row
+        if self._failed.get(iid) == (size, mtime_ns):
+            return None
+        try:
+            digest = hash_file(path, self._throttle, self._stop)
+        except InterruptedError:
+            return None
+        except OSError as exc:
+            self._failed[iid] = (size, mtime_ns)
+            logger.debug("hash skipped id=%s (%s)", iid, exc)
+            return None
+        self._failed.pop(iid, None)
+        return iid, digest, size, mtime_ns
+
+    def run_pass(self, pool: ThreadPoolExecutor) -> int:
+        """Hash every row pending at the start of the pass; returns rows stored."""
+        stored = 0
+        after = 0
+        while not self._stop.is_set():
+            rows = self._pending(after)
+            if not rows:
+                break
+            after = rows[-1][0]
+            done = [r for r in pool.map(self._hash_one, rows) if r is not None]
+            if done and not self._stop.is_set():
+                n = self._write_queue.enqueue_write(
+                    _repo.LOW, _repo.SetContentHashesOp(done),
+                ).result(timeout=_WRITE_TIMEOUT_SEC)
+                stored += n
+                self.hashed_total += n
+                self.bytes_total += sum(r[2] for r in done)
+        self.last_pass_at = int(time.time())
+        return stored
+
+    def _loop(self) -> None:
+        with ThreadPoolExecutor(
+            max_workers=_WORKERS, thread_name_prefix="xyz-gallery-hasher-io",
+        ) as pool:
+            while not self._stop.is_set():
+                try:
+                    n = self.run_pass(pool)
+                    if n:
+                        logger.info("content hashes stored: %d", n)
+                except Exception:
+                    logger.exception("hasher pass failed")
+                self._wake.wait(_IDLE_POLL_SEC)
+                self._wake.clear()
+
+
+_hasher: Optional[_Hasher] = None
+_hasher_lock = threading.Lock()
+
+
+def start_hasher(*, db_path: Any, write_queue: Any,
+                 mb_per_sec: float = DEFAULT_MB_PER_SEC) -> None:
+    """Start the hasher daemon (idempotent); ``mb_per_sec <= 0`` leaves it off."""
+    global _hasher
+    if mb_per_sec <= 0:
+        logger.info("content hasher disabled (content_hash_mb_per_sec=0)")
+        return
+    with _hasher_lock:
+        if _hasher is not None:
+            return
+        _hasher = _Hasher(db_path=db_path, write_queue=write_queue,
+                          mb_per_sec=mb_per_sec)
+        _hasher.start()
+
+
+def stop_hasher() -> None:
+    global _hasher
+    with _hasher_lock:
+        h, _hasher = _hasher, None
+    if h is not None:
+        h.stop()
+
+
+def set_rate(mb_per_sec: float) -> None:
+    """Retune a running hasher (``<= 0`` = unthrottled while running)."""
+    with _hasher_lock:
+        if _hasher is not None:
+            _hasher._throttle.set_rate(mb_per_sec * 1024 * 1024)
+
+
+def wake() -> None:
+    """Start the next pass now (e.g. after a batch of new images)."""
+    with _hasher_lock:
+        if _hasher is not None:
+            _hasher._wake.set()
+
+
+def status() -> Dict[str, Any]:
+    with _hasher_lock:
+        h = _hasher
+    if h is None:
+        return {"running": False}
+    return {
+        "running": True,
+        "hashed_total": h.hashed_total,
+        "bytes_total": h.bytes_total,
+        "unreadable": len(h._failed),
+        "last_pass_at": h.last_pass_at,
+    }
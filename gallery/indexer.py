@@ -12,6 +12,11 @@ Scope (per TASKS.md T07 + PROJECT_STATE §7):
 * ``index_one(path)`` — single-file path; returns ``image.id`` after
   the LOW write, or ``None`` if skipped (watcher T20, ``service`` 广播 id).
 * ``delete_one(path)`` — T20 watcher: delete DB row by POSIX path, idem.
+* ``index_many(paths)`` / ``delete_many(paths)`` — watcher flush chunks:
+  one fingerprint / id query per chunk, parallel parsing, one write op.
+* ``pair_moves`` / ``relocate_many`` — turn a vanished row + an appeared
+  file with the same fingerprint into one ``UpdateImagePathOp`` (watcher
+  and ``delta_scan`` move detection) instead of delete + re-parse.
 * ``_inflight`` + ``_inflight_lock`` — module-wide de-duplication
   barrier keyed on ``os.path.realpath + os.path.normcase`` (TASKS T07
   UPDATED / T20 UPDATED).  Released unconditionally in ``finally``.
@@ -31,11 +36,10 @@ import logging
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
-from PIL import Image, UnidentifiedImageError
-
 from . import db as _db
 from . import metadata as _metadata
 from . import paths as _paths
@@ -49,6 +53,11 @@ __all__ = [
     "delta_scan",
     "index_one",
     "delete_one",
+    "index_many",
+    "delete_many",
+    "load_move_candidates",
+    "pair_moves",
+    "relocate_many",
     "is_cold_scanning",
     "schedule_cold_scan_all",
     "is_derivative_path_excluded",
@@ -156,6 +165,8 @@ def _read_dims(path: str) -> Tuple[Optional[int], Optional[int]]:
     # decoding pixels, so this is cheap (~0.3 ms on a typical PNG).
     # T06's read_comfy_metadata does not expose dimensions, and widening
     # its contract is explicitly off-limits (PROJECT_STATE §7 note 8).
+    from PIL import Image, UnidentifiedImageError
+
     try:
         with Image.open(path) as img:
             w, h = img.size
@@ -176,17 +187,13 @@ def _normalise_tags_csv(raw: Optional[str]) -> Optional[str]:
 
 
 def _load_prompt_stopwords(db_path: _PathLike) -> frozenset:
-    cfg = Path(db_path).parent / "gallery_config.json"
-    if not cfg.is_file():
-        return frozenset()
+    # Cached per (mtime_ns, size) in ``folders`` — one stat per call.
+    from . import folders as _folders
+
     try:
-        data = json.loads(cfg.read_text(encoding="utf-8"))
+        return _folders.prompt_stopwords(Path(db_path).parent)
     except Exception:
         return frozenset()
-    words = data.get("prompt_stopwords")
-    if not words:
-        return frozenset()
-    return frozenset(str(w).strip().lower() for w in words if str(w).strip())
 
 
 def _normalized_tag_list(raw: Optional[str]) -> List[str]:
@@ -483,6 +490,316 @@ def delete_one(
         _release(key)
 
 
+# Metadata parsing is file I/O + zlib, so a few threads overlap well on a
+# watcher flush without competing with the single writer.
+_PARSE_WORKERS: int = 4
+
+
+def _load_chunk_fingerprints(
+    db_path: _PathLike, posix_paths: List[str]
+) -> Dict[str, Tuple[int, int]]:
+    """``{path: (file_size, mtime_ns)}`` for ``posix_paths`` in one query."""
+    if not posix_paths:
+        return {}
+    conn = _db.connect_read(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT image.path, image.file_size, image.mtime_ns "
+            "FROM json_each(?) AS j JOIN image ON image.path = j.value "
+            "WHERE image.file_size IS NOT NULL AND image.mtime_ns IS NOT NULL",
+            (json.dumps(posix_paths),),
+        ).fetchall()
+    finally:
+        conn.close()
+    return {
+        str(r["path"]): (int(r["file_size"]), int(r["mtime_ns"])) for r in rows
+    }
+
+
+def index_many(
+    paths: Iterable[_PathLike], *, root: Dict[str, Any],
+    db_path: _PathLike, write_queue, timeout: float = 60.0,
+) -> List[int]:
+    """Batch form of :func:`index_one` for a watcher flush chunk.
+
+    Skips exactly what ``index_one`` skips, but with one fingerprint query
+    for the chunk, metadata parsing on a small thread pool and a single
+    :class:`repo.UpsertImagesOp`.  Returns the written ``image.id`` values
+    in input order; a file that fails to parse is logged and left out.
+    """
+    root_path = str(root["path"])
+    claimed: List[str] = []
+    try:
+        stats: List[Tuple[str, str, os.stat_result]] = []
+        for p in paths:
+            abs_path = str(p)
+            if _metadata.is_gallery_atomic_temp_basename(os.path.basename(abs_path)):
+                continue
+            if is_derivative_path_excluded(abs_path, root_path):
+                continue
+            key = _normalise_key(abs_path)
+            if not _claim(key):
+                continue
+            claimed.append(key)
+            try:
+                st = os.stat(abs_path)
+            except OSError:
+                continue
+            stats.append((abs_path, Path(abs_path).as_posix(), st))
+
+        fingerprints = _load_chunk_fingerprints(
+            db_path, [posix_path for _a, posix_path, _st in stats],
+        )
+        todo = [
+            (abs_path, st) for abs_path, posix_path, st in stats
+            if fingerprints.get(posix_path)
+            != (int(st.st_size), int(st.st_mtime_ns))
+        ]
+        if not todo:
+            return []
+        extra_sw = _load_prompt_stopwords(db_path)
+
+        def _parse(item: Tuple[str, os.stat_result]) -> _repo.UpsertImageOp:
+            abs_path, st = item
+            return _build_upsert_op(
+                abs_path=abs_path, root=root, stat_result=st,
+                meta=_metadata.read_comfy_metadata(abs_path),
+                extra_stopwords=extra_sw,
+            )
+
+        ops: List[_repo.UpsertImageOp] = []
+        with ThreadPoolExecutor(
+            max_workers=min(_PARSE_WORKERS, len(todo)),
+            thread_name_prefix="xyz-gallery-parse",
+        ) as pool:
+            for (abs_path, _st), fut in [
+                (item, pool.submit(_parse, item)) for item in todo
+            ]:
+                try:
+                    ops.append(fut.result())
+                except Exception:
+                    logger.exception("failed to build op for %s", abs_path)
+
+        if not ops:
+            return []
+        res = write_queue.enqueue_write(
+            _repo.LOW, _repo.UpsertImagesOp(ops),
+        ).result(timeout=timeout)
+        for path, msg in res["failed"].items():
+            logger.warning("index_many upsert failed for %s: %s", path, msg)
+        ids = [res["ids"][op.path] for op in ops if op.path in res["ids"]]
+        if ids:
+            _wake_hasher()
+        return ids
+    finally:
+        for key in claimed:
+            _release(key)
+
+
+def _wake_hasher() -> None:
+    # New rows carry a NULL content_hash; don't leave them until the
+    # hasher's idle poll comes round.
+    from . import hasher as _hasher
+
+    _hasher.wake()
+
+
+def delete_many(
+    paths: Iterable[_PathLike], *, db_path: _PathLike, write_queue,
+    timeout: float = 60.0,
+) -> List[int]:
+    """Batch form of :func:`delete_one`: one id lookup + one ``DeleteImagesOp``.
+
+    Returns the deleted ids.  The op's path guard leaves rows alone that
+    were re-pointed between the lookup and the write.
+    """
+    claimed: List[str] = []
+    try:
+        posix_paths: List[str] = []
+        for p in paths:
+            key = _normalise_key(str(p))
+            if not _claim(key):
+                continue
+            claimed.append(key)
+            posix_paths.append(Path(str(p)).as_posix())
+        if not posix_paths:
+            return []
+        conn = _db.connect_read(db_path)
+        try:
+            rows = conn.execute(
+                "SELECT image.id, image.path FROM json_each(?) AS j "
+                "JOIN image ON image.path = j.value",
+                (json.dumps(posix_paths),),
+            ).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return []
+        return write_queue.enqueue_write(
+            _repo.LOW,
+            _repo.DeleteImagesOp(
+                image_ids=[int(r["id"]) for r in rows],
+                paths=[str(r["path"]) for r in rows],
+            ),
+        ).result(timeout=timeout)
+    finally:
+        for key in claimed:
+            _release(key)
+
+
+# -- move detection (watcher flush / delta_scan) ------------------------------
+#
+# An OS-level move shows up as "path A vanished" + "path B appeared".  A
+# vanished row and an appeared file with the same ``(file_size, mtime_ns)``
+# are the same bytes — moves and renames keep both — so the row is
+# re-pointed with ``UpdateImagePathOp``: id, tags, favorite, hashes and the
+# cached thumbnail survive, and nothing is re-parsed.  The vanished file
+# can no longer be stat'ed, so the stored fingerprint stands in for its
+# inode; ties go to the same filename, then to ``content_hash``.
+
+def load_move_candidates(
+    posix_paths: Iterable[str], *, db_path: _PathLike,
+) -> List[Dict[str, Any]]:
+    """Rows at ``posix_paths`` with what :func:`pair_moves` matches on."""
+    paths = list(posix_paths)
+    if not paths:
+        return []
+    conn = _db.connect_read(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT image.id, image.path, image.filename, image.file_size, "
+            "image.mtime_ns, image.content_hash "
+            "FROM json_each(?) AS j JOIN image ON image.path = j.value "
+            "WHERE image.file_size IS NOT NULL AND image.mtime_ns IS NOT NULL",
+            (json.dumps(paths),),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(r) for r in rows]
+
+
+def pair_moves(
+    gone: Iterable[Dict[str, Any]],
+    fresh: Iterable[Tuple[str, os.stat_result]],
+) -> List[Tuple[Dict[str, Any], str, os.stat_result]]:
+    """Pair vanished rows with appeared ``(abs_path, stat)`` files.
+
+    Returns ``(row, abs_path, stat)`` per confident match; anything
+    ambiguous stays unpaired (index + delete is always safe).
+    """
+    by_fp: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    for row in gone:
+        by_fp.setdefault(
+            (int(row["file_size"]), int(row["mtime_ns"])), []).append(row)
+    pairs: List[Tuple[Dict[str, Any], str, os.stat_result]] = []
+    for abs_path, st in fresh:
+        cands = by_fp.get((int(st.st_size), int(st.st_mtime_ns)))
+        if not cands:
+            continue
+        row = _pick_move_source(cands, abs_path)
+        if row is not None:
+            cands.remove(row)
+            pairs.append((row, abs_path, st))
+    return pairs
+
+
+def _pick_move_source(
+    cands: List[Dict[str, Any]], abs_path: str,
+) -> Optional[Dict[str, Any]]:
+    if len(cands) == 1:
+        return cands[0]
+    name = os.path.basename(abs_path)
+    same = [c for c in cands if c["filename"] == name]
+    if len(same) == 1:
+        return same[0]
+    hashed = [c for c in (same or cands) if c["content_hash"]]
+    if not hashed:
+        return None
+    from . import hasher as _hasher
+
+    try:
+        digest = _hasher.hash_file(abs_path)
+    except OSError:
+        return None
+    # Identical bytes under one fingerprint: any of them is a faithful source.
+    match = sorted(
+        (c for c in hashed if c["content_hash"] == digest), key=lambda c: c["id"])
+    return match[0] if match else None
+
+
+def relocate_many(
+    pairs: Iterable[Tuple[Dict[str, Any], str, os.stat_result]], *,
+    root: Dict[str, Any], db_path: _PathLike, write_queue,
+    thumbs_dir: Optional[_PathLike] = None, timeout: float = 60.0,
+) -> Tuple[List[int], List[Tuple[Dict[str, Any], str]]]:
+    """Re-point paired rows at their new paths under ``root`` in one write.
+
+    Returns ``(moved_ids, failed)`` — ``failed`` holds ``(row, abs_path)``
+    pairs the caller should fall back to delete + index for (target path
+    already indexed, row vanished, or the new path is busy elsewhere).
+    """
+    root_posix = str(root["path"])
+    root_res = Path(root_posix).resolve(strict=False)
+    claimed: List[str] = []
+    try:
+        items: List[_repo.UpdateImagePathOp] = []
+        by_id: Dict[int, Tuple[Dict[str, Any], str]] = {}
+        failed: List[Tuple[Dict[str, Any], str]] = []
+        for row, abs_path, st in pairs:
+            key = _normalise_key(abs_path)
+            if not _claim(key):
+                failed.append((row, abs_path))
+                continue
+            claimed.append(key)
+            try:
+                rel = Path(abs_path).resolve(strict=False).relative_to(
+                    root_res).as_posix()
+            except ValueError:
+                failed.append((row, abs_path))
+                continue
+            posix_path = Path(abs_path).as_posix()
+            filename = os.path.basename(posix_path)
+            items.append(_repo.UpdateImagePathOp(
+                image_id=int(row["id"]),
+                path=posix_path,
+                folder_id=int(root["id"]),
+                relative_path=rel,
+                filename=filename,
+                filename_lc=filename.lower(),
+                ext=os.path.splitext(filename)[1].lower().lstrip("."),
+                file_size=int(st.st_size),
+                mtime_ns=int(st.st_mtime_ns),
+                # Same bytes, same xyz_gallery.* chunks: nothing to sync.
+                refresh_sync=False,
+            ))
+            by_id[int(row["id"])] = (row, abs_path)
+        if not items:
+            return [], failed
+        res = write_queue.enqueue_write(
+            _repo.LOW, _repo.UpdateImagePathsOp(items),
+        ).result(timeout=timeout)
+        for iid, msg in res["failed"].items():
+            logger.info("move not applied for id=%s (%s)", iid, msg)
+            failed.append(by_id[int(iid)])
+        moved = [item.image_id for item in items
+                 if item.image_id in res["versions"]]
+        if moved:
+            from . import thumbs as _thumbs
+
+            if thumbs_dir is None:
+                from . import THUMBS_DIR
+                thumbs_dir = THUMBS_DIR
+            _thumbs.rekey(
+                [(str(by_id[iid][0]["path"]), Path(by_id[iid][1]).as_posix(),
+                  int(by_id[iid][0]["mtime_ns"])) for iid in moved],
+                thumbs_dir=thumbs_dir, write_queue=write_queue,
+            )
+        return moved, failed
+    finally:
+        for key in claimed:
+            _release(key)
+
+
 def delta_scan(
     root: Dict[str, Any], *, db_path: _PathLike, write_queue,
     mode: str = "light",
@@ -491,9 +808,11 @@ def delta_scan(
     """Light delta scan: ``(size, mtime_ns)`` comparison, no PIL decode.
 
     Only files that actually differ are handed off to ``index_one``
-    (where the full ``read_comfy_metadata`` path runs).  Deletion
-    reconciliation is intentionally out of scope for T07 — that is
-    T20 / T25's heartbeat territory (AI_RULES R1.2).
+    (where the full ``read_comfy_metadata`` path runs).  New paths are
+    first paired with rows whose files vanished (:func:`pair_moves`) so
+    files moved while the gallery was not watching keep their rows.
+    Deletion reconciliation is intentionally out of scope for T07 — that
+    is T20 / T25's heartbeat territory (AI_RULES R1.2).
     """
     if mode != "light":
         raise ValueError(f"delta_scan: unknown mode {mode!r}")
@@ -517,6 +836,10 @@ def delta_scan(
     errors = 0
     crash = False
     deleted_ids: List[int] = []
+    moved_ids: List[int] = []
+    # New paths wait for the walk to finish: some may be moved rows.
+    appeared: List[Tuple[str, os.stat_result]] = []
+    seen: Set[str] = set()
 
     try:
         for abs_path in _iter_image_files(root_path):
@@ -535,21 +858,44 @@ def delta_scan(
                 errors += 1
                 continue
             posix_path = Path(abs_path).as_posix()
+            seen.add(posix_path)
             cached = fingerprints.get(posix_path)
             if cached is not None and cached == (
                 int(st.st_size), int(st.st_mtime_ns)
             ):
                 continue
-            try:
-                if index_one(
-                    abs_path, root=root,
-                    db_path=db_path, write_queue=write_queue,
-                ):
-                    changed += 1
-            except Exception:
-                errors += 1
-                logger.exception("delta_scan index_one failed for %s", abs_path)
-
+            if cached is None:
+                appeared.append((abs_path, st))
+                continue
+            c, e = _delta_index_one(abs_path, root, db_path, write_queue)
+            changed += c
+            errors += e
+
+        if appeared:
+            vanished = [
+                p for p in fingerprints
+                if p not in seen and not os.path.isfile(p)
+                and not is_derivative_path_excluded(p, root_path)
+            ]
+            pairs = pair_moves(
+                load_move_candidates(vanished, db_path=db_path), appeared,
+            ) if vanished else []
+            if pairs:
+                moved_ids, failed = relocate_many(
+                    pairs, root=root, db_path=db_path, write_queue=write_queue,
+                )
+                paired = {a for _r, a, _st in pairs}
+                retry = {a for _r, a in failed}
+                appeared = [
+                    (a, st) for a, st in appeared if a not in paired or a in retry
+                ]
+            for abs_path, _st in appeared:
+                c, e = _delta_index_one(abs_path, root, db_path, write_queue)
+                changed += c
+                errors += e
+
+        if changed:
+            _wake_hasher()
         deleted_ids = _reconcile_missing_disk_rows(
             root, db_path=db_path, write_queue=write_queue,
         )
@@ -572,9 +918,26 @@ def delta_scan(
         "errors": errors,
         "removed": len(deleted_ids),
         "deleted_ids": deleted_ids,
+        "moved": len(moved_ids),
+        "moved_ids": moved_ids,
     }
 
 
+def _delta_index_one(
+    abs_path: str, root: Dict[str, Any], db_path: _PathLike, write_queue,
+) -> Tuple[int, int]:
+    """``index_one`` for ``delta_scan``: ``(changed, errors)`` increments."""
+    try:
+        if index_one(
+            abs_path, root=root, db_path=db_path, write_queue=write_queue,
+        ):
+            return 1, 0
+    except Exception:
+        logger.exception("delta_scan index_one failed for %s", abs_path)
+        return 0, 1
+    return 0, 0
+
+
 def _reconcile_missing_disk_rows(
     root: Dict[str, Any], *, db_path: _PathLike, write_queue,
 ) -> List[int]:
@@ -663,7 +1026,11 @@ def maybe_rebuild_prompt_vocab_from_config(
 def reconcile_folders_under_root(
     root: Dict[str, Any], *, db_path: _PathLike, write_queue,
 ) -> None:
-    """Enqueue ``ReconcileFoldersUnderRootOp`` (LOW) — sync ``folder`` rows with disk."""
+    """Enqueue ``ReconcileFoldersUnderRootOp`` (LOW) — sync ``folder`` rows with disk.
+
+    The directory scan runs here on the caller's thread; the writer only
+    applies the diff.
+    """
     try:
         write_queue.enqueue_write(
             _repo.LOW,
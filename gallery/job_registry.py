@@ -17,6 +17,7 @@ from typing import Any, Dict, List, Optional
 __all__ = [
     "sync_bulk_payload",
     "finish_bulk",
+    "queue_bulk",
     "list_active",
     "reset_for_test",
     "start_index_job",
@@ -105,6 +106,25 @@ def finish_bulk(data: dict) -> None:
     _remove(str(bid))
 
 
+def queue_bulk(job_id: str, *, kind: str, done: int = 0, total: int = 0) -> None:
+    """Register a persisted bulk job waiting for a ``bulk_jobs`` worker."""
+    jid = str(job_id)
+    _upsert(
+        jid,
+        {
+            "status": "queued",
+            "kind": str(kind),
+            "job_id": jid,
+            "done": int(done),
+            "total": int(total) if total else 0,
+            "phase": "queued",
+            "plan_id": jid,
+            "bulk_id": jid,
+            "updated_ms": _now_ms(),
+        },
+    )
+
+
 # --- index / rescan (INDEX_PROGRESS in §7.9) ---------------------------------
 
 
@@ -174,7 +194,7 @@ def emit_index_progress(
             "updated_ms": _now_ms(),
         },
     )
-    _w.broadcast(
+    _w.broadcast_coalesced(
         _w.INDEX_PROGRESS,
         {
             "job_id": str(job_id),
@@ -185,8 +205,9 @@ def emit_index_progress(
             "message": msg,
             "root_id": int(root_id),
         },
+        key=str(job_id),
     )
-    _w.broadcast(
+    _w.broadcast_coalesced(
         _w.JOB_PROGRESS,
         {
             "job_id": str(job_id),
@@ -197,6 +218,7 @@ def emit_index_progress(
             "message": msg,
             "root_id": int(root_id),
         },
+        key=str(job_id),
     )
 
 
@@ -207,6 +229,7 @@ def emit_index_done(
 
     jid = str(job_id)
     _remove(jid)
+    _w.flush_coalesced(jid)
     _w.broadcast(
         _w.JOB_COMPLETED,
         {
@@ -241,7 +264,7 @@ def emit_job_progress(
             "updated_ms": _now_ms(),
         },
     )
-    _w.broadcast(
+    _w.broadcast_coalesced(
         _w.JOB_PROGRESS,
         {
             "job_id": jid,
@@ -251,6 +274,7 @@ def emit_job_progress(
             "phase": str(phase or ""),
             "message": (message or "")[:512],
         },
+        key=jid,
     )
 
 
@@ -261,6 +285,7 @@ def emit_job_done(
 
     jid = str(job_id)
     _remove(jid)
+    _w.flush_coalesced(jid)
     _w.broadcast(
         _w.JOB_COMPLETED,
         {
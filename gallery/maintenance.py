@@ -0,0 +1,284 @@
+"""XYZ Image Gallery — idle-time SQLite maintenance (optimize / vacuum / checkpoint).
+
+A daemon (``xyz-gallery-maintenance``) wakes every ``TICK_SEC`` and, when
+the WriteQueue has been idle for ``IDLE_SEC``, enqueues one LOW
+:class:`MaintenanceOp` carrying whichever tasks are due:
+
+  * ``optimize`` — ``PRAGMA optimize`` every ``OPTIMIZE_EVERY_SEC`` (a
+    bounded ``ANALYZE`` first if the DB has never been analysed);
+  * ``vacuum`` — ``PRAGMA incremental_vacuum`` of at most
+    ``VACUUM_MAX_PAGES`` when the freelist exceeds ``VACUUM_MIN_FREE_PAGES``
+    (needs ``auto_vacuum=INCREMENTAL``, schema v8);
+  * ``checkpoint`` — ``PRAGMA wal_checkpoint(TRUNCATE)`` every
+    ``CHECKPOINT_EVERY_SEC`` or once the WAL passes ``CHECKPOINT_WAL_BYTES``.
+
+The op runs on the writer connection with ``autocommit = True`` (these
+PRAGMAs refuse to run inside ``BEGIN``), so it is serialised with every
+other write and never races the single writer.  Each run returns a report
+(bytes reclaimed from the file and the WAL, per-step timings) that is
+logged, kept in a short history for ``GET /xyz/gallery/admin/maintenance``
+and counted in ``metrics``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from . import metrics as _metrics
+from . import repo as _repo
+
+logger = logging.getLogger("xyz.gallery.maintenance")
+
+__all__ = [
+    "TASKS",
+    "MaintenanceOp",
+    "run_now",
+    "history",
+    "start_maintenance",
+    "stop_maintenance",
+]
+
+TASKS = ("optimize", "vacuum", "checkpoint")
+
+TICK_SEC = 60.0
+# Longer than a heartbeat delta_scan burst, shorter than its 30 s period.
+IDLE_SEC = 10.0
+OPTIMIZE_EVERY_SEC = 6 * 3600.0
+CHECKPOINT_EVERY_SEC = 15 * 60.0
+CHECKPOINT_WAL_BYTES = 64 * 1024 * 1024
+VACUUM_MIN_FREE_PAGES = 1024
+# 4 KiB pages → ≤ 32 MiB per run, so a HIGH write never waits long behind it.
+VACUUM_MAX_PAGES = 8192
+_ANALYSIS_LIMIT = 1000
+_HISTORY_MAX = 20
+
+_metrics.describe(
+    "xyz_gallery_maintenance_seconds", "histogram",
+    "Duration of one maintenance step, by task.",
+)
+_metrics.describe(
+    "xyz_gallery_maintenance_reclaimed_bytes_total", "counter",
+    "Bytes returned to the filesystem by incremental vacuum / WAL truncation.",
+)
+
+_history: Deque[Dict[str, Any]] = deque(maxlen=_HISTORY_MAX)
+_history_lock = threading.Lock()
+
+
+def _wal_bytes(db_file: str) -> int:
+    try:
+        return os.path.getsize(db_file + "-wal")
+    except OSError:
+        return 0
+
+
+def _pragma_int(conn: sqlite3.Connection, name: str) -> int:
+    return int(conn.execute(f"PRAGMA {name}").fetchone()[0])
+
+
+class MaintenanceOp:
+    """Run ``tasks`` on the writer connection; returns a report dict."""
+
+    autocommit = True
+
+    def __init__(self, tasks: Sequence[str]) -> None:
+        unknown = set(tasks) - set(TASKS)
+        if unknown:
+            raise ValueError(f"unknown maintenance task(s): {sorted(unknown)}")
+        # Checkpoint last so it also flushes what optimize / vacuum wrote.
+        self.tasks = tuple(t for t in TASKS if t in tasks)
+
+    def apply(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        db_file = conn.execute("PRAGMA database_list").fetchone()[2]
+        page_size = _pragma_int(conn, "page_size")
+        before = {
+            "pages": _pragma_int(conn, "page_count"),
+            "free_pages": _pragma_int(conn, "freelist_count"),
+            "wal_bytes": _wal_bytes(db_file),
+        }
+        steps: Dict[str, Dict[str, Any]] = {}
+        t_run = time.perf_counter()
+        for task in self.tasks:
+            t0 = time.perf_counter()
+            steps[task] = getattr(self, "_" + task)(conn)
+            took = time.perf_counter() - t0
+            steps[task]["ms"] = round(took * 1000.0, 1)
+            _metrics.observe("xyz_gallery_maintenance_seconds", took, task=task)
+        after = {
+            "pages": _pragma_int(conn, "page_count"),
+            "free_pages": _pragma_int(conn, "freelist_count"),
+            "wal_bytes": _wal_bytes(db_file),
+        }
+        reclaimed_db = max(0, before["pages"] - after["pages"]) * page_size
+        reclaimed_wal = max(0, before["wal_bytes"] - after["wal_bytes"])
+        if reclaimed_db + reclaimed_wal:
+            _metrics.inc("xyz_gallery_maintenance_reclaimed_bytes_total",
+                         reclaimed_db + reclaimed_wal)
+        return {
+            "at": int(time.time()),
+            "tasks": list(self.tasks),
+            "ms": round((time.perf_counter() - t_run) * 1000.0, 1),
+            "page_size": page_size,
+            "before": before,
+            "after": after,
+            "reclaimed_db_bytes": reclaimed_db,
+            "reclaimed_wal_bytes": reclaimed_wal,
+            "steps": steps,
+        }
+
+    @staticmethod
+    def _optimize(conn: sqlite3.Connection) -> Dict[str, Any]:
+        analysed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).fetchone() is not None
+        if not analysed:
+            # First run on an old DB: PRAGMA optimize only re-analyses
+            # tables it thinks changed, so seed the stats once (bounded).
+            conn.execute(f"PRAGMA analysis_limit = {_ANALYSIS_LIMIT}")
+            conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+        return {"analyzed": not analysed}
+
+    @staticmethod
+    def _vacuum(conn: sqlite3.Connection) -> Dict[str, Any]:
+        if _pragma_int(conn, "auto_vacuum") != 2:
+            return {"skipped": "auto_vacuum is not INCREMENTAL"}
+        free = _pragma_int(conn, "freelist_count")
+        # executescript: the sqlite3 cursor would stop incremental_vacuum
+        # after its first page.
+        conn.executescript(
+            f"PRAGMA incremental_vacuum({min(free, VACUUM_MAX_PAGES)})")
+        return {"freed_pages": free - _pragma_int(conn, "freelist_count")}
+
+    @staticmethod
+    def _checkpoint(conn: sqlite3.Connection) -> Dict[str, Any]:
+        busy, log, done = conn.execute(
+            "PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        # busy=1: a reader still pins old frames; the next run retries.
+        return {"busy": bool(busy), "wal_frames": int(log),
+                "checkpointed_frames": int(done)}
+
+
+def _record(report: Dict[str, Any]) -> None:
+    with _history_lock:
+        _history.append(report)
+    logger.info(
+        "maintenance %s: %.0f ms, reclaimed %d B (db) + %d B (wal), "
+        "free pages %d → %d",
+        "+".join(report["tasks"]), report["ms"], report["reclaimed_db_bytes"],
+        report["reclaimed_wal_bytes"], report["before"]["free_pages"],
+        report["after"]["free_pages"],
+    )
+
+
+def history() -> List[Dict[str, Any]]:
+    """Recent run reports, newest last."""
+    with _history_lock:
+        return list(_history)
+
+
+def run_now(
+    tasks: Sequence[str] = TASKS, *, write_queue: Any, timeout: float = 600.0,
+) -> Dict[str, Any]:
+    """Enqueue one LOW :class:`MaintenanceOp` and wait for its report."""
+    op = MaintenanceOp(tasks)
+    report = write_queue.enqueue_write(_repo.LOW, op).result(timeout=timeout)
+    _record(report)
+    return report
+
+
+# -- scheduler ---------------------------------------------------------------
+
+class _Scheduler:
+    def __init__(self, *, db_path: Path, write_queue: Any) -> None:
+        self._db_path = Path(db_path)
+        self._write_queue = write_queue
+        self._stop = threading.Event()
+        self._thr: Optional[threading.Thread] = None
+        now = time.monotonic()
+        self._last = {"optimize": now, "checkpoint": now}
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thr = threading.Thread(
+            target=self._loop, name="xyz-gallery-maintenance", daemon=True,
+        )
+        self._thr.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._thr is not None:
+            self._thr.join(timeout=timeout)
+            self._thr = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(TICK_SEC):
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("maintenance tick failed")
+
+    def due(self) -> List[str]:
+        now = time.monotonic()
+        out: List[str] = []
+        if now - self._last["optimize"] >= OPTIMIZE_EVERY_SEC:
+            out.append("optimize")
+        if self._free_pages() >= VACUUM_MIN_FREE_PAGES:
+            out.append("vacuum")
+        if (
+            now - self._last["checkpoint"] >= CHECKPOINT_EVERY_SEC
+            or _wal_bytes(str(self._db_path)) >= CHECKPOINT_WAL_BYTES
+        ):
+            out.append("checkpoint")
+        return out
+
+    def _free_pages(self) -> int:
+        from . import db as _db
+
+        conn = _db.connect_read(self._db_path)
+        try:
+            return _pragma_int(conn, "freelist_count")
+        finally:
+            conn.close()
+
+    def tick(self) -> Optional[Dict[str, Any]]:
+        if self._write_queue.idle_seconds() < IDLE_SEC:
+            return None
+        tasks = self.due()
+        if not tasks:
+            return None
+        report = run_now(tasks, write_queue=self._write_queue)
+        now = time.monotonic()
+        for task in tasks:
+            if task in self._last:
+                self._last[task] = now
+        return report
+
+
+_scheduler: Optional[_Scheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def start_maintenance(*, db_path: Any, write_queue: Any) -> None:
+    """Start the idle-time scheduler (idempotent). Needs a running WriteQueue."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            return
+        _scheduler = _Scheduler(db_path=db_path, write_queue=write_queue)
+        _scheduler.start()
+
+
+def stop_maintenance() -> None:
+    global _scheduler
+    with _scheduler_lock:
+        sched, _scheduler = _scheduler, None
+    if sched is not None:
+        sched.stop()
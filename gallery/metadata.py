@@ -29,9 +29,6 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Optional, Tuple
 
-from PIL import Image, UnidentifiedImageError
-from PIL.PngImagePlugin import PngInfo
-
 from . import paths as _paths
 
 
@@ -139,6 +136,8 @@ def _open_png_text(p: Path, errors: list[str]) -> Optional[dict[str, str]]:
     if not p.is_file():
         errors.append(f"file not found: {p}")
         return None
+    from PIL import Image, UnidentifiedImageError
+
     try:
         with Image.open(p) as img:
             if (img.format or "").upper() != "PNG":
@@ -372,6 +371,9 @@ def build_png_download_bytes(path: Any, variant: str) -> bytes:
     p = Path(path)
     if not p.is_file():
         raise FileNotFoundError(str(p))
+    from PIL import Image
+    from PIL.PngImagePlugin import PngInfo
+
     with Image.open(p) as img:
         img.load()
         if (img.format or "").upper() != "PNG":
@@ -436,6 +438,8 @@ def write_xyz_chunks(
     p = Path(path)
     if not p.is_file():
         raise FileNotFoundError(str(p))
+    from PIL import Image
+    from PIL.PngImagePlugin import PngInfo
 
     staging_parents: list[Path] = []
     seen_norm: set[str] = set()
@@ -0,0 +1,213 @@
+"""XYZ Image Gallery — in-process metrics (counters, gauges, histograms).
+
+Cheap enough for the writer thread: a histogram is a fixed tuple of
+log-spaced bucket bounds plus integer counts, so ``observe`` is one
+``bisect`` and three additions under a lock — no per-sample storage.
+Series are keyed by metric name + a small, fixed label set (priority,
+op class); callers must not put ids or paths in labels.
+
+``GET /xyz/gallery/metrics`` serves :func:`snapshot` (JSON) or
+:func:`render_prometheus` (text exposition format 0.0.4).
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+__all__ = [
+    "DEFAULT_BUCKETS_S",
+    "describe",
+    "observe",
+    "inc",
+    "set_gauge",
+    "snapshot",
+    "render_prometheus",
+    "reset_for_test",
+]
+
+# 0.5 ms … 30 s: covers a bare UPDATE through a full vocab rebuild.
+DEFAULT_BUCKETS_S: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+_Labels = Tuple[Tuple[str, str], ...]
+_Key = Tuple[str, _Labels]
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        # One extra slot for the +Inf bucket.
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (coarse)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else math.inf
+        return math.inf
+
+
+_lock = threading.Lock()
+_meta: Dict[str, Tuple[str, str]] = {}
+_histograms: Dict[_Key, _Histogram] = {}
+_counters: Dict[_Key, float] = {}
+_gauges: Dict[_Key, float] = {}
+
+
+def _key(name: str, labels: Dict[str, Any]) -> _Key:
+    return name, tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def describe(name: str, kind: str, help_text: str) -> None:
+    """Register ``# HELP`` / ``# TYPE`` for ``name`` (idempotent)."""
+    if kind not in ("counter", "gauge", "histogram"):
+        raise ValueError(f"unknown metric kind: {kind!r}")
+    with _lock:
+        _meta[name] = (kind, help_text)
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    k = _key(name, labels)
+    with _lock:
+        h = _histograms.get(k)
+        if h is None:
+            h = _histograms[k] = _Histogram(DEFAULT_BUCKETS_S)
+        h.observe(float(value))
+
+
+def inc(name: str, amount: float = 1.0, **labels: Any) -> None:
+    k = _key(name, labels)
+    with _lock:
+        _counters[k] = _counters.get(k, 0.0) + amount
+
+
+def set_gauge(name: str, value: float, **labels: Any) -> None:
+    with _lock:
+        _gauges[_key(name, labels)] = float(value)
+
+
+def snapshot(
+    prefix: Union[str, Tuple[str, ...]] = "",
+) -> Dict[str, List[Dict[str, Any]]]:
+    """JSON-friendly view: seconds as floats, quantiles from bucket bounds.
+
+    ``prefix`` keeps only metric names starting with it (str or tuple).
+    """
+    with _lock:
+        hists = [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "count": h.count,
+                "sum": round(h.total, 6),
+                "p50": h.quantile(0.5),
+                "p95": h.quantile(0.95),
+                "p99": h.quantile(0.99),
+                "max_bucket": _max_bucket(h),
+            }
+            for (name, labels), h in sorted(_histograms.items())
+        ]
+        counters = [
+            {"name": name, "labels": dict(labels), "value": v}
+            for (name, labels), v in sorted(_counters.items())
+        ]
+        gauges = [
+            {"name": name, "labels": dict(labels), "value": v}
+            for (name, labels), v in sorted(_gauges.items())
+        ]
+    if prefix:
+        hists = [r for r in hists if r["name"].startswith(prefix)]
+        counters = [r for r in counters if r["name"].startswith(prefix)]
+        gauges = [r for r in gauges if r["name"].startswith(prefix)]
+    for row in hists:
+        for q in ("p50", "p95", "p99", "max_bucket"):
+            if math.isinf(row[q]):
+                row[q] = None
+    return {"histograms": hists, "counters": counters, "gauges": gauges}
+
+
+def _max_bucket(h: _Histogram) -> float:
+    for i in range(len(h.counts) - 1, -1, -1):
+        if h.counts[i]:
+            return h.bounds[i] if i < len(h.bounds) else math.inf
+    return 0.0
+
+
+def _fmt_labels(labels: _Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(
+            k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def _fmt_num(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+def render_prometheus() -> str:
+    """Prometheus text exposition (``text/plain; version=0.0.4``)."""
+    out: List[str] = []
+    with _lock:
+        by_name: Dict[str, List[Tuple[str, _Labels, Any]]] = {}
+        for (name, labels), h in _histograms.items():
+            by_name.setdefault(name, []).append(("histogram", labels, h))
+        for (name, labels), v in _counters.items():
+            by_name.setdefault(name, []).append(("counter", labels, v))
+        for (name, labels), v in _gauges.items():
+            by_name.setdefault(name, []).append(("gauge", labels, v))
+        for name in sorted(by_name):
+            series = sorted(by_name[name], key=lambda s: s[1])
+            kind, help_text = _meta.get(name, (series[0][0], ""))
+            if help_text:
+                out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for skind, labels, val in series:
+                if skind != "histogram":
+                    out.append(f"{name}{_fmt_labels(labels)} {_fmt_num(val)}")
+                    continue
+                cum = 0
+                for i, n in enumerate(val.counts):
+                    cum += n
+                    le = val.bounds[i] if i < len(val.bounds) else math.inf
+                    out.append(
+                        f"{name}_bucket"
+                        f"{_fmt_labels(labels, (('le', _fmt_num(le)),))} {cum}"
+                    )
+                out.append(f"{name}_sum{_fmt_labels(labels)} {val.total!r}")
+                out.append(f"{name}_count{_fmt_labels(labels)} {val.count}")
+    return "\n".join(out) + "\n"
+
+
+def reset_for_test() -> None:
+    """Drop every series (descriptions are kept)."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _gauges.clear()
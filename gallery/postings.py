@@ -0,0 +1,319 @@
+"""XYZ Image Gallery — optional in-memory posting lists for vocab AND filters.
+
+One sorted ``array('I')`` of image ids per ``(vocab_table, token_id)`` for
+``tag`` / ``prompt_token`` / ``word_token``.  ``repo._vocab_intersect_plan``
+asks :func:`intersect` first and falls back to its SQL join whenever this
+module answers ``None`` (disabled, building, dirty, over the memory cap,
+or bound to another DB) — the index is a pure accelerator, never a source
+of truth.
+
+Maintenance:
+  * Built lazily from one read snapshot in a daemon thread on first use
+    (or after a ``reset``), never on the request path.
+  * Kept current from ``repo``'s commit journal: ``WriteQueue`` replays
+    every committed vocab-link delta into :func:`_on_commit` on the writer
+    thread.  Deltas are absolute ("image X now has exactly these ids"),
+    so replaying the backlog captured during a build over the build's
+    snapshot converges to the committed state.
+  * Bounded (R7.4): an estimate of array + dict overhead is checked while
+    building and on every append; crossing ``max_bytes`` drops the index
+    and leaves SQL in charge until :func:`enable` is called again.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from . import db as _db
+from . import repo as _repo
+
+logger = logging.getLogger("xyz.gallery.postings")
+
+__all__ = [
+    "DEFAULT_MAX_BYTES",
+    "enable",
+    "disable",
+    "generation",
+    "intersect",
+    "stats",
+]
+
+_PathLike = Union[str, Path]
+
+DEFAULT_MAX_BYTES: int = 64 * 1024 * 1024
+
+# Rough CPython cost of one dict slot + tuple key + empty array object.
+_KEY_OVERHEAD_BYTES: int = 160
+
+_LINK_TABLES: Tuple[Tuple[str, str, str], ...] = (
+    ("tag", "image_tag", "tag_id"),
+    ("prompt_token", "image_prompt_token", "token_id"),
+    ("word_token", "image_word_token", "token_id"),
+)
+
+_Key = Tuple[str, int]
+
+_lock = threading.Lock()
+_db_key: Optional[str] = None
+_max_bytes: int = DEFAULT_MAX_BYTES
+_lists: Dict[_Key, "array[int]"] = {}
+_bytes: int = 0
+# 'off' | 'dirty' | 'building' | 'ready' | 'over_cap'
+_state: str = "off"
+_backlog: Optional[List[Tuple[Any, ...]]] = None
+_generation: int = 0
+# Identifies the in-flight build; enable/disable/re-build orphan older ones.
+_build_epoch: int = 0
+
+
+def generation() -> int:
+    """Bumped whenever :func:`intersect` answers may change (cache stamp)."""
+    return _generation
+
+
+def enable(*, db_path: _PathLike, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+    """Bind to ``db_path`` and subscribe to the commit journal (idempotent).
+
+    The first :func:`intersect` call schedules the build.  ``max_bytes <= 0``
+    is the same as :func:`disable`.
+    """
+    global _db_key, _max_bytes, _state, _lists, _bytes, _generation
+    global _build_epoch, _backlog
+    if int(max_bytes) <= 0:
+        disable()
+        return
+    with _lock:
+        _build_epoch += 1
+        _backlog = None
+        _db_key = str(db_path)
+        _max_bytes = int(max_bytes)
+        _lists = {}
+        _bytes = 0
+        _state = "dirty"
+        _generation += 1
+    _repo.add_commit_listener(_on_commit)
+
+
+def disable() -> None:
+    global _db_key, _state, _lists, _bytes, _generation, _backlog
+    global _build_epoch
+    _repo.remove_commit_listener(_on_commit)
+    with _lock:
+        _build_epoch += 1
+        _db_key = None
+        _lists = {}
+        _bytes = 0
+        _backlog = None
+        _state = "off"
+        _generation += 1
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "state": _state,
+            "tokens": len(_lists),
+            "bytes": int(_bytes),
+            "max_bytes": int(_max_bytes),
+        }
+
+
+def intersect(
+    *, db_path: _PathLike, terms: Sequence[_Key], limit: Optional[int] = None,
+) -> Optional[List[int]]:
+    """Ascending ids present in every ``(vocab_table, token_id)`` list.
+
+    ``None`` means "not answerable from memory — use SQL".  A token with no
+    postings yields ``[]`` (the AND is empty).  With ``limit`` a result
+    that would exceed it is abandoned early (``None``): the loop runs
+    under ``_lock``, which the writer thread needs for every commit.
+    """
+    with _lock:
+        if _db_key is None or _db_key != str(db_path):
+            return None
+        if _state == "dirty":
+            _start_build_locked()
+            return None
+        if _state != "ready":
+            return None
+        lists = [_lists.get((str(t), int(i))) for t, i in terms]
+        if any(a is None for a in lists):
+            return []
+        # Held under ``_lock`` throughout: the writer mutates arrays in
+        # place. Rarest list drives; the rest are bisect probes.
+        ordered = sorted(lists, key=len)  # type: ignore[arg-type]
+        driver = ordered[0]
+        others = ordered[1:]
+        # Rarest list over the cap: the rarest-first SQL join costs no
+        # more, and walking it here would stall the writer.
+        if limit is not None and len(driver) > limit:  # type: ignore[arg-type]
+            return None
+        out: List[int] = []
+        for iid in driver:
+            for arr in others:
+                j = bisect.bisect_left(arr, iid)  # type: ignore[arg-type]
+                if j >= len(arr) or arr[j] != iid:  # type: ignore[arg-type,index]
+                    break
+            else:
+                out.append(iid)
+                if limit is not None and len(out) > limit:
+                    return None
+        return out
+
+
+# -- build ------------------------------------------------------------------
+
+def _start_build_locked() -> None:
+    global _state, _backlog, _build_epoch
+    _state = "building"
+    _backlog = []
+    _build_epoch += 1
+    t = threading.Thread(
+        target=_build, args=(_build_epoch, str(_db_key), int(_max_bytes)),
+        name="xyz-gallery-postings-build", daemon=True,
+    )
+    t.start()
+
+
+def _build(epoch: int, db_key: str, max_bytes: int) -> None:
+    global _lists, _bytes, _state, _backlog, _generation
+    lists: Dict[_Key, "array[int]"] = {}
+    nbytes = 0
+    over = False
+    try:
+        conn = _db.connect_read(db_key)
+        try:
+            for vocab_table, link_table, link_col in _LINK_TABLES:
+                # ``idx_*_token`` / ``idx_image_tag_tag`` cover (token, image)
+                # so this is an index-order scan, already sorted per token.
+                cur_key: Optional[_Key] = None
+                cur: Optional["array[int]"] = None
+                for tok_id, image_id in conn.execute(
+                    f"SELECT {link_col}, image_id FROM {link_table} "
+                    f"ORDER BY {link_col}, image_id"
+                ):
+                    if cur_key is None or cur_key[1] != tok_id:
+                        cur_key = (vocab_table, int(tok_id))
+                        cur = array("I")
+                        lists[cur_key] = cur
+                        nbytes += _KEY_OVERHEAD_BYTES
+                    cur.append(int(image_id))  # type: ignore[union-attr]
+                    nbytes += 4
+                    if nbytes > max_bytes:
+                        over = True
+                        break
+                if over:
+                    break
+        finally:
+            conn.close()
+    except Exception:
+        logger.exception("postings build failed; SQL fallback stays active")
+        with _lock:
+            if epoch == _build_epoch and _state == "building":
+                _state = "dirty"
+                _backlog = None
+        return
+
+    with _lock:
+        if epoch != _build_epoch or _state != "building":
+            return  # disabled / re-bound while we were scanning
+        if over:
+            logger.warning(
+                "postings index exceeds %d bytes; staying on SQL plans",
+                max_bytes,
+            )
+            _lists = {}
+            _bytes = 0
+            _state = "over_cap"
+            _backlog = None
+            return
+        _lists = lists
+        _bytes = nbytes
+        backlog = _backlog or []
+        _backlog = None
+        _state = "ready"
+        for entry in backlog:
+            _apply_locked(entry)
+        _generation += 1
+    logger.info("postings index ready (%d tokens, ~%d bytes)", len(lists), nbytes)
+
+
+# -- incremental maintenance (writer thread) --------------------------------
+
+def _on_commit(entries: List[Tuple[Any, ...]]) -> None:
+    global _generation
+    with _lock:
+        if _state == "building" and _backlog is not None:
+            _backlog.extend(entries)
+            return
+        if _state != "ready":
+            return
+        for entry in entries:
+            _apply_locked(entry)
+            if _state != "ready":
+                break
+        _generation += 1
+
+
+def _apply_locked(entry: Tuple[Any, ...]) -> None:
+    global _state, _lists, _bytes
+    kind = entry[0]
+    if kind == "reset":
+        _lists = {}
+        _bytes = 0
+        _state = "dirty"
+        return
+    if kind == "drop":
+        arr = _lists.pop((str(entry[1]), int(entry[2])), None)
+        if arr is not None:
+            _bytes -= _KEY_OVERHEAD_BYTES + 4 * len(arr)
+        return
+    if kind != "links":
+        return
+    _tag, table, image_id, old_ids, new_ids = entry
+    iid = int(image_id)
+    keep = set(int(x) for x in new_ids)
+    for tok in old_ids:
+        if int(tok) in keep:
+            continue
+        key = (str(table), int(tok))
+        arr = _lists.get(key)
+        if arr is None:
+            continue
+        j = bisect.bisect_left(arr, iid)
+        if j < len(arr) and arr[j] == iid:
+            del arr[j]
+            _bytes -= 4
+            if not arr:
+                del _lists[key]
+                _bytes -= _KEY_OVERHEAD_BYTES
+    for tok in keep:
+        key = (str(table), int(tok))
+        arr = _lists.get(key)
+        if arr is None:
+            arr = array("I")
+            _lists[key] = arr
+            _bytes += _KEY_OVERHEAD_BYTES
+        # New images carry the largest AUTOINCREMENT id → O(1) append.
+        if not arr or arr[-1] < iid:
+            arr.append(iid)
+            _bytes += 4
+            continue
+        j = bisect.bisect_left(arr, iid)
+        if j < len(arr) and arr[j] == iid:
+            continue
+        arr.insert(j, iid)
+        _bytes += 4
+    if _bytes > _max_bytes:
+        logger.warning(
+            "postings index grew past %d bytes; dropping to SQL plans",
+            _max_bytes,
+        )
+        _lists = {}
+        _bytes = 0
+        _state = "over_cap"
@@ -0,0 +1,134 @@
+"""XYZ Image Gallery — on-demand sampling profiler for the gallery threads.
+
+``sample`` polls ``sys._current_frames`` every ``interval`` seconds for
+``duration`` seconds, keeps only threads whose name starts with
+``xyz-gallery-`` (writer, heartbeat, metadata-sync, coalescer, cold scan,
+thumbs flusher, bulk-job workers …) and folds each stack into a
+``thread;outer;…;leaf`` key.  The result renders as collapsed-stack text
+(one ``stack count`` line per key) that ``flamegraph.pl`` / speedscope
+read directly.
+
+Nothing is installed in the interpreter (no ``setprofile`` / ``settrace``):
+when no capture is running the module costs nothing, and a capture only
+walks frame objects from its own thread.  One capture at a time; the
+duration and rate are clamped so an admin request cannot pin a core.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+__all__ = [
+    "THREAD_PREFIX",
+    "MAX_DURATION_SEC",
+    "ProfilerBusy",
+    "sample",
+    "render_collapsed",
+]
+
+THREAD_PREFIX = "xyz-gallery-"
+DEFAULT_DURATION_SEC = 5.0
+MAX_DURATION_SEC = 60.0
+DEFAULT_INTERVAL_SEC = 0.01
+MIN_INTERVAL_SEC = 0.001
+# Deep recursion (json / PIL decoders) is truncated from the root side so
+# the leaf frames — where the time is — survive.
+MAX_STACK_DEPTH = 128
+
+_capture_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Another capture is already running."""
+
+
+def _frame_label(frame, with_lines: bool) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    fname = os.path.basename(code.co_filename)
+    if with_lines:
+        return f"{name} ({fname}:{frame.f_lineno})"
+    return f"{name} ({fname})"
+
+
+def _fold(frame, with_lines: bool) -> str:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame, with_lines).replace(";", ":"))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def sample(
+    duration: float = DEFAULT_DURATION_SEC,
+    interval: float = DEFAULT_INTERVAL_SEC,
+    *,
+    thread_prefix: str = THREAD_PREFIX,
+    with_lines: bool = False,
+) -> Dict[str, Any]:
+    """Blocking capture; returns counts per thread and per folded stack.
+
+    Raises :class:`ProfilerBusy` if a capture is already in progress.
+    """
+    duration = min(max(float(duration), 0.0), MAX_DURATION_SEC)
+    interval = max(float(interval), MIN_INTERVAL_SEC)
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfilerBusy("a profile capture is already running")
+    try:
+        own = threading.get_ident()
+        stacks: Counter = Counter()
+        per_thread: Counter = Counter()
+        ticks = 0
+        started = time.perf_counter()
+        deadline = started + duration
+        next_tick = started
+        while True:
+            names = {
+                t.ident: t.name for t in threading.enumerate()
+                if t.name.startswith(thread_prefix)
+            }
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                name = names.get(ident)
+                if name is None or ident == own:
+                    continue
+                stacks[name + ";" + _fold(frame, with_lines)] += 1
+                per_thread[name] += 1
+            del frames
+            ticks += 1
+            next_tick += interval
+            now = time.perf_counter()
+            if next_tick >= deadline:
+                break
+            if next_tick > now:
+                time.sleep(next_tick - now)
+            else:
+                # Fell behind (GIL contention): skip missed ticks rather
+                # than bursting to catch up.
+                next_tick = now
+        elapsed = time.perf_counter() - started
+    finally:
+        _capture_lock.release()
+    return {
+        "duration_s": round(elapsed, 3),
+        "interval_s": interval,
+        "ticks": ticks,
+        "threads": dict(sorted(per_thread.items())),
+        "stacks": dict(stacks.most_common()),
+    }
+
+
+def render_collapsed(result: Dict[str, Any], thread: Optional[str] = None) -> str:
+    """Brendan Gregg collapsed-stack text from a :func:`sample` result."""
+    lines = [
+        f"{stack} {count}"
+        for stack, count in result.get("stacks", {}).items()
+        if thread is None or stack.split(";", 1)[0] == thread
+    ]
+    return "\n".join(lines) + ("\n" if lines else "")
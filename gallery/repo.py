@@ -37,9 +37,10 @@ import time
 from concurrent.futures import Future
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 
 from . import db as _db
+from . import metrics as _metrics
 from . import paths as _paths
 from . import vocab as _vocab
 
@@ -51,21 +52,29 @@ __all__ = [
     "LOW",
     "WriteQueue",
     "UpsertImageOp",
+    "UpsertImagesOp",
     "UpsertVocabAndLinksOp",
     "RebuildPromptVocabFullOp",
     "UpdateImageOp",
     "ResyncMetadataOp",
+    "BulkUpdateImagesOp",
+    "BULK_CHUNK_ROWS",
     "UpdateImagePathOp",
+    "UpdateImagePathsOp",
     "DeleteImageOp",
+    "DeleteImagesOp",
     "UnindexCustomRootOp",
     "RelocateFolderSubtreeDbOp",
     "PurgeFolderSubtreeDbOp",
     "EnsureFolderOp",
     "ReconcileFoldersUnderRootOp",
+    "scan_folder_dirs",
     "InsertThumbCacheOp",
     "SetSyncStatusOp",
     "SetSyncFailedOp",
     "SetSyncHardFailedOp",
+    "SetContentHashesOp",
+    "SetPerceptualHashesOp",
     # T09 read-side DTOs + API
     "FilterSpec",
     "SortSpec",
@@ -76,10 +85,16 @@ __all__ = [
     "DEFAULT_PAGE_SIZE",
     "MAX_PAGE_SIZE",
     "TOTAL_ESTIMATE_CAP",
+    "IMAGE_PROJECTIONS",
     "get_image",
     "list_images",
     "folder_tree",
     "neighbors",
+    "NEIGHBORS_MAX_PREFETCH",
+    "ImageExportCursor",
+    "open_image_export",
+    "folder_generation",
+    "bump_folder_generation",
     # T21 vocab read helpers
     "vocab_lookup",
     "list_models_for_vocab",
@@ -90,9 +105,9 @@ __all__ = [
     "count_selection",
     "list_selection_ids_preview",
     "fetch_selection_id_paths",
-    "fetch_selection_id_path_tags_csv",
     "fetch_selection_move_sources",
     "list_tags_admin",
+    "list_duplicate_groups",
     "DeleteTagByNameOp",
     "PurgeZeroUsageTagsOp",
     "RenameTagOp",
@@ -118,9 +133,132 @@ _LOW_YIELD_THRESHOLD: int = 200
 # (TASKS.md T04 test #4) so a single crash can't blow the join deadline.
 _CRASH_RESTART_SLEEP_SEC: float = 0.02
 
+# Ops slower than this (queue wait excluded) are logged with their class.
+_SLOW_OP_LOG_SEC: float = 1.0
+
+_PRIORITY_LABELS: Dict[int, str] = {HIGH: "high", MID: "mid", LOW: "low"}
+
+_metrics.describe(
+    "xyz_gallery_write_wait_seconds", "histogram",
+    "Time from enqueue_write to the start of the op's transaction.",
+)
+_metrics.describe(
+    "xyz_gallery_write_apply_seconds", "histogram",
+    "Time spent in op.apply inside BEGIN IMMEDIATE.",
+)
+_metrics.describe(
+    "xyz_gallery_write_commit_seconds", "histogram",
+    "Time spent in COMMIT after a successful apply.",
+)
+_metrics.describe(
+    "xyz_gallery_write_failures_total", "counter",
+    "Ops whose transaction was rolled back.",
+)
+_metrics.describe(
+    "xyz_gallery_write_slow_ops_total", "counter",
+    "Ops whose apply + commit exceeded the slow-op log threshold.",
+)
+_metrics.describe(
+    "xyz_gallery_write_low_yields_total", "counter",
+    "LOW ops deferred by the starvation guard behind waiting HIGH/MID ops.",
+)
+_metrics.describe(
+    "xyz_gallery_write_queue_depth", "gauge",
+    "Ops waiting in the write queue, sampled when metrics are read.",
+)
+
 _PathLike = Union[str, Path]
 
 
+# -- Commit journal ---------------------------------------------------------
+#
+# Ops append vocab-link deltas here while they run on the writer thread;
+# ``WriteQueue`` hands the batch to every registered listener only after
+# the op's COMMIT (and drops it on ROLLBACK), so listeners observe exactly
+# the committed stream.  Entries:
+#   ("links", vocab_table, image_id, old_token_ids, new_token_ids)
+#   ("drop", vocab_table, token_id)      — vocab row deleted outright
+#   ("reset",)                           — bulk rewrite; rebuild from SQL
+#   ("phash", image_id, phash)           — perceptual hash stored (``similar``)
+#   ("phash", image_id, None)            — hash cleared (v10 stale trigger)
+#                                          or the image row deleted
+# Recording is skipped entirely while no listener is registered.
+_commit_journal: List[Tuple[Any, ...]] = []
+_commit_listeners: List[Any] = []
+
+
+def add_commit_listener(fn: Any) -> None:
+    """Register ``fn(entries)`` to receive committed journal batches."""
+    if fn not in _commit_listeners:
+        _commit_listeners.append(fn)
+
+
+def remove_commit_listener(fn: Any) -> None:
+    try:
+        _commit_listeners.remove(fn)
+    except ValueError:
+        pass
+
+
+def _journal_links(
+    vocab_table: str, image_id: int, old_ids: List[int], new_ids: List[int],
+) -> None:
+    if old_ids or new_ids:
+        _commit_journal.append(
+            ("links", vocab_table, int(image_id), tuple(old_ids), tuple(new_ids)))
+
+
+# TEMP triggers on the writer connection only: the persistent v10 trigger
+# NULLs ``phash`` from inside SQLite, and every op that changes a file
+# fingerprint or deletes a row would otherwise have to re-read it first.
+_PHASH_JOURNAL_DDL = """
+CREATE TEMP TRIGGER IF NOT EXISTS trg_journal_phash_stale
+AFTER UPDATE OF file_size, mtime_ns ON main.image
+WHEN OLD.phash IS NOT NULL
+ AND (OLD.file_size IS NOT NEW.file_size OR OLD.mtime_ns IS NOT NEW.mtime_ns)
+BEGIN
+    SELECT xyz_journal_phash_dropped(OLD.id);
+END;
+
+CREATE TEMP TRIGGER IF NOT EXISTS trg_journal_image_deleted
+AFTER DELETE ON main.image
+WHEN OLD.phash IS NOT NULL
+BEGIN
+    SELECT xyz_journal_phash_dropped(OLD.id);
+END;
+"""
+
+
+def _journal_phash_dropped(image_id: int) -> None:
+    if _commit_listeners:
+        _commit_journal.append(("phash", int(image_id), None))
+
+
+def _install_commit_journal_triggers(conn: sqlite3.Connection) -> None:
+    try:
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(image)")}
+        if "phash" not in cols:
+            # Pre-v10 file (tests driving a bare queue): nothing to journal.
+            return
+        conn.create_function(
+            "xyz_journal_phash_dropped", 1, _journal_phash_dropped)
+        conn.executescript(_PHASH_JOURNAL_DDL)
+    except sqlite3.Error:
+        logger.exception("could not install phash journal triggers")
+
+
+def _dispatch_commit_journal() -> None:
+    if not _commit_journal:
+        return
+    entries = list(_commit_journal)
+    _commit_journal.clear()
+    for fn in list(_commit_listeners):
+        try:
+            fn(entries)
+        except Exception:
+            logger.exception("commit listener failed")
+
+
 # -- Placeholder op factories ----------------------------------------------
 #
 # T04 intentionally ships these as empty shells: the WriteQueue contract is
@@ -203,7 +341,7 @@ class UpsertImageOp:
         self.word_tokens = list(word_tokens) if word_tokens else []
         self.normalized_tags = list(normalized_tags) if normalized_tags else []
 
-    def apply(self, conn: sqlite3.Connection) -> None:
+    def apply(self, conn: sqlite3.Connection) -> int:
         self._ensure_folder_chain(conn)
         conn.execute(_UPSERT_IMAGE_SQL, {
             "path": self.path,
@@ -251,6 +389,7 @@ class UpsertImageOp:
             word_tokens=self.word_tokens,
             tag_names=final_tag_names,
         ).apply(conn)
+        return image_id
 
     def _ensure_folder_chain(self, conn: sqlite3.Connection) -> None:
         # relative_path is the POSIX path relative to root_path, including
@@ -335,6 +474,33 @@ ON CONFLICT(path) DO UPDATE SET
 """
 
 
+class UpsertImagesOp:
+    """Apply a chunk of :class:`UpsertImageOp` in one transaction (watcher flush).
+
+    Each item runs under its own ``SAVEPOINT`` so one bad row is rolled
+    back (journal entries included) and reported without sinking the rest.
+    ``apply`` returns ``{"ids": {path: image_id}, "failed": {path: message}}``.
+    """
+
+    def __init__(self, items: List[UpsertImageOp]):
+        self.items = list(items)
+
+    def apply(self, conn: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+        ids: Dict[str, int] = {}
+        failed: Dict[str, str] = {}
+        for item in self.items:
+            mark = len(_commit_journal)
+            conn.execute("SAVEPOINT xyz_upsert_item")
+            try:
+                ids[item.path] = item.apply(conn)
+            except Exception as exc:  # noqa: BLE001 — one file, not the chunk
+                conn.execute("ROLLBACK TO xyz_upsert_item")
+                del _commit_journal[mark:]
+                failed[item.path] = str(exc)
+            conn.execute("RELEASE xyz_upsert_item")
+        return {"ids": ids, "failed": failed}
+
+
 class UpsertVocabAndLinksOp:
     """Replace ``image_prompt_token`` / ``image_tag`` rows for one image (T15).
 
@@ -356,10 +522,11 @@ class UpsertVocabAndLinksOp:
         self.tag_names = list(tag_names)
 
     def apply(self, conn: sqlite3.Connection) -> None:
-        for (tid,) in conn.execute(
+        old_prompt = conn.execute(
             "SELECT token_id FROM image_prompt_token WHERE image_id = ?",
             (self.image_id,),
-        ).fetchall():
+        ).fetchall()
+        for (tid,) in old_prompt:
             conn.execute(
                 "UPDATE prompt_token SET usage_count = usage_count - 1 "
                 "WHERE id = ? AND usage_count > 0",
@@ -374,10 +541,11 @@ class UpsertVocabAndLinksOp:
             (self.image_id,),
         )
 
-        for (wid,) in conn.execute(
+        old_word = conn.execute(
             "SELECT token_id FROM image_word_token WHERE image_id = ?",
             (self.image_id,),
-        ).fetchall():
+        ).fetchall()
+        for (wid,) in old_word:
             conn.execute(
                 "UPDATE word_token SET usage_count = usage_count - 1 "
                 "WHERE id = ? AND usage_count > 0",
@@ -392,10 +560,11 @@ class UpsertVocabAndLinksOp:
             (self.image_id,),
         )
 
-        for (gid,) in conn.execute(
+        old_tag = conn.execute(
             "SELECT tag_id FROM image_tag WHERE image_id = ?",
             (self.image_id,),
-        ).fetchall():
+        ).fetchall()
+        for (gid,) in old_tag:
             conn.execute(
                 "UPDATE tag SET usage_count = usage_count - 1 "
                 "WHERE id = ? AND usage_count > 0",
@@ -403,6 +572,10 @@ class UpsertVocabAndLinksOp:
             )
         conn.execute("DELETE FROM image_tag WHERE image_id = ?", (self.image_id,))
 
+        new_prompt: List[int] = []
+        new_word: List[int] = []
+        new_tag: List[int] = []
+
         for tok in self.prompt_tokens:
             conn.execute(
                 "INSERT OR IGNORE INTO prompt_token(token, usage_count) VALUES (?, 0)",
@@ -423,6 +596,7 @@ class UpsertVocabAndLinksOp:
                 "INSERT INTO image_prompt_token(image_id, token_id) VALUES (?, ?)",
                 (self.image_id, pid),
             )
+            new_prompt.append(pid)
 
         for wtok in self.word_tokens:
             conn.execute(
@@ -444,6 +618,7 @@ class UpsertVocabAndLinksOp:
                 "INSERT INTO image_word_token(image_id, token_id) VALUES (?, ?)",
                 (self.image_id, wid),
             )
+            new_word.append(wid)
 
         for name in self.tag_names:
             conn.execute(
@@ -465,6 +640,18 @@ class UpsertVocabAndLinksOp:
                 "INSERT INTO image_tag(image_id, tag_id) VALUES (?, ?)",
                 (self.image_id, tid),
             )
+            new_tag.append(tid)
+
+        if _commit_listeners:
+            for table, old_rows, new_ids in (
+                ("prompt_token", old_prompt, new_prompt),
+                ("word_token", old_word, new_word),
+                ("tag", old_tag, new_tag),
+            ):
+                _journal_links(
+                    table, self.image_id,
+                    [int(r[0]) for r in old_rows], new_ids,
+                )
 
 
 class RebuildPromptVocabFullOp:
@@ -478,6 +665,8 @@ class RebuildPromptVocabFullOp:
         self.extra_stopwords = extra_stopwords
 
     def apply(self, conn: sqlite3.Connection) -> None:
+        if _commit_listeners:
+            _commit_journal.append(("reset",))
         conn.execute("DELETE FROM image_prompt_token")
         conn.execute("DELETE FROM prompt_token")
         conn.execute("DELETE FROM image_word_token")
@@ -666,6 +855,213 @@ class ResyncMetadataOp:
         return int(row[0])
 
 
+BULK_CHUNK_ROWS: int = 500
+
+_SYNC_RESET_SQL = (
+    "metadata_sync_status = 'pending', "
+    "metadata_sync_retry_count = 0, "
+    "metadata_sync_next_retry_at = NULL, "
+    "metadata_sync_last_error = NULL"
+)
+
+
+def _tags_from_csv(tags_csv: Optional[str]) -> Tuple[str, ...]:
+    if not tags_csv:
+        return ()
+    return tuple(t for t in str(tags_csv).split(",") if t)
+
+
+def _merge_tag_lists(
+    current: Tuple[str, ...],
+    add: List[str],
+    remove: List[str],
+) -> List[str]:
+    rset = {_vocab.normalize_tag(x) for x in remove}
+    rset.discard("")
+    out = [t for t in current if _vocab.normalize_tag(t) not in rset]
+    seen = {_vocab.normalize_tag(t) for t in out}
+    for a in add:
+        nt = _vocab.normalize_tag(a)
+        if nt and nt not in seen:
+            out.append(nt)
+            seen.add(nt)
+    return out
+
+
+class BulkUpdateImagesOp:
+    """Set favorite or add/remove tags on a chunk of ``image`` ids in one tx.
+
+    The set-based twin of :class:`UpdateImageOp` for bulk edits (T23): one
+    ``UPDATE … RETURNING`` covers the whole chunk, and ``image_tag`` /
+    ``tag.usage_count`` move by ``GROUP BY`` deltas instead of a per-image
+    link rebuild (prompt/word links are never touched).  ``add_tags`` /
+    ``remove_tags`` must already be normalised; ``tags_csv`` keeps its
+    existing order, drops removed tags and appends new ones.  Rows whose
+    ``tags_csv`` would not change are left alone (no version bump).
+
+    ``apply`` returns ``{"updated": [(id, version, tags_or_None)],
+    "missing": [id], "unchanged": [id]}``; ``tags_or_None`` is the new tag
+    list for tag edits and ``None`` for favorite edits.
+    """
+
+    def __init__(
+        self,
+        *,
+        image_ids: List[int],
+        favorite: Optional[int] = None,
+        add_tags: Optional[List[str]] = None,
+        remove_tags: Optional[List[str]] = None,
+    ):
+        self.image_ids = [int(x) for x in image_ids]
+        self.favorite = favorite
+        self.add_tags = list(add_tags or ())
+        self.remove_tags = list(remove_tags or ())
+        if (favorite is None) == (not self.add_tags and not self.remove_tags):
+            raise ValueError(
+                "BulkUpdateImagesOp: pass exactly one of favorite / tag edits",
+            )
+
+    def apply(self, conn: sqlite3.Connection) -> Dict[str, List[Any]]:
+        if self.favorite is not None:
+            return self._apply_favorite(conn)
+        return self._apply_tags(conn)
+
+    def _apply_favorite(self, conn: sqlite3.Connection) -> Dict[str, List[Any]]:
+        rows = conn.execute(
+            "UPDATE image SET favorite = ?, " + _SYNC_RESET_SQL + ", "
+            "version = version + 1 "
+            "WHERE id IN (SELECT value FROM json_each(?)) "
+            "RETURNING id, version",
+            (int(self.favorite), json.dumps(self.image_ids)),
+        ).fetchall()
+        hit = {int(r[0]) for r in rows}
+        return {
+            "updated": [(int(r[0]), int(r[1]), None) for r in rows],
+            "missing": [i for i in self.image_ids if i not in hit],
+            "unchanged": [],
+        }
+
+    def _apply_tags(self, conn: sqlite3.Connection) -> Dict[str, List[Any]]:
+        current = {
+            int(r[0]): r[1]
+            for r in conn.execute(
+                "SELECT id, tags_csv FROM image "
+                "WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(self.image_ids),),
+            )
+        }
+        missing = [i for i in self.image_ids if i not in current]
+        unchanged: List[int] = []
+        new_tags: Dict[int, List[str]] = {}
+        for iid, tags_csv in current.items():
+            cur = _tags_from_csv(tags_csv)
+            merged = _merge_tag_lists(cur, self.add_tags, self.remove_tags)
+            want = ",".join(merged) if merged else None
+            if (not merged and not cur) or (
+                want is not None and (tags_csv or "") == want
+            ):
+                unchanged.append(iid)
+            else:
+                new_tags[iid] = merged
+        if not new_tags:
+            return {"updated": [], "missing": missing, "unchanged": unchanged}
+
+        changed_json = json.dumps(list(new_tags))
+        old_links: Dict[int, List[int]] = {}
+        if _commit_listeners:
+            old_links = self._links_of(conn, changed_json)
+
+        # A tag both removed and added ends up present (moved to the end of
+        # tags_csv), so only the remove-only names lose their links.
+        add_set = set(self.add_tags)
+        drop_names = json.dumps(
+            [t for t in self.remove_tags if t not in add_set])
+        for tag_id, n in conn.execute(
+            "SELECT tag_id, COUNT(*) FROM image_tag "
+            "WHERE image_id IN (SELECT value FROM json_each(?)) "
+            "AND tag_id IN (SELECT id FROM tag WHERE name IN "
+            "(SELECT value FROM json_each(?))) "
+            "GROUP BY tag_id",
+            (changed_json, drop_names),
+        ).fetchall():
+            conn.execute(
+                "UPDATE tag SET usage_count = MAX(usage_count - ?, 0) "
+                "WHERE id = ?",
+                (int(n), int(tag_id)),
+            )
+        conn.execute(
+            "DELETE FROM image_tag "
+            "WHERE image_id IN (SELECT value FROM json_each(?)) "
+            "AND tag_id IN (SELECT id FROM tag WHERE name IN "
+            "(SELECT value FROM json_each(?)))",
+            (changed_json, drop_names),
+        )
+
+        if self.add_tags:
+            conn.executemany(
+                "INSERT OR IGNORE INTO tag(name, usage_count) VALUES (?, 0)",
+                [(t,) for t in self.add_tags],
+            )
+            add_names = json.dumps(self.add_tags)
+            for tag_id, n in conn.execute(
+                "SELECT t.id, COUNT(*) FROM json_each(?) AS j "
+                "JOIN tag AS t ON t.name IN (SELECT value FROM json_each(?)) "
+                "WHERE NOT EXISTS (SELECT 1 FROM image_tag AS it "
+                "WHERE it.image_id = j.value AND it.tag_id = t.id) "
+                "GROUP BY t.id",
+                (changed_json, add_names),
+            ).fetchall():
+                conn.execute(
+                    "UPDATE tag SET usage_count = usage_count + ? WHERE id = ?",
+                    (int(n), int(tag_id)),
+                )
+            conn.execute(
+                "INSERT OR IGNORE INTO image_tag(image_id, tag_id) "
+                "SELECT j.value, t.id FROM json_each(?) AS j "
+                "JOIN tag AS t ON t.name IN (SELECT value FROM json_each(?))",
+                (changed_json, add_names),
+            )
+
+        rows = conn.execute(
+            "UPDATE image SET tags_csv = json_extract(j.value, '$[1]'), "
+            + _SYNC_RESET_SQL + ", version = version + 1 "
+            "FROM json_each(?) AS j "
+            "WHERE image.id = json_extract(j.value, '$[0]') "
+            "RETURNING image.id, image.version",
+            (json.dumps([
+                [iid, ",".join(tags) if tags else None]
+                for iid, tags in new_tags.items()
+            ]),),
+        ).fetchall()
+
+        if _commit_listeners:
+            new_links = self._links_of(conn, changed_json)
+            for iid in new_tags:
+                _journal_links(
+                    "tag", iid, old_links.get(iid, []), new_links.get(iid, []),
+                )
+        return {
+            "updated": [
+                (int(r[0]), int(r[1]), list(new_tags[int(r[0])])) for r in rows
+            ],
+            "missing": missing,
+            "unchanged": unchanged,
+        }
+
+    @staticmethod
+    def _links_of(
+        conn: sqlite3.Connection, ids_json: str,
+    ) -> Dict[int, List[int]]:
+        out: Dict[int, List[int]] = {}
+        for iid, tid in conn.execute(
+            "SELECT image_id, tag_id FROM image_tag "
+            "WHERE image_id IN (SELECT value FROM json_each(?))",
+            (ids_json,),
+        ):
+            out.setdefault(int(iid), []).append(int(tid))
+        return out
+
+
 class UpdateImagePathOp:
     """Rewrite ``path`` / folder columns after a successful on-disk move (T24).
 
@@ -745,54 +1141,108 @@ class UpdateImagePathOp:
         return int(out[0])
 
 
+class UpdateImagePathsOp:
+    """Apply a chunk of :class:`UpdateImagePathOp` in one transaction.
+
+    Each item runs under its own ``SAVEPOINT`` so one bad row (vanished id,
+    ``path`` collision) is rolled back and reported without sinking the
+    rest of the chunk.  ``apply`` returns ``{"versions": {id: version},
+    "failed": {id: message}}``.
+    """
+
+    def __init__(self, items: List[UpdateImagePathOp]):
+        self.items = list(items)
+
+    def apply(self, conn: sqlite3.Connection) -> Dict[str, Dict[int, Any]]:
+        versions: Dict[int, int] = {}
+        failed: Dict[int, str] = {}
+        for item in self.items:
+            conn.execute("SAVEPOINT xyz_path_item")
+            try:
+                versions[item.image_id] = item.apply(conn)
+            except (KeyError, RuntimeError, sqlite3.IntegrityError) as exc:
+                conn.execute("ROLLBACK TO xyz_path_item")
+                failed[item.image_id] = str(exc)
+            conn.execute("RELEASE xyz_path_item")
+        return {"versions": versions, "failed": failed}
+
+
 def _delete_image_row_by_id(conn: sqlite3.Connection, image_id: int) -> None:
     """Cascade-delete one ``image`` row by primary key (DB only)."""
-    for (tid,) in conn.execute(
-        "SELECT token_id FROM image_prompt_token WHERE image_id = ?",
-        (image_id,),
-    ).fetchall():
-        conn.execute(
-            "UPDATE prompt_token SET usage_count = usage_count - 1 "
-            "WHERE id = ? AND usage_count > 0",
-            (int(tid),),
-        )
-        conn.execute(
-            "DELETE FROM prompt_token WHERE id = ? AND usage_count = 0",
-            (int(tid),),
-        )
-    conn.execute(
-        "DELETE FROM image_prompt_token WHERE image_id = ?",
-        (image_id,),
-    )
-    for (wid,) in conn.execute(
-        "SELECT token_id FROM image_word_token WHERE image_id = ?",
-        (image_id,),
-    ).fetchall():
-        conn.execute(
-            "UPDATE word_token SET usage_count = usage_count - 1 "
-            "WHERE id = ? AND usage_count > 0",
-            (int(wid),),
+    _delete_image_rows(conn, [int(image_id)])
+
+
+# (vocab table, link table, link column, drop vocab rows that reach zero)
+_IMAGE_LINK_TABLES: Tuple[Tuple[str, str, str, bool], ...] = (
+    ("prompt_token", "image_prompt_token", "token_id", True),
+    ("word_token", "image_word_token", "token_id", True),
+    ("tag", "image_tag", "tag_id", False),
+)
+
+
+def _delete_image_rows(
+    conn: sqlite3.Connection, image_ids: List[int],
+) -> List[int]:
+    """Cascade-delete ``image`` rows set-wise; returns the ids actually removed.
+
+    Vocab ``usage_count`` drops by one ``GROUP BY`` delta per token rather
+    than one UPDATE per link; prompt / word tokens that reach zero are
+    deleted (tags are kept for the tag admin's purge).
+    """
+    if not image_ids:
+        return []
+    ids_json = json.dumps([int(x) for x in image_ids])
+    old_links: Dict[str, Dict[int, List[int]]] = {}
+    for vocab_table, link_table, link_col, drop_unused in _IMAGE_LINK_TABLES:
+        if _commit_listeners:
+            per_image: Dict[int, List[int]] = {}
+            for iid, tid in conn.execute(
+                f"SELECT image_id, {link_col} FROM {link_table} "
+                "WHERE image_id IN (SELECT value FROM json_each(?))",
+                (ids_json,),
+            ):
+                per_image.setdefault(int(iid), []).append(int(tid))
+            old_links[vocab_table] = per_image
+        deltas = conn.execute(
+            f"SELECT {link_col}, COUNT(*) FROM {link_table} "
+            "WHERE image_id IN (SELECT value FROM json_each(?)) "
+            f"GROUP BY {link_col}",
+            (ids_json,),
+        ).fetchall()
+        if not deltas:
+            continue
+        conn.executemany(
+            f"UPDATE {vocab_table} SET usage_count = MAX(usage_count - ?, 0) "
+            "WHERE id = ?",
+            [(int(n), int(tid)) for tid, n in deltas],
         )
         conn.execute(
-            "DELETE FROM word_token WHERE id = ? AND usage_count = 0",
-            (int(wid),),
+            f"DELETE FROM {link_table} "
+            "WHERE image_id IN (SELECT value FROM json_each(?))",
+            (ids_json,),
         )
+        if drop_unused:
+            conn.execute(
+                f"DELETE FROM {vocab_table} WHERE usage_count = 0 "
+                "AND id IN (SELECT value FROM json_each(?))",
+                (json.dumps([int(tid) for tid, _n in deltas]),),
+            )
     conn.execute(
-        "DELETE FROM image_word_token WHERE image_id = ?",
-        (image_id,),
+        "DELETE FROM thumbnail_cache "
+        "WHERE image_id IN (SELECT value FROM json_each(?))",
+        (ids_json,),
     )
-    for (gid,) in conn.execute(
-        "SELECT tag_id FROM image_tag WHERE image_id = ?",
-        (image_id,),
-    ).fetchall():
-        conn.execute(
-            "UPDATE tag SET usage_count = usage_count - 1 "
-            "WHERE id = ? AND usage_count > 0",
-            (int(gid),),
-        )
-    conn.execute("DELETE FROM image_tag WHERE image_id = ?", (image_id,))
-    conn.execute("DELETE FROM thumbnail_cache WHERE image_id = ?", (image_id,))
-    conn.execute("DELETE FROM image WHERE id = ?", (image_id,))
+    deleted = [
+        int(r[0]) for r in conn.execute(
+            "DELETE FROM image WHERE id IN (SELECT value FROM json_each(?)) "
+            "RETURNING id",
+            (ids_json,),
+        ).fetchall()
+    ]
+    for vocab_table, per_image in old_links.items():
+        for iid, old in per_image.items():
+            _journal_links(vocab_table, iid, old, [])
+    return deleted
 
 
 def _rebuild_tags_csv_for_image(conn: sqlite3.Connection, image_id: int) -> int:
@@ -842,6 +1292,8 @@ class DeleteTagByNameOp:
             )
         ]
         conn.execute("DELETE FROM tag WHERE id = ?", (tid,))
+        if _commit_listeners:
+            _commit_journal.append(("drop", "tag", tid))
         affected: List[Tuple[int, int]] = []
         for iid in image_ids:
             ver = _rebuild_tags_csv_for_image(conn, iid)
@@ -922,20 +1374,54 @@ class DeleteImageOp:
         return image_id
 
 
+class DeleteImagesOp:
+    """Remove a chunk of ``image`` rows by id in one transaction (bulk delete).
+
+    ``paths`` (parallel to ``image_ids``) guards against rows that moved
+    after the plan was made: an id whose stored ``path`` differs is left
+    alone.  Returns the deleted ids; absent ids are skipped silently, like
+    :class:`DeleteImageOp`.
+    """
+
+    def __init__(
+        self, *, image_ids: List[int], paths: Optional[List[str]] = None,
+    ):
+        self.image_ids = [int(x) for x in image_ids]
+        self.paths = None if paths is None else [str(p) for p in paths]
+        if self.paths is not None and len(self.paths) != len(self.image_ids):
+            raise ValueError("DeleteImagesOp: paths must match image_ids")
+
+    def apply(self, conn: sqlite3.Connection) -> List[int]:
+        ids = self.image_ids
+        if self.paths is not None and ids:
+            ids = [
+                int(r[0]) for r in conn.execute(
+                    "SELECT image.id FROM json_each(?) AS j "
+                    "JOIN image ON image.id = json_extract(j.value, '$[0]') "
+                    "AND image.path = json_extract(j.value, '$[1]')",
+                    (json.dumps([list(x) for x in zip(ids, self.paths)]),),
+                ).fetchall()
+            ]
+        return _delete_image_rows(conn, ids)
+
+
 class UnindexCustomRootOp:
     """Drop all ``image`` rows for a removable root and delete its ``folder`` rows."""
 
+    invalidates_folder_cache = True
+
     def __init__(self, *, root_id: int, root_path: str):
         self.root_id = int(root_id)
         self.root_path = str(root_path)
 
     def apply(self, conn: sqlite3.Connection) -> None:
         root_pp = Path(self.root_path).resolve(strict=False).as_posix().rstrip("/")
-        for (iid,) in conn.execute(
-            "SELECT id FROM image WHERE folder_id = ?",
-            (self.root_id,),
-        ).fetchall():
-            _delete_image_row_by_id(conn, int(iid))
+        _delete_image_rows(conn, [
+            int(r[0]) for r in conn.execute(
+                "SELECT id FROM image WHERE folder_id = ?",
+                (self.root_id,),
+            ).fetchall()
+        ])
         like_pat = _sql_like_escape(root_pp) + "/%"
         for (fid,) in conn.execute(
             "SELECT id FROM folder WHERE id != ? AND (path LIKE ? ESCAPE '\\') "
@@ -944,6 +1430,7 @@ class UnindexCustomRootOp:
         ).fetchall():
             conn.execute("DELETE FROM folder WHERE id = ?", (int(fid),))
         conn.execute("DELETE FROM folder WHERE id = ?", (self.root_id,))
+        _forget_folder_scan(root_pp)
 
 
 class RelocateFolderSubtreeDbOp:
@@ -954,6 +1441,8 @@ class RelocateFolderSubtreeDbOp:
     PNG re-embed writer would mark every file as "updating" for no benefit.
     """
 
+    invalidates_folder_cache = True
+
     def __init__(
         self,
         *,
@@ -1043,17 +1532,19 @@ class RelocateFolderSubtreeDbOp:
 class PurgeFolderSubtreeDbOp:
     """Remove ``image`` + ``folder`` rows whose paths lie under a deleted subtree."""
 
+    invalidates_folder_cache = True
+
     def __init__(self, *, subtree_prefix_posix: str):
         self.prefix = _norm_fs_path(str(subtree_prefix_posix))
 
     def apply(self, conn: sqlite3.Connection) -> List[int]:
         old = self.prefix
-        deleted_ids: List[int] = []
+        doomed: List[int] = []
         for iid, pth in conn.execute("SELECT id, path FROM image"):
             pn = _norm_fs_path(str(pth))
             if pn == old or pn.startswith(old + "/"):
-                _delete_image_row_by_id(conn, int(iid))
-                deleted_ids.append(int(iid))
+                doomed.append(int(iid))
+        deleted_ids = _delete_image_rows(conn, doomed)
         id_to_path: Dict[int, str] = {}
         for fid, pth in conn.execute("SELECT id, path FROM folder"):
             id_to_path[int(fid)] = _norm_fs_path(str(pth))
@@ -1064,6 +1555,7 @@ class PurgeFolderSubtreeDbOp:
         to_del.sort(key=lambda i: -len(id_to_path[i]))
         for fid in to_del:
             conn.execute("DELETE FROM folder WHERE id = ?", (fid,))
+        _forget_folder_scan(old)
         return deleted_ids
 
 
@@ -1112,13 +1604,18 @@ def _relink_folder_parent_ids(conn: sqlite3.Connection, *, root_id: int, root_pp
 
 
 def _dedupe_folder_rows_by_norm_path(conn: sqlite3.Connection) -> bool:
-    """Merge duplicate ``folder`` rows whose ``path`` normalizes identically (Windows)."""
+    """Merge duplicate ``folder`` rows whose ``path`` normalizes identically (Windows).
+
+    The survivor (lowest id, so image FKs stay put) takes the normalised
+    path, so the subtree range lookups in ``ReconcileFoldersUnderRootOp``
+    find it from then on.
+    """
     groups: Dict[str, List[int]] = {}
     for fid, pth in conn.execute("SELECT id, path FROM folder"):
         key = _norm_fs_path(str(pth))
         groups.setdefault(key, []).append(int(fid))
     mutated = False
-    for _key, ids in groups.items():
+    for key, ids in groups.items():
         if len(ids) <= 1:
             continue
         ids.sort()
@@ -1135,98 +1632,181 @@ def _dedupe_folder_rows_by_norm_path(conn: sqlite3.Connection) -> bool:
             cur = conn.execute("DELETE FROM folder WHERE id = ?", (dup,))
             if cur.rowcount:
                 mutated = True
+        conn.execute("UPDATE folder SET path = ? WHERE id = ?", (key, keep))
     return mutated
 
 
+# Per-root listing cache for :func:`scan_folder_dirs`:
+# root -> {dir: (mtime_ns or None, child dir names)}.  ``None`` marks a
+# listing that must not be trusted next time (racy mtime / listing error).
+_folder_scan_cache: Dict[str, Dict[str, Tuple[Optional[int], Tuple[str, ...]]]] = {}
+_folder_scan_lock = threading.Lock()
+
+
+def _forget_folder_scan(prefix_posix: str) -> None:
+    """Drop cached listings for ``prefix_posix`` and any root beneath it.
+
+    Called when a root is unregistered or its tree is purged — a dropped
+    root would otherwise keep its whole listing alive for the process
+    lifetime.  Only ever a cache miss if the entry was still wanted.
+    """
+    pfx = _norm_fs_path(prefix_posix)
+    with _folder_scan_lock:
+        for key in [k for k in _folder_scan_cache
+                    if k == pfx or k.startswith(pfx + "/")]:
+            del _folder_scan_cache[key]
+
+
+# A directory touched this close to the scan may still change within the
+# same mtime tick (FAT / SMB granularity) — relist it on the next scan.
+_FOLDER_SCAN_RACY_NS: int = 2_000_000_000
+
+
+def scan_folder_dirs(root_path: str) -> Optional[FrozenSet[str]]:
+    """Normalised directories under ``root_path`` (root included); ``None`` if gone.
+
+    Runs on the caller's thread, never the writer's.  A directory whose
+    mtime matches the previous scan of the same root reuses its cached
+    child list instead of being listed again, so an unchanged tree costs
+    one ``stat`` per directory.  Derivative dirs (``_thumbs`` …) are pruned
+    exactly like the indexer's walk.
+    """
+    root_posix = _norm_fs_path(root_path)
+    if not os.path.isdir(root_path):
+        _forget_folder_scan(root_posix)
+        return None
+    with _folder_scan_lock:
+        prev = _folder_scan_cache.get(root_posix, {})
+    racy_after = time.time_ns() - _FOLDER_SCAN_RACY_NS
+    seen: Dict[str, Tuple[Optional[int], Tuple[str, ...]]] = {}
+    out: set[str] = set()
+    stack = [root_posix]
+    while stack:
+        d = stack.pop()
+        try:
+            mtime_ns: Optional[int] = os.stat(d).st_mtime_ns
+        except OSError as exc:
+            logger.warning("reconcile scan error under %s: %s", root_path, exc)
+            continue
+        out.add(d)
+        hit = prev.get(d)
+        if hit is not None and hit[0] is not None and hit[0] == mtime_ns:
+            children = hit[1]
+        else:
+            names: List[str] = []
+            try:
+                with os.scandir(d) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                names.append(entry.name)
+                        except OSError:
+                            continue
+            except OSError as exc:
+                logger.warning("reconcile scan error under %s: %s", root_path, exc)
+                mtime_ns = None
+            _paths.prune_derivative_walk_dirnames(names)
+            children = tuple(sorted(names))
+            if mtime_ns is not None and mtime_ns >= racy_after:
+                mtime_ns = None
+        seen[d] = (mtime_ns, children)
+        stack.extend(d + "/" + name for name in children)
+    with _folder_scan_lock:
+        _folder_scan_cache[root_posix] = seen
+    return frozenset(out)
+
+
 class ReconcileFoldersUnderRootOp:
-    """Sync ``folder`` rows under one registered root with on-disk directories."""
+    """Sync ``folder`` rows under one registered root with on-disk directories.
+
+    The disk side is a snapshot from :func:`scan_folder_dirs`, taken when
+    the op is built (caller thread) unless ``disk_dirs`` is passed in, so
+    the writer transaction only diffs it against the root's rows.  Rows it
+    inserts carry the normalised path, which lets the diff fetch the subtree
+    as a range on the ``UNIQUE(path)`` index instead of normalising every
+    ``folder`` row.
+    """
+
+    invalidates_folder_cache = True
 
-    def __init__(self, *, root_id: int, root_path: str, root_kind: str):
+    def __init__(
+        self,
+        *,
+        root_id: int,
+        root_path: str,
+        root_kind: str,
+        disk_dirs: Optional[Iterable[str]] = None,
+    ):
         self.root_id = int(root_id)
         self.root_path = str(root_path)
         self.root_kind = str(root_kind)
+        if disk_dirs is None:
+            disk_dirs = scan_folder_dirs(self.root_path)
+        self.disk_dirs: Optional[FrozenSet[str]] = (
+            None if disk_dirs is None else frozenset(disk_dirs)
+        )
 
     def apply(self, conn: sqlite3.Connection) -> bool:
-        if not os.path.isdir(self.root_path):
+        if self.disk_dirs is None:
             return False
         root_posix = _norm_fs_path(self.root_path)
-        disk_dirs: set[str] = {root_posix}
-
-        def _on_walk_error(exc: OSError) -> None:
-            logger.warning("reconcile walk error under %s: %s", self.root_path, exc)
+        prefix = root_posix + "/"
+        disk_dirs = self.disk_dirs | {root_posix}
 
-        for dirpath, dirnames, _names in os.walk(
-            self.root_path, onerror=_on_walk_error, followlinks=False,
+        # '/' + 1 == '0': [prefix, root + '0') is exactly the subtree.
+        norm_to_fid: Dict[str, int] = {root_posix: self.root_id}
+        for fid, pth in conn.execute(
+            "SELECT id, path FROM folder WHERE path >= ? AND path < ?",
+            (prefix, root_posix + "0"),
         ):
-            _paths.prune_derivative_walk_dirnames(dirnames)
-            abs_d = _norm_fs_path(str(dirpath))
-            if abs_d != root_posix and _paths.is_derivative_path_excluded(
-                abs_d + "/.__probe__.png", root_posix,
-            ):
-                continue
-            disk_dirs.add(abs_d)
-
-        rows_here: List[Tuple[int, str, str]] = []
-        for fid, pth in conn.execute("SELECT id, path FROM folder"):
-            raw = str(pth)
-            pn = _norm_fs_path(raw)
-            if int(fid) == int(self.root_id) or pn == root_posix or pn.startswith(
-                root_posix + "/",
-            ):
-                rows_here.append((int(fid), raw, pn))
-
-        db_paths_norm = {r[2] for r in rows_here}
-        norm_to_fid: Dict[str, int] = {}
-        for fid, _raw, pn in rows_here:
-            norm_to_fid[pn] = int(fid)
+            norm_to_fid[str(pth)] = int(fid)
 
-        prefix = root_posix + "/"
         mutated = False
-        to_delete = [
-            (norm_to_fid[pn], pn)
-            for pn in db_paths_norm
-            if pn != root_posix and pn.startswith(prefix) and pn not in disk_dirs
+        deleted = False
+        stale = [
+            (fid, pn) for pn, fid in norm_to_fid.items()
+            if pn.startswith(prefix) and pn not in disk_dirs
         ]
-        to_delete.sort(key=lambda x: -len(x[1]))
-        for fid, _pn in to_delete:
+        stale.sort(key=lambda x: -len(x[1]))
+        for fid, raw in stale:
+            del norm_to_fid[raw]
+            # Only rows that miss the snapshot pay for a real normalisation:
+            # a legacy spelling of a live dir is rewritten, not dropped.
+            pn = _norm_fs_path(raw)
+            if pn in disk_dirs:
+                if pn not in norm_to_fid:
+                    conn.execute(
+                        "UPDATE folder SET path = ? WHERE id = ?", (pn, fid),
+                    )
+                    norm_to_fid[pn] = fid
+                mutated = True
+                continue
             cur = conn.execute("DELETE FROM folder WHERE id = ?", (fid,))
             if cur.rowcount:
-                mutated = True
-
-        missing = [p for p in sorted(disk_dirs) if p not in db_paths_norm]
-        n_root = len(Path(root_posix).parts)
-
-        def _sub_depth(p: str) -> int:
-            return len(Path(p).parts) - n_root
+                mutated = deleted = True
 
-        missing.sort(key=_sub_depth)
+        missing = [p for p in disk_dirs if p not in norm_to_fid]
+        missing.sort(key=lambda p: (p.count("/"), p))
         for pth in missing:
-            parent = _norm_fs_path(str(Path(pth).parent))
-            if parent == root_posix:
-                parent_id = self.root_id
-            else:
-                prow = conn.execute(
-                    "SELECT id FROM folder WHERE "
-                    "replace(replace(path, char(92), '/'), '//', '/') = ?",
-                    (parent,),
-                ).fetchone()
-                if prow is None:
-                    continue
-                parent_id = int(prow[0])
-            part = Path(pth).name
+            parent_id = norm_to_fid.get(pth.rsplit("/", 1)[0])
+            if parent_id is None:
+                continue
             cur = conn.execute(
                 "INSERT OR IGNORE INTO folder"
                 "(path, kind, parent_id, display_name, removable) "
                 "VALUES (?, ?, ?, ?, ?)",
-                (pth, self.root_kind, parent_id, part, 0),
+                (pth, self.root_kind, parent_id, pth.rsplit("/", 1)[1], 0),
             )
             if cur.rowcount:
+                norm_to_fid[pth] = int(cur.lastrowid)
                 mutated = True
 
-        if _dedupe_folder_rows_by_norm_path(conn):
-            mutated = True
-            _relink_folder_parent_ids(conn, root_id=int(self.root_id), root_pp=root_posix)
-        elif mutated:
+        # Legacy rows written before paths were normalised (Windows
+        # backslashes, unresolved segments) only ever collide with fresh
+        # inserts, so the full-table dedupe runs only after a mutation.
+        if mutated and _dedupe_folder_rows_by_norm_path(conn):
+            deleted = True
+        if deleted:
             _relink_folder_parent_ids(conn, root_id=int(self.root_id), root_pp=root_posix)
 
         if mutated:
@@ -1253,6 +1833,8 @@ class EnsureFolderOp:
     in T05's scope (T07 owns that wiring).
     """
 
+    invalidates_folder_cache = True
+
     def __init__(self, *, path: str, kind: str, removable: int,
                  display_name: str, parent_id: Optional[int] = None):
         self.path = path
@@ -1278,15 +1860,22 @@ class EnsureFolderOp:
 # derived from (path, mtime_ns) so collisions on a stable file are a
 # no-op rewrite, and mtime_ns changes produce a brand-new PK entirely.
 class InsertThumbCacheOp:
-    """Record a freshly-generated WebP thumbnail in ``thumbnail_cache``."""
+    """Record a freshly-generated WebP thumbnail in ``thumbnail_cache``.
+
+    With ``phash`` / ``mtime_ns`` the image's perceptual hash is stored in
+    the same transaction, exactly as :class:`SetPerceptualHashesOp` would.
+    """
 
     def __init__(self, *, hash_key: str, image_id: int,
-                 size_bytes: int, created_at: int, last_accessed: int):
+                 size_bytes: int, created_at: int, last_accessed: int,
+                 phash: Optional[int] = None, mtime_ns: Optional[int] = None):
         self.hash_key = hash_key
         self.image_id = int(image_id)
         self.size_bytes = int(size_bytes)
         self.created_at = int(created_at)
         self.last_accessed = int(last_accessed)
+        self.phash = None if phash is None else int(phash)
+        self.mtime_ns = None if mtime_ns is None else int(mtime_ns)
 
     def apply(self, conn: sqlite3.Connection) -> None:
         conn.execute(
@@ -1296,6 +1885,8 @@ class InsertThumbCacheOp:
             (self.hash_key, self.image_id, self.size_bytes,
              self.created_at, self.last_accessed),
         )
+        if self.phash is not None and self.mtime_ns is not None:
+            _set_phash(conn, self.image_id, self.phash, self.mtime_ns)
 
 
 class SetSyncStatusOp:
@@ -1413,6 +2004,57 @@ class SetSyncHardFailedOp:
         )
 
 
+class SetContentHashesOp:
+    """Store ``content_hash`` for rows whose fingerprint still matches.
+
+    ``items`` are ``(image_id, content_hash, file_size, mtime_ns)`` as seen
+    by the hasher when it read the file; a row re-indexed in between keeps
+    its NULL hash and is hashed again later.  Returns the rows updated.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, str, int, int]]):
+        self.items = [(int(i), str(h), int(sz), int(mt)) for i, h, sz, mt in items]
+
+    def apply(self, conn: sqlite3.Connection) -> int:
+        cur = conn.executemany(
+            "UPDATE image SET content_hash = ? "
+            "WHERE id = ? AND file_size = ? AND mtime_ns = ?",
+            [(h, i, sz, mt) for i, h, sz, mt in self.items],
+        )
+        return int(cur.rowcount)
+
+
+class SetPerceptualHashesOp:
+    """Store ``phash`` (64-bit dHash of the thumbnail) for matching rows.
+
+    ``items`` are ``(image_id, phash, mtime_ns)`` with ``phash`` unsigned;
+    it is stored as a signed INTEGER.  Rows whose ``mtime_ns`` moved on
+    since the thumbnail was encoded are skipped.  Committed values are
+    journalled as ``("phash", image_id, phash)`` for ``similar``'s index.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, int, int]]):
+        self.items = [(int(i), int(h), int(mt)) for i, h, mt in items]
+
+    def apply(self, conn: sqlite3.Connection) -> int:
+        return sum(
+            _set_phash(conn, iid, h, mtime_ns) for iid, h, mtime_ns in self.items
+        )
+
+
+def _set_phash(conn: sqlite3.Connection, iid: int, h: int, mtime_ns: int) -> bool:
+    signed = h - (1 << 64) if h >= (1 << 63) else h
+    cur = conn.execute(
+        "UPDATE image SET phash = ? WHERE id = ? AND mtime_ns = ?",
+        (signed, iid, mtime_ns),
+    )
+    if not cur.rowcount:
+        return False
+    if _commit_listeners:
+        _commit_journal.append(("phash", iid, h))
+    return True
+
+
 # -- Read side (T09) -------------------------------------------------------
 #
 # All read APIs are synchronous, open a short-lived ``db.connect_read``
@@ -1615,6 +2257,9 @@ class ListPage:
 class Neighbors:
     prev_id: Optional[int]
     next_id: Optional[int]
+    # ``neighbors(prefetch=N)`` — up to N ids following the anchor in
+    # filter+sort order (``next_ids[0] == next_id``); empty otherwise.
+    next_ids: Tuple[int, ...] = ()
 
 
 # ---- SQL-building helpers (T09 internal) ---------------------------------
@@ -1641,6 +2286,85 @@ _IMAGE_SELECT = (
 )
 
 
+# ``list_images(projection=...)``.  ``grid`` is the card-grid subset: the
+# prompt / metadata / tag columns and the per-row folder-label UDF are
+# pruned (selected as NULL/'' so ``_row_to_image_record`` still builds a
+# record — callers must not read pruned fields).
+IMAGE_PROJECTIONS: Tuple[str, ...] = ("full", "grid")
+
+_IMAGE_SELECT_GRID = (
+    "SELECT image.id, '' AS path, NULL AS folder_id, "
+    "'' AS relative_path, image.filename, image.filename_lc, NULL AS ext, "
+    "image.width, image.height, image.file_size, image.mtime_ns, "
+    "image.created_at, NULL AS positive_prompt, NULL AS negative_prompt, "
+    "NULL AS model, NULL AS seed, NULL AS cfg, NULL AS sampler, "
+    "NULL AS scheduler, 0 AS workflow_present, image.favorite, "
+    "NULL AS tags_csv, NULL AS metadata_sync_status, image.version, "
+    "NULL AS folder_kind, NULL AS folder_display_name, "
+    "{folder_line_header} AS folder_line_header "
+    "FROM image LEFT JOIN folder ON folder.id = image.folder_id"
+)
+
+
+# ``open_image_export(fields=...)``: one entry per ``_IMAGE_SELECT`` column
+# as ``(alias, expression, placeholder, ImageRecord field)``.  Columns no
+# requested field needs are selected as their placeholder, like
+# ``_IMAGE_SELECT_GRID``, so an id-only export never reads a prompt.
+_IMAGE_EXPORT_COLUMNS: Tuple[Tuple[str, str, str, Optional[str]], ...] = (
+    ("id", "image.id", "image.id", "id"),
+    ("path", "image.path", "''", "path"),
+    ("folder_id", "image.folder_id", "NULL", "folder_id"),
+    ("relative_path", "image.relative_path", "''", "relative_path"),
+    ("filename", "image.filename", "''", "filename"),
+    ("filename_lc", "image.filename_lc", "NULL", None),
+    ("ext", "image.ext", "NULL", "ext"),
+    ("width", "image.width", "NULL", "width"),
+    ("height", "image.height", "NULL", "height"),
+    ("file_size", "image.file_size", "NULL", "file_size"),
+    ("mtime_ns", "image.mtime_ns", "NULL", "mtime_ns"),
+    ("created_at", "image.created_at", "NULL", "created_at"),
+    ("positive_prompt", "image.positive_prompt", "NULL", "positive_prompt"),
+    ("negative_prompt", "image.negative_prompt", "NULL", "negative_prompt"),
+    ("model", "image.model", "NULL", "model"),
+    ("seed", "image.seed", "NULL", "seed"),
+    ("cfg", "image.cfg", "NULL", "cfg"),
+    ("sampler", "image.sampler", "NULL", "sampler"),
+    ("scheduler", "image.scheduler", "NULL", "scheduler"),
+    ("workflow_present", "image.workflow_present", "0", "has_workflow"),
+    ("favorite", "image.favorite", "NULL", "favorite"),
+    ("tags_csv", "image.tags_csv", "NULL", "tags"),
+    ("metadata_sync_status", "image.metadata_sync_status", "NULL", "sync_status"),
+    ("version", "image.version", "0", "version"),
+    ("folder_kind", "folder.kind", "NULL", "folder_kind"),
+    ("folder_display_name", "folder.display_name", "NULL", "folder_display_name"),
+    ("folder_line_header", _FOLDER_LINE_SORT_SQL, "NULL", None),
+)
+
+
+def _image_select_fields(fields: Iterable[str]) -> str:
+    want = set(fields)
+    known = {c[3] for c in _IMAGE_EXPORT_COLUMNS if c[3] is not None}
+    unknown = sorted(want - known)
+    if unknown:
+        raise ValueError(f"unknown image field(s): {', '.join(unknown)}")
+    cols = ", ".join(
+        f"{expr if field in want else placeholder} AS {alias}"
+        for alias, expr, placeholder, field in _IMAGE_EXPORT_COLUMNS
+    )
+    return f"SELECT {cols} FROM image LEFT JOIN folder ON folder.id = image.folder_id"
+
+
+def _image_select(projection: str, sort_key: str) -> str:
+    if projection == "full":
+        return _IMAGE_SELECT
+    if projection == "grid":
+        # The label is only needed to emit a ``sort=folder`` cursor.
+        return _IMAGE_SELECT_GRID.format(folder_line_header=(
+            _FOLDER_LINE_SORT_SQL if sort_key == "folder" else "NULL"
+        ))
+    raise ValueError(f"unknown projection: {projection!r}")
+
+
 # Maps public sort key → SQL expression for ``ORDER BY`` / cursor predicates.
 # ``name`` / ``time`` / ``size`` hit dedicated indexes; ``folder`` uses the
 # ``xyz_folder_line_header`` UDF (label order, not ``path``).
@@ -1743,14 +2467,115 @@ def _folder_root_and_prefix(
     return root_id, rel + "/"
 
 
+# Link table → (vocab table, vocab key column). Literal map, never built
+# from user input (same audit rule as ``_sort_column``).
+_VOCAB_KEY_COLUMN: Dict[str, str] = {
+    "tag": "name",
+    "prompt_token": "token",
+    "word_token": "token",
+}
+
+
+# Above this many ids the in-memory intersection is not inlined: a bound
+# id list that large is no cheaper than the rarest-first SQL join.
+_POSTINGS_INLINE_MAX: int = 20_000
+
+
+def _vocab_intersect_plan(
+    conn: sqlite3.Connection,
+    terms: List[Tuple[str, str, str, str]],
+    *,
+    db_path: Optional[_PathArg] = None,
+) -> Optional[Tuple[str, List[Any]]]:
+    """AND over tag / prompt / word postings as one rarest-first join.
+
+    ``terms`` are ``(link_table, link_col, vocab_table, value)``.  Token
+    rows are resolved up front: an unknown token means the AND is empty
+    (``None``), otherwise terms are ordered by ``usage_count`` so the
+    rarest posting list drives (``idx_*_token`` / ``idx_image_tag_tag``
+    range scan) and every other term is a point probe on the link
+    table's ``(image_id, token_id)`` primary key.  ``CROSS JOIN`` pins
+    that order for the planner.  The result is a plain ``image.id IN
+    (…)`` predicate, so sorting / cursor paging are unchanged.
+
+    Vocab ids are re-resolved by value inside the SQL rather than bound
+    as integers: the compiled filter is memoised (``_compiled_filter``)
+    and a tag rename/merge must not leave a cached plan pointing at a
+    dead id.  Stale usage counts only cost plan quality, never rows.
+
+    When :mod:`postings` holds a ready index for ``db_path`` the AND is
+    answered from memory and bound as a JSON id list instead; the memo
+    stamp includes ``postings.generation()`` so such plans expire on the
+    next committed vocab change.
+    """
+    seen: set = set()
+    resolved: List[Tuple[int, str, str, str, str]] = []
+    token_keys: List[Tuple[str, int]] = []
+    for link_table, link_col, vocab_table, value in terms:
+        dedupe = (vocab_table, value.lower())
+        if dedupe in seen:
+            continue
+        seen.add(dedupe)
+        key_col = _VOCAB_KEY_COLUMN[vocab_table]
+        row = conn.execute(
+            f"SELECT id, usage_count FROM {vocab_table} "
+            f"WHERE {key_col} = ? COLLATE NOCASE",
+            (value,),
+        ).fetchone()
+        if row is None:
+            return None
+        token_keys.append((vocab_table, int(row[0])))
+        resolved.append(
+            (int(row[1] or 0), link_table, link_col, vocab_table, value))
+    resolved.sort(key=lambda t: t[0])
+
+    if db_path is not None:
+        from . import postings as _postings
+
+        ids = _postings.intersect(
+            db_path=db_path, terms=token_keys, limit=_POSTINGS_INLINE_MAX)
+        if ids is not None:
+            if not ids:
+                return None
+            return (
+                "image.id IN (SELECT value FROM json_each(?))",
+                [json.dumps(ids, separators=(",", ":"))],
+            )
+
+    joins: List[str] = []
+    conds: List[str] = []
+    params: List[Any] = []
+    for i, (_n, link_table, link_col, vocab_table, value) in enumerate(resolved):
+        alias = f"p{i}"
+        key_col = _VOCAB_KEY_COLUMN[vocab_table]
+        joins.append(f"{link_table} {alias}")
+        if i:
+            conds.append(f"{alias}.image_id = p0.image_id")
+        conds.append(
+            f"{alias}.{link_col} = (SELECT id FROM {vocab_table} "
+            f"WHERE {key_col} = ? COLLATE NOCASE)"
+        )
+        params.append(value)
+    sql = (
+        "image.id IN (SELECT p0.image_id FROM "
+        + " CROSS JOIN ".join(joins)
+        + " WHERE " + " AND ".join(conds) + ")"
+    )
+    return sql, params
+
+
 def _build_filter(
-    conn: sqlite3.Connection, flt: FilterSpec
+    conn: sqlite3.Connection,
+    flt: FilterSpec,
+    *,
+    db_path: Optional[_PathArg] = None,
 ) -> Tuple[str, List[Any]]:
     """Return ``(where_sql_without_leading_WHERE, params)``.
 
-    When ``flt`` selects a folder that cannot be resolved the WHERE
-    clause short-circuits to ``1=0`` — this keeps the rest of the
-    pipeline (sorting / cursor) uniform.
+    When ``flt`` selects a folder that cannot be resolved, or ANDs a
+    vocab token that does not exist, the WHERE clause short-circuits to
+    ``1=0`` — this keeps the rest of the pipeline (sorting / cursor)
+    uniform.
     """
     where: List[str] = []
     params: List[Any] = []
@@ -1816,18 +2641,11 @@ def _build_filter(
 
     # T15 ``image_tag`` / ``image_prompt_token`` — AND semantics on
     # normalised vocabulary keys (routes + indexer share ``vocab.*``).
+    vocab_terms: List[Tuple[str, str, str, str]] = []
     for tag in flt.tags_and:
         tok = str(tag).strip()
-        if not tok:
-            continue
-        where.append(
-            "EXISTS ("
-            "SELECT 1 FROM image_tag it "
-            "INNER JOIN tag t ON t.id = it.tag_id "
-            "WHERE it.image_id = image.id AND t.name = ? COLLATE NOCASE"
-            ")"
-        )
-        params.append(tok)
+        if tok:
+            vocab_terms.append(("image_tag", "tag_id", "tag", tok))
 
     if flt.prompt_match_mode == "string":
         for sub in flt.prompt_substrings:
@@ -1844,37 +2662,126 @@ def _build_filter(
     elif flt.prompt_match_mode == "word":
         for w in flt.words_and:
             tok = str(w).strip()
-            if not tok:
-                continue
-            where.append(
-                "EXISTS ("
-                "SELECT 1 FROM image_word_token iwt "
-                "INNER JOIN word_token wt ON wt.id = iwt.token_id "
-                "WHERE iwt.image_id = image.id AND wt.token = ? COLLATE NOCASE"
-                ")"
-            )
-            params.append(tok.lower())
+            if tok:
+                vocab_terms.append(
+                    ("image_word_token", "token_id", "word_token", tok.lower()))
     else:
         for token in flt.prompts_and:
             tok = str(token).strip()
-            if not tok:
-                continue
-            where.append(
-                "EXISTS ("
-                "SELECT 1 FROM image_prompt_token ipt "
-                "INNER JOIN prompt_token pt ON pt.id = ipt.token_id "
-                "WHERE ipt.image_id = image.id AND pt.token = ? COLLATE NOCASE"
-                ")"
-            )
-            params.append(tok)
+            if tok:
+                vocab_terms.append(
+                    ("image_prompt_token", "token_id", "prompt_token", tok))
+
+    if vocab_terms:
+        plan = _vocab_intersect_plan(conn, vocab_terms, db_path=db_path)
+        if plan is None:
+            return "1=0", []
+        where.append(plan[0])
+        params.extend(plan[1])
 
     if not where:
         return "1=1", params
     return " AND ".join(where), params
 
 
+# Compiled ``_build_filter`` output keyed on the frozen ``FilterSpec``.
+# Plain specs are a pure function of the spec; folder selections also
+# depend on the live ``folder`` chain (and vocab ANDs on ``postings``), so
+# they are keyed per DB and stamped with the generation(s) current at
+# compile time. Every op that rewrites ``folder`` rows sets
+# ``invalidates_folder_cache`` and the writer bumps the generation *after*
+# COMMIT — a reader that compiled from the pre-commit snapshot can
+# therefore never store its result under the post-commit generation.
+# Bounded (R7.4): cleared wholesale when full; specs are tiny and the UI
+# cycles through a handful per session.
+_FILTER_SQL_CACHE_MAX: int = 256
+# Plans binding more than this many characters (an inlined postings id
+# list) are not memoised: they are cheap to recompute from memory and
+# would make the cache's footprint unbounded by ``posting_index_max_mb``.
+_FILTER_SQL_CACHE_MAX_PARAM_CHARS: int = 4096
+_filter_sql_cache: Dict[
+    Tuple[str, FilterSpec], Tuple[Tuple[int, int], str, Tuple[Any, ...]]
+] = {}
+_filter_sql_cache_lock = threading.Lock()
+_folder_generation: int = 0
+
+
+def folder_generation() -> int:
+    """Monotonic counter bumped after every committed ``folder`` rewrite."""
+    return _folder_generation
+
+
+def bump_folder_generation() -> int:
+    global _folder_generation
+    with _filter_sql_cache_lock:
+        _folder_generation += 1
+        return _folder_generation
+
+
+def _has_vocab_terms(flt: FilterSpec) -> bool:
+    if flt.tags_and:
+        return True
+    if flt.prompt_match_mode == "word":
+        return bool(flt.words_and)
+    if flt.prompt_match_mode == "prompt":
+        return bool(flt.prompts_and)
+    return False
+
+
+def _compiled_filter(
+    conn: sqlite3.Connection,
+    flt: FilterSpec,
+    *,
+    db_path: Optional[_PathArg] = None,
+) -> Tuple[str, List[Any]]:
+    """Memoised :func:`_build_filter` for hot read paths.
+
+    A hit skips the ``folder.parent_id`` climb entirely. Specs that depend
+    on DB state (folder selection, vocab AND answered by :mod:`postings`)
+    are only cached when ``db_path`` is known and are stamped with the
+    matching generation(s). An empty result (``1=0``) is never cached —
+    ``UpsertImageOp`` may create the folder / token later without
+    touching any generation.
+    """
+    folder_dep = flt.folder_id is not None
+    vocab_dep = _has_vocab_terms(flt)
+    if (folder_dep or vocab_dep) and db_path is None:
+        return _build_filter(conn, flt)
+    key: Tuple[str, FilterSpec] = (
+        str(db_path) if (folder_dep or vocab_dep) else "", flt)
+    stamp = _filter_stamp(folder_dep, vocab_dep)
+    with _filter_sql_cache_lock:
+        hit = _filter_sql_cache.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1], list(hit[2])
+    where_sql, params = _build_filter(conn, flt, db_path=db_path)
+    if where_sql == "1=0":
+        return where_sql, params
+    if sum(len(p) for p in params if isinstance(p, str)) > \
+            _FILTER_SQL_CACHE_MAX_PARAM_CHARS:
+        return where_sql, params
+    with _filter_sql_cache_lock:
+        if len(_filter_sql_cache) >= _FILTER_SQL_CACHE_MAX:
+            _filter_sql_cache.clear()
+        _filter_sql_cache[key] = (stamp, where_sql, tuple(params))
+    return where_sql, list(params)
+
+
+def _filter_stamp(folder_dep: bool, vocab_dep: bool) -> Tuple[int, int]:
+    # Read the generations *before* compiling (see the cache comment).
+    pgen = 0
+    if vocab_dep:
+        from . import postings as _postings
+
+        pgen = _postings.generation()
+    return (_folder_generation if folder_dep else 0, pgen)
+
+
 def _selection_predicate_sql(
-    conn: sqlite3.Connection, sel: SelectionSpec
+    conn: sqlite3.Connection,
+    sel: SelectionSpec,
+    *,
+    db_path: Optional[_PathArg] = None,
 ) -> Tuple[str, List[Any]]:
     """Predicate on ``image`` / ``folder`` join rows for ``WHERE …`` (no leading WHERE)."""
     if sel.mode == "explicit":
@@ -1885,7 +2792,7 @@ def _selection_predicate_sql(
         )
     if sel.mode == "all_except":
         flt = sel.filter or FilterSpec()
-        where_sql, where_params = _build_filter(conn, flt)
+        where_sql, where_params = _compiled_filter(conn, flt, db_path=db_path)
         inner = (
             "SELECT image.id FROM image "
             "LEFT JOIN folder ON folder.id = image.folder_id "
@@ -1904,7 +2811,7 @@ def count_selection(*, db_path: _PathArg, sel: SelectionSpec) -> int:
     """Count images matching ``sel`` (T23 — same rowset as listing, no pagination)."""
     conn = _db.connect_read(db_path)
     try:
-        pred, params = _selection_predicate_sql(conn, sel)
+        pred, params = _selection_predicate_sql(conn, sel, db_path=db_path)
         sql = (
             "SELECT COUNT(*) FROM image "
             "LEFT JOIN folder ON folder.id = image.folder_id "
@@ -1926,7 +2833,7 @@ def list_selection_ids_preview(
         return total, []
     conn = _db.connect_read(db_path)
     try:
-        pred, params = _selection_predicate_sql(conn, sel)
+        pred, params = _selection_predicate_sql(conn, sel, db_path=db_path)
         sql = (
             "SELECT image.id FROM image "
             "LEFT JOIN folder ON folder.id = image.folder_id "
@@ -1944,7 +2851,7 @@ def fetch_selection_id_paths(
     """Return ``(id, path)`` ordered by id — used by bulk write paths (sandbox)."""
     conn = _db.connect_read(db_path)
     try:
-        pred, params = _selection_predicate_sql(conn, sel)
+        pred, params = _selection_predicate_sql(conn, sel, db_path=db_path)
         sql = (
             "SELECT image.id, image.path FROM image "
             "LEFT JOIN folder ON folder.id = image.folder_id "
@@ -1962,7 +2869,7 @@ def fetch_selection_move_sources(
     """Return ``(id, path, file_size, filename)`` for move preflight (T24)."""
     conn = _db.connect_read(db_path)
     try:
-        pred, params = _selection_predicate_sql(conn, sel)
+        pred, params = _selection_predicate_sql(conn, sel, db_path=db_path)
         sql = (
             "SELECT image.id, image.path, image.file_size, image.filename "
             "FROM image "
@@ -1986,27 +2893,6 @@ def fetch_selection_move_sources(
         conn.close()
 
 
-def fetch_selection_id_path_tags_csv(
-    *, db_path: _PathArg, sel: SelectionSpec,
-) -> List[Tuple[int, str, Optional[str]]]:
-    """Return ``(id, path, tags_csv)`` for bulk tag merge (T23)."""
-    conn = _db.connect_read(db_path)
-    try:
-        pred, params = _selection_predicate_sql(conn, sel)
-        sql = (
-            "SELECT image.id, image.path, image.tags_csv FROM image "
-            "LEFT JOIN folder ON folder.id = image.folder_id "
-            f"WHERE {pred} ORDER BY image.id"
-        )
-        rows = conn.execute(sql, params).fetchall()
-        return [
-            (int(r["id"]), str(r["path"]), r["tags_csv"])
-            for r in rows
-        ]
-    finally:
-        conn.close()
-
-
 def _row_to_image_record(row: sqlite3.Row) -> ImageRecord:
     rel_path = str(row["relative_path"])
     rel_dir = rel_path.rsplit("/", 1)[0] if "/" in rel_path else ""
@@ -2156,6 +3042,86 @@ def vocab_lookup(
     )
 
 
+def list_duplicate_groups(
+    *,
+    db_path: _PathArg,
+    limit: int = 50,
+    offset: int = 0,
+    folder_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Byte-identical images grouped by ``content_hash``, most wasted bytes first.
+
+    ``folder_id`` keeps only groups with at least one member in that root /
+    sub-folder tree.  ``hashed`` / ``total`` show how far the lazy hasher
+    has got — groups are only as complete as the hashes behind them.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    offset = max(0, int(offset))
+    conn = _db.connect_read(db_path)
+    try:
+        scope = ""
+        params: List[Any] = []
+        if folder_id is not None:
+            resolved = _folder_root_and_prefix(conn, int(folder_id))
+            if resolved is None:
+                raise KeyError(f"folder id={folder_id} not found")
+            root_id, prefix = resolved
+            scope = (
+                " AND content_hash IN (SELECT content_hash FROM image "
+                "WHERE content_hash IS NOT NULL AND folder_id = ? "
+                "AND relative_path LIKE ?)"
+            )
+            params += [root_id, prefix + "%"]
+        groups_sql = (
+            "SELECT content_hash, COUNT(*) AS n, MAX(file_size) AS sz "
+            "FROM image WHERE content_hash IS NOT NULL" + scope +
+            " GROUP BY content_hash HAVING COUNT(*) > 1"
+        )
+        (n_groups,) = conn.execute(
+            f"SELECT COUNT(*) FROM ({groups_sql})", params).fetchone()
+        groups = conn.execute(
+            groups_sql + " ORDER BY (n - 1) * COALESCE(sz, 0) DESC, content_hash "
+            "LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+        members: Dict[str, List[Dict[str, Any]]] = {}
+        if groups:
+            for r in conn.execute(
+                "SELECT id, content_hash, path, filename, folder_id, file_size, "
+                "created_at, favorite FROM image WHERE content_hash IN "
+                "(SELECT value FROM json_each(?)) "
+                "ORDER BY content_hash, created_at, id",
+                (json.dumps([g["content_hash"] for g in groups]),),
+            ):
+                members.setdefault(r["content_hash"], []).append({
+                    "id": int(r["id"]),
+                    "path": r["path"],
+                    "filename": r["filename"],
+                    "folder_id": r["folder_id"],
+                    "created_at": r["created_at"],
+                    "favorite": bool(r["favorite"]),
+                })
+        hashed, total = conn.execute(
+            "SELECT COUNT(content_hash), COUNT(*) FROM image").fetchone()
+    finally:
+        conn.close()
+    return {
+        "groups": [
+            {
+                "content_hash": g["content_hash"],
+                "count": int(g["n"]),
+                "file_size": g["sz"],
+                "wasted_bytes": (int(g["n"]) - 1) * int(g["sz"] or 0),
+                "images": members.get(g["content_hash"], []),
+            }
+            for g in groups
+        ],
+        "total_groups": int(n_groups),
+        "hashed": int(hashed),
+        "total": int(total),
+    }
+
+
 def list_tags_admin(
     *,
     db_path: _PathArg,
@@ -2276,6 +3242,7 @@ def list_images(
     sort: Optional[SortSpec] = None,
     cursor: Optional[str] = None,
     limit: int = DEFAULT_PAGE_SIZE,
+    projection: str = "full",
 ) -> ListPage:
     """Cursor-paged image listing.
 
@@ -2284,14 +3251,18 @@ def list_images(
     safe — newly-inserted rows whose ``(sort_val, id)`` compare greater
     than the current cursor show up on a future page; rows deleted
     below the cursor are simply skipped (cf. TASKS T09 tests #2/#3).
+
+    ``projection="grid"`` fills only id / filename / dims / size /
+    mtime_ns / created_at / favorite / version (see ``IMAGE_PROJECTIONS``).
     """
     flt = filter or FilterSpec()
     srt = sort or SortSpec()
     limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    select_sql = _image_select(projection, srt.key)
 
     conn = _db.connect_read(db_path)
     try:
-        where_sql, where_params = _build_filter(conn, flt)
+        where_sql, where_params = _compiled_filter(conn, flt, db_path=db_path)
         sort_col = _sort_column(srt.key)
         ascending = (srt.dir == "asc")
         order_sql = (
@@ -2321,7 +3292,7 @@ def list_images(
             ]
 
         sql = (
-            _IMAGE_SELECT
+            select_sql
             + " WHERE " + where_sql
             + cursor_clause
             + order_sql
@@ -2372,12 +3343,18 @@ def _sort_col_key(key: str) -> str:
     }[key]
 
 
+# ``neighbors(prefetch=N)`` clamp: the detail view preloads a few images
+# ahead, never a page's worth.
+NEIGHBORS_MAX_PREFETCH: int = 32
+
+
 def neighbors(
     image_id: int,
     *,
     db_path: _PathArg,
     filter: Optional[FilterSpec] = None,
     sort: Optional[SortSpec] = None,
+    prefetch: int = 0,
 ) -> Neighbors:
     """Return the prev/next id within the given filter+sort ordering.
 
@@ -2386,70 +3363,150 @@ def neighbors(
     front-end's job (SPEC FR-16).  If ``image_id`` does not satisfy the
     filter (or does not exist), both sides are ``None`` — this is the
     same semantic the front-end already handles for first/last cards.
+
+    One statement: a CTE resolves the anchor's sort value *through* the
+    filter (so a non-matching anchor yields NULL and both seeks come back
+    empty), then ``UNION ALL`` of two ``LIMIT`` seeks.  ``prefetch=N``
+    widens the forward seek and returns up to N following ids in
+    ``Neighbors.next_ids`` for detail-view preloading.
     """
     flt = filter or FilterSpec()
     srt = sort or SortSpec()
+    n_ahead = max(0, min(int(prefetch), NEIGHBORS_MAX_PREFETCH))
 
     conn = _db.connect_read(db_path)
     try:
-        # Pull the anchor row's sort value. ``filename_lc`` is not in
-        # ``_IMAGE_SELECT`` (it's only used for sorting), so fetch sort
-        # column directly.
+        where_sql, where_params = _compiled_filter(conn, flt, db_path=db_path)
         sort_col = _sort_column(srt.key)
-        anchor = conn.execute(
-            f"SELECT {sort_col} AS sv, image.id "
-            "FROM image LEFT JOIN folder ON folder.id = image.folder_id "
-            "WHERE image.id = ?",
-            (int(image_id),),
-        ).fetchone()
-        if anchor is None:
-            return Neighbors(prev_id=None, next_id=None)
-        anchor_val = anchor["sv"]
-        if anchor_val is None:
-            anchor_val = _cursor_null_sentinel(srt.key)
-
-        # Confirm the anchor matches the filter; if not, return None/None.
-        where_sql, where_params = _build_filter(conn, flt)
-        in_set = conn.execute(
-            f"SELECT 1 FROM image LEFT JOIN folder ON folder.id = image.folder_id "
-            f"WHERE {where_sql} AND image.id = ? LIMIT 1",
-            list(where_params) + [int(image_id)],
-        ).fetchone()
-        if in_set is None:
-            return Neighbors(prev_id=None, next_id=None)
-
         ascending = (srt.dir == "asc")
         null_default = _cursor_null_sentinel(srt.key)
+        keyed = f"COALESCE({sort_col}, ?)"
 
-        def _one_side(forward: bool) -> Optional[int]:
-            # forward = direction the *user* means "next":
-            #   asc + forward → strictly greater (sort_val, id)
-            #   desc + forward → strictly lesser
-            go_gt = ascending if forward else not ascending
+        def _seek(go_gt: bool) -> str:
+            # Same (sort_val, id) tuple comparison as the list cursor.
             op = ">" if go_gt else "<"
             order_dir = "ASC" if go_gt else "DESC"
-            sql = (
+            return (
                 "SELECT image.id FROM image LEFT JOIN folder "
                 "ON folder.id = image.folder_id "
                 f"WHERE {where_sql} "
-                f"AND (COALESCE({sort_col}, ?) {op} ? "
-                f"OR (COALESCE({sort_col}, ?) = ? AND image.id {op} ?)) "
-                f"ORDER BY COALESCE({sort_col}, ?) {order_dir}, image.id {order_dir} "
-                "LIMIT 1"
+                f"AND ({keyed} {op} (SELECT sv FROM anchor) "
+                f"OR ({keyed} = (SELECT sv FROM anchor) "
+                f"AND image.id {op} ?)) "
+                f"ORDER BY {keyed} {order_dir}, image.id {order_dir} "
+                "LIMIT ?"
             )
-            params = list(where_params) + [
-                null_default, anchor_val,
-                null_default, anchor_val, int(image_id),
-                null_default,
-            ]
-            row = conn.execute(sql, params).fetchone()
-            return int(row["id"]) if row is not None else None
 
-        next_id = _one_side(forward=True)
-        prev_id = _one_side(forward=False)
+        # forward = direction the *user* means "next":
+        #   asc → strictly greater (sort_val, id); desc → strictly lesser.
+        sql = (
+            "WITH anchor AS ("
+            f"SELECT {keyed} AS sv FROM image LEFT JOIN folder "
+            "ON folder.id = image.folder_id "
+            f"WHERE {where_sql} AND image.id = ?) "
+            f"SELECT 1 AS fwd, id FROM ({_seek(ascending)}) "
+            "UNION ALL "
+            f"SELECT 0 AS fwd, id FROM ({_seek(not ascending)})"
+        )
+        side_params = list(where_params) + [
+            null_default, null_default, int(image_id), null_default,
+        ]
+        params: List[Any] = (
+            [null_default] + list(where_params) + [int(image_id)]
+            + side_params + [max(1, n_ahead)]
+            + side_params + [1]
+        )
+        rows = conn.execute(sql, params).fetchall()
     finally:
         conn.close()
-    return Neighbors(prev_id=prev_id, next_id=next_id)
+    ahead = [int(r["id"]) for r in rows if r["fwd"]]
+    behind = [int(r["id"]) for r in rows if not r["fwd"]]
+    return Neighbors(
+        prev_id=behind[0] if behind else None,
+        next_id=ahead[0] if ahead else None,
+        next_ids=tuple(ahead[:n_ahead]),
+    )
+
+
+class ImageExportCursor:
+    """Forward-only server-side cursor over one filter+sort result set.
+
+    Returned by :func:`open_image_export`.  Holds a single read connection
+    and a single ``SELECT`` for its whole lifetime, so rows come from one
+    WAL snapshot with no ``LIMIT``/cursor re-seeks and no ``COUNT``.  Not
+    meant for concurrent fetches (the export route awaits each batch
+    before asking for the next).  Callers must always :meth:`close` — an
+    open cursor pins the snapshot and keeps checkpoints from truncating
+    the WAL.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, cur: sqlite3.Cursor) -> None:
+        self._conn: Optional[sqlite3.Connection] = conn
+        self._cur: Optional[sqlite3.Cursor] = cur
+        # A cancelled request may close while an executor fetch is still
+        # running; the lock orders the two.
+        self._lock = threading.Lock()
+
+    def fetch(self, n: int) -> Tuple[ImageRecord, ...]:
+        """Next ``n`` records; an empty tuple means exhausted (and closed)."""
+        with self._lock:
+            if self._cur is None:
+                return ()
+            rows = self._cur.fetchmany(max(1, int(n)))
+        if not rows:
+            self.close()
+            return ()
+        return tuple(_row_to_image_record(r) for r in rows)
+
+    def close(self) -> None:
+        with self._lock:
+            cur, conn = self._cur, self._conn
+            self._cur = None
+            self._conn = None
+            if cur is not None:
+                try:
+                    cur.close()
+                except sqlite3.Error:
+                    pass
+            if conn is not None:
+                conn.close()
+
+
+def open_image_export(
+    *,
+    db_path: _PathArg,
+    filter: Optional[FilterSpec] = None,
+    sort: Optional[SortSpec] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> ImageExportCursor:
+    """Start a streaming export of every image matching ``filter``.
+
+    Same ordering as :func:`list_images` (``sort_val``, ``id``) but
+    unbounded: the caller pulls batches with
+    :meth:`ImageExportCursor.fetch` and must close the cursor.
+    ``fields`` names the :class:`ImageRecord` fields the caller reads;
+    the rest are not selected (``None`` = all).  Raises ``ValueError``
+    for an unknown field.
+    """
+    flt = filter or FilterSpec()
+    srt = sort or SortSpec()
+    select = _IMAGE_SELECT if fields is None else _image_select_fields(fields)
+    # The connection migrates between executor threads batch by batch;
+    # the cursor object guarantees one user at a time.
+    conn = _db.connect_read(db_path, check_same_thread=False)
+    try:
+        where_sql, where_params = _compiled_filter(conn, flt, db_path=db_path)
+        sort_col = _sort_column(srt.key)
+        order_dir = "ASC" if srt.dir == "asc" else "DESC"
+        cur = conn.execute(
+            select + " WHERE " + where_sql
+            + f" ORDER BY {sort_col} {order_dir}, image.id {order_dir}",
+            where_params,
+        )
+    except BaseException:
+        conn.close()
+        raise
+    return ImageExportCursor(conn, cur)
 
 
 def fetch_folder_row(*, db_path: _PathArg, folder_id: int) -> Optional[Dict[str, Any]]:
@@ -2658,15 +3715,20 @@ class WriteQueue:
 
     def __init__(self, db_path: _PathLike):
         self._db_path: Path = Path(db_path)
-        # Queue entries: ``(priority, seq, op, future_or_none)``.
-        # ``seq`` is monotonic → stable FIFO within the same priority class.
-        self._pq: "queue.PriorityQueue[tuple[int, int, Any, Optional[Future]]]" = (
+        # Queue entries: ``(priority, seq, op, future_or_none, enqueued_at)``.
+        # ``seq`` is monotonic → stable FIFO within the same priority class
+        # (and tuples never compare past it).
+        self._pq: "queue.PriorityQueue[tuple[int, int, Any, Optional[Future], float]]" = (
             queue.PriorityQueue()
         )
         self._seq_counter = itertools.count()
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
         self._thread_lock = threading.Lock()
+        self._last_op_done: float = time.monotonic()
+        # Set while the writer is inside ``_execute_single``: a popped op is
+        # no longer in ``_pq`` but the writer is anything but idle.
+        self._busy_since: Optional[float] = None
 
     # ---- public API ------------------------------------------------------
 
@@ -2677,9 +3739,27 @@ class WriteQueue:
             raise TypeError("op must implement .apply(conn)")
         fut: "Future" = Future()
         seq = next(self._seq_counter)
-        self._pq.put((priority, seq, op, fut))
+        self._pq.put((priority, seq, op, fut, time.perf_counter()))
         return fut
 
+    def depth(self) -> Dict[str, int]:
+        """Waiting ops per priority label (advisory snapshot)."""
+        out = {label: 0 for label in _PRIORITY_LABELS.values()}
+        with self._pq.mutex:
+            for entry in self._pq.queue:
+                if entry[2] is not _STOP_SENTINEL:
+                    out[_PRIORITY_LABELS[entry[0]]] += 1
+        return out
+
+    def idle_seconds(self) -> float:
+        """Seconds since the last op finished; ``0.0`` while any op waits or runs."""
+        if self._busy_since is not None:
+            return 0.0
+        with self._pq.mutex:
+            if any(e[2] is not _STOP_SENTINEL for e in self._pq.queue):
+                return 0.0
+        return max(0.0, time.monotonic() - self._last_op_done)
+
     def start(self) -> None:
         with self._thread_lock:
             if self._thread is not None and self._thread.is_alive():
@@ -2702,7 +3782,7 @@ class WriteQueue:
             # Ensure a blocked get() wakes up even on an empty queue.
             # seq=-1 keeps the sentinel distinct from any real entry
             # (real seqs come from itertools.count() starting at 0).
-            self._pq.put((HIGH, -1, _STOP_SENTINEL, None))
+            self._pq.put((HIGH, -1, _STOP_SENTINEL, None, 0.0))
         t.join(timeout=timeout)
         joined = not t.is_alive()
         if joined:
@@ -2726,11 +3806,12 @@ class WriteQueue:
 
     def _writer_loop(self) -> None:
         conn = _db.connect_write(self._db_path)
+        _install_commit_journal_triggers(conn)
         low_streak = 0
         try:
             while not self._stop_event.is_set():
                 item = self._pq.get(block=True)
-                priority, _seq, op, fut = item
+                priority, _seq, op, fut, enqueued_at = item
 
                 if op is _STOP_SENTINEL:
                     return
@@ -2745,11 +3826,14 @@ class WriteQueue:
                         # the pending HIGH/MID first on the next get().
                         self._pq.put(item)
                         low_streak = 0
+                        _metrics.inc("xyz_gallery_write_low_yields_total")
                         continue
                 else:
                     low_streak = 0
 
-                self._execute_single(conn, op, fut)
+                self._execute_single(
+                    conn, op, fut, priority=priority, enqueued_at=enqueued_at,
+                )
         finally:
             try:
                 conn.close()
@@ -2761,22 +3845,64 @@ class WriteQueue:
         conn: sqlite3.Connection,
         op: Any,
         fut: Optional["Future"],
+        *,
+        priority: int = LOW,
+        enqueued_at: Optional[float] = None,
     ) -> None:
         # db.connect_write() puts sqlite3 in autocommit (isolation_level=None),
         # so BEGIN/COMMIT are explicit. Using BEGIN IMMEDIATE acquires the
         # RESERVED lock up-front — with one writer thread this is equivalent
         # to BEGIN, but it fails fast if the file was locked externally
         # (e.g. migration script mid-flight) rather than surprising op.apply.
+        # Ops with ``autocommit = True`` (checkpoint / VACUUM-style PRAGMAs
+        # that refuse to run inside a transaction) skip the BEGIN/COMMIT.
+        self._busy_since = time.monotonic()
         tx_open = False
+        in_tx = not getattr(op, "autocommit", False)
+        _commit_journal.clear()
+        labels = {
+            "priority": _PRIORITY_LABELS.get(priority, str(priority)),
+            "op": type(op).__name__,
+        }
+        t_start = time.perf_counter()
+        if enqueued_at is not None:
+            _metrics.observe(
+                "xyz_gallery_write_wait_seconds", t_start - enqueued_at, **labels,
+            )
         try:
-            conn.execute("BEGIN IMMEDIATE")
-            tx_open = True
+            if in_tx:
+                conn.execute("BEGIN IMMEDIATE")
+                tx_open = True
             result = op.apply(conn)
-            conn.execute("COMMIT")
-            tx_open = False
+            t_applied = time.perf_counter()
+            if in_tx:
+                conn.execute("COMMIT")
+                tx_open = False
+            t_done = time.perf_counter()
+            _metrics.observe(
+                "xyz_gallery_write_apply_seconds", t_applied - t_start, **labels,
+            )
+            _metrics.observe(
+                "xyz_gallery_write_commit_seconds", t_done - t_applied, **labels,
+            )
+            if t_done - t_start >= _SLOW_OP_LOG_SEC:
+                _metrics.inc("xyz_gallery_write_slow_ops_total", **labels)
+                logger.warning(
+                    "slow write op %s (%s): %.3fs (apply %.3fs, commit %.3fs, "
+                    "queued %.3fs)",
+                    labels["op"], labels["priority"], t_done - t_start,
+                    t_applied - t_start, t_done - t_applied,
+                    t_start - enqueued_at if enqueued_at is not None else 0.0,
+                )
+            if getattr(op, "invalidates_folder_cache", False):
+                # After COMMIT, never before: see ``_compiled_filter``.
+                bump_folder_generation()
+            _dispatch_commit_journal()
             if fut is not None and not fut.done():
                 fut.set_result(result)
         except BaseException as exc:
+            _commit_journal.clear()
+            _metrics.inc("xyz_gallery_write_failures_total", **labels)
             if tx_open:
                 try:
                     conn.execute("ROLLBACK")
@@ -2790,6 +3916,9 @@ class WriteQueue:
             # supervisor handle shutdown semantics.
             if not isinstance(exc, Exception):
                 raise
+        finally:
+            self._last_op_done = time.monotonic()
+            self._busy_since = None
 
     def _has_higher_priority_waiting(self) -> bool:
         # Peek the heap under its own mutex. Advisory — another thread may
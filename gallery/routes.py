@@ -1,6 +1,18 @@
 """HTTP routes for the XYZ Image Gallery (T02 placeholder + T10 read endpoints).
 
-T18 adds ``GET /xyz/gallery/ws`` (WebSocket) — see ``gallery/ws_hub.py``.
+T18 adds ``GET /xyz/gallery/ws`` (WebSocket) — see ``gallery/ws_hub.py``;
+``GET /xyz/gallery/ws/stats`` reports per-tab queue depth and send latency.
+``GET /xyz/gallery/metrics`` exposes ``metrics`` (WriteQueue histograms) as
+JSON or Prometheus text.  A middleware times every ``/xyz/gallery/*``
+handler and ``_run`` times executor wait vs. run; ``GET
+/xyz/gallery/admin/perf`` adds ``db``'s opt-in slow-statement log and
+``GET /xyz/gallery/admin/profile`` samples the gallery threads' stacks.
+``GET|POST /xyz/gallery/admin/maintenance`` lists / triggers SQLite
+maintenance runs (``gallery/maintenance.py``).  ``GET /xyz/gallery/duplicates``
+lists byte-identical images grouped by the lazily filled ``content_hash``
+(``gallery/hasher.py``); ``GET /xyz/gallery/image/{id}/similar`` and
+``POST /xyz/gallery/similar/cluster`` find near-duplicates by perceptual
+hash (``gallery/similar.py``).
 
 T19 adds ``PATCH /xyz/gallery/image/{id}``, ``POST …/resync``, and a
 ``DELETE`` stub — see ``gallery/service.py``.
@@ -9,22 +21,28 @@ T21 adds ``GET /xyz/gallery/vocab/{tags,prompts,models}`` for autocomplete
 and model vocab (``repo.vocab_lookup`` / ``list_models_for_vocab``).
 
 T22 adds ``GET /xyz/gallery/index/status`` for focus reconciliation
-(SPEC §7.8 / §7.9).
+(SPEC §7.8 / §7.9).  While ``gallery.setup``'s background bring-up runs it
+also reports ``startup`` progress, and data endpoints answer ``503
+warming``.
 
 T23 adds ``POST /xyz/gallery/bulk/*`` (favorite / tags / ``resolve_selection``)
 with the SPEC §6.2 ``Selection`` envelope (see ``repo.SelectionSpec``).
 
 T24 adds ``POST /xyz/gallery/bulk/move/preflight|execute`` and
 ``POST /xyz/gallery/image/{id}/move`` — see ``gallery/service.py``.
+Bulk move / delete ``execute`` persist the plan as a ``bulk_jobs`` job and
+answer ``202`` with its ``job_id``; ``GET /xyz/gallery/bulk/jobs/{job_id}``
+reports its state.
 
 T10 scope (TASKS.md T10):
   * SPA shell + static assets (``/xyz/gallery`` + ``/static/*``).
   * Read-only data endpoints backed by ``repo`` read APIs (T09):
       - ``GET /xyz/gallery/folders``
-      - ``GET /xyz/gallery/images`` (+ cursor + filter + sort)
+      - ``GET /xyz/gallery/images`` (+ cursor + filter + sort, ``fields=grid``)
       - ``GET /xyz/gallery/images/count``
+      - ``GET /xyz/gallery/images/export`` (NDJSON / CSV stream, ``fields=``)
       - ``GET /xyz/gallery/image/{id}``
-      - ``GET /xyz/gallery/image/{id}/neighbors``
+      - ``GET /xyz/gallery/image/{id}/neighbors`` (``?prefetch=N``)
   * Binary endpoints:
       - ``GET /xyz/gallery/thumb/{id}``   (delegates to ``thumbs.request``)
       - ``GET /xyz/gallery/raw/{id}`` + ``/raw/{id}/download``  (HTTP Range)
@@ -45,7 +63,9 @@ Boundary notes (ARCHITECTURE §2.1 / AI_RULES R5.5 / R7.1):
 from __future__ import annotations
 
 import asyncio
+import csv
 import errno
+import io
 import json
 import logging
 import time
@@ -56,14 +76,26 @@ from typing import Any, Optional
 
 from aiohttp import web
 
-from . import DATA_DIR, DB_PATH, THUMBS_DIR
+try:  # optional: ~5-10x faster than json.dumps on list pages
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    _orjson = None
+
+from . import DATA_DIR, DB_PATH, THUMBS_DIR, startup_status
+from . import bulk_jobs as _bulk_jobs
+from . import db as _db
 from . import vocab as _vocab
 from . import folders as _folders
+from . import hasher as _hasher
 from . import indexer as _indexer
+from . import maintenance as _maintenance
 from . import metadata as _metadata
+from . import metrics as _metrics
 from . import paths as _paths
+from . import profiler as _profiler
 from . import repo as _repo
 from . import service as _service
+from . import similar as _similar
 from . import thumbs as _thumbs
 from . import ws_hub as _ws_hub
 
@@ -110,6 +142,20 @@ def _error(status: int, code: str, message: str,
     return web.json_response(env, status=status)
 
 
+def _dumps(obj: Any) -> bytes:
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8")
+
+
+def _json_response(body: Any, status: int = 200) -> web.Response:
+    """``web.json_response`` equivalent via :func:`_dumps` (orjson if present)."""
+    return web.Response(
+        body=_dumps(body), status=status, content_type="application/json",
+    )
+
+
 def _iso(ts: Optional[int]) -> Optional[str]:
     if ts is None:
         return None
@@ -161,9 +207,11 @@ def _metadata_positive_prompt_normalized(
     return ", ".join(toks)
 
 
-def _serialize_image(rec: _repo.ImageRecord) -> dict:
+def _serialize_image(rec: _repo.ImageRecord, *, detail: bool = True) -> dict:
+    # ``positive_prompt_normalized`` runs the whole vocab pipeline; only
+    # the detail view shows it, so list pages (``detail=False``) omit it.
     v_suffix = f"?v={rec.mtime_ns}" if rec.mtime_ns is not None else ""
-    return {
+    body = {
         "id": rec.id,
         "path": rec.path,
         "folder": {
@@ -182,9 +230,6 @@ def _serialize_image(rec: _repo.ImageRecord) -> dict:
         "created_at": _iso(rec.created_at),
         "metadata": {
             "positive_prompt": rec.positive_prompt,
-            "positive_prompt_normalized": _metadata_positive_prompt_normalized(
-                rec.positive_prompt
-            ),
             "negative_prompt": rec.negative_prompt,
             "model": rec.model,
             "seed": rec.seed,
@@ -202,6 +247,23 @@ def _serialize_image(rec: _repo.ImageRecord) -> dict:
         "thumb_url": f"/xyz/gallery/thumb/{rec.id}{v_suffix}",
         "raw_url": f"/xyz/gallery/raw/{rec.id}",
     }
+    if detail:
+        body["metadata"]["positive_prompt_normalized"] = (
+            _metadata_positive_prompt_normalized(rec.positive_prompt)
+        )
+    return body
+
+
+def _serialize_image_grid(rec: _repo.ImageRecord) -> dict:
+    """``fields=grid`` card: same key paths as the full shape, fewer keys."""
+    v_suffix = f"?v={rec.mtime_ns}" if rec.mtime_ns is not None else ""
+    return {
+        "id": rec.id,
+        "filename": rec.filename,
+        "size": {"width": rec.width, "height": rec.height},
+        "gallery": {"favorite": rec.favorite, "version": rec.version},
+        "thumb_url": f"/xyz/gallery/thumb/{rec.id}{v_suffix}",
+    }
 
 
 def _serialize_folder(node: _repo.FolderNode) -> dict:
@@ -218,15 +280,79 @@ def _serialize_folder(node: _repo.FolderNode) -> dict:
     }
 
 
+# Flat per-row shape for ``/images/export``: dataset tooling wants one
+# column per field, not the nested SPEC §6.2 card.  Order here is the
+# default column order; ``fields=`` picks a subset (and its own order).
+_EXPORT_FIELDS: dict = {
+    "id": lambda r: r.id,
+    "path": lambda r: r.path,
+    "folder_id": lambda r: r.folder_id,
+    "folder_kind": lambda r: r.folder_kind,
+    "relative_path": lambda r: r.relative_path,
+    "filename": lambda r: r.filename,
+    "ext": lambda r: r.ext,
+    "width": lambda r: r.width,
+    "height": lambda r: r.height,
+    "file_size": lambda r: r.file_size,
+    "mtime_ns": lambda r: r.mtime_ns,
+    "created_at": lambda r: _iso(r.created_at),
+    "positive_prompt": lambda r: r.positive_prompt,
+    "negative_prompt": lambda r: r.negative_prompt,
+    "model": lambda r: r.model,
+    "seed": lambda r: r.seed,
+    "cfg": lambda r: r.cfg,
+    "sampler": lambda r: r.sampler,
+    "scheduler": lambda r: r.scheduler,
+    "has_workflow": lambda r: r.has_workflow,
+    "favorite": lambda r: r.favorite,
+    "tags": lambda r: list(r.tags),
+    "sync_status": lambda r: r.sync_status,
+    "version": lambda r: r.version,
+}
+
+# Rows pulled from the export cursor per executor hop.
+_EXPORT_BATCH = 500
+
+
+def _parse_export_fields(query) -> tuple:
+    raw = query.get("fields")
+    if raw in (None, ""):
+        return tuple(_EXPORT_FIELDS)
+    names = tuple(f.strip() for f in raw.split(",") if f.strip())
+    if not names:
+        raise ValueError("fields must name at least one field")
+    unknown = [f for f in names if f not in _EXPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown export field(s): {', '.join(unknown)}")
+    return names
+
+
+def _export_chunk(records, names: tuple, fmt: str) -> bytes:
+    getters = [_EXPORT_FIELDS[n] for n in names]
+    if fmt == "csv":
+        buf = io.StringIO()
+        w = csv.writer(buf, lineterminator="\n")
+        for rec in records:
+            row = []
+            for g in getters:
+                v = g(rec)
+                if isinstance(v, list):
+                    v = ",".join(v)
+                elif isinstance(v, bool):
+                    v = int(v)
+                row.append("" if v is None else v)
+            w.writerow(row)
+        return buf.getvalue().encode("utf-8")
+    return b"".join(
+        _dumps({n: g(rec) for n, g in zip(names, getters)}) + b"\n"
+        for rec in records
+    )
+
+
 def _prompt_extra_stopwords() -> frozenset:
     """Mirror ``indexer`` / ``gallery_config.json`` prompt_stopwords (T15)."""
     try:
-        cfg = DATA_DIR / "gallery_config.json"
-        if not cfg.is_file():
-            return frozenset()
-        blob = json.loads(cfg.read_text(encoding="utf-8"))
-        arr = blob.get("prompt_stopwords", [])
-        return frozenset(str(x).lower() for x in arr if x)
+        return _folders.prompt_stopwords(DATA_DIR)
     except Exception:
         return frozenset()
 
@@ -454,11 +580,132 @@ def _parse_limit(query) -> int:
     return max(1, min(v, _repo.MAX_PAGE_SIZE))
 
 
+def _parse_fields(query) -> str:
+    raw = (query.get("fields") or "full").strip().lower()
+    if raw not in _repo.IMAGE_PROJECTIONS:
+        raise ValueError(f"invalid fields: {raw!r}")
+    return raw
+
+
+def _parse_prefetch(query) -> int:
+    raw = query.get("prefetch")
+    if raw in (None, ""):
+        return 0
+    try:
+        v = int(raw)
+    except ValueError as exc:
+        raise ValueError(f"invalid prefetch: {raw!r}") from exc
+    return max(0, min(v, _repo.NEIGHBORS_MAX_PREFETCH))
+
+
 async def _run(fn, *args, **kwargs):
     # C-2: non-trivial reads / disk work must not block the event loop.
     # repo's read APIs are sync and open a short-lived connection each.
+    # Executor queue wait and run time are recorded separately: a saturated
+    # default pool shows up as wait, a slow filter as run.
     loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, lambda: fn(*args, **kwargs))
+    label = "{}.{}".format(
+        str(getattr(fn, "__module__", "") or "").rsplit(".", 1)[-1],
+        getattr(fn, "__qualname__", type(fn).__name__),
+    )
+    submitted = time.perf_counter()
+
+    def _call():
+        started = time.perf_counter()
+        _metrics.observe("xyz_gallery_executor_wait_seconds", started - submitted)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _metrics.observe(
+                "xyz_gallery_executor_run_seconds",
+                time.perf_counter() - started, fn=label,
+            )
+
+    return await loop.run_in_executor(None, _call)
+
+
+_metrics.describe(
+    "xyz_gallery_http_request_seconds", "histogram",
+    "Gallery HTTP handler latency by route pattern and method.",
+)
+_metrics.describe(
+    "xyz_gallery_http_errors_total", "counter",
+    "Gallery HTTP responses with a 5xx status.",
+)
+_metrics.describe(
+    "xyz_gallery_executor_wait_seconds", "histogram",
+    "Time a _run call waited for a default-executor thread.",
+)
+_metrics.describe(
+    "xyz_gallery_executor_run_seconds", "histogram",
+    "Time a _run call spent in its sync function.",
+)
+
+
+@web.middleware
+async def _timing_middleware(request: web.Request, handler):
+    """Per-route latency for ``/xyz/gallery/*`` (the WS stream is excluded)."""
+    if not request.path.startswith("/xyz/gallery") or request.path == "/xyz/gallery/ws":
+        return await handler(request)
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        resp = await handler(request)
+        status = resp.status
+        return resp
+    except web.HTTPException as exc:
+        status = exc.status
+        raise
+    finally:
+        route = request.match_info.route.resource
+        labels = {
+            # Pattern, not path: ids must not become label values.
+            "route": route.canonical if route is not None else "unmatched",
+            "method": request.method,
+        }
+        _metrics.observe(
+            "xyz_gallery_http_request_seconds", time.perf_counter() - t0, **labels,
+        )
+        if status >= 500:
+            _metrics.inc("xyz_gallery_http_errors_total", **labels)
+
+
+# Answer while the background bring-up is still running: the SPA shell,
+# the status poll, the WS stream and the observability endpoints.
+_WARMING_ALLOWED = frozenset({
+    "/xyz/gallery",
+    "/xyz/gallery/ws",
+    "/xyz/gallery/index/status",
+    "/xyz/gallery/metrics",
+    "/xyz/gallery/admin/perf",
+    "/xyz/gallery/admin/profile",
+})
+
+
+@web.middleware
+async def _warming_middleware(request: web.Request, handler):
+    """``503 warming`` for data endpoints until ``gallery`` start-up is ready.
+
+    A start-up that failed before ``ready`` answers ``503 startup_failed``
+    instead: retrying will not help until the error is fixed.
+    """
+    path = request.path
+    if (
+        not path.startswith("/xyz/gallery")
+        or path in _WARMING_ALLOWED
+        or path.startswith("/xyz/gallery/static/")
+    ):
+        return await handler(request)
+    status = startup_status()
+    if status["state"] == "failed":
+        return _error(503, "startup_failed",
+                      f"gallery start-up failed: {status['error']}",
+                      details=status)
+    if status["state"] != "warming":
+        return await handler(request)
+    resp = _error(503, "warming", "gallery is starting up", details=status)
+    resp.headers["Retry-After"] = "1"
+    return resp
 
 
 def _current_write_queue():
@@ -780,6 +1027,7 @@ async def _list_images(request: web.Request) -> web.Response:
         flt = _parse_filter(request.query)
         srt = _parse_sort(request.query)
         limit = _parse_limit(request.query)
+        projection = _parse_fields(request.query)
     except ValueError as exc:
         return _error(400, "invalid_query", str(exc))
     cursor = request.query.get("cursor") or None
@@ -787,15 +1035,19 @@ async def _list_images(request: web.Request) -> web.Response:
         page = await _run(
             _repo.list_images,
             db_path=DB_PATH, filter=flt, sort=srt,
-            cursor=cursor, limit=limit,
+            cursor=cursor, limit=limit, projection=projection,
         )
     except ValueError as exc:
         return _error(400, "invalid_cursor", str(exc))
     except Exception as exc:
         logger.exception("list_images failed")
         return _error(500, "internal", str(exc))
-    return web.json_response({
-        "items": [_serialize_image(r) for r in page.items],
+    if projection == "grid":
+        items = [_serialize_image_grid(r) for r in page.items]
+    else:
+        items = [_serialize_image(r, detail=False) for r in page.items]
+    return _json_response({
+        "items": items,
         "next_cursor": page.next_cursor,
         "total_estimate": page.total,
         "total_approximate": page.total_approximate,
@@ -823,23 +1075,80 @@ async def _images_count(request: web.Request) -> web.Response:
     )
 
 
+async def _export_images(request: web.Request) -> web.StreamResponse:
+    """Stream every filter match as NDJSON (default) or CSV.
+
+    One server-side cursor (``repo.open_image_export``) feeds
+    ``_EXPORT_BATCH``-row chunks; ``await resp.write`` drains the
+    transport before the next batch is fetched, so memory stays flat
+    however slow the client is.  No total is computed.
+    """
+    try:
+        flt = _parse_filter(request.query)
+        srt = _parse_sort(request.query)
+        names = _parse_export_fields(request.query)
+        fmt = (request.query.get("format") or "ndjson").strip().lower()
+        if fmt not in ("ndjson", "csv"):
+            raise ValueError(f"invalid format: {fmt!r}")
+    except ValueError as exc:
+        return _error(400, "invalid_query", str(exc))
+    try:
+        cur = await _run(
+            _repo.open_image_export, db_path=DB_PATH, filter=flt, sort=srt,
+            fields=names,
+        )
+    except Exception as exc:
+        logger.exception("export open failed")
+        return _error(500, "internal", str(exc))
+
+    resp = web.StreamResponse(headers={
+        "Content-Type": (
+            "text/csv; charset=utf-8" if fmt == "csv"
+            else "application/x-ndjson; charset=utf-8"
+        ),
+        "Content-Disposition": f'attachment; filename="xyz_gallery.{fmt}"',
+        "Cache-Control": "no-store",
+    })
+    try:
+        await resp.prepare(request)
+        if fmt == "csv":
+            head = io.StringIO()
+            csv.writer(head, lineterminator="\n").writerow(names)
+            await resp.write(head.getvalue().encode("utf-8"))
+        while True:
+            batch = await _run(cur.fetch, _EXPORT_BATCH)
+            if not batch:
+                break
+            await resp.write(_export_chunk(batch, names, fmt))
+    except (ConnectionResetError, asyncio.CancelledError):
+        # Client went away mid-stream; nothing left to tell it.
+        logger.info("export aborted by client")
+        raise
+    finally:
+        await _run(cur.close)
+    await resp.write_eof()
+    return resp
+
+
 def _read_index_status() -> dict:
-    page = _repo.list_images(
-        db_path=DB_PATH,
-        filter=_repo.FilterSpec(),
-        sort=_repo.SortSpec(),
-        cursor=None,
-        limit=1,
-    )
+    startup = startup_status()
+    totals: dict = {"images": None, "approximate": True}
+    if startup["state"] not in ("warming", "failed"):
+        page = _repo.list_images(
+            db_path=DB_PATH,
+            filter=_repo.FilterSpec(),
+            sort=_repo.SortSpec(),
+            cursor=None,
+            limit=1,
+        )
+        totals = {"images": page.total, "approximate": page.total_approximate}
     return {
         "scanning": _indexer.is_cold_scanning(),
         "pending_events": 0,
         "last_full_scan_at": None,
-        "totals": {
-            "images": page.total,
-            "approximate": page.total_approximate,
-        },
+        "totals": totals,
         "last_event_ts": _ws_hub.get_last_event_ts(),
+        "startup": startup,
     }
 
 
@@ -979,7 +1288,7 @@ async def _get_image(request: web.Request) -> web.Response:
         return _error(500, "internal", str(exc))
     if rec is None:
         return _error(404, "not_found", f"image {image_id} not found")
-    return web.json_response(_serialize_image(rec))
+    return _json_response(_serialize_image(rec))
 
 
 async def _image_neighbors(request: web.Request) -> web.Response:
@@ -987,17 +1296,21 @@ async def _image_neighbors(request: web.Request) -> web.Response:
     try:
         flt = _parse_filter(request.query)
         srt = _parse_sort(request.query)
+        prefetch = _parse_prefetch(request.query)
     except ValueError as exc:
         return _error(400, "invalid_query", str(exc))
     try:
         nb = await _run(
             _repo.neighbors, image_id,
-            db_path=DB_PATH, filter=flt, sort=srt,
+            db_path=DB_PATH, filter=flt, sort=srt, prefetch=prefetch,
         )
     except Exception as exc:
         logger.exception("neighbors failed")
         return _error(500, "internal", str(exc))
-    return web.json_response({"prev_id": nb.prev_id, "next_id": nb.next_id})
+    body: dict = {"prev_id": nb.prev_id, "next_id": nb.next_id}
+    if prefetch:
+        body["next_ids"] = list(nb.next_ids)
+    return web.json_response(body)
 
 
 async def _get_thumb(request: web.Request) -> web.StreamResponse:
@@ -1265,13 +1578,16 @@ async def _ws_handler(request: web.Request) -> web.WebSocketResponse:
 
     ws = web.WebSocketResponse()
     await ws.prepare(request)
-    await _ws_hub.add_client(ws)
+    label = f"{_client_actor(request)}@{request.remote or '?'}"
+    await _ws_hub.add_client(ws, label=label)
     try:
         async for msg in ws:
             if msg.type == web.WSMsgType.TEXT:
                 raw = msg.data.strip()
+                # Replies ride the tab's outbound queue so they never
+                # interleave with the hub's writer task.
                 if raw.lower() == "ping":
-                    await ws.send_str(_ws_pong_envelope())
+                    _ws_hub.send_to(ws, _ws_pong_envelope())
                     continue
                 if raw.startswith("{"):
                     try:
@@ -1279,7 +1595,7 @@ async def _ws_handler(request: web.Request) -> web.WebSocketResponse:
                     except json.JSONDecodeError:
                         continue
                     if isinstance(obj, dict) and obj.get("type") == "ping":
-                        await ws.send_str(_ws_pong_envelope())
+                        _ws_hub.send_to(ws, _ws_pong_envelope())
             elif msg.type in (
                 web.WSMsgType.CLOSE,
                 web.WSMsgType.CLOSING,
@@ -1291,6 +1607,205 @@ async def _ws_handler(request: web.Request) -> web.WebSocketResponse:
     return ws
 
 
+async def _get_ws_stats(_request: web.Request) -> web.Response:
+    """Per-tab outbound queue depth, drops and send latency."""
+    return web.json_response({
+        "clients": _ws_hub.client_stats(),
+        "queue_max": _ws_hub.CLIENT_QUEUE_MAX,
+    })
+
+
+async def _get_metrics(request: web.Request) -> web.Response:
+    """WriteQueue wait / apply / commit histograms and counters.
+
+    JSON by default; Prometheus text for ``?format=prometheus`` or an
+    ``Accept: text/plain`` scraper.
+    """
+    wq = _current_write_queue()
+    if wq is not None:
+        for label, n in wq.depth().items():
+            _metrics.set_gauge(
+                "xyz_gallery_write_queue_depth", n, priority=label,
+            )
+    fmt = request.query.get("format", "").lower()
+    if not fmt and "text/plain" in request.headers.get("Accept", ""):
+        fmt = "prometheus"
+    if fmt == "prometheus":
+        return web.Response(
+            body=_metrics.render_prometheus().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+    if fmt not in ("", "json"):
+        return _error(400, "invalid_query", f"unknown format {fmt!r}")
+    return _json_response(_metrics.snapshot())
+
+
+async def _get_admin_perf(_request: web.Request) -> web.Response:
+    """Route / executor latency aggregates + the recent slow-statement log."""
+    snap = _metrics.snapshot(prefix=("xyz_gallery_http_", "xyz_gallery_executor_"))
+    return _json_response({
+        **snap,
+        "slow_query_ms": _db.slow_query_ms(),
+        "slow_queries": _db.slow_queries(),
+    })
+
+
+async def _get_admin_profile(request: web.Request) -> web.Response:
+    """Sample the ``xyz-gallery-*`` threads for ``seconds`` at ``hz``.
+
+    JSON (per-thread sample counts + folded stacks) by default;
+    ``?format=collapsed`` returns flamegraph-ready text.  ``thread=``
+    narrows the collapsed output to one thread name.
+    """
+    try:
+        seconds = float(request.query.get("seconds", _profiler.DEFAULT_DURATION_SEC))
+        hz = float(request.query.get("hz", 100))
+    except ValueError:
+        return _error(400, "invalid_query", "seconds and hz must be numbers")
+    if not 0 < seconds <= _profiler.MAX_DURATION_SEC:
+        return _error(400, "invalid_query",
+                      f"seconds must be in (0, {_profiler.MAX_DURATION_SEC:g}]")
+    if not 0 < hz <= 1000:
+        return _error(400, "invalid_query", "hz must be in (0, 1000]")
+    fmt = (request.query.get("format") or "json").strip().lower()
+    if fmt not in ("json", "collapsed"):
+        return _error(400, "invalid_query", f"unknown format {fmt!r}")
+    with_lines = request.query.get("lines", "0").lower() in ("1", "true", "yes")
+    try:
+        out = await _run(_profiler.sample, seconds, 1.0 / hz,
+                         with_lines=with_lines)
+    except _profiler.ProfilerBusy as exc:
+        return _error(409, "conflict", str(exc))
+    thread = request.query.get("thread") or None
+    if fmt == "collapsed":
+        return web.Response(
+            text=_profiler.render_collapsed(out, thread=thread),
+            content_type="text/plain",
+        )
+    return _json_response(out)
+
+
+async def _get_admin_maintenance(_request: web.Request) -> web.Response:
+    """Recent maintenance run reports (newest last)."""
+    return _json_response({"runs": _maintenance.history()})
+
+
+async def _post_admin_maintenance(request: web.Request) -> web.Response:
+    """Run maintenance now; body ``{"tasks": [...]}`` (default / empty: all)."""
+    body: Any = {}
+    if request.can_read_body:
+        try:
+            body = await request.json()
+        except json.JSONDecodeError as exc:
+            return _error(400, "invalid_body", f"invalid JSON: {exc}")
+    if not isinstance(body, dict):
+        return _error(400, "invalid_body", "body must be a JSON object")
+    tasks = body.get("tasks") or list(_maintenance.TASKS)
+    if not isinstance(tasks, list) or not all(isinstance(t, str) for t in tasks):
+        return _error(400, "invalid_body", "tasks must be a list of strings")
+    wq = _current_write_queue()
+    if wq is None:
+        return _error(503, "not_ready", "gallery write queue not started")
+    try:
+        report = await _run(_maintenance.run_now, tasks, write_queue=wq)
+    except ValueError as exc:
+        return _error(400, "invalid_body", str(exc))
+    except Exception as exc:
+        logger.exception("maintenance run failed")
+        return _error(500, "internal", str(exc))
+    return _json_response(report)
+
+
+async def _get_duplicates(request: web.Request) -> web.Response:
+    """Byte-identical image groups; ``?limit&offset&folder_id`` + hasher status."""
+    q = request.query
+    try:
+        limit = int(q.get("limit") or 50)
+        offset = int(q.get("offset") or 0)
+        folder_id = int(q["folder_id"]) if q.get("folder_id") else None
+    except ValueError:
+        return _error(400, "invalid_query",
+                      "limit, offset and folder_id must be integers")
+    try:
+        body = await _run(
+            _repo.list_duplicate_groups,
+            db_path=DB_PATH, limit=limit, offset=offset, folder_id=folder_id,
+        )
+    except KeyError as exc:
+        return _error(404, "not_found", str(exc))
+    except Exception as exc:
+        logger.exception("list_duplicate_groups failed")
+        return _error(500, "internal", str(exc))
+    body["hasher"] = _hasher.status()
+    return _json_response(body)
+
+
+async def _get_image_similar(request: web.Request) -> web.Response:
+    """Near-duplicates of one image by perceptual hash; ``?distance&limit``."""
+    image_id = int(request.match_info["id"])
+    try:
+        distance = int(request.query.get("distance") or _similar.DEFAULT_DISTANCE)
+        limit = int(request.query.get("limit") or 50)
+    except ValueError:
+        return _error(400, "invalid_query", "distance and limit must be integers")
+    wq = _current_write_queue()
+    if wq is None:
+        return _error(503, "not_ready", "gallery write queue not started")
+    try:
+        body = await _run(
+            _similar.find_similar, image_id,
+            db_path=DB_PATH, thumbs_dir=THUMBS_DIR, write_queue=wq,
+            distance=distance, limit=limit,
+        )
+    except KeyError as exc:
+        return _error(404, "not_found", str(exc))
+    except ValueError as exc:
+        return _error(400, "invalid_query", str(exc))
+    except Exception as exc:
+        logger.exception("find_similar failed")
+        return _error(500, "internal", str(exc))
+    return _json_response(body)
+
+
+async def _post_similar_cluster(request: web.Request) -> web.Response:
+    """Start the near-duplicate cluster job; body ``{"distance", "backfill"}``."""
+    body: Any = {}
+    if request.can_read_body:
+        try:
+            body = await request.json()
+        except json.JSONDecodeError as exc:
+            return _error(400, "invalid_body", f"invalid JSON: {exc}")
+    if not isinstance(body, dict):
+        return _error(400, "invalid_body", "body must be a JSON object")
+    distance = body.get("distance", _similar.DEFAULT_DISTANCE)
+    backfill = body.get("backfill", True)
+    if not isinstance(distance, int) or isinstance(distance, bool):
+        return _error(400, "invalid_body", "distance must be an integer")
+    if not isinstance(backfill, bool):
+        return _error(400, "invalid_body", "backfill must be a boolean")
+    wq = _current_write_queue()
+    if wq is None:
+        return _error(503, "not_ready", "gallery write queue not started")
+    try:
+        jid = _similar.start_cluster_job(
+            db_path=DB_PATH, thumbs_dir=THUMBS_DIR, write_queue=wq,
+            distance=distance, backfill=backfill,
+        )
+    except ValueError as exc:
+        return _error(400, "invalid_body", str(exc))
+    except _similar.ClusterBusy as exc:
+        return _error(409, "conflict", str(exc))
+    return web.json_response({"job_id": jid}, status=202)
+
+
+async def _get_similar_clusters(_request: web.Request) -> web.Response:
+    """Latest finished cluster job result (``null`` before the first run)."""
+    return _json_response({
+        "result": _similar.last_clusters(),
+        "index": _similar.stats(),
+    })
+
+
 async def _get_workflow(request: web.Request) -> web.Response:
     image_id = int(request.match_info["id"])
     try:
@@ -1531,7 +2046,7 @@ async def _post_bulk_move_execute(request: web.Request) -> web.Response:
     actor = _client_actor(request)
     try:
         out = await _run(
-            _service.execute_move,
+            _service.submit_move,
             str(pid).strip(), ro, db_path=DB_PATH, actor=actor,
         )
     except _service.PreflightMoveError as exc:
@@ -1546,7 +2061,7 @@ async def _post_bulk_move_execute(request: web.Request) -> web.Response:
     except Exception as exc:
         logger.exception("execute_move failed")
         return _error(500, "internal", str(exc))
-    return web.json_response(out)
+    return web.json_response(out, status=202)
 
 
 async def _post_image_move(request: web.Request) -> web.Response:
@@ -1672,7 +2187,7 @@ async def _post_bulk_delete_execute(request: web.Request) -> web.Response:
     actor = _client_actor(request)
     try:
         out = await _run(
-            _service.execute_delete,
+            _service.submit_delete,
             str(pid).strip(),
             db_path=DB_PATH,
             actor=actor,
@@ -1689,6 +2204,18 @@ async def _post_bulk_delete_execute(request: web.Request) -> web.Response:
     except Exception as exc:
         logger.exception("execute_delete failed")
         return _error(500, "internal", str(exc))
+    return web.json_response(out, status=202)
+
+
+async def _get_bulk_job(request: web.Request) -> web.Response:
+    job_id = request.match_info["job_id"]
+    try:
+        out = await _run(_bulk_jobs.get_job, db_path=DB_PATH, job_id=job_id)
+    except Exception as exc:
+        logger.exception("bulk job lookup failed")
+        return _error(500, "internal", str(exc))
+    if out is None:
+        return _error(404, "not_found", f"bulk job {job_id} not found")
     return web.json_response(out)
 
 
@@ -1705,6 +2232,16 @@ def register(server) -> None:
     if _registered:
         return
     routes = server.routes
+    app = getattr(server, "app", None)
+    if app is not None:
+        for mw in (_timing_middleware, _warming_middleware):
+            if mw in app.middlewares:
+                continue
+            try:
+                app.middlewares.append(mw)
+            except RuntimeError:  # frozen: the app is already running
+                logger.warning("gallery middleware %s not installed (app frozen)",
+                               mw.__name__)
 
     routes.get("/xyz/gallery")(_serve_spa)
     routes.get(r"/xyz/gallery/static/{tail:.*}")(_serve_static)
@@ -1727,6 +2264,7 @@ def register(server) -> None:
     routes.get("/xyz/gallery/jobs/active")(_get_jobs_active)
     routes.get("/xyz/gallery/images")(_list_images)
     routes.get("/xyz/gallery/images/count")(_images_count)
+    routes.get("/xyz/gallery/images/export")(_export_images)
     routes.get(r"/xyz/gallery/image/{id:\d+}")(_get_image)
     routes.get(r"/xyz/gallery/image/{id:\d+}/neighbors")(_image_neighbors)
     routes.get(r"/xyz/gallery/image/{id:\d+}/workflow.json")(_get_workflow)
@@ -1743,6 +2281,16 @@ def register(server) -> None:
     routes.post("/xyz/gallery/admin/tags/purge_zero")(_post_admin_tags_purge_zero)
     routes.post("/xyz/gallery/admin/tags/rename")(_post_admin_tags_rename)
     routes.get("/xyz/gallery/ws")(_ws_handler)
+    routes.get("/xyz/gallery/ws/stats")(_get_ws_stats)
+    routes.get("/xyz/gallery/metrics")(_get_metrics)
+    routes.get("/xyz/gallery/admin/perf")(_get_admin_perf)
+    routes.get("/xyz/gallery/admin/profile")(_get_admin_profile)
+    routes.get("/xyz/gallery/admin/maintenance")(_get_admin_maintenance)
+    routes.post("/xyz/gallery/admin/maintenance")(_post_admin_maintenance)
+    routes.get("/xyz/gallery/duplicates")(_get_duplicates)
+    routes.get(r"/xyz/gallery/image/{id:\d+}/similar")(_get_image_similar)
+    routes.post("/xyz/gallery/similar/cluster")(_post_similar_cluster)
+    routes.get("/xyz/gallery/similar/clusters")(_get_similar_clusters)
     routes.post("/xyz/gallery/bulk/resolve_selection")(_post_bulk_resolve_selection)
     routes.post("/xyz/gallery/bulk/favorite")(_post_bulk_favorite)
     routes.post("/xyz/gallery/bulk/tags")(_post_bulk_tags)
@@ -1750,6 +2298,7 @@ def register(server) -> None:
     routes.post("/xyz/gallery/bulk/move/execute")(_post_bulk_move_execute)
     routes.post("/xyz/gallery/bulk/delete/preflight")(_post_bulk_delete_preflight)
     routes.post("/xyz/gallery/bulk/delete/execute")(_post_bulk_delete_execute)
+    routes.get("/xyz/gallery/bulk/jobs/{job_id}")(_get_bulk_job)
     routes.post(r"/xyz/gallery/image/{id:\d+}/move")(_post_image_move)
 
     _registered = True
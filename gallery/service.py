@@ -15,11 +15,13 @@ import subprocess
 import threading
 import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
 
 from . import audit as _audit
+from . import bulk_jobs as _bulk_jobs
 from . import db as _db
 from . import folders as _folders
 from . import metadata_sync as _metadata_sync
@@ -32,12 +34,23 @@ logger = logging.getLogger("xyz.gallery.service")
 
 BULK_HIGH_IF_TOTAL_LEQ: int = 64
 
+# Per-image WS events collected by a bulk loop go out every this many rows
+# (``ws_hub.broadcast_many`` → ``image.*.batch`` for anything non-trivial).
+_WS_EVENT_BATCH_ROWS: int = 200
+
+
+def _bulk_key(d: dict) -> str:
+    return str(d.get("bulk_id") or d.get("plan_id") or "")
+
 
 def _emit_bulk_progress(d: dict) -> None:
     from . import job_registry as _jr
 
     out = _jr.sync_bulk_payload(d)
-    _ws_hub.broadcast(_ws_hub.BULK_PROGRESS, out)
+    # Registry state stays exact; the wire is throttled per bulk id.
+    _ws_hub.broadcast_coalesced(
+        _ws_hub.BULK_PROGRESS, out, key=_bulk_key(out),
+    )
 
 
 def _emit_bulk_completed(d: dict) -> None:
@@ -47,22 +60,52 @@ def _emit_bulk_completed(d: dict) -> None:
     bid = out.get("bulk_id") or out.get("plan_id")
     if bid is not None and "job_id" not in out:
         out["job_id"] = str(bid)
+    _ws_hub.flush_coalesced(_bulk_key(out))
     _ws_hub.broadcast(_ws_hub.BULK_COMPLETED, out)
     _jr.finish_bulk(out)
 
+
+class _ImageEventBatch:
+    """Per-image WS payloads from one bulk loop, sent in chunks.
+
+    Small runs keep the one-envelope-per-image contract (see
+    ``ws_hub.broadcast_many``); call :meth:`flush` before the terminal
+    ``bulk.completed`` so clients see every row change first.
+    """
+
+    def __init__(self, event_type: str,
+                 every: int = _WS_EVENT_BATCH_ROWS) -> None:
+        self._type = event_type
+        self._every = max(1, int(every))
+        self._rows: List[dict] = []
+
+    def add(self, data: dict) -> None:
+        self._rows.append(data)
+        if len(self._rows) >= self._every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._rows:
+            rows, self._rows = self._rows, []
+            _ws_hub.broadcast_many(self._type, rows)
+
 __all__ = [
     "update_image",
     "resync_image",
     "broadcast_image_upserted",
     "broadcast_image_deleted",
+    "broadcast_images_upserted",
+    "broadcast_images_deleted",
     "broadcast_index_overflow",
     "bulk_set_favorite",
     "bulk_edit_tags",
     "preflight_move",
     "execute_move",
+    "submit_move",
     "move_single_image",
     "preflight_delete",
     "execute_delete",
+    "submit_delete",
     "delete_single_image",
     "PreflightMoveError",
     "folder_register_custom_root",
@@ -82,6 +125,25 @@ __all__ = [
 ]
 
 _PLAN_TTL_SEC = 300.0
+# Bulk move engine: rows per path-update op, same-device rename threads and
+# (disk-bound) cross-device copy threads.
+_MOVE_CHUNK_ROWS = 256
+# Rows whose file moved but whose path update and move-back both failed
+# are retried this many times, backing off from this delay (doubling).
+_STRANDED_RETRIES = 4
+_STRANDED_RETRY_BASE_SEC = 2.0
+_MOVE_WORKERS = 4
+_CROSS_DEVICE_WORKERS = 2
+_COPY_CHUNK_BYTES = 8 * 1024 * 1024
+# Bulk delete: rows per set-wise DB purge (and per WS batch), unlink threads.
+_DELETE_CHUNK_ROWS = 500
+_UNLINK_WORKERS = 8
+_COPY_UNSUPPORTED_ERRNOS = frozenset(
+    e for e in (
+        errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF,
+        getattr(errno, "EOPNOTSUPP", None), getattr(errno, "ENOTSUP", None),
+    ) if e is not None
+)
 _plan_lock = threading.Lock()
 _plans: Dict[str, "_MovePlanRecord"] = {}
 _delete_plans: Dict[str, "_DeletePlanRecord"] = {}
@@ -227,7 +289,7 @@ def _physical_move(src: str, dst: str) -> None:
     except OSError as exc:
         if not _is_cross_device(exc):
             raise
-        shutil.copy2(src, dst)
+        _copy_across_devices(src, dst)
         if Path(src).stat().st_size != Path(dst).stat().st_size:
             try:
                 os.unlink(dst)
@@ -237,6 +299,45 @@ def _physical_move(src: str, dst: str) -> None:
         os.unlink(src)
 
 
+def _copy_fd_range(fd_in: int, fd_out: int, size: int) -> None:
+    """Kernel-side copy (``copy_file_range`` → ``sendfile``) with a Python fallback."""
+    done = 0
+    for name in ("copy_file_range", "sendfile"):
+        fn = getattr(os, name, None)
+        if fn is None:
+            continue
+        try:
+            while done < size:
+                if name == "copy_file_range":
+                    n = fn(fd_in, fd_out, min(_COPY_CHUNK_BYTES, size - done))
+                else:
+                    n = fn(fd_out, fd_in, done, min(_COPY_CHUNK_BYTES, size - done))
+                if n == 0:
+                    break
+                done += n
+            if done >= size:
+                return
+        except OSError as exc:
+            # Unsupported for this pair of filesystems: try the next method
+            # from wherever the last one stopped.
+            if exc.errno not in _COPY_UNSUPPORTED_ERRNOS:
+                raise
+        os.lseek(fd_in, done, os.SEEK_SET)
+        os.lseek(fd_out, done, os.SEEK_SET)
+    while done < size:
+        buf = os.read(fd_in, min(_COPY_CHUNK_BYTES, size - done))
+        if not buf:
+            break
+        os.write(fd_out, buf)
+        done += len(buf)
+
+
+def _copy_across_devices(src: str, dst: str) -> None:
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        _copy_fd_range(fin.fileno(), fout.fileno(), os.fstat(fin.fileno()).st_size)
+    shutil.copystat(src, dst)
+
+
 def _is_cross_device(exc: OSError) -> bool:
     if exc.errno == errno.EXDEV:
         return True
@@ -428,13 +529,14 @@ def _re_check_plan_disk(plan: _MovePlanRecord) -> None:
                 )
 
 
-def execute_move(
+def _prepare_move_job(
     plan_id: str,
     rename_overrides: Optional[Mapping[str, Any]],
     *,
     db_path: Path,
-    actor: str = "unknown",
-) -> dict:
+    actor: str,
+) -> int:
+    """Validate a preflighted plan and persist it as a ``bulk_jobs`` job."""
     raw = _store_pop(plan_id)
     if raw is None:
         raise PreflightMoveError("not_found", "unknown or expired plan_id")
@@ -451,85 +553,298 @@ def execute_move(
 
     _re_check_plan_disk(plan)
 
-    wq = _write_queue_handle()
-    total = len(plan.mappings)
-    ok_count = 0
-    failed: List[dict] = []
+    _bulk_jobs.create(
+        job_id=plan_id,
+        kind="move",
+        actor=actor,
+        params={
+            "target_folder_id": plan.target_folder_id,
+            "total_bytes": plan.total_bytes,
+        },
+        rows=[
+            _bulk_jobs.JobRow(seq=i, image_id=m.image_id, src=m.src, dst=m.dst)
+            for i, m in enumerate(plan.mappings)
+        ],
+        write_queue=_write_queue_handle(),
+    )
+    return len(plan.mappings)
+
+
+def execute_move(
+    plan_id: str,
+    rename_overrides: Optional[Mapping[str, Any]],
+    *,
+    db_path: Path,
+    actor: str = "unknown",
+) -> dict:
+    """Run a preflighted move plan to completion on the calling thread."""
+    _prepare_move_job(plan_id, rename_overrides, db_path=db_path, actor=actor)
+    return _bulk_jobs.run_inline(
+        plan_id, db_path=db_path, write_queue=_write_queue_handle(),
+    )
+
+
+def submit_move(
+    plan_id: str,
+    rename_overrides: Optional[Mapping[str, Any]],
+    *,
+    db_path: Path,
+    actor: str = "unknown",
+) -> dict:
+    """Persist a preflighted move plan and queue it on the bulk job runner."""
+    if not _bulk_jobs.is_running():
+        raise RuntimeError("bulk job runner is not started")
+    total = _prepare_move_job(
+        plan_id, rename_overrides, db_path=db_path, actor=actor,
+    )
+    _bulk_jobs.submit(plan_id, kind="move", total=total)
+    return {"job_id": plan_id, "plan_id": plan_id, "status": "queued", "total": total}
+
+
+def _move_one_file(
+    row: _bulk_jobs.JobRow,
+    roots: List[Mapping[str, Any]],
+    root_paths: List[str],
+) -> Optional[_repo.UpdateImagePathOp]:
+    """Disk half of one bulk-move row; ``None`` when src already is dst."""
+    dst = str(row.dst)
+    _paths.assert_inside_root(row.src, root_paths)
+    _paths.assert_inside_root(dst, root_paths)
+    if Path(row.src).resolve(strict=False) == Path(dst).resolve(strict=False):
+        return None
+    # Resumed job: the file may already be in place from the run that was
+    # interrupted before its checkpoint.
+    if os.path.exists(row.src) or not os.path.exists(dst):
+        _physical_move(row.src, dst)
+    (
+        folder_id,
+        path_posix,
+        rel,
+        filename,
+        filename_lc,
+        ext,
+        mtime_ns,
+        file_size,
+    ) = _fields_for_moved_file(dst, roots)
+    return _repo.UpdateImagePathOp(
+        image_id=row.image_id,
+        path=path_posix,
+        folder_id=folder_id,
+        relative_path=rel,
+        filename=filename,
+        filename_lc=filename_lc,
+        ext=ext,
+        file_size=file_size,
+        mtime_ns=mtime_ns,
+        # Pure filesystem move: file bytes (incl. xyz_gallery.*) unchanged;
+        # DB tags/favorite unchanged — skip PNG metadata_sync storm (T24).
+        refresh_sync=False,
+    )
+
+
+def _device_of(dir_path: Path, cache: Dict[Path, Optional[int]]) -> Optional[int]:
+    # Walk up to the nearest existing directory: a target subfolder may not
+    # exist yet, but it will land on its parent's device.
+    p = dir_path
+    while p not in cache:
+        try:
+            cache[p] = os.stat(p).st_dev
+        except OSError:
+            if p.parent == p:
+                cache[p] = None
+            else:
+                cache[p] = _device_of(p.parent, cache)
+    return cache[p]
+
+
+def _update_moved_paths(
+    wq: Any, ops: List[_repo.UpdateImagePathOp],
+) -> Dict[str, Dict[int, Any]]:
+    """One ``UpdateImagePathsOp`` for the chunk; per row if that one fails.
+
+    The files are already at their targets, so a chunk-level error (writer
+    timeout, an exception escaping one row) must not fail every row.
+    """
+    try:
+        return wq.enqueue_write(
+            _repo.MID, _repo.UpdateImagePathsOp(ops),
+        ).result(timeout=120.0)
+    except Exception:  # noqa: BLE001
+        logger.exception(
+            "execute_move path update chunk failed; retrying %d rows one by one",
+            len(ops),
+        )
+    out: Dict[str, Dict[int, Any]] = {"versions": {}, "failed": {}}
+    for op in ops:
+        try:
+            res = wq.enqueue_write(
+                _repo.MID, _repo.UpdateImagePathsOp([op]),
+            ).result(timeout=120.0)
+        except Exception as exc:  # noqa: BLE001
+            out["failed"][op.image_id] = str(exc)
+            continue
+        out["versions"].update(res["versions"])
+        out["failed"].update(res["failed"])
+    return out
+
+
+def _move_file_back(row: _bulk_jobs.JobRow) -> bool:
+    """Undo the disk half of a row whose path update did not land."""
+    dst = str(row.dst)
+    try:
+        if os.path.exists(dst) and not os.path.exists(row.src):
+            _physical_move(dst, row.src)
+    except Exception as exc:  # noqa: BLE001
+        logger.error(
+            "execute_move rollback failed id=%s %s -> %s: %s",
+            row.image_id, dst, row.src, exc,
+        )
+        return False
+    return True
+
+
+def _settle_moved_rows(
+    wq: Any, ckpt: _bulk_jobs.Checkpoint, updated: "_ImageEventBatch",
+    pairs: List[Tuple[_bulk_jobs.JobRow, _repo.UpdateImagePathOp]],
+) -> List[Tuple[_bulk_jobs.JobRow, _repo.UpdateImagePathOp]]:
+    """Point moved rows at their new paths; returns the stranded pairs.
+
+    A row whose update does not land gets its file moved back and is
+    failed; if even that fails it is returned unrecorded (still pending).
+    """
+    res = _update_moved_paths(wq, [op for _m, op in pairs])
+    stranded: List[Tuple[_bulk_jobs.JobRow, _repo.UpdateImagePathOp]] = []
+    for m, op in pairs:
+        ver = res["versions"].get(op.image_id)
+        if ver is None:
+            msg = res["failed"].get(op.image_id, "path update failed")
+            if _move_file_back(m):
+                ckpt.fail(m, "internal", msg)
+            else:
+                stranded.append((m, op))
+            continue
+        ckpt.ok(m)
+        updated.add(
+            {
+                "id": int(op.image_id),
+                "version": int(ver),
+                "moved_to": op.path,
+            },
+        )
+    return stranded
+
+
+def _run_move_job(
+    job: _bulk_jobs.Job, ckpt: _bulk_jobs.Checkpoint,
+) -> Optional[dict]:
+    """Move engine: parallel disk stage per chunk, then one path-update op.
+
+    Rows whose source and target directories share a device are plain
+    ``os.replace`` calls on ``_MOVE_WORKERS`` threads; the rest are copies
+    bounded by ``_CROSS_DEVICE_WORKERS`` so two spindles are not thrashed
+    by a dozen interleaved streams.
+    """
+    plan_id = job.job_id
+    roots = _folders.list_roots(db_path=ckpt.db_path)
+    root_paths = [str(r["path"]) for r in roots]
+    wq = ckpt.write_queue
+    total = job.total
 
     _emit_bulk_progress(
         {
             "plan_id": plan_id,
             "bulk_id": plan_id,
-            "done": 0,
+            "done": ckpt.processed,
             "total": total,
             "kind": "move",
         },
     )
 
-    for i, m in enumerate(plan.mappings):
-        try:
-            if Path(m.src).resolve(strict=False) == Path(m.dst).resolve(strict=False):
-                ok_count += 1
-            else:
-                _physical_move(m.src, m.dst)
-                (
-                    folder_id,
-                    path_posix,
-                    rel,
-                    filename,
-                    filename_lc,
-                    ext,
-                    mtime_ns,
-                    file_size,
-                ) = _fields_for_moved_file(m.dst, roots)
-                fut = wq.enqueue_write(
-                    _repo.MID,
-                    _repo.UpdateImagePathOp(
-                        image_id=m.image_id,
-                        path=path_posix,
-                        folder_id=folder_id,
-                        relative_path=rel,
-                        filename=filename,
-                        filename_lc=filename_lc,
-                        ext=ext,
-                        file_size=file_size,
-                        mtime_ns=mtime_ns,
-                        # Pure filesystem move: file bytes (incl. xyz_gallery.*) unchanged;
-                        # DB tags/favorite unchanged — skip PNG metadata_sync storm (T24).
-                        refresh_sync=False,
-                    ),
+    updated = _ImageEventBatch(_ws_hub.IMAGE_UPDATED)
+    devices: Dict[Path, Optional[int]] = {}
+    # File at dst, row still at src (path update and move-back both failed).
+    stranded: List[Tuple[_bulk_jobs.JobRow, _repo.UpdateImagePathOp]] = []
+    with ThreadPoolExecutor(
+        max_workers=_MOVE_WORKERS, thread_name_prefix="xyz-gallery-move",
+    ) as same_pool, ThreadPoolExecutor(
+        max_workers=_CROSS_DEVICE_WORKERS, thread_name_prefix="xyz-gallery-copy",
+    ) as copy_pool:
+        for start in range(0, len(job.rows), _MOVE_CHUNK_ROWS):
+            if ckpt.stopping:
+                updated.flush()
+                return None
+            chunk = job.rows[start:start + _MOVE_CHUNK_ROWS]
+            disk: List[Tuple[_bulk_jobs.JobRow, Future]] = []
+            for m in chunk:
+                src_dev = _device_of(Path(m.src).parent, devices)
+                dst_dev = _device_of(Path(str(m.dst)).parent, devices)
+                pool = (
+                    same_pool
+                    if src_dev is not None and src_dev == dst_dev
+                    else copy_pool
                 )
-                ver = int(fut.result(timeout=120.0))
-                ok_count += 1
-                _ws_hub.broadcast(
-                    _ws_hub.IMAGE_UPDATED,
-                    {
-                        "id": int(m.image_id),
-                        "version": ver,
-                        "moved_to": path_posix,
-                    },
+                disk.append(
+                    (m, pool.submit(_move_one_file, m, roots, root_paths)),
                 )
-        except Exception as exc:  # noqa: BLE001
-            failed.append(
+
+            ops: List[_repo.UpdateImagePathOp] = []
+            by_id: Dict[int, _bulk_jobs.JobRow] = {}
+            for m, fut in disk:
+                try:
+                    op = fut.result()
+                except Exception as exc:  # noqa: BLE001
+                    code = (
+                        "sandbox" if isinstance(exc, _paths.SandboxError)
+                        else "internal"
+                    )
+                    ckpt.fail(m, code, str(exc))
+                    logger.warning("execute_move failed id=%s: %s", m.image_id, exc)
+                    continue
+                if op is None:
+                    ckpt.ok(m)
+                    continue
+                ops.append(op)
+                by_id[op.image_id] = m
+
+            if ops:
+                stranded.extend(_settle_moved_rows(
+                    wq, ckpt, updated, [(by_id[op.image_id], op) for op in ops],
+                ))
+            _emit_bulk_progress(
                 {
-                    "id": int(m.image_id),
-                    "code": "internal",
-                    "message": str(exc),
+                    "plan_id": plan_id,
+                    "bulk_id": plan_id,
+                    "done": ckpt.processed,
+                    "total": total,
+                    "kind": "move",
                 },
             )
-            logger.exception("execute_move failed id=%s", m.image_id)
-        _emit_bulk_progress(
-            {
-                "plan_id": plan_id,
-                "bulk_id": plan_id,
-                "done": i + 1,
-                "total": total,
-                "kind": "move",
-            },
+
+    # Stranded rows stay pending while we back off, so a shutdown here is
+    # an ordinary pause: the next start re-applies their path update.
+    delay = _STRANDED_RETRY_BASE_SEC
+    for _attempt in range(_STRANDED_RETRIES):
+        if not stranded:
+            break
+        if ckpt.sleep(delay):
+            updated.flush()
+            return None
+        stranded = _settle_moved_rows(wq, ckpt, updated, stranded)
+        delay *= 2
+    for m, _op in stranded:
+        logger.error(
+            "execute_move id=%s: file is at %s but its row still points at %s",
+            m.image_id, m.dst, m.src,
+        )
+        ckpt.fail(
+            m, "moved_not_indexed",
+            f"file moved to {m.dst} but the gallery still lists {m.src}; "
+            "a rescan of the target folder picks it up",
         )
-        if (i + 1) % 50 == 0:
-            time.sleep(0)
 
+    updated.flush()
+    ok_count = job.total - len(job.failed)
+    failed = list(job.failed)
     _emit_bulk_completed(
         {
             "plan_id": plan_id,
@@ -546,7 +861,7 @@ def execute_move(
     )
     _audit.log_event(
         "bulk_move_completed",
-        actor,
+        job.actor,
         {
             "plan_id": plan_id,
             "moved": ok_count,
@@ -690,65 +1005,125 @@ def preflight_delete(sel: _repo.SelectionSpec, *, db_path: Path) -> dict:
     }
 
 
-def execute_delete(plan_id: str, *, db_path: Path, actor: str = "unknown") -> dict:
-    """Phase-2 bulk delete: unlink then ``DeleteImageOp`` per row (T25)."""
+def _prepare_delete_job(plan_id: str, *, actor: str) -> int:
     raw = _delete_store_pop(plan_id)
     if raw is None:
         raise PreflightMoveError("not_found", "unknown or expired plan_id")
+    _bulk_jobs.create(
+        job_id=plan_id,
+        kind="delete",
+        actor=actor,
+        params={"total_bytes": raw.total_bytes},
+        rows=[
+            _bulk_jobs.JobRow(seq=i, image_id=image_id, src=path)
+            for i, (image_id, path) in enumerate(raw.rows)
+        ],
+        write_queue=_write_queue_handle(),
+    )
+    return len(raw.rows)
 
-    wq = _write_queue_handle()
-    roots = _folders.list_roots(db_path=db_path)
+
+def execute_delete(plan_id: str, *, db_path: Path, actor: str = "unknown") -> dict:
+    """Phase-2 bulk delete on the calling thread: unlink then ``DeleteImageOp`` (T25)."""
+    _prepare_delete_job(plan_id, actor=actor)
+    return _bulk_jobs.run_inline(
+        plan_id, db_path=db_path, write_queue=_write_queue_handle(),
+    )
+
+
+def submit_delete(plan_id: str, *, db_path: Path, actor: str = "unknown") -> dict:
+    """Persist a preflighted delete plan and queue it on the bulk job runner."""
+    if not _bulk_jobs.is_running():
+        raise RuntimeError("bulk job runner is not started")
+    total = _prepare_delete_job(plan_id, actor=actor)
+    _bulk_jobs.submit(plan_id, kind="delete", total=total)
+    return {"job_id": plan_id, "plan_id": plan_id, "status": "queued", "total": total}
+
+
+def _unlink_one(row: _bulk_jobs.JobRow, root_paths: List[str]) -> None:
+    _paths.assert_inside_root(row.src, root_paths)
+    try:
+        os.unlink(row.src)
+    except FileNotFoundError:
+        pass  # already gone (watcher, or a resumed job) — drop the row anyway
+
+
+def _run_delete_job(
+    job: _bulk_jobs.Job, ckpt: _bulk_jobs.Checkpoint,
+) -> Optional[dict]:
+    """Parallel unlink stage per chunk, then one set-wise ``DeleteImagesOp``."""
+    wq = ckpt.write_queue
+    roots = _folders.list_roots(db_path=ckpt.db_path)
     root_paths = [str(r["path"]) for r in roots]
-    total = len(raw.rows)
-    failed: List[dict] = []
-    ok_count = 0
-    bid = plan_id
+    total = job.total
+    ok_count = job.done - len(job.failed)
+    bid = job.job_id
 
     _emit_bulk_progress(
         {
             "plan_id": bid,
             "bulk_id": bid,
-            "done": 0,
+            "done": ckpt.processed,
             "total": total,
             "kind": "delete",
         },
     )
 
-    for i, (image_id, path) in enumerate(raw.rows):
-        try:
-            _paths.assert_inside_root(path, root_paths)
-            p = Path(path)
-            if p.is_file():
-                os.unlink(str(p))
-            fut = wq.enqueue_write(
-                _repo.MID,
-                _repo.DeleteImageOp(path=p.as_posix()),
-            )
-            did = fut.result(timeout=120.0)
-            if did is not None:
-                broadcast_image_deleted(int(did))
-                ok_count += 1
-        except Exception as exc:  # noqa: BLE001
-            failed.append(
+    deleted = _ImageEventBatch(_ws_hub.IMAGE_DELETED, every=_DELETE_CHUNK_ROWS)
+    with ThreadPoolExecutor(
+        max_workers=_UNLINK_WORKERS, thread_name_prefix="xyz-gallery-unlink",
+    ) as pool:
+        for start in range(0, len(job.rows), _DELETE_CHUNK_ROWS):
+            if ckpt.stopping:
+                return None
+            chunk = job.rows[start:start + _DELETE_CHUNK_ROWS]
+            unlinked: List[_bulk_jobs.JobRow] = []
+            for row, fut in [
+                (r, pool.submit(_unlink_one, r, root_paths)) for r in chunk
+            ]:
+                try:
+                    fut.result()
+                except Exception as exc:  # noqa: BLE001
+                    code = (
+                        "sandbox" if isinstance(exc, _paths.SandboxError)
+                        else "internal"
+                    )
+                    ckpt.fail(row, code, str(exc))
+                    logger.warning("execute_delete id=%s: %s", row.image_id, exc)
+                else:
+                    unlinked.append(row)
+
+            if unlinked:
+                try:
+                    gone = wq.enqueue_write(
+                        _repo.MID,
+                        _repo.DeleteImagesOp(
+                            image_ids=[r.image_id for r in unlinked],
+                            paths=[Path(r.src).as_posix() for r in unlinked],
+                        ),
+                    ).result(timeout=120.0)
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("execute_delete chunk of %d rows", len(unlinked))
+                    for r in unlinked:
+                        ckpt.fail(r, "internal", str(exc))
+                else:
+                    for did in gone:
+                        deleted.add({"id": int(did)})
+                    ok_count += len(gone)
+                    for r in unlinked:
+                        ckpt.ok(r)
+            deleted.flush()
+            _emit_bulk_progress(
                 {
-                    "id": int(image_id),
-                    "code": "internal",
-                    "message": str(exc),
+                    "plan_id": bid,
+                    "bulk_id": bid,
+                    "done": ckpt.processed,
+                    "total": total,
+                    "kind": "delete",
                 },
             )
-            logger.exception("execute_delete id=%s", image_id)
-        _emit_bulk_progress(
-            {
-                "plan_id": bid,
-                "bulk_id": bid,
-                "done": i + 1,
-                "total": total,
-                "kind": "delete",
-            },
-        )
-        if (i + 1) % 50 == 0:
-            time.sleep(0)
 
+    failed = list(job.failed)
     _emit_bulk_completed(
         {
             "plan_id": bid,
@@ -761,17 +1136,21 @@ def execute_delete(plan_id: str, *, db_path: Path, actor: str = "unknown") -> di
     )
     _audit.log_event(
         "bulk_delete_completed",
-        actor,
+        job.actor,
         {
             "plan_id": bid,
             "deleted": ok_count,
             "failed": len(failed),
-            "total_bytes": raw.total_bytes,
+            "total_bytes": int(job.params.get("total_bytes") or 0),
         },
     )
     return {"deleted": ok_count, "failed": failed, "plan_id": bid}
 
 
+_bulk_jobs.register_runner("move", _run_move_job)
+_bulk_jobs.register_runner("delete", _run_delete_job)
+
+
 def delete_single_image(
     image_id: int,
     *,
@@ -825,29 +1204,6 @@ def _bulk_priority(n_rows: int) -> int:
     return _repo.HIGH if n_rows <= BULK_HIGH_IF_TOTAL_LEQ else _repo.MID
 
 
-def _tags_from_csv(tags_csv: Optional[str]) -> Tuple[str, ...]:
-    if not tags_csv:
-        return ()
-    return tuple(t for t in str(tags_csv).split(",") if t)
-
-
-def _merge_tag_lists(
-    current: Tuple[str, ...],
-    add: List[str],
-    remove: List[str],
-) -> List[str]:
-    rset = {_vocab.normalize_tag(x) for x in remove}
-    rset.discard("")
-    out = [t for t in current if _vocab.normalize_tag(t) not in rset]
-    seen = {_vocab.normalize_tag(t) for t in out}
-    for a in add:
-        nt = _vocab.normalize_tag(a)
-        if nt and nt not in seen:
-            out.append(nt)
-            seen.add(nt)
-    return out
-
-
 def _parse_patch(body: Any) -> Tuple[Optional[int], Optional[List[str]]]:
     """Return ``(favorite_int_or_none, normalized_tags_or_none)``.
 
@@ -976,6 +1332,19 @@ def broadcast_image_deleted(image_id: int) -> None:
     _ws_hub.broadcast(_ws_hub.IMAGE_DELETED, {"id": int(image_id)})
 
 
+def broadcast_images_upserted(image_ids: List[int]) -> None:
+    """Watcher flush chunk: one ``broadcast_many`` instead of N envelopes."""
+    _ws_hub.broadcast_many(
+        _ws_hub.IMAGE_UPSERTED, [{"id": int(i)} for i in image_ids],
+    )
+
+
+def broadcast_images_deleted(image_ids: List[int]) -> None:
+    _ws_hub.broadcast_many(
+        _ws_hub.IMAGE_DELETED, [{"id": int(i)} for i in image_ids],
+    )
+
+
 def broadcast_index_overflow(root_id: int) -> None:
     """T20: Coalescer 触顶 → 降级 delta_scan; 用漂移事件可观测 (前端 T22+)."""
     _ws_hub.broadcast(
@@ -984,13 +1353,97 @@ def broadcast_index_overflow(root_id: int) -> None:
     )
 
 
+def _bulk_update_chunks(
+    rows: List[Tuple[int, str]],
+    *,
+    kind: str,
+    bulk_id: str,
+    db_path: Path,
+    op_kwargs: Dict[str, Any],
+    event: Callable[[int, int, Optional[List[str]]], dict],
+) -> Tuple[int, List[dict]]:
+    """Run ``BulkUpdateImagesOp`` over ``rows`` in ``BULK_CHUNK_ROWS`` chunks.
+
+    Every chunk is enqueued before the first result is awaited, so the
+    writer drains them back to back; progress is emitted once per chunk.
+    Returns ``(affected, failed)``.
+    """
+    total = len(rows)
+    pr = _bulk_priority(total)
+    roots = _folders.list_roots(db_path=db_path)
+    root_paths = [r["path"] for r in roots]
+    wq = _write_queue_handle()
+    failed: List[dict] = []
+    # (rows consumed, ids in chunk, future) — sandbox rejects still count
+    # towards ``done`` so progress reaches ``total``.
+    chunks: List[Tuple[int, List[int], Optional[Future]]] = []
+    ids: List[int] = []
+    consumed = 0
+    for image_id, path in rows:
+        consumed += 1
+        try:
+            _paths.assert_inside_root(path, root_paths)
+        except _paths.SandboxError as e:
+            failed.append(
+                {"id": int(image_id), "code": "sandbox", "message": str(e)},
+            )
+            logger.warning("bulk %s sandbox id=%s: %s", kind, image_id, e)
+            continue
+        ids.append(int(image_id))
+        if len(ids) >= _repo.BULK_CHUNK_ROWS:
+            chunks.append((consumed, ids, wq.enqueue_write(
+                pr, _repo.BulkUpdateImagesOp(image_ids=ids, **op_kwargs))))
+            ids, consumed = [], 0
+    if consumed:
+        fut = wq.enqueue_write(
+            pr, _repo.BulkUpdateImagesOp(image_ids=ids, **op_kwargs),
+        ) if ids else None
+        chunks.append((consumed, ids, fut))
+
+    ok_count = 0
+    done = 0
+    sync_hint: Dict[int, int] = {}
+    updated = _ImageEventBatch(_ws_hub.IMAGE_UPDATED)
+    for n_rows, chunk_ids, fut in chunks:
+        if fut is not None:
+            try:
+                res = fut.result(timeout=120.0)
+            except Exception as e:  # noqa: BLE001
+                logger.exception("bulk %s chunk of %d ids", kind, len(chunk_ids))
+                failed.extend(
+                    {"id": i, "code": "internal", "message": str(e)}
+                    for i in chunk_ids
+                )
+            else:
+                for iid, ver, tags in res["updated"]:
+                    ok_count += 1
+                    updated.add(event(iid, ver, tags))
+                    sync_hint[iid] = ver
+                for iid in res["missing"]:
+                    failed.append(
+                        {
+                            "id": iid,
+                            "code": "not_found",
+                            "message": f"image id={iid} not found",
+                        },
+                    )
+        done += n_rows
+        _emit_bulk_progress(
+            {"bulk_id": bulk_id, "done": done, "total": total, "kind": kind},
+        )
+    updated.flush()
+    if sync_hint:
+        _metadata_sync.queue_many(sync_hint)
+    return ok_count, failed
+
+
 def bulk_set_favorite(
     sel: _repo.SelectionSpec,
     value: bool,
     *,
     db_path: Path,
 ) -> dict:
-    """Apply favorite to every image in ``sel``; one op / tx + per-id WS (T23)."""
+    """Apply favorite to every image in ``sel``; one op / chunk + batched WS (T23)."""
     rows = _repo.fetch_selection_id_paths(db_path=db_path, sel=sel)
     total = len(rows)
     bulk_id = str(uuid.uuid4())
@@ -1002,68 +1455,21 @@ def bulk_set_favorite(
         )
         return {"affected": 0, "bulk_id": bulk_id}
 
-    pr = _bulk_priority(total)
-    roots = _folders.list_roots(db_path=db_path)
-    root_paths = [r["path"] for r in roots]
-    wq = _write_queue_handle()
     _emit_bulk_progress(
         {
             "bulk_id": bulk_id, "done": 0, "total": total, "kind": "favorite",
         },
     )
-    failed: List[dict] = []
-    ok_count = 0
-    sync_hint: Dict[int, int] = {}
-    for i, (image_id, path) in enumerate(rows):
-        try:
-            _paths.assert_inside_root(path, root_paths)
-            fut = wq.enqueue_write(
-                pr,
-                _repo.UpdateImageOp(
-                    image_id=int(image_id),
-                    favorite=1 if value else 0,
-                    normalized_tags=None,
-                    bump_version=True,
-                    refresh_sync=True,
-                ),
-            )
-            ver = int(fut.result(timeout=120.0))
-        except (KeyError, _paths.SandboxError) as e:
-            code = "sandbox" if isinstance(e, _paths.SandboxError) else "not_found"
-            failed.append(
-                {"id": int(image_id), "code": code, "message": str(e)},
-            )
-            logger.warning("bulk_set_favorite id=%s: %s", image_id, e)
-        except Exception as e:  # noqa: BLE001
-            failed.append(
-                {
-                    "id": int(image_id),
-                    "code": "internal",
-                    "message": str(e),
-                },
-            )
-            logger.exception("bulk_set_favorite id=%s", image_id)
-        else:
-            ok_count += 1
-            _ws_hub.broadcast(
-                _ws_hub.IMAGE_UPDATED,
-                {
-                    "id": int(image_id),
-                    "version": ver,
-                    "favorite": bool(value),
-                },
-            )
-            sync_hint[int(image_id)] = int(ver)
-        _emit_bulk_progress(
-            {
-                "bulk_id": bulk_id,
-                "done": i + 1,
-                "total": total,
-                "kind": "favorite",
-            },
-        )
-    if sync_hint:
-        _metadata_sync.queue_many(sync_hint)
+    ok_count, failed = _bulk_update_chunks(
+        rows,
+        kind="favorite",
+        bulk_id=bulk_id,
+        db_path=db_path,
+        op_kwargs={"favorite": 1 if value else 0},
+        event=lambda iid, ver, _tags: {
+            "id": iid, "version": ver, "favorite": bool(value),
+        },
+    )
     _emit_bulk_completed(
         {
             "bulk_id": bulk_id,
@@ -1085,7 +1491,11 @@ def bulk_edit_tags(
     *,
     db_path: Path,
 ) -> dict:
-    """Add/remove normalised tags on every image in ``sel`` (T23)."""
+    """Add/remove normalised tags on every image in ``sel`` (T23).
+
+    ``tags_csv`` is merged inside the write transaction, so rows whose tags
+    already match are skipped there (no version bump, no WS event).
+    """
     add_n = [_vocab.normalize_tag(x) for x in add]
     add_n = [x for x in add_n if x]
     rem_n = [_vocab.normalize_tag(x) for x in remove]
@@ -1093,7 +1503,7 @@ def bulk_edit_tags(
     if not add_n and not rem_n:
         raise ValueError("add/remove must contain at least one non-empty tag")
 
-    rows = _repo.fetch_selection_id_path_tags_csv(db_path=db_path, sel=sel)
+    rows = _repo.fetch_selection_id_paths(db_path=db_path, sel=sel)
     total = len(rows)
     bulk_id = str(uuid.uuid4())
     if total == 0:
@@ -1102,109 +1512,21 @@ def bulk_edit_tags(
         )
         return {"affected": 0, "bulk_id": bulk_id}
 
-    pr = _bulk_priority(total)
-    roots = _folders.list_roots(db_path=db_path)
-    root_paths = [r["path"] for r in roots]
-    wq = _write_queue_handle()
     _emit_bulk_progress(
         {
             "bulk_id": bulk_id, "done": 0, "total": total, "kind": "tags",
         },
     )
-    failed: List[dict] = []
-    ok_count = 0
-    sync_hint2: Dict[int, int] = {}
-    for i, (image_id, path, tags_csv) in enumerate(rows):
-        try:
-            _paths.assert_inside_root(path, root_paths)
-        except _paths.SandboxError as e:
-            failed.append(
-                {"id": int(image_id), "code": "sandbox", "message": str(e)},
-            )
-            logger.warning("bulk_edit_tags sandbox id=%s: %s", image_id, e)
-            _emit_bulk_progress(
-                {
-                    "bulk_id": bulk_id,
-                    "done": i + 1,
-                    "total": total,
-                    "kind": "tags",
-                },
-            )
-            continue
-        cur = _tags_from_csv(tags_csv)
-        new_list = _merge_tag_lists(cur, add_n, rem_n)
-        # Must match what UpdateImageOp will write: ",".join(new_list) or NULL for empty.
-        # list(cur) == new_list is unsafe (tuple vs list) and can diverge from tags_csv
-        # string form; one bad skip leaves disk/DB out of sync with a few items.
-        if (not new_list) and (not cur):
-            _emit_bulk_progress(
-                {
-                    "bulk_id": bulk_id,
-                    "done": i + 1,
-                    "total": total,
-                    "kind": "tags",
-                },
-            )
-            continue
-        want_csv: Optional[str] = ",".join(new_list) if new_list else None
-        if want_csv is not None and (tags_csv or "") == want_csv:
-            _emit_bulk_progress(
-                {
-                    "bulk_id": bulk_id,
-                    "done": i + 1,
-                    "total": total,
-                    "kind": "tags",
-                },
-            )
-            continue
-        try:
-            fut = wq.enqueue_write(
-                pr,
-                _repo.UpdateImageOp(
-                    image_id=int(image_id),
-                    favorite=None,
-                    normalized_tags=new_list,
-                    bump_version=True,
-                    refresh_sync=True,
-                ),
-            )
-            ver = int(fut.result(timeout=120.0))
-        except (KeyError, _paths.SandboxError) as e:
-            code = "sandbox" if isinstance(e, _paths.SandboxError) else "not_found"
-            failed.append(
-                {"id": int(image_id), "code": code, "message": str(e)},
-            )
-            logger.warning("bulk_edit_tags op id=%s: %s", image_id, e)
-        except Exception as e:  # noqa: BLE001
-            failed.append(
-                {
-                    "id": int(image_id),
-                    "code": "internal",
-                    "message": str(e),
-                },
-            )
-            logger.exception("bulk_edit_tags id=%s", image_id)
-        else:
-            ok_count += 1
-            _ws_hub.broadcast(
-                _ws_hub.IMAGE_UPDATED,
-                {
-                    "id": int(image_id),
-                    "version": ver,
-                    "tags": list(new_list),
-                },
-            )
-            sync_hint2[int(image_id)] = int(ver)
-        _emit_bulk_progress(
-            {
-                "bulk_id": bulk_id,
-                "done": i + 1,
-                "total": total,
-                "kind": "tags",
-            },
-        )
-    if sync_hint2:
-        _metadata_sync.queue_many(sync_hint2)
+    ok_count, failed = _bulk_update_chunks(
+        rows,
+        kind="tags",
+        bulk_id=bulk_id,
+        db_path=db_path,
+        op_kwargs={"add_tags": add_n, "remove_tags": rem_n},
+        event=lambda iid, ver, tags: {
+            "id": iid, "version": ver, "tags": list(tags or ()),
+        },
+    )
     _emit_bulk_completed(
         {
             "bulk_id": bulk_id,
@@ -1702,15 +2024,15 @@ def tag_admin_list(
     }
 
 
-def _broadcast_image_updated_tags(
+def _image_updated_tags_payload(
     image_id: int, version: int, *, db_path: Path,
-) -> None:
-    """``image.updated`` (tags) for callers that batch `metadata_sync.queue_many` (T44)."""
+) -> Dict[str, Any]:
+    """``image.updated`` (tags) data for callers that batch `metadata_sync.queue_many` (T44)."""
     rec = _repo.get_image(int(image_id), db_path=db_path)
     payload: Dict[str, Any] = {"id": int(image_id), "version": int(version)}
     if rec is not None:
         payload["tags"] = list(rec.tags)
-    _ws_hub.broadcast(_ws_hub.IMAGE_UPDATED, payload)
+    return payload
 
 
 def tag_admin_delete(*, name: str, db_path: Path) -> Dict[str, Any]:
@@ -1727,14 +2049,16 @@ def tag_admin_delete(*, name: str, db_path: Path) -> Dict[str, Any]:
         _jr.start_generic_job(
             jid, kind="tag_delete", done=0, total=naff, phase="notify", message="",
         )
+    updated = _ImageEventBatch(_ws_hub.IMAGE_UPDATED)
     for k, pair in enumerate(aff):
         iid, ver = int(pair[0]), int(pair[1])
         to_sync[iid] = ver
-        _broadcast_image_updated_tags(iid, ver, db_path=db_path)
+        updated.add(_image_updated_tags_payload(iid, ver, db_path=db_path))
         if jid is not None and ((k + 1) % 10 == 0 or (k + 1) == naff):
             _jr.emit_job_progress(
                 jid, kind="tag_delete", done=k + 1, total=naff, phase="notify",
             )
+    updated.flush()
     if to_sync:
         _metadata_sync.queue_many(to_sync)
     if jid is not None and naff > 1:
@@ -1768,14 +2092,16 @@ def tag_admin_rename(*, old_name: str, new_name: str, db_path: Path) -> Dict[str
         _jr.start_generic_job(
             jid2, kind="tag_rename", done=0, total=naff, phase="notify", message="",
         )
+    updated = _ImageEventBatch(_ws_hub.IMAGE_UPDATED)
     for k, pair in enumerate(aff):
         iid, ver = int(pair[0]), int(pair[1])
         to_sync[iid] = ver
-        _broadcast_image_updated_tags(iid, ver, db_path=db_path)
+        updated.add(_image_updated_tags_payload(iid, ver, db_path=db_path))
         if jid2 is not None and ((k + 1) % 10 == 0 or (k + 1) == naff):
             _jr.emit_job_progress(
                 jid2, kind="tag_rename", done=k + 1, total=naff, phase="notify",
             )
+    updated.flush()
     if to_sync:
         _metadata_sync.queue_many(to_sync)
     if jid2 is not None and naff > 1:
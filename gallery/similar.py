@@ -0,0 +1,541 @@
+"""XYZ Image Gallery — perceptual-hash near-duplicate search (``image.phash``).
+
+``phash`` is a 64-bit dHash of the 320 px thumbnail: ``thumbs`` computes
+it from the cropped pixels it is about to encode (no second decode) and
+stores it in the same :class:`repo.InsertThumbCacheOp` as the cache row
+(:class:`repo.SetPerceptualHashesOp` for the other paths).  Rows thumbnailed
+before schema v10 are filled on demand (:func:`phash_for` rebuilds the
+same crop from the source — never the lossy .webp, so every path stores
+the same hash) or in bulk by the cluster job.
+
+Search is multi-index hashing: the hash is cut into four 16-bit chunks,
+each with its own ``chunk → ids`` table.  Two hashes within Hamming
+distance ``k`` agree to within ``k // 4`` bits on at least one chunk, so a
+query probes every chunk value that close in each table and verifies the
+candidates with a popcount — a few hundred dict lookups instead of a
+scan.  Like ``postings`` the index is a pure accelerator: it is built in
+a daemon thread, kept current from ``repo``'s commit journal (hashes
+stored, cleared by a fingerprint change, or gone with their row), and
+every hit is re-checked against SQLite, so while it is building answers
+come from, or are corrected by, SQL.
+
+``POST /xyz/gallery/similar/cluster`` runs :func:`start_cluster_job`:
+backfill missing hashes, then link every pair within ``distance`` and
+report connected components (single linkage) through ``job_registry``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from . import db as _db
+from . import repo as _repo
+
+logger = logging.getLogger("xyz.gallery.similar")
+
+__all__ = [
+    "DEFAULT_DISTANCE",
+    "MAX_DISTANCE",
+    "ClusterBusy",
+    "dhash",
+    "hamming",
+    "enable",
+    "disable",
+    "stats",
+    "phash_for",
+    "find_similar",
+    "cluster",
+    "start_cluster_job",
+    "last_clusters",
+]
+
+_PathLike = Union[str, Path]
+
+DEFAULT_DISTANCE = 8
+# Probe radius per chunk is ``k // 4``; 16 → radius 4 (≈2.5k probes/chunk).
+MAX_DISTANCE = 16
+
+_CHUNKS = 4
+_CHUNK_BITS = 16
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+_BATCH = 256
+_PROGRESS_EVERY = 1000
+
+
+def dhash(img: Any) -> int:
+    """64-bit difference hash of a PIL image (unsigned int).
+
+    Grey 9×8 box-downscale; bit ``r * 8 + c`` is set when pixel ``c`` is
+    brighter than pixel ``c + 1`` in row ``r``.
+    """
+    from PIL import Image
+
+    px = img.convert("L").resize((9, 8), Image.Resampling.BOX).tobytes()
+    h = 0
+    for r in range(8):
+        row = px[r * 9:(r + 1) * 9]
+        for c in range(8):
+            h = (h << 1) | (row[c] > row[c + 1])
+    return h
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _unsigned(v: int) -> int:
+    return v & ((1 << 64) - 1)
+
+
+def _chunks(h: int) -> List[int]:
+    return [(h >> (i * _CHUNK_BITS)) & _CHUNK_MASK for i in range(_CHUNKS)]
+
+
+_flip_cache: Dict[int, List[int]] = {}
+
+
+def _flip_masks(radius: int) -> List[int]:
+    """Every ``_CHUNK_BITS``-bit mask with at most ``radius`` bits set."""
+    masks = _flip_cache.get(radius)
+    if masks is None:
+        masks = [m for m in range(1 << _CHUNK_BITS)
+                 if bin(m).count("1") <= radius]
+        masks.sort(key=lambda m: bin(m).count("1"))
+        _flip_cache[radius] = masks
+    return masks
+
+
+class _MultiIndex:
+    """``id → hash`` plus one ``chunk → [ids]`` table per 16-bit chunk.
+
+    A re-hashed or dropped id is unlinked from its old buckets, so every
+    bucket entry has a current value in ``hashes``.
+    """
+
+    def __init__(self) -> None:
+        self.hashes: Dict[int, int] = {}
+        self.tables: List[Dict[int, List[int]]] = [{} for _ in range(_CHUNKS)]
+
+    def add(self, iid: int, h: int) -> None:
+        if self.hashes.get(iid) == h:
+            return
+        self.discard(iid)
+        self.hashes[iid] = h
+        for table, c in zip(self.tables, _chunks(h)):
+            bucket = table.get(c)
+            if bucket is None:
+                table[c] = [iid]
+            else:
+                bucket.append(iid)
+
+    def discard(self, iid: int) -> None:
+        h = self.hashes.pop(iid, None)
+        if h is None:
+            return
+        for table, c in zip(self.tables, _chunks(h)):
+            bucket = table.get(c)
+            if bucket is None:
+                continue
+            try:
+                bucket.remove(iid)
+            except ValueError:
+                continue
+            if not bucket:
+                del table[c]
+
+    def query(self, h: int, k: int) -> Dict[int, int]:
+        """``{id: distance}`` for every indexed hash within ``k`` of ``h``."""
+        masks = _flip_masks(k // _CHUNKS)
+        hashes = self.hashes
+        seen = set()
+        out: Dict[int, int] = {}
+        for table, c in zip(self.tables, _chunks(h)):
+            for m in masks:
+                bucket = table.get(c ^ m)
+                if not bucket:
+                    continue
+                for iid in bucket:
+                    if iid in seen:
+                        continue
+                    seen.add(iid)
+                    d = hamming(hashes[iid], h)
+                    if d <= k:
+                        out[iid] = d
+        return out
+
+
+# -- shared index -------------------------------------------------------------
+
+_lock = threading.Lock()
+_state = "off"  # off | building | ready
+_db_key: Optional[str] = None
+_index: Optional[_MultiIndex] = None
+_backlog: Optional[List[Tuple[Any, ...]]] = None
+_build_epoch = 0
+
+
+def _load_hashes(db_path: _PathLike) -> Iterable[Tuple[int, int]]:
+    conn = _db.connect_read(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT id, phash FROM image WHERE phash IS NOT NULL").fetchall()
+    finally:
+        conn.close()
+    return [(int(r[0]), _unsigned(int(r[1]))) for r in rows]
+
+
+def enable(*, db_path: _PathLike) -> None:
+    """Build the index in the background and keep it on the commit journal."""
+    global _state, _db_key, _index, _backlog, _build_epoch
+    with _lock:
+        _build_epoch += 1
+        _state = "building"
+        _db_key = str(Path(db_path))
+        _index = None
+        _backlog = []
+        epoch = _build_epoch
+    _repo.add_commit_listener(_on_commit)
+    threading.Thread(
+        target=_build, args=(epoch, str(Path(db_path))),
+        name="xyz-gallery-similar-build", daemon=True,
+    ).start()
+
+
+def disable() -> None:
+    global _state, _db_key, _index, _backlog, _build_epoch
+    _repo.remove_commit_listener(_on_commit)
+    with _lock:
+        _build_epoch += 1
+        _state = "off"
+        _db_key = None
+        _index = None
+        _backlog = None
+
+
+def _build(epoch: int, db_key: str) -> None:
+    global _state, _index, _backlog
+    t0 = time.perf_counter()
+    index = _MultiIndex()
+    try:
+        for iid, h in _load_hashes(db_key):
+            index.add(iid, h)
+    except Exception:
+        logger.exception("similar: index build failed; SQL scan only")
+        with _lock:
+            if epoch == _build_epoch:
+                _state = "off"
+                _backlog = None
+        return
+    with _lock:
+        if epoch != _build_epoch:
+            return
+        for entry in _backlog or ():
+            _apply_locked(index, entry)
+        _index = index
+        _backlog = None
+        _state = "ready"
+    logger.info("similar: indexed %d perceptual hashes in %.0f ms",
+                len(index.hashes), (time.perf_counter() - t0) * 1000.0)
+
+
+def _apply_locked(index: _MultiIndex, entry: Tuple[Any, ...]) -> None:
+    if entry[0] != "phash":
+        return
+    if entry[2] is None:
+        index.discard(int(entry[1]))
+    else:
+        index.add(int(entry[1]), int(entry[2]))
+
+
+def _on_commit(entries: List[Tuple[Any, ...]]) -> None:
+    with _lock:
+        if _state == "building" and _backlog is not None:
+            _backlog.extend(e for e in entries if e[0] == "phash")
+        elif _state == "ready" and _index is not None:
+            for entry in entries:
+                _apply_locked(_index, entry)
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "state": _state,
+            "hashes": len(_index.hashes) if _index is not None else 0,
+        }
+
+
+def _candidates(db_path: _PathLike, h: int, k: int) -> Tuple[Dict[int, int], bool]:
+    with _lock:
+        if _state == "ready" and _index is not None and _db_key == str(Path(db_path)):
+            return _index.query(h, k), True
+    out = {}
+    for iid, other in _load_hashes(db_path):
+        d = hamming(other, h)
+        if d <= k:
+            out[iid] = d
+    return out, False
+
+
+# -- queries ------------------------------------------------------------------
+
+def phash_for(
+    image_id: int, *, db_path: _PathLike, thumbs_dir: _PathLike, write_queue: Any,
+    record: bool = True,
+) -> Optional[Tuple[int, int]]:
+    """``(phash, mtime_ns)`` for ``image_id``, hashing its thumbnail if needed.
+
+    Returns None for an unknown image or one whose thumbnail cannot be
+    built.  The hash is ``thumbs.request_phash``'s — the same pixels the
+    thumbnail generator hashes — so it does not depend on which path ran
+    first.  With ``record`` a freshly computed hash is enqueued (LOW).
+    """
+    from . import thumbs as _thumbs
+
+    conn = _db.connect_read(db_path)
+    try:
+        row = conn.execute(
+            "SELECT phash, mtime_ns FROM image WHERE id = ?", (int(image_id),),
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    if row["phash"] is not None:
+        return _unsigned(int(row["phash"])), int(row["mtime_ns"] or 0)
+    got = _thumbs.request_phash(
+        int(image_id), db_path=db_path, thumbs_dir=thumbs_dir,
+        write_queue=write_queue,
+    )
+    if got is None:
+        return None
+    h, mtime_ns = got
+    if record:
+        write_queue.enqueue_write(
+            _repo.LOW, _repo.SetPerceptualHashesOp([(int(image_id), h, mtime_ns)]),
+        )
+    return h, mtime_ns
+
+
+def find_similar(
+    image_id: int, *, db_path: _PathLike, thumbs_dir: _PathLike, write_queue: Any,
+    distance: int = DEFAULT_DISTANCE, limit: int = 50,
+) -> Dict[str, Any]:
+    """Images whose ``phash`` is within ``distance`` bits of ``image_id``'s.
+
+    Raises ``KeyError`` for an unknown image and ``ValueError`` for a
+    ``distance`` outside ``0..MAX_DISTANCE``.  ``phash`` is None when the
+    image has no usable thumbnail (nothing to compare).
+    """
+    k = int(distance)
+    if not 0 <= k <= MAX_DISTANCE:
+        raise ValueError(f"distance must be between 0 and {MAX_DISTANCE}")
+    limit = max(1, min(int(limit), _repo.MAX_PAGE_SIZE))
+    got = phash_for(image_id, db_path=db_path, thumbs_dir=thumbs_dir,
+                    write_queue=write_queue)
+    if got is None:
+        if _repo.get_image(int(image_id), db_path=db_path) is None:
+            raise KeyError(f"image id={image_id} not found")
+        return {"image_id": int(image_id), "phash": None, "distance": k,
+                "items": [], "total": 0, "indexed": False}
+    h = got[0]
+    t0 = time.perf_counter()
+    cand, indexed = _candidates(db_path, h, k)
+    cand.pop(int(image_id), None)
+    items: List[Dict[str, Any]] = []
+    if cand:
+        # The index may lag deletes / re-hashes: SQLite has the last word.
+        conn = _db.connect_read(db_path)
+        try:
+            rows = conn.execute(
+                "SELECT id, phash, path, filename, folder_id, created_at "
+                "FROM image WHERE phash IS NOT NULL AND id IN "
+                "(SELECT value FROM json_each(?))",
+                (json.dumps(list(cand)),),
+            ).fetchall()
+        finally:
+            conn.close()
+        for r in rows:
+            d = hamming(_unsigned(int(r["phash"])), h)
+            if d <= k:
+                items.append({
+                    "id": int(r["id"]),
+                    "distance": d,
+                    "path": r["path"],
+                    "filename": r["filename"],
+                    "folder_id": r["folder_id"],
+                    "created_at": r["created_at"],
+                })
+    items.sort(key=lambda it: (it["distance"], it["id"]))
+    return {
+        "image_id": int(image_id),
+        "phash": f"{h:016x}",
+        "distance": k,
+        "items": items[:limit],
+        "total": len(items),
+        "indexed": indexed,
+        "ms": round((time.perf_counter() - t0) * 1000.0, 2),
+    }
+
+
+# -- cluster job ----------------------------------------------------------------
+
+class ClusterBusy(RuntimeError):
+    """Another cluster job is still running."""
+
+
+_job_lock = threading.Lock()
+_job_id: Optional[str] = None
+_last: Optional[Dict[str, Any]] = None
+
+
+def last_clusters() -> Optional[Dict[str, Any]]:
+    """Result of the most recent finished cluster job (None before the first)."""
+    with _job_lock:
+        return _last
+
+
+def start_cluster_job(
+    *, db_path: _PathLike, thumbs_dir: _PathLike, write_queue: Any,
+    distance: int = DEFAULT_DISTANCE, backfill: bool = True,
+) -> str:
+    """Start clustering in a daemon thread; returns its ``job_registry`` id."""
+    from . import job_registry as _jr
+
+    k = int(distance)
+    if not 0 <= k <= MAX_DISTANCE:
+        raise ValueError(f"distance must be between 0 and {MAX_DISTANCE}")
+    global _job_id
+    with _job_lock:
+        if _job_id is not None:
+            raise ClusterBusy(f"cluster job {_job_id} is still running")
+        _job_id = jid = _jr.new_job_id()
+    _jr.start_generic_job(jid, kind="similar_cluster",
+                          phase="hash" if backfill else "cluster")
+    threading.Thread(
+        target=_run_cluster_job,
+        args=(jid, Path(db_path), Path(thumbs_dir), write_queue, k, backfill),
+        name="xyz-gallery-similar-cluster", daemon=True,
+    ).start()
+    return jid
+
+
+def _run_cluster_job(
+    jid: str, db_path: Path, thumbs_dir: Path, write_queue: Any, k: int,
+    backfill: bool,
+) -> None:
+    global _job_id, _last
+    from . import job_registry as _jr
+
+    try:
+        failed = _backfill(jid, db_path, thumbs_dir, write_queue) if backfill else 0
+        result = cluster(db_path=db_path, distance=k, job_id=jid)
+        result["unhashed"] = failed
+        with _job_lock:
+            _last = result
+        _jr.emit_job_done(jid, kind="similar_cluster",
+                          terminal="ok" if not failed else "partial",
+                          ok=result["images"], failed=failed, phase="cluster")
+    except Exception:
+        logger.exception("similar: cluster job %s failed", jid)
+        _jr.emit_job_done(jid, kind="similar_cluster", terminal="failed",
+                          phase="cluster")
+    finally:
+        with _job_lock:
+            _job_id = None
+
+
+def _backfill(jid: str, db_path: Path, thumbs_dir: Path, write_queue: Any) -> int:
+    """Hash every row without a ``phash``; returns how many could not be."""
+    from . import job_registry as _jr
+
+    conn = _db.connect_read(db_path)
+    try:
+        (total,) = conn.execute(
+            "SELECT COUNT(*) FROM image WHERE phash IS NULL").fetchone()
+    finally:
+        conn.close()
+    done = failed = after = 0
+    while True:
+        conn = _db.connect_read(db_path)
+        try:
+            ids = [int(r[0]) for r in conn.execute(
+                "SELECT id FROM image WHERE phash IS NULL AND id > ? "
+                "ORDER BY id LIMIT ?", (after, _BATCH))]
+        finally:
+            conn.close()
+        if not ids:
+            break
+        after = ids[-1]
+        batch: List[Tuple[int, int, int]] = []
+        for iid in ids:
+            got = phash_for(iid, db_path=db_path, thumbs_dir=thumbs_dir,
+                            write_queue=write_queue, record=False)
+            if got is None:
+                failed += 1
+            else:
+                batch.append((iid, got[0], got[1]))
+        if batch:
+            write_queue.enqueue_write(
+                _repo.LOW, _repo.SetPerceptualHashesOp(batch),
+            ).result(timeout=60.0)
+        done += len(ids)
+        _jr.emit_job_progress(jid, kind="similar_cluster", done=done,
+                              total=max(int(total), done), phase="hash")
+    return failed
+
+
+def cluster(
+    *, db_path: _PathLike, distance: int = DEFAULT_DISTANCE,
+    job_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Connected components of the "within ``distance``" graph, size ≥ 2.
+
+    Works on its own snapshot of ``image.phash`` (not the shared index)
+    so the groups are consistent with one point in time.
+    """
+    from . import job_registry as _jr
+
+    k = int(distance)
+    t0 = time.perf_counter()
+    rows = list(_load_hashes(db_path))
+    index = _MultiIndex()
+    for iid, h in rows:
+        index.add(iid, h)
+    parent = {iid: iid for iid, _ in rows}
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    total = len(rows)
+    for n, (iid, h) in enumerate(rows, 1):
+        for other in index.query(h, k):
+            if other > iid:
+                a, b = find(iid), find(other)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+        if job_id is not None and (n % _PROGRESS_EVERY == 0 or n == total):
+            _jr.emit_job_progress(job_id, kind="similar_cluster", done=n,
+                                  total=total, phase="cluster")
+    groups: Dict[int, List[int]] = {}
+    for iid, _h in rows:
+        groups.setdefault(find(iid), []).append(iid)
+    clusters = sorted(
+        (sorted(ids) for ids in groups.values() if len(ids) > 1),
+        key=lambda ids: (-len(ids), ids[0]),
+    )
+    return {
+        "job_id": job_id,
+        "distance": k,
+        "finished_at": int(time.time()),
+        "ms": round((time.perf_counter() - t0) * 1000.0, 1),
+        "images": total,
+        "clusters": [{"size": len(ids), "ids": ids} for ids in clusters],
+    }
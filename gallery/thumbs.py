@@ -4,8 +4,9 @@ Scope (per TASKS.md T08 + PROJECT_STATE §7):
 
 * ``request(image_id, ...)`` — cache-on-miss thumbnail generation. Hits
   disk if a .webp already exists; otherwise builds one with Pillow
-  (320×320 cover, WebP q=78) and records a bookkeeping row via the
-  shared ``repo.WriteQueue``. Concurrent requests for the same
+  (320×320 cover, WebP q=78) and records a bookkeeping row — plus the
+  thumbnail's perceptual hash (``similar``) — via the shared
+  ``repo.WriteQueue``. Concurrent requests for the same
   ``hash_key`` share a single ``Future`` so 1000 simultaneous calls
   produce exactly one .webp (SPEC §8.3 "同 key 串行" / TASKS T08 #4).
 * ``touch(hash_key)`` — buffer a ``last_accessed`` bump in a bounded
@@ -36,9 +37,7 @@ import threading
 import time
 from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, Optional, Set, Tuple, Union
-
-from PIL import Image, UnidentifiedImageError
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from . import db as _db
 from . import repo as _repo
@@ -47,9 +46,11 @@ logger = logging.getLogger("xyz.gallery.thumbs")
 
 __all__ = [
     "request",
+    "request_phash",
     "touch",
     "hash_key_for",
     "thumb_path_for",
+    "rekey",
     "start_touch_flusher",
     "stop_touch_flusher",
 ]
@@ -60,7 +61,6 @@ _PathLike = Union[str, Path]
 # knobs without a SPEC change first (AI_RULES R5.2).
 _THUMB_SIZE: int = 320
 _WEBP_QUALITY: int = 78
-_RESAMPLE = Image.Resampling.LANCZOS
 
 # Touch-flush daemon cadence. 10 s of stale last_accessed is irrelevant
 # for an LRU whose budget is measured in days (§8.3), and batching saves
@@ -154,40 +154,78 @@ def _load_image_row(
 
 # -- thumbnail synthesis ----------------------------------------------------
 
-def _generate_and_save(src_path: str, dst_path: Path) -> Optional[int]:
+def _cover_crop(img):
+    """The thumbnail's pixels: ``_THUMB_SIZE`` square cover-crop, or None.
+
+    Cover: scale so the shorter side reaches _THUMB_SIZE, then
+    centre-crop to the target square. Equivalent to CSS's
+    ``object-fit: cover`` done server-side (SPEC §8.3) so we never ship
+    oversized bytes to the grid.
+    """
+    from PIL import Image
+
+    img.load()
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    w, h = img.size
+    if w <= 0 or h <= 0:
+        return None
+    scale = max(_THUMB_SIZE / w, _THUMB_SIZE / h)
+    new_w = max(_THUMB_SIZE, int(round(w * scale)))
+    new_h = max(_THUMB_SIZE, int(round(h * scale)))
+    scaled = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+    left = (new_w - _THUMB_SIZE) // 2
+    top = (new_h - _THUMB_SIZE) // 2
+    return scaled.crop((left, top, left + _THUMB_SIZE, top + _THUMB_SIZE))
+
+
+def _source_phash(src_path: str) -> Optional[int]:
+    """``similar.dhash`` of the cover-crop, rebuilt from the source.
+
+    For thumbnails cached before their hash was recorded: hashing the
+    lossy .webp instead would give a slightly different value than
+    :func:`_generate_and_save` stores for the same image.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    from . import similar as _similar
+
+    try:
+        with Image.open(src_path) as img:
+            cropped = _cover_crop(img)
+            return None if cropped is None else _similar.dhash(cropped)
+    except (UnidentifiedImageError, OSError, ValueError) as exc:
+        _log_thumb_gen_failure(src_path, exc)
+        return None
+
+
+def _generate_and_save(
+    src_path: str, dst_path: Path,
+) -> Optional[Tuple[int, int]]:
     """Build a ``_THUMB_SIZE`` × ``_THUMB_SIZE`` cover-crop WebP.
 
-    Returns the on-disk size in bytes on success, None on any failure.
-    Uses write-to-temp + ``os.replace`` so a crash mid-encode cannot
-    leave a partially-written .webp that a subsequent request would
-    mistake for a cache hit.
+    Returns ``(size_bytes, phash)`` on success — ``phash`` is the
+    ``similar.dhash`` of the cropped thumbnail, taken from the pixels
+    already in memory so perceptual hashing costs no second decode —
+    or None on any failure.  Uses write-to-temp + ``os.replace`` so a
+    crash mid-encode cannot leave a partially-written .webp that a
+    subsequent request would mistake for a cache hit.
     """
+    from PIL import Image, UnidentifiedImageError
+
+    from . import similar as _similar
+
     tmp_path = dst_path.with_suffix(dst_path.suffix + ".tmp")
     try:
         with Image.open(src_path) as img:
-            img.load()
-            if img.mode not in ("RGB", "RGBA"):
-                img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
-            w, h = img.size
-            if w <= 0 or h <= 0:
+            cropped = _cover_crop(img)
+            if cropped is None:
                 return None
-            # Cover: scale so the shorter side reaches _THUMB_SIZE, then
-            # centre-crop to the target square. Equivalent to CSS's
-            # ``object-fit: cover`` done server-side (SPEC §8.3) so we
-            # never ship oversized bytes to the grid.
-            scale = max(_THUMB_SIZE / w, _THUMB_SIZE / h)
-            new_w = max(_THUMB_SIZE, int(round(w * scale)))
-            new_h = max(_THUMB_SIZE, int(round(h * scale)))
-            scaled = img.resize((new_w, new_h), _RESAMPLE)
-            left = (new_w - _THUMB_SIZE) // 2
-            top = (new_h - _THUMB_SIZE) // 2
-            cropped = scaled.crop(
-                (left, top, left + _THUMB_SIZE, top + _THUMB_SIZE)
-            )
             dst_path.parent.mkdir(parents=True, exist_ok=True)
             cropped.save(tmp_path, format="WEBP", quality=_WEBP_QUALITY)
+            phash = _similar.dhash(cropped)
         os.replace(tmp_path, dst_path)
-        return int(dst_path.stat().st_size)
+        return int(dst_path.stat().st_size), phash
     except (UnidentifiedImageError, OSError, ValueError) as exc:
         _log_thumb_gen_failure(src_path, exc)
         try:
@@ -199,11 +237,13 @@ def _generate_and_save(src_path: str, dst_path: Path) -> Optional[int]:
 
 
 def _generate_and_record(
-    *, image_id: int, src_posix: str, key: str, dst: Path, write_queue,
-) -> Optional[Path]:
-    size_bytes = _generate_and_save(src_posix, dst)
-    if size_bytes is None:
+    *, image_id: int, src_posix: str, mtime_ns: int, key: str, dst: Path,
+    write_queue,
+) -> Optional[Tuple[Path, int]]:
+    generated = _generate_and_save(src_posix, dst)
+    if generated is None:
         return None
+    size_bytes, phash = generated
     now = int(time.time())
     # Order matters: the .webp is already on disk above. Only after
     # that do we enqueue the cache row (§4.5 "先物理后入队"). If the
@@ -214,6 +254,7 @@ def _generate_and_record(
         hash_key=key, image_id=int(image_id),
         size_bytes=int(size_bytes),
         created_at=now, last_accessed=now,
+        phash=phash, mtime_ns=int(mtime_ns),
     )
     try:
         write_queue.enqueue_write(_repo.LOW, op)
@@ -222,7 +263,7 @@ def _generate_and_record(
             "thumbs: enqueue_write failed for image_id=%s hash=%s",
             image_id, key,
         )
-    return dst
+    return dst, phash
 
 
 # -- public: request / touch ------------------------------------------------
@@ -240,6 +281,41 @@ def request(
     winner's ``Future``. Cross-key calls proceed in parallel — there is
     no global thumbnail lock.
     """
+    got = _request(image_id, db_path=db_path, thumbs_dir=thumbs_dir,
+                   write_queue=write_queue)
+    return None if got is None else got[0]
+
+
+def request_phash(
+    image_id: int, *,
+    db_path: _PathLike,
+    thumbs_dir: _PathLike,
+    write_queue,
+) -> Optional[Tuple[int, int]]:
+    """``(phash, mtime_ns)`` for ``image_id``, generating its thumbnail if missing.
+
+    The hash always comes from the cover-crop pixels (never the lossy
+    .webp): the one generation computed (and recorded) when the thumbnail
+    is new, else a rebuild of the crop from the source.  None for an
+    unknown image or an unreadable source.
+    """
+    got = _request(image_id, db_path=db_path, thumbs_dir=thumbs_dir,
+                   write_queue=write_queue)
+    if got is None:
+        return None
+    _dst, phash, src_posix, mtime_ns = got
+    if phash is None:
+        phash = _source_phash(src_posix)
+    return None if phash is None else (phash, mtime_ns)
+
+
+def _request(
+    image_id: int, *,
+    db_path: _PathLike,
+    thumbs_dir: _PathLike,
+    write_queue,
+) -> Optional[Tuple[Path, Optional[int], str, int]]:
+    # ``(path, phash, src_posix, mtime_ns)``; ``phash`` is None on a cache hit.
     row = _load_image_row(db_path, image_id)
     if row is None:
         return None
@@ -252,11 +328,11 @@ def request(
     try:
         if dst.is_file() and dst.stat().st_size > 0:
             touch(key)
-            return dst
+            return dst, None, src_posix, mtime_ns
     except OSError:
         pass
 
-    fut: "Future[Optional[Path]]"
+    fut: "Future[Optional[Tuple[Path, int]]]"
     is_owner = False
     with _inflight_lock:
         existing = _inflight.get(key)
@@ -270,7 +346,7 @@ def request(
     if is_owner:
         try:
             result = _generate_and_record(
-                image_id=image_id, src_posix=src_posix,
+                image_id=image_id, src_posix=src_posix, mtime_ns=mtime_ns,
                 key=key, dst=dst, write_queue=write_queue,
             )
         except BaseException as exc:
@@ -282,12 +358,13 @@ def request(
                 _inflight.pop(key, None)
 
     result = fut.result()
-    if result is not None:
-        # Every served hit counts as an access — whether or not we were
-        # the generator. Winners already paid the INSERT, so this just
-        # schedules a cheap last_accessed bump.
-        touch(key)
-    return result
+    if result is None:
+        return None
+    # Every served hit counts as an access — whether or not we were
+    # the generator. Winners already paid the INSERT, so this just
+    # schedules a cheap last_accessed bump.
+    touch(key)
+    return result[0], result[1], src_posix, mtime_ns
 
 
 def touch(hash_key: str) -> None:
@@ -305,6 +382,52 @@ def _drain_touch_set() -> Set[str]:
     return drained
 
 
+# -- moved sources ----------------------------------------------------------
+
+class _RekeyThumbsOp:
+    """Point ``thumbnail_cache`` rows at the keys of their moved sources."""
+
+    def __init__(self, pairs: List[Tuple[str, str]]):
+        self._rows = [(new, old) for old, new in pairs]
+
+    def apply(self, conn) -> None:
+        conn.executemany(
+            "UPDATE OR REPLACE thumbnail_cache SET hash_key = ? WHERE hash_key = ?",
+            self._rows,
+        )
+
+
+def rekey(
+    moves: Iterable[Tuple[str, str, int]], *,
+    thumbs_dir: _PathLike, write_queue,
+) -> int:
+    """Carry cached thumbnails over a source move instead of re-encoding.
+
+    ``moves`` are ``(old_posix_path, new_posix_path, mtime_ns)``.  The key
+    embeds the path, so a moved image would otherwise miss the cache; the
+    bytes are unchanged, so the old .webp is renamed to the new key and
+    its LRU row follows.  Returns how many files were carried over.
+    """
+    pairs: List[Tuple[str, str]] = []
+    for old_path, new_path, mtime_ns in moves:
+        old_key = hash_key_for(old_path, mtime_ns)
+        new_key = hash_key_for(new_path, mtime_ns)
+        src = thumb_path_for(old_key, thumbs_dir)
+        dst = thumb_path_for(new_key, thumbs_dir)
+        try:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(src, dst)
+        except OSError:
+            continue  # never generated (or gone): regenerates on demand
+        pairs.append((old_key, new_key))
+    if pairs:
+        try:
+            write_queue.enqueue_write(_repo.LOW, _RekeyThumbsOp(pairs))
+        except Exception:
+            logger.exception("thumbs: rekey enqueue failed (%d files)", len(pairs))
+    return len(pairs)
+
+
 # -- flusher op + daemon ----------------------------------------------------
 
 class _TouchFlushOp:
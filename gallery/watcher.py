@@ -1,8 +1,9 @@
 """XYZ Image Gallery — per-root ``watchdog`` Observers + ``Coalescer`` (T20).
 
-FS events (debounced + coalesced) hand off to ``indexer.index_one`` /
-``indexer.delete_one``.  Overflow → ``indexer.delta_scan`` (SPEC §8.2 /
-TASKS T20).  WS 广播经 ``service`` 薄封装。
+FS events (debounced + coalesced) hand off, one flush chunk at a time, to
+``indexer.index_many`` / ``indexer.delete_many``.  Overflow → ``indexer.delta_scan`` (SPEC §8.2 /
+TASKS T20).  Deletes wait briefly for a matching create so OS-level moves
+become ``indexer.relocate_many`` instead of delete + re-index.  WS 广播经 ``service`` 薄封装。
 """
 
 from __future__ import annotations
@@ -12,6 +13,7 @@ import os
 import threading
 import time
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -80,6 +82,68 @@ def _bypasses_watcher_path_event(last_path: str, ev: str) -> bool:
 
 _IMAGE_EXTS: frozenset = frozenset({".png", ".jpg", ".jpeg", ".webp"})
 
+# ---- rename matcher: deletes wait here for a matching create ----------------
+#
+# A move the OS reports as delete + create (across roots, or from a file
+# manager that does not emit moves) would drop the row — and with it
+# DB-only tags / favorites — then re-parse the file under its new path.
+# Instead a flushed delete parks its row for ``Coalescer.RENAME_WINDOW_S``;
+# a create flushed by *any* root's coalescer in that window that
+# ``indexer.pair_moves`` matches re-points the row.  Unclaimed rows are
+# deleted by their own coalescer once the window lapses.
+
+_parked: Dict[str, Tuple[int, Dict[str, Any], float]] = {}  # path → (root_id, row, deadline)
+_parked_lock = threading.Lock()
+
+
+def _park_deletes(root_id: int, rows: List[Dict[str, Any]], deadline: float) -> None:
+    with _parked_lock:
+        for row in rows:
+            _parked[str(row["path"])] = (int(root_id), row, deadline)
+
+
+def _unpark(posix_paths: List[str]) -> None:
+    """A path that came back before its delete applied is not a move source."""
+    with _parked_lock:
+        for p in posix_paths:
+            _parked.pop(p, None)
+
+
+def _claim_moves(
+    fresh: List[Tuple[str, os.stat_result]],
+) -> List[Tuple[Dict[str, Any], str, os.stat_result]]:
+    from . import indexer as _indexer
+
+    with _parked_lock:
+        if not _parked:
+            return []
+        pairs = _indexer.pair_moves([v[1] for v in _parked.values()], fresh)
+        for row, _a, _st in pairs:
+            _parked.pop(str(row["path"]), None)
+    return pairs
+
+
+def _take_expired(root_id: int, now: float) -> List[str]:
+    with _parked_lock:
+        due = [p for p, (rid, _row, dl) in _parked.items()
+               if rid == root_id and dl <= now]
+        for p in due:
+            del _parked[p]
+    return due
+
+
+def _drop_parked() -> int:
+    """Forget every parked row (watchers stopped: no coalescer owns them)."""
+    with _parked_lock:
+        n = len(_parked)
+        _parked.clear()
+    return n
+
+
+def _has_parked(root_id: int) -> bool:
+    with _parked_lock:
+        return any(rid == root_id for rid, _row, _dl in _parked.values())
+
 # ---- T25: coalescer counters (reset when heartbeat writes audit stats) ----
 
 _coalescer_events_seen: int = 0
@@ -107,11 +171,16 @@ def snapshot_coalescer_stats_for_audit() -> Tuple[int, int]:
 
 def _fan_out_delta_scan_result(root: Dict[str, Any], st: Dict[str, Any]) -> None:
     """WS: deleted rows + optional drift envelope (T25)."""
-    from . import service as _service
     from . import ws_hub as _ws_hub
 
-    for iid in st.get("deleted_ids") or []:
-        _service.broadcast_image_deleted(int(iid))
+    _ws_hub.broadcast_many(
+        _ws_hub.IMAGE_DELETED,
+        [{"id": int(iid)} for iid in st.get("deleted_ids") or []],
+    )
+    _ws_hub.broadcast_many(
+        _ws_hub.IMAGE_UPSERTED,
+        [{"id": int(iid)} for iid in st.get("moved_ids") or []],
+    )
     ch = int(st.get("changed", 0))
     rm = int(st.get("removed", 0))
     if ch > 0 or rm > 0:
@@ -227,6 +296,9 @@ class Coalescer:
     # ``index.done`` — a second batch of OS events (large moves) can arrive
     # seconds later; merge them into the same job instead of two modals.
     WATCHER_SESSION_END_DELAY_S: float = 2.5
+    # How long a flushed delete waits for its create (see ``_park_deletes``).
+    # Shorter than the session end delay so the job outlives the window.
+    RENAME_WINDOW_S: float = 2.0
 
     def __init__(self, *, root: Dict[str, Any], db_path: Any, write_queue: Any, delta: _DeltaArmer) -> None:
         self._root = root
@@ -314,6 +386,32 @@ class Coalescer:
         self._watcher_end_timer = t
         t.start()
 
+    def _delete_parked(self, now: float) -> None:
+        """Apply this root's parked deletes whose rename window ended by ``now``."""
+        from . import indexer as _indexer
+        from . import service as _service
+
+        root_id = int(self._root["id"])
+        expired = [p for p in _take_expired(root_id, now)
+                   if not os.path.isfile(p)]
+        if not expired:
+            return
+        try:
+            _service.broadcast_images_deleted(_indexer.delete_many(
+                expired,
+                db_path=self._db_path,
+                write_queue=self._write_queue,
+            ))
+        except Exception:
+            logger.exception(
+                "parked delete failed root_id=%s (%d paths)",
+                root_id, len(expired),
+            )
+
+    def flush_parked(self) -> None:
+        """On shutdown: apply every parked delete now instead of losing it."""
+        self._delete_parked(float("inf"))
+
     def _watcher_on_idle(self) -> None:
         from . import indexer as _indexer
         from . import job_registry as _jobs
@@ -324,7 +422,7 @@ class Coalescer:
             self._watcher_end_timer = None
             if not self._watcher_job_id:
                 return
-            if self._buf:
+            if self._buf or _has_parked(r_id):
                 self._schedule_watcher_end_timer()
                 return
             jid = str(self._watcher_job_id)
@@ -342,6 +440,34 @@ class Coalescer:
             jid, root_id=r_id, phase="", ok=1, failed=0,
         )
 
+    def _relocate_moved(self, fresh: List[str]) -> List[str]:
+        """Re-point parked rows at matching new paths; returns the rest."""
+        from . import indexer as _indexer
+        from . import service as _service
+
+        _unpark([Path(p).as_posix() for p in fresh])
+        stats: List[Tuple[str, os.stat_result]] = []
+        for p in fresh:
+            try:
+                stats.append((p, os.stat(p)))
+            except OSError:
+                continue
+        pairs = _claim_moves(stats)
+        if not pairs:
+            return fresh
+        moved, failed = _indexer.relocate_many(
+            pairs, root=self._root,
+            db_path=self._db_path, write_queue=self._write_queue,
+        )
+        if moved:
+            _service.broadcast_images_upserted(moved)
+        if failed:
+            # Fall back to delete + index for these.
+            _park_deletes(int(self._root["id"]), [r for r, _a in failed],
+                          time.monotonic())
+        paired = {a for _r, a, _st in pairs} - {a for _r, a in failed}
+        return [p for p in fresh if p not in paired]
+
     def _tick_loop(self) -> None:
         from . import indexer as _indexer
         from . import job_registry as _jobs
@@ -401,53 +527,57 @@ class Coalescer:
             try:
                 for i in range(0, nflush, self.FLUSH_MAX):
                     chunk = to_flush[i: i + self.FLUSH_MAX]
-                    for _k, pend in chunk:
-                        if pend.act == "d":
-                            iid = _indexer.delete_one(
-                                pend.path,
-                                db_path=self._db_path,
-                                write_queue=self._write_queue,
-                            )
-                            if iid is not None:
-                                _service.broadcast_image_deleted(int(iid))
-                        else:
-                            if not _is_image_name(os.path.basename(pend.path)):
-                                pass
-                            elif _is_derivative_excluded_path(
-                                pend.path, str(self._root["path"]),
-                            ):
-                                pass
-                            else:
-                                iid = _indexer.index_one(
-                                    pend.path, root=self._root,
-                                    db_path=self._db_path,
-                                    write_queue=self._write_queue,
-                                )
-                                if iid is not None:
-                                    _service.broadcast_image_upserted(int(iid))
-                        if self._watcher_job_id is not None:
-                            with self._lock:
-                                self._watcher_cum_done += 1
-                                cd = int(self._watcher_cum_done)
-                                cp = int(self._watcher_cum_planned)
-                                jcur = str(self._watcher_job_id)
-                            if (
-                                cd == 1
-                                or cd == cp
-                                or (cd % 10 == 0 and cd < cp)
-                            ):
-                                _jobs.emit_index_progress(
-                                    jcur,
-                                    done=cd,
-                                    total=cp,
-                                    root_id=root_id,
-                                    phase="",
-                                    message=w_msg,
-                                )
+                    # Keys are unique per flush, so deletes and upserts of
+                    # one chunk are independent: one batch call each.
+                    gone = [p.path for _k, p in chunk if p.act == "d"]
+                    fresh = [
+                        p.path for _k, p in chunk
+                        if p.act != "d"
+                        and _is_image_name(os.path.basename(p.path))
+                        and not _is_derivative_excluded_path(
+                            p.path, str(self._root["path"]),
+                        )
+                    ]
+                    if gone:
+                        _park_deletes(root_id, _indexer.load_move_candidates(
+                            [Path(p).as_posix() for p in gone],
+                            db_path=self._db_path,
+                        ), time.monotonic() + self.RENAME_WINDOW_S)
+                    if fresh:
+                        fresh = self._relocate_moved(fresh)
+                    if fresh:
+                        _service.broadcast_images_upserted(_indexer.index_many(
+                            fresh, root=self._root,
+                            db_path=self._db_path,
+                            write_queue=self._write_queue,
+                        ))
+                    if self._watcher_job_id is not None:
+                        with self._lock:
+                            self._watcher_cum_done += len(chunk)
+                            cd = int(self._watcher_cum_done)
+                            cp = int(self._watcher_cum_planned)
+                            jcur = str(self._watcher_job_id)
+                        _jobs.emit_index_progress(
+                            jcur,
+                            done=cd,
+                            total=cp,
+                            root_id=root_id,
+                            phase="",
+                            message=w_msg,
+                        )
+            except Exception:
+                # Keep the tick thread alive; the heartbeat delta scan
+                # reconciles whatever this flush left behind.
+                logger.exception(
+                    "coalescer flush failed root_id=%s (%d events)",
+                    root_id, nflush,
+                )
             finally:
                 if nflush and self._watcher_job_id is not None:
                     self._schedule_watcher_end_timer()
 
+            self._delete_parked(time.monotonic())
+
             with self._lock:
                 fm = self._folder_mono
                 if fm is not None and now - fm >= self.DEBOUNCE_S:
@@ -702,5 +832,11 @@ def stop_file_watchers() -> None:
         c.request_stop()
     for c in _CLS:
         c.join_tick()
+    # ``_parked`` lives in memory only: a delete still waiting for its
+    # create would otherwise leave the row behind until the next delta
+    # scan.  The WriteQueue is still up (it stops after the watchers).
+    for c in _CLS:
+        c.flush_parked()
+    _drop_parked()
     _OBS, _CLS = [], []
     _WSTARTED = False
@@ -3,8 +3,19 @@
 SPEC §7.9 wire envelope: ``{"type": <string>, "data": <object>, "ts": <epoch_ms>}``.
 
 ``broadcast`` is **fire-and-forget** (ARCHITECTURE §4.4): safe to call from
-async request handlers via ``create_task``, and thread-safe when the aiohttp
-event loop has been captured (first successful WS ``prepare``).
+async request handlers, and thread-safe when the aiohttp event loop has
+been captured (first successful WS ``prepare``).  Each envelope is encoded
+once and offered to every tab's bounded outbound queue; one writer task
+per tab drains it, so a slow tab never delays the others.  A tab whose
+queue overflows loses its backlog and receives ``resync_required``.
+
+Bulk paths use two helpers on top of it:
+  * ``broadcast_many`` — per-item events for small sets (unchanged
+    contract), ``<type>.batch`` envelopes (``{"ids": [...], "items":
+    [...]}``) once a set exceeds ``BATCH_MIN_ITEMS``.
+  * ``broadcast_coalesced`` — latest-wins per ``(type, key)`` at most once
+    per ``COALESCE_INTERVAL_SEC`` (progress streams); ``flush_coalesced``
+    settles a key before its terminal event.
 """
 
 from __future__ import annotations
@@ -14,8 +25,7 @@ import json
 import logging
 import threading
 import time
-from concurrent.futures import Future as CFuture
-from typing import Any, Dict, Optional, Set
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from aiohttp import web
 
@@ -36,6 +46,20 @@ JOB_PROGRESS = "job.progress"
 JOB_COMPLETED = "job.completed"
 INDEX_DRIFT_DETECTED = "index.drift_detected"
 
+# ``broadcast_many`` envelopes: ``<event type>`` + this suffix.
+BATCH_SUFFIX = ".batch"
+IMAGE_UPSERTED_BATCH = IMAGE_UPSERTED + BATCH_SUFFIX
+IMAGE_UPDATED_BATCH = IMAGE_UPDATED + BATCH_SUFFIX
+IMAGE_DELETED_BATCH = IMAGE_DELETED + BATCH_SUFFIX
+
+# Up to this many items still go out one envelope each (single PATCH,
+# two-image bulk, …) so small operations look exactly as before.
+BATCH_MIN_ITEMS = 8
+# Upper bound on items per ``.batch`` frame.
+BATCH_MAX_ITEMS = 1000
+# Progress streams: at most one envelope per (type, key) per window.
+COALESCE_INTERVAL_SEC = 0.1
+
 __all__ = [
     "IMAGE_UPSERTED",
     "IMAGE_UPDATED",
@@ -46,19 +70,102 @@ __all__ = [
     "IMAGE_SYNC_STATUS_CHANGED",
     "BULK_PROGRESS",
     "BULK_COMPLETED",
+    "RESYNC_REQUIRED",
     "JOB_PROGRESS",
     "JOB_COMPLETED",
     "INDEX_DRIFT_DETECTED",
+    "BATCH_SUFFIX",
+    "IMAGE_UPSERTED_BATCH",
+    "IMAGE_UPDATED_BATCH",
+    "IMAGE_DELETED_BATCH",
+    "BATCH_MIN_ITEMS",
+    "BATCH_MAX_ITEMS",
+    "COALESCE_INTERVAL_SEC",
     "get_last_event_ts",
     "broadcast",
     "broadcast_await",
+    "broadcast_many",
+    "broadcast_coalesced",
+    "flush_coalesced",
     "reset_clients",
     "add_client",
     "remove_client",
+    "send_to",
+    "client_stats",
+    "CLIENT_QUEUE_MAX",
 ]
 
+# Per-client outbound queue depth.  A tab that falls this far behind is
+# cut over to ``resync_required`` instead of holding frames for it.
+CLIENT_QUEUE_MAX = 1024
+RESYNC_REQUIRED = "resync_required"
+
+
+class _Client:
+    """One connected tab: bounded FIFO of encoded frames + its writer task."""
+
+    __slots__ = (
+        "ws", "label", "queue", "task", "connected_ms", "sent", "dropped",
+        "resyncs", "last_latency_ms", "max_latency_ms", "avg_latency_ms",
+    )
+
+    def __init__(self, ws: web.WebSocketResponse, label: str) -> None:
+        self.ws = ws
+        self.label = label
+        self.queue: "asyncio.Queue[Tuple[bytes, float]]" = asyncio.Queue(
+            maxsize=CLIENT_QUEUE_MAX)
+        self.task: Optional["asyncio.Task[None]"] = None
+        self.connected_ms = int(time.time() * 1000)
+        self.sent = 0
+        self.dropped = 0
+        self.resyncs = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.avg_latency_ms = 0.0
+
+    def offer(self, frame: bytes) -> None:
+        """Enqueue without waiting (loop thread only)."""
+        try:
+            self.queue.put_nowait((frame, time.monotonic()))
+            return
+        except asyncio.QueueFull:
+            pass
+        # Overflow: everything queued is stale for this tab anyway; swap it
+        # for one resync marker so the SPA refetches instead of replaying.
+        dropped = 1
+        while True:
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            dropped += 1
+        self.dropped += dropped
+        self.resyncs += 1
+        logger.warning(
+            "ws client %s overflowed (%d frames dropped); resync requested",
+            self.label, dropped,
+        )
+        self.queue.put_nowait((_encode(RESYNC_REQUIRED, {
+            "reason": "queue_overflow", "dropped": dropped,
+        }), time.monotonic()))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "client": self.label,
+            "connected_ms": self.connected_ms,
+            "queue_depth": self.queue.qsize(),
+            "queue_max": CLIENT_QUEUE_MAX,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "resyncs": self.resyncs,
+            "last_latency_ms": round(self.last_latency_ms, 3),
+            "avg_latency_ms": round(self.avg_latency_ms, 3),
+            "max_latency_ms": round(self.max_latency_ms, 3),
+        }
+
+
 _clients_lock = threading.Lock()
-_clients: Set[web.WebSocketResponse] = set()
+_clients: Dict[web.WebSocketResponse, _Client] = {}
 _event_loop: Optional[asyncio.AbstractEventLoop] = None
 _last_event_ms: int = 0
 
@@ -67,25 +174,73 @@ def reset_clients() -> None:
     """Clear connection registry (offline tests only)."""
     global _event_loop, _last_event_ms
     with _clients_lock:
+        stale = list(_clients.values())
         _clients.clear()
+    for c in stale:
+        if c.task is not None:
+            c.task.cancel()
+    with _coalesce_lock:
+        _coalesce.clear()
     _event_loop = None
     _last_event_ms = 0
 
 
-async def add_client(ws: web.WebSocketResponse) -> None:
+async def add_client(ws: web.WebSocketResponse, *, label: str = "") -> None:
     global _event_loop
     if _event_loop is None:
         _event_loop = asyncio.get_running_loop()
+    client = _Client(ws, label or f"ws-{id(ws):x}")
+    client.task = asyncio.get_running_loop().create_task(_writer(client))
     with _clients_lock:
-        _clients.add(ws)
+        _clients[ws] = client
 
 
 async def remove_client(ws: web.WebSocketResponse) -> None:
     with _clients_lock:
-        _clients.discard(ws)
+        client = _clients.pop(ws, None)
+    if client is not None and client.task is not None:
+        client.task.cancel()
+
+
+def client_stats() -> List[Dict[str, Any]]:
+    """Per-tab queue depth / drop / send-latency counters."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return [c.stats() for c in clients]
+
+
+async def _writer(client: _Client) -> None:
+    # One task per tab: a slow socket only ever blocks its own queue.
+    ws = client.ws
+    send_frame = getattr(ws, "send_frame", None)
+    try:
+        while True:
+            frame, queued_at = await client.queue.get()
+            if ws.closed:
+                break
+            if send_frame is not None:
+                await send_frame(frame, web.WSMsgType.TEXT)
+            else:  # aiohttp < 3.11
+                await ws.send_str(frame.decode("utf-8"))
+            lat = (time.monotonic() - queued_at) * 1000.0
+            client.sent += 1
+            client.last_latency_ms = lat
+            if lat > client.max_latency_ms:
+                client.max_latency_ms = lat
+            client.avg_latency_ms = (
+                lat if client.sent == 1
+                else client.avg_latency_ms * 0.9 + lat * 0.1
+            )
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.debug("ws send failed; dropping socket", exc_info=True)
+    with _clients_lock:
+        if _clients.get(ws) is client:
+            del _clients[ws]
 
 
-def _envelope(event_type: str, data: Dict[str, Any]) -> str:
+def _encode(event_type: str, data: Dict[str, Any]) -> bytes:
     global _last_event_ms
     ts = int(time.time() * 1000)
     _last_event_ms = ts
@@ -94,7 +249,7 @@ def _envelope(event_type: str, data: Dict[str, Any]) -> str:
         "data": data,
         "ts": ts,
     }
-    return json.dumps(payload, separators=(",", ":"))
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
 
 
 def get_last_event_ts() -> int:
@@ -102,24 +257,22 @@ def get_last_event_ts() -> int:
     return int(_last_event_ms)
 
 
-async def _broadcast_coro(event_type: str, data: Dict[str, Any]) -> None:
-    text = _envelope(event_type, data)
+def _fan_out(frame: bytes) -> None:
+    # Loop thread. Every tab shares the same encoded bytes.
     with _clients_lock:
-        targets = list(_clients)
-    dead: list[web.WebSocketResponse] = []
-    for ws in targets:
-        if ws.closed:
-            dead.append(ws)
+        targets = list(_clients.values())
+    for client in targets:
+        if client.ws.closed:
             continue
-        try:
-            await ws.send_str(text)
-        except Exception:
-            logger.debug("ws send failed; dropping socket", exc_info=True)
-            dead.append(ws)
-    if dead:
-        with _clients_lock:
-            for ws in dead:
-                _clients.discard(ws)
+        client.offer(frame)
+
+
+def send_to(ws: web.WebSocketResponse, text: str) -> None:
+    """Queue a direct reply (e.g. ``pong``) behind this tab's pending frames."""
+    with _clients_lock:
+        client = _clients.get(ws)
+    if client is not None:
+        client.offer(text.encode("utf-8"))
 
 
 def _schedule_broadcast(event_type: str, data: Dict[str, Any]) -> None:
@@ -130,41 +283,152 @@ def _schedule_broadcast(event_type: str, data: Dict[str, Any]) -> None:
         if loop is None:
             logger.debug("ws broadcast skipped (no event loop yet)")
             return
-
-        def _log_exc(fut: CFuture[Any]) -> None:
-            exc = fut.exception()
-            if exc:
-                logger.warning("ws broadcast task failed: %s", exc)
-
-        fut = asyncio.run_coroutine_threadsafe(
-            _broadcast_coro(event_type, data), loop)
-        fut.add_done_callback(_log_exc)
+        # Encode on the calling (worker) thread; the loop only enqueues.
+        frame = _encode(event_type, data)
+        try:
+            loop.call_soon_threadsafe(_fan_out, frame)
+        except RuntimeError:
+            logger.debug("ws broadcast skipped (event loop closed)")
         return
-
-    task = loop.create_task(_broadcast_coro(event_type, data))
-
-    def _done(t: asyncio.Task[Any]) -> None:
-        if t.cancelled():
-            return
-        exc = t.exception()
-        if exc:
-            logger.warning("ws broadcast task failed: %s", exc)
-
-    task.add_done_callback(_done)
+    _fan_out(_encode(event_type, data))
 
 
 def broadcast(event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
     """Fan-out one event to every connected tab (thread-safe).
 
-    Must not block the event loop for heavy work — this only schedules
-    JSON sends. Callers that already sit on the loop get a background
-    ``Task``; worker threads use ``run_coroutine_threadsafe`` once
-    ``_event_loop`` has been captured by the first WS handshake.
+    Never waits on a socket: the envelope is encoded once and offered to
+    each tab's bounded queue (``CLIENT_QUEUE_MAX``); per-tab writer tasks
+    do the sends.  Worker threads hand the frame to the loop captured by
+    the first WS handshake.
     """
     _schedule_broadcast(event_type, dict(data) if data else {})
 
 
 async def broadcast_await(
         event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
-    """Same fan-out as ``broadcast`` but awaitable (strict ordering for tests)."""
-    await _broadcast_coro(event_type, dict(data) if data else {})
+    """Same fan-out as ``broadcast`` from the loop (ordered per tab)."""
+    _fan_out(_encode(event_type, dict(data) if data else {}))
+
+
+def broadcast_many(
+        event_type: str, items: Sequence[Dict[str, Any]]) -> None:
+    """Fan-out one ``event_type`` per item, batching large sets.
+
+    ``len(items) <= BATCH_MIN_ITEMS`` → one ordinary envelope per item.
+    Otherwise ``<event_type>.batch`` frames of up to ``BATCH_MAX_ITEMS``:
+    ``{"ids": [...]}`` plus ``"items"`` (the per-event ``data`` dicts, in
+    order) whenever an item carries more than its ``id``.
+    """
+    rows = [dict(it) for it in items]
+    if len(rows) <= BATCH_MIN_ITEMS:
+        for row in rows:
+            broadcast(event_type, row)
+        return
+    for off in range(0, len(rows), BATCH_MAX_ITEMS):
+        chunk = rows[off:off + BATCH_MAX_ITEMS]
+        data: Dict[str, Any] = {"ids": [row.get("id") for row in chunk]}
+        if any(len(row) > 1 or "id" not in row for row in chunk):
+            data["items"] = chunk
+        broadcast(event_type + BATCH_SUFFIX, data)
+
+
+# ---- time-windowed coalescing ---------------------------------------------
+
+class _CoalesceSlot:
+    __slots__ = ("last_sent", "pending", "armed")
+
+    def __init__(self) -> None:
+        self.last_sent = 0.0
+        self.pending: Optional[Dict[str, Any]] = None
+        self.armed = False
+
+
+_coalesce_lock = threading.Lock()
+_coalesce: Dict[Tuple[str, str], _CoalesceSlot] = {}
+# Idle slots are pruned past this many keys (jobs that never flushed).
+_COALESCE_MAX_SLOTS = 1024
+
+
+def _timer_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return _event_loop
+
+
+def broadcast_coalesced(
+    event_type: str,
+    data: Optional[Dict[str, Any]] = None,
+    *,
+    key: str = "",
+    interval: float = COALESCE_INTERVAL_SEC,
+) -> None:
+    """``broadcast`` at most once per ``interval`` for ``(event_type, key)``.
+
+    The first event of a quiet window goes out immediately; later ones in
+    the window replace each other and the newest is sent when the window
+    closes.  Without a captured loop this is a plain ``broadcast`` (which
+    then has nowhere to deliver anyway).
+    """
+    payload = dict(data) if data else {}
+    loop = _timer_loop()
+    if loop is None or interval <= 0:
+        broadcast(event_type, payload)
+        return
+    k = (event_type, str(key))
+    now = time.monotonic()
+    arm_after: Optional[float] = None
+    with _coalesce_lock:
+        slot = _coalesce.get(k)
+        if slot is None:
+            if len(_coalesce) >= _COALESCE_MAX_SLOTS:
+                for idle in [kk for kk, sl in _coalesce.items()
+                             if sl.pending is None and not sl.armed]:
+                    del _coalesce[idle]
+            slot = _CoalesceSlot()
+            _coalesce[k] = slot
+        wait = slot.last_sent + interval - now
+        if wait <= 0 and not slot.armed:
+            slot.last_sent = now
+            send_now = True
+        else:
+            send_now = False
+            slot.pending = payload
+            if not slot.armed:
+                slot.armed = True
+                arm_after = max(0.0, wait)
+    if send_now:
+        broadcast(event_type, payload)
+    elif arm_after is not None:
+        loop.call_soon_threadsafe(loop.call_later, arm_after, _flush_slot, k)
+
+
+def _flush_slot(k: Tuple[str, str]) -> None:
+    with _coalesce_lock:
+        slot = _coalesce.get(k)
+        if slot is None:
+            return  # flushed / discarded by ``flush_coalesced``
+        payload = slot.pending
+        slot.pending = None
+        slot.armed = False
+        if payload is None:
+            return
+        slot.last_sent = time.monotonic()
+    broadcast(k[0], payload)
+
+
+def flush_coalesced(key: str = "", *, discard: bool = False) -> None:
+    """Send (or drop) every pending coalesced event for ``key`` now.
+
+    Call before a stream's terminal event (``bulk.completed`` /
+    ``job.completed``) so no trailing progress frame lands after it.
+    """
+    with _coalesce_lock:
+        slots: List[Tuple[Tuple[str, str], _CoalesceSlot]] = [
+            (k, _coalesce.pop(k)) for k in list(_coalesce) if k[1] == str(key)
+        ]
+    if discard:
+        return
+    for k, slot in slots:
+        if slot.pending is not None:
+            broadcast(k[0], slot.pending)
@@ -6,7 +6,7 @@ import { ConfirmModal } from './ConfirmModal.js';
 import * as api from '../api.js';
 import { executeBulkImageDownloads } from '../stores/downloadHelper.js';
 import { vocabCacheClear } from '../stores/vocab.js';
-import { subscribeGalleryEvent } from '../stores/connection.js';
+import { subscribeGalleryEvent, waitForBulkJob } from '../stores/connection.js';
 import {
   selectionState, buildWireSelection, resetSelection, setSelectAllInView,
 } from '../stores/selection.js';
@@ -252,10 +252,17 @@ export const BulkBar = defineComponent({
       bulkDone.value = 0;
       bulkTotal.value = 0;
       try {
-        await api.post('/bulk/delete/execute', { plan_id: deletePlanId.value });
+        // 202: the delete runs as a background job; stay busy until it ends.
+        const out = await api.post('/bulk/delete/execute', { plan_id: deletePlanId.value });
+        const res = await waitForBulkJob((out && out.job_id) || deletePlanId.value);
         closeDeleteConfirm();
         resetSelection();
         emit('moved');
+        if (!res.ok) {
+          errorText.value = 'Delete failed — see the server log.';
+        } else if (res.failed) {
+          errorText.value = `${res.failed} image(s) could not be deleted.`;
+        }
       } catch (e) {
         errorText.value = (e && e.message) ? String(e.message) : String(e);
       } finally {
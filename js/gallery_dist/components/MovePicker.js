@@ -4,6 +4,7 @@ import {
 } from 'vue';
 import * as api from '../api.js';
 import { buildWireSelection } from '../stores/selection.js';
+import { waitForBulkJob } from '../stores/connection.js';
 
 function fmtBytes(n) {
   const x = Number(n) || 0;
@@ -158,9 +159,17 @@ export const MovePicker = defineComponent({
         if (Object.keys(ro).length) {
           body.rename_overrides = ro;
         }
-        await api.post('/bulk/move/execute', body);
+        // 202: the move runs as a background job; stay busy until it ends.
+        const out = await api.post('/bulk/move/execute', body);
+        const res = await waitForBulkJob((out && out.job_id) || planId.value);
         emit('done');
-        emit('close');
+        if (!res.ok) {
+          err.value = 'Move failed — see the server log.';
+        } else if (res.failed) {
+          err.value = `${res.failed} image(s) could not be moved.`;
+        } else {
+          emit('close');
+        }
       } catch (e) {
         err.value = (e && e.message) ? String(e.message) : String(e);
       } finally {
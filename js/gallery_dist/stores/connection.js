@@ -11,6 +11,7 @@ const EV = {
   FOLDER_CHANGED: 'folder.changed',
   BULK: 'bulk.progress',
   BULK_DONE: 'bulk.completed',
+  RESYNC: 'resync_required',
   PONG: 'pong',
 };
 
@@ -43,6 +44,56 @@ export function subscribeReconcile(fn) {
   return () => { reconcileSubs.delete(fn); };
 }
 
+const BULK_JOB_POLL_MS = 2000;
+
+/**
+ * Resolve once the persisted bulk job ``jobId`` (move / delete execute →
+ * ``202 {job_id}``) finishes: on its ``bulk.completed`` event, or via
+ * ``GET /bulk/jobs/{id}`` polling when the socket is down or the event
+ * went out before we subscribed.  Result: ``{ ok, failed }`` — ``ok`` is
+ * false when the job itself failed, ``failed`` counts failed rows.
+ */
+export function waitForBulkJob(jobId, { pollMs = BULK_JOB_POLL_MS } = {}) {
+  const id = String(jobId);
+  return new Promise((resolve) => {
+    let timer = null;
+    let settled = false;
+    let unsub = null;
+    const finish = (ok, failed) => {
+      if (settled) return;
+      settled = true;
+      if (timer) clearTimeout(timer);
+      if (unsub) unsub();
+      resolve({ ok, failed: Number(failed) || 0 });
+    };
+    unsub = subscribeGalleryEvent((env) => {
+      if (!env || env.type !== EV.BULK_DONE || !env.data) return;
+      const d = env.data;
+      if (String(d.job_id || d.bulk_id || d.plan_id) !== id) return;
+      const failed = Array.isArray(d.failed) ? d.failed.length : d.failed;
+      finish(!d.error, failed);
+    });
+    const poll = async () => {
+      timer = null;
+      try {
+        const st = await api.get(`/bulk/jobs/${encodeURIComponent(id)}`);
+        if (st && (st.state === 'done' || st.state === 'failed')) {
+          finish(st.state === 'done', st.failed);
+          return;
+        }
+      } catch (e) {
+        // Pruned / unknown job: nothing left to wait for.
+        if (e && e.status === 404) {
+          finish(false, 0);
+          return;
+        }
+      }
+      if (!settled) timer = setTimeout(poll, pollMs);
+    };
+    void poll();
+  });
+}
+
 export function onWebSocketOpen(fn) {
   onOpenSubs.add(fn);
   if (typeof window !== 'undefined' && ws && ws.readyState === WebSocket.OPEN) {
@@ -61,6 +112,21 @@ function _emitOnOpen() {
   }
 }
 
+// ws_hub.broadcast_many: `<type>.batch` carries `ids` (+ per-event `items`);
+// subscribers keep seeing one plain `<type>` envelope per image.
+const BATCH_SUFFIX = '.batch';
+
+function unfoldBatch(env) {
+  const t = env && env.type;
+  if (typeof t !== 'string' || !t.endsWith(BATCH_SUFFIX)) return [env];
+  const d = env.data || {};
+  const base = t.slice(0, -BATCH_SUFFIX.length);
+  let items = [];
+  if (Array.isArray(d.items)) items = d.items;
+  else if (Array.isArray(d.ids)) items = d.ids.map((id) => ({ id }));
+  return items.map((data) => ({ type: base, data, ts: env.ts }));
+}
+
 function emitToSubs(set, a1, a2) {
   for (const fn of set) {
     try {
@@ -135,8 +201,13 @@ function openSocket() {
       return;
     }
     noteEnvelopeTs(env);
+    if (env && env.type === EV.RESYNC) {
+      // Server dropped this tab's backlog (outbound queue overflow).
+      emitToSubs(reconcileSubs, 'resync', env.ts);
+      return;
+    }
     if (env && env.type && env.type !== EV.PONG) {
-      emitToSubs(eventSubs, env);
+      for (const one of unfoldBatch(env)) emitToSubs(eventSubs, one);
     }
   });
   socket.addEventListener('close', () => {
@@ -352,6 +352,20 @@ def test_filters(db_path: Path, ref: dict) -> None:
     )
     assert {r.filename for r in prompt_hit.items} == {
         "flat_a.png", "fluffy.png"}, [r.filename for r in prompt_hit.items]
+
+    # Mixed tag + prompt AND, plus an unknown token short-circuiting.
+    mixed = repo.list_images(
+        db_path=db_path,
+        filter=repo.FilterSpec(tags_and=("cat",), prompts_and=("alone",)),
+        limit=50,
+    )
+    assert [r.filename for r in mixed.items] == ["fluffy.png"]
+    none = repo.list_images(
+        db_path=db_path,
+        filter=repo.FilterSpec(tags_and=("cat", "no-such-tag")),
+        limit=50,
+    )
+    assert none.items == () and none.total == 0
     print("T09 filter dimensions OK")
 
 
@@ -410,6 +424,43 @@ def test_folder_recursive(db_path: Path, ref: dict) -> None:
     print("T09 folder + recursive OK")
 
 
+def test_folder_filter_cache_generation(db_path: Path, ref: dict) -> None:
+    """Folder specs are memoised per folder generation: a committed folder
+    rewrite must invalidate, a raw write alone must not be observed."""
+    from gallery import db, repo
+    flt = repo.FilterSpec(folder_id=ref["out_a"], recursive=True)
+    first = repo.list_images(db_path=db_path, filter=flt, limit=50)
+    assert len(first.items) == 5
+    assert (str(db_path), flt) in repo._filter_sql_cache
+
+    conn = db.connect_write(db_path)
+    try:
+        conn.execute(
+            "UPDATE folder SET path = ? WHERE id = ?",
+            ("/scratch/output/day1_renamed", ref["out_a"]),
+        )
+    finally:
+        conn.close()
+    try:
+        # Cache hit: still compiled against day1/.
+        again = repo.list_images(db_path=db_path, filter=flt, limit=50)
+        assert [r.id for r in again.items] == [r.id for r in first.items]
+        repo.bump_folder_generation()
+        moved = repo.list_images(db_path=db_path, filter=flt, limit=50)
+        assert moved.items == ()
+    finally:
+        conn = db.connect_write(db_path)
+        try:
+            conn.execute(
+                "UPDATE folder SET path = ? WHERE id = ?",
+                ("/scratch/output/day1", ref["out_a"]),
+            )
+        finally:
+            conn.close()
+        repo.bump_folder_generation()
+    print("T09 folder filter cache generation OK")
+
+
 def test_sorts(db_path: Path, ref: dict) -> None:
     from gallery import repo
     for key in ("name", "time", "size", "folder"):
@@ -530,6 +581,28 @@ def test_neighbors(db_path: Path, ref: dict) -> None:
         filter=repo.FilterSpec(model="nonexistent"), sort=srt,
     )
     assert n.prev_id is None and n.next_id is None
+
+    # prefetch=N → next_ids mirrors the list order after the anchor.
+    n = repo.neighbors(all_ids[3], db_path=db_path, sort=srt, prefetch=3)
+    assert n.prev_id == all_ids[2]
+    assert n.next_id == all_ids[4]
+    assert n.next_ids == tuple(all_ids[4:7])
+    n = repo.neighbors(all_ids[-2], db_path=db_path, sort=srt, prefetch=5)
+    assert n.next_ids == (all_ids[-1],)
+    n = repo.neighbors(all_ids[3], db_path=db_path, sort=srt)
+    assert n.next_ids == ()
+
+    # desc walks the same list backwards.
+    n = repo.neighbors(
+        all_ids[3], db_path=db_path,
+        sort=repo.SortSpec(key="time", dir="desc"), prefetch=2,
+    )
+    assert n.prev_id == all_ids[4]
+    assert n.next_ids == (all_ids[2], all_ids[1])
+
+    # Folder-free specs are compiled once and reused.
+    flt = repo.FilterSpec(model="nonexistent")
+    assert ("", flt) in repo._filter_sql_cache
     print("T09 neighbors boundaries OK")
 
 
@@ -603,6 +676,24 @@ def test_explain_query_plan_hits_indexes(db_path: Path, ref: dict) -> None:
         ).fetchall()
         plan_text = " | ".join(str(r[3]) for r in plan)
         assert "idx_image_created_at" in plan_text, plan_text
+
+        # Vocab AND: rarest posting list drives, the rest are PK probes.
+        from gallery import repo
+        rconn = repo._db.connect_read(db_path)
+        try:
+            where_sql, params = repo._build_filter(
+                rconn, repo.FilterSpec(tags_and=("cat", "fluffy")))
+        finally:
+            rconn.close()
+        assert where_sql.startswith("image.id IN (SELECT p0.image_id"), where_sql
+        # 'fluffy' (1 use) is rarer than 'cat' (2 uses) → drives the join.
+        assert params == ["fluffy", "cat"], params
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT image.id FROM image WHERE " + where_sql,
+            params,
+        ).fetchall()
+        plan_text = " | ".join(str(r[3]) for r in plan)
+        assert "idx_image_tag_tag" in plan_text, plan_text
     finally:
         conn.close()
     print("T09 EXPLAIN QUERY PLAN index hits OK")
@@ -620,6 +711,7 @@ def main() -> None:
         test_cursor_stable_under_concurrent_insert(db_path, ref)
         test_filters(db_path, ref)
         test_folder_recursive(db_path, ref)
+        test_folder_filter_cache_generation(db_path, ref)
         test_sorts(db_path, ref)
         test_folder_line_header_sort_order(db_path, ref)
         test_total_estimate_cap(db_path, ref)
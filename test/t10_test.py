@@ -335,6 +335,52 @@ async def _assert_list_and_cursor(client: TestClient, ref: Dict[str, Any]
     print(f"T10 list + cursor OK ({pages} pages, {len(seen)} items)")
 
 
+async def _assert_grid_projection(client: TestClient, ref: Dict[str, Any]
+                                  ) -> None:
+    full = await (await client.get(
+        "/xyz/gallery/images?sort=name&dir=asc")).json()
+    # List pages skip the per-row prompt normalisation (detail-only field).
+    assert all(
+        "positive_prompt_normalized" not in it["metadata"]
+        for it in full["items"]
+    ), full["items"][0]
+
+    for sort in ("name", "folder"):
+        seen = []
+        cursor = None
+        while True:
+            qs = f"fields=grid&sort={sort}&dir=asc&limit=2"
+            if cursor:
+                qs += "&cursor=" + cursor
+            r = await client.get("/xyz/gallery/images?" + qs)
+            assert r.status == 200, r.status
+            data = await r.json()
+            for it in data["items"]:
+                assert set(it) == {
+                    "id", "filename", "size", "gallery", "thumb_url",
+                }, it
+                assert set(it["gallery"]) == {"favorite", "version"}
+                seen.append(it["id"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        ref_full = await (await client.get(
+            f"/xyz/gallery/images?sort={sort}&dir=asc")).json()
+        assert seen == [it["id"] for it in ref_full["items"]], (sort, seen)
+
+    grid = await (await client.get(
+        "/xyz/gallery/images?fields=grid&sort=name&dir=asc")).json()
+    a = next(it for it in grid["items"] if it["id"] == ref["id_a"])
+    a_full = next(it for it in full["items"] if it["id"] == ref["id_a"])
+    assert a["thumb_url"] == a_full["thumb_url"]
+    assert a["size"]["width"] == a_full["size"]["width"]
+    assert a["gallery"]["favorite"] is True
+
+    r = await client.get("/xyz/gallery/images?fields=bogus")
+    assert r.status == 400
+    print("T10 fields=grid projection OK")
+
+
 async def _assert_filters(client: TestClient, ref: Dict[str, Any]) -> None:
     # favorite=yes → id_a + id_c (both favorite=1).
     r = await client.get("/xyz/gallery/images?favorite=yes&sort=time&dir=asc")
@@ -399,6 +445,55 @@ async def _assert_count(client: TestClient, ref: Dict[str, Any]) -> None:
     print("T10 images/count OK")
 
 
+async def _assert_export(client: TestClient, ref: Dict[str, Any]) -> None:
+    r = await client.get("/xyz/gallery/images/export?sort=time&dir=asc")
+    assert r.status == 200, r.status
+    assert r.headers["Content-Type"].startswith("application/x-ndjson")
+    lines = (await r.text()).splitlines()
+    rows = [json.loads(ln) for ln in lines]
+    assert [row["id"] for row in rows] == [
+        ref["id_a"], ref["id_b"], ref["id_c"],
+        ref["id_outside"], ref["id_unicode"],
+    ], rows
+    assert rows[0]["positive_prompt"] == "a cat on a mat"
+    assert rows[0]["tags"] == ["cat", "cute"]
+    print("T10 export ndjson OK")
+
+    # Projection drops prompts; filter applies; CSV has a header row.
+    r = await client.get(
+        "/xyz/gallery/images/export?format=csv&favorite=yes"
+        "&sort=time&dir=asc&fields=id,filename,tags"
+    )
+    assert r.status == 200, r.status
+    assert r.headers["Content-Type"].startswith("text/csv")
+    text = await r.text()
+    assert "cat on a mat" not in text
+    assert text.splitlines() == [
+        "id,filename,tags",
+        f'{ref["id_a"]},a.png,"cat,cute"',
+        f'{ref["id_c"]},c.png,"landscape,mountain"',
+    ], text
+
+    # ... and the cursor never selects the pruned columns.
+    from gallery import repo
+
+    cur = repo.open_image_export(db_path=ref["db_path"], fields=("id", "tags"))
+    try:
+        recs = cur.fetch(10)
+    finally:
+        cur.close()
+    assert len(recs) == 5 and all(
+        rec.positive_prompt is None and rec.path == "" for rec in recs), recs
+    assert {rec.tags for rec in recs} >= {("cat", "cute")}, recs
+
+    r = await client.get("/xyz/gallery/images/export?fields=id,bogus")
+    assert r.status == 400
+    assert (await r.json())["error"]["code"] == "invalid_query"
+    r = await client.get("/xyz/gallery/images/export?format=xml")
+    assert r.status == 400
+    print("T10 export csv + projection OK")
+
+
 async def _assert_single_and_404(client: TestClient, ref: Dict[str, Any]
                                  ) -> None:
     from gallery.routes import _metadata_positive_prompt_normalized
@@ -540,8 +635,10 @@ async def _run_all(ref: Dict[str, Any]) -> None:
         async with TestClient(srv) as client:
             await _assert_folders(client, ref)
             await _assert_list_and_cursor(client, ref)
+            await _assert_grid_projection(client, ref)
             await _assert_filters(client, ref)
             await _assert_count(client, ref)
+            await _assert_export(client, ref)
             await _assert_single_and_404(client, ref)
             await _assert_neighbors(client, ref)
             await _assert_thumb(client, ref)
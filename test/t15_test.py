@@ -145,7 +145,7 @@ def test_schema_v3_and_vocab_op() -> None:
         finally:
             conn.close()
         (uv,) = sqlite3.connect(str(db_path)).execute("PRAGMA user_version").fetchone()
-        assert uv == 6, uv
+        assert uv == 10, uv
 
         wq = repo.WriteQueue(db_path)
         wq.start()
@@ -185,6 +185,127 @@ async def _test_threadsafe_broadcast(app: web.Application) -> None:
     print("T18 thread-safe broadcast OK")
 
 
+async def _test_batch_and_coalesce(app: web.Application) -> None:
+    from gallery import ws_hub as wh
+
+    async with TestServer(app) as srv:
+        async with TestClient(srv) as client:
+            ws = await client.ws_connect("/xyz/gallery/ws")
+            try:
+                # Small sets keep the per-event contract.
+                wh.broadcast_many(wh.IMAGE_DELETED, [{"id": 1}, {"id": 2}])
+                assert (await _drain(ws))["data"] == {"id": 1}
+                assert (await _drain(ws))["data"] == {"id": 2}
+
+                n = wh.BATCH_MAX_ITEMS + 5
+                wh.broadcast_many(
+                    wh.IMAGE_UPDATED,
+                    [{"id": i, "version": 2} for i in range(n)],
+                )
+                first = await _drain(ws)
+                second = await _drain(ws)
+                assert first["type"] == wh.IMAGE_UPDATED_BATCH, first
+                assert first["data"]["ids"] == list(range(wh.BATCH_MAX_ITEMS))
+                assert first["data"]["items"][3] == {"id": 3, "version": 2}
+                assert second["data"]["ids"] == list(
+                    range(wh.BATCH_MAX_ITEMS, n))
+                wh.broadcast_many(
+                    wh.IMAGE_DELETED,
+                    [{"id": i} for i in range(wh.BATCH_MIN_ITEMS + 1)],
+                )
+                ids_only = await _drain(ws)
+                assert ids_only["type"] == wh.IMAGE_DELETED_BATCH
+                assert "items" not in ids_only["data"], ids_only
+
+                # 50 progress calls inside one window → leading + trailing.
+                for i in range(50):
+                    wh.broadcast_coalesced(
+                        wh.BULK_PROGRESS, {"done": i}, key="b1")
+                lead = await _drain(ws)
+                trail = await _drain(ws, timeout=1.0)
+                assert lead["data"] == {"done": 0}, lead
+                assert trail["data"] == {"done": 49}, trail
+
+                # flush before a terminal event: pending progress first.
+                wh.broadcast_coalesced(wh.BULK_PROGRESS, {"done": 1}, key="b2")
+                wh.broadcast_coalesced(wh.BULK_PROGRESS, {"done": 2}, key="b2")
+                wh.flush_coalesced("b2")
+                wh.broadcast(wh.BULK_COMPLETED, {"done": 2})
+                seq = [await _drain(ws) for _ in range(3)]
+                assert [e["type"] for e in seq] == [
+                    wh.BULK_PROGRESS, wh.BULK_PROGRESS, wh.BULK_COMPLETED,
+                ], seq
+                assert seq[1]["data"] == {"done": 2}
+                await asyncio.sleep(wh.COALESCE_INTERVAL_SEC * 2)
+                try:
+                    extra = await _drain(ws, timeout=0.2)
+                except asyncio.TimeoutError:
+                    extra = None
+                assert extra is None, extra
+            finally:
+                await ws.close()
+    print("T18 batch envelopes + coalesced progress OK")
+
+
+class _StuckSocket:
+    """Stand-in for a tab on a dead link: every send blocks until released."""
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.release = asyncio.Event()
+        self.frames: list[bytes] = []
+
+    async def send_frame(self, frame: bytes, _opcode: Any) -> None:
+        await self.release.wait()
+        self.frames.append(frame)
+
+
+async def _test_slow_client_isolated(app: web.Application) -> None:
+    from gallery import ws_hub as wh
+
+    async with TestServer(app) as srv:
+        async with TestClient(srv) as client:
+            ws = await client.ws_connect("/xyz/gallery/ws")
+            stuck = _StuckSocket()
+            await wh.add_client(stuck, label="stuck")  # type: ignore[arg-type]
+            try:
+                n = wh.CLIENT_QUEUE_MAX + 10
+                for i in range(n):
+                    wh.broadcast("flood", {"i": i})
+                    if i % 64 == 0:
+                        # Let writer tasks run, as a real producer would.
+                        await asyncio.sleep(0)
+                # The healthy tab gets everything, in order, unaffected.
+                for i in range(n):
+                    body = await _drain(ws, timeout=10.0)
+                    assert body["data"]["i"] == i, body
+
+                stats = {c["client"]: c for c in wh.client_stats()}
+                st = stats["stuck"]
+                assert st["resyncs"] == 1, st
+                assert st["dropped"] > 0, st
+                assert st["queue_depth"] <= wh.CLIENT_QUEUE_MAX, st
+                assert stats[next(k for k in stats if k != "stuck")]["sent"] >= n
+
+                r = await client.get("/xyz/gallery/ws/stats")
+                assert r.status == 200
+                assert len((await r.json())["clients"]) == 2
+
+                stuck.release.set()
+                for _ in range(50):
+                    await asyncio.sleep(0.01)
+                    if any(b"resync_required" in f for f in stuck.frames):
+                        break
+                kinds = [json.loads(f)["type"] for f in stuck.frames]
+                assert "resync_required" in kinds, kinds[:5]
+                # Nothing older than the marker survives behind it.
+                assert kinds.index("resync_required") <= 1, kinds[:5]
+            finally:
+                await wh.remove_client(stuck)  # type: ignore[arg-type]
+                await ws.close()
+    print("T18 slow client bounded queue + resync_required OK")
+
+
 async def _run_all(scratch: Path) -> None:
     app = _build_app(scratch)
     try:
@@ -194,6 +315,8 @@ async def _run_all(scratch: Path) -> None:
         await _test_text_ping(app)
         await _test_1000_broadcasts(app)
         await _test_threadsafe_broadcast(app)
+        await _test_batch_and_coalesce(app)
+        await _test_slow_client_isolated(app)
     finally:
         wq = app.get("xyz_write_queue")
         if wq is not None:
@@ -112,6 +112,85 @@ def _delete_op() -> None:
     print("T20 delete_one + DeleteImageOp path OK")
 
 
+def _batch_flush() -> None:
+    """``index_many`` / ``delete_many``: one write op per chunk, ids in order."""
+    from PIL import Image
+
+    from gallery import indexer as gidx
+
+    th = Path(tempfile.mkdtemp())
+    try:
+        dbs, rdir, root, wq = _scratch_with_root(th)
+        (rdir / "r" / "sub").mkdir()
+        files = [rdir / "r" / "a.png", rdir / "r" / "sub" / "b.png",
+                 rdir / "r" / "c.png"]
+        for f in files:
+            Image.new("RGB", (3, 2), "red").save(f, format="PNG")
+        seen_ops: list = []
+        real_enqueue = wq.enqueue_write
+
+        def _spy(prio, op):
+            seen_ops.append(type(op).__name__)
+            return real_enqueue(prio, op)
+
+        with mock.patch.object(wq, "enqueue_write", side_effect=_spy):
+            ids = gidx.index_many(files, root=root, db_path=dbs, write_queue=wq)
+            assert seen_ops == ["UpsertImagesOp"], seen_ops
+            assert len(ids) == 3 and len(set(ids)) == 3, ids
+            # Unchanged fingerprints → nothing enqueued.
+            assert gidx.index_many(
+                files, root=root, db_path=dbs, write_queue=wq) == []
+            assert seen_ops == ["UpsertImagesOp"], seen_ops
+        conn = gallery_db.connect_read(dbs)
+        try:
+            got = [
+                conn.execute(
+                    "SELECT id, width FROM image WHERE path = ?",
+                    (f.as_posix(),),
+                ).fetchone()
+                for f in files
+            ]
+        finally:
+            conn.close()
+        assert [int(r["id"]) for r in got] == ids
+        assert all(int(r["width"]) == 3 for r in got)
+        for f in files[:2]:
+            f.unlink()
+        gone = gidx.delete_many(
+            files[:2] + [rdir / "r" / "never.png"], db_path=dbs, write_queue=wq,
+        )
+        assert sorted(gone) == sorted(ids[:2]), gone
+
+        # Any per-row error stays with its row; the rest of the chunk lands.
+        class _Bad:
+            path = "bad.png"
+
+            def apply(self, conn):
+                conn.execute("DELETE FROM image")
+                raise ValueError("bad vocab token")
+
+        class _Good:
+            path = "good.png"
+
+            def apply(self, conn):
+                return 7
+
+        out = wq.enqueue_write(
+            gallery_repo.LOW, gallery_repo.UpsertImagesOp([_Bad(), _Good()]),
+        ).result(timeout=5.0)
+        assert out == {"ids": {"good.png": 7},
+                       "failed": {"bad.png": "bad vocab token"}}, out
+        conn = gallery_db.connect_read(dbs)
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM image").fetchone()[0] == 1
+        finally:
+            conn.close()
+    finally:
+        wq.stop(timeout=2.0)
+        shutil.rmtree(th, ignore_errors=True)
+    print("T20 index_many / delete_many batch OK")
+
+
 def _coalescer_high_water() -> None:
     th = Path(tempfile.mkdtemp())
     try:
@@ -199,6 +278,7 @@ def _debounce_drain() -> None:
 def main() -> None:
     _merge_cases()
     _delete_op()
+    _batch_flush()
     _coalescer_high_water()
     _service_not_raises()
     _debounce_drain()
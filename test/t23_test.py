@@ -225,9 +225,82 @@ def test_bulk_favorite_and_tags() -> None:
         shutil.rmtree(scratch, ignore_errors=True)
 
 
+def test_bulk_update_op_matches_per_row_links() -> None:
+    import gallery as gallery_mod
+    from gallery import repo as g_repo
+    from gallery import service as g_service
+    from gallery import ws_hub as g_ws
+
+    db_path, scratch, i1, i2, i3 = _scratch_db_three()
+    old_chunk = g_repo.BULK_CHUNK_ROWS
+    try:
+        wq = g_repo.WriteQueue(db_path)
+        wq.start()
+        gallery_mod._write_queue = wq
+        # Seed links the way PATCH does so image_tag mirrors tags_csv.
+        for iid, tags in ((i1, ["t1", "t2"]), (i2, ["t1"]), (i3, ["t2"])):
+            wq.enqueue_write(g_repo.HIGH, g_repo.UpdateImageOp(
+                image_id=iid, normalized_tags=tags,
+            )).result(timeout=5)
+        events: list[tuple[str, dict]] = []
+        orig = g_ws.broadcast
+
+        def _cap(ty: str, data: dict | None = None) -> None:
+            events.append((ty, dict(data or {})))
+
+        g_ws.broadcast = _cap  # type: ignore[assignment]
+        g_repo.BULK_CHUNK_ROWS = 2
+        try:
+            out = g_service.bulk_edit_tags(
+                g_repo.SelectionSpec(
+                    mode="explicit", explicit_ids=(i1, i2, i3)),
+                add=["t3", "T2"],
+                remove=["t1"],
+                db_path=db_path,
+            )
+            res = wq.enqueue_write(g_repo.HIGH, g_repo.BulkUpdateImagesOp(
+                image_ids=[i1, i2, i3, 999_999], add_tags=["t3", "t2"],
+                remove_tags=["t1"],
+            )).result(timeout=5)
+        finally:
+            g_ws.broadcast = orig  # type: ignore[assignment]
+            g_repo.BULK_CHUNK_ROWS = old_chunk
+            wq.stop()
+        assert out["affected"] == 3, out
+        assert not out["failed"], out
+        # Re-applying the same edit is a no-op: no version bump.
+        assert res["updated"] == [] and sorted(res["unchanged"]) == sorted(
+            [i1, i2, i3]), res
+        assert res["missing"] == [999_999], res
+        progs = [d["done"] for t, d in events if t == g_ws.BULK_PROGRESS]
+        assert progs == [0, 2, 3], progs
+
+        u = sqlite3.connect(str(db_path))
+        try:
+            csv = dict(u.execute("SELECT id, tags_csv FROM image").fetchall())
+            links = sorted(u.execute(
+                "SELECT it.image_id, t.name FROM image_tag it "
+                "JOIN tag t ON t.id = it.tag_id").fetchall())
+            usage = dict(u.execute(
+                "SELECT name, usage_count FROM tag").fetchall())
+            vers = dict(u.execute("SELECT id, version FROM image").fetchall())
+        finally:
+            u.close()
+        assert csv == {i1: "t2,t3", i2: "t3,t2", i3: "t2,t3"}, csv
+        assert links == sorted(
+            [(i, n) for i in (i1, i2, i3) for n in ("t2", "t3")]), links
+        assert usage == {"t1": 0, "t2": 3, "t3": 3}, usage
+        assert len(set(vers.values())) == 1, vers
+    finally:
+        gallery_mod._write_queue = None
+        import shutil
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
 def _run() -> None:
     test_count_explicit_and_all_except()
     test_bulk_favorite_and_tags()
+    test_bulk_update_op_matches_per_row_links()
     print("T23 ALL TESTS PASSED")
 
 
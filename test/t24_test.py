@@ -351,6 +351,77 @@ def test_move_single_collision_suggestion() -> None:
         shutil.rmtree(scratch, ignore_errors=True)
 
 
+def test_cross_device_move_engine() -> None:
+    """EXDEV rename → kernel copy fallback chain; chunked path-update op."""
+    import errno
+    import os
+
+    import gallery as gallery_mod
+    from gallery import db
+    from gallery import repo as g_repo
+    from gallery import service as g_service
+
+    db_path, scratch, _id_a, id_b, i1, i2, _ = _scratch_two_roots_move()
+    try:
+        wq = g_repo.WriteQueue(db_path)
+        wq.start()
+        gallery_mod._write_queue = wq
+        src_bytes = (Path(scratch) / "vol_a" / "other.png").read_bytes()
+
+        def _exdev(_src, _dst):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        def _no_cfr(*_a, **_k):
+            raise OSError(errno.ENOSYS, "copy_file_range unsupported")
+
+        try:
+            sel = g_repo.SelectionSpec(mode="explicit", explicit_ids=(i1, i2))
+            plan = g_service.preflight_move(sel, id_b, db_path=db_path)
+            with mock.patch("gallery.service.os.replace", side_effect=_exdev), \
+                    mock.patch.object(os, "copy_file_range", _no_cfr, create=True):
+                out = g_service.execute_move(plan["plan_id"], None, db_path=db_path)
+            assert out["moved"] == 2 and not out["failed"], out
+            assert (Path(scratch) / "vol_b" / "other.png").read_bytes() == src_bytes
+            assert not list((Path(scratch) / "vol_a").iterdir())
+
+            # One vanished id in a chunk is isolated by its savepoint.
+            st = (Path(scratch) / "vol_b" / "other.png").stat()
+            ok_op = g_repo.UpdateImagePathOp(
+                image_id=i2,
+                path=(Path(scratch) / "vol_b" / "other.png").resolve().as_posix(),
+                folder_id=id_b,
+                relative_path="other.png",
+                filename="other.png",
+                filename_lc="other.png",
+                ext="png",
+                file_size=int(st.st_size),
+                mtime_ns=int(st.st_mtime_ns),
+                refresh_sync=False,
+            )
+            gone = g_repo.UpdateImagePathOp(
+                image_id=999_999, path="/nowhere.png", folder_id=id_b,
+                relative_path="nowhere.png", filename="nowhere.png",
+                filename_lc="nowhere.png", ext="png", file_size=1, mtime_ns=1,
+            )
+            res = wq.enqueue_write(
+                g_repo.MID, g_repo.UpdateImagePathsOp([gone, ok_op]),
+            ).result(timeout=5.0)
+            assert list(res["failed"]) == [999_999], res
+            assert list(res["versions"]) == [i2], res
+        finally:
+            wq.stop()
+            gallery_mod._write_queue = None
+        conn = db.connect_read(db_path)
+        try:
+            paths = [r[0] for r in conn.execute("SELECT path FROM image")]
+        finally:
+            conn.close()
+        assert all("/vol_b/" in p for p in paths), paths
+    finally:
+        import shutil
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
 def _run() -> None:
     test_fetch_selection_move_sources()
     test_update_image_path_op()
@@ -358,6 +429,7 @@ def _run() -> None:
     test_preflight_conflict_and_execute()
     test_preflight_insufficient_space()
     test_move_single_collision_suggestion()
+    test_cross_device_move_engine()
     print("T24 ALL TESTS PASSED")
 
 
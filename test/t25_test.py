@@ -286,6 +286,76 @@ def test_delta_scan_removes_stale_row() -> None:
         shutil.rmtree(scratch, ignore_errors=True)
 
 
+def test_delete_images_op_groups_vocab_deltas() -> None:
+    from gallery import db
+    from gallery import repo as g_repo
+    from gallery import vocab
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz-t25-set-"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        root = (scratch / "out").as_posix()
+        wq = g_repo.WriteQueue(db_path)
+        wq.start()
+        try:
+            wq.enqueue_write(g_repo.HIGH, g_repo.EnsureFolderOp(
+                path=root, kind="output", removable=0, display_name="out",
+            )).result(timeout=5)
+            ids = []
+            for name, tags, prompt in (
+                ("a.png", ["cat"], "red fox, night"),
+                ("b.png", ["cat", "dog"], "red fox"),
+                ("c.png", ["cat"], "blue sky"),
+            ):
+                wq.enqueue_write(g_repo.LOW, g_repo.UpsertImageOp(
+                    path=f"{root}/{name}", folder_id=1, root_path=root,
+                    root_kind="output", relative_path=name, filename=name,
+                    filename_lc=name, ext="png", width=8, height=8,
+                    file_size=10, mtime_ns=1, created_at=1,
+                    positive_prompt=prompt, negative_prompt=None, model=None,
+                    seed=None, cfg=None, sampler=None, scheduler=None,
+                    workflow_present=0, favorite=None, tags_csv=",".join(tags),
+                    indexed_at=1,
+                    prompt_tokens=vocab.normalize_prompt(prompt),
+                    word_tokens=list(vocab.split_positive_prompt_words(prompt)),
+                    normalized_tags=tags,
+                )).result(timeout=5)
+            rc = db.connect_read(db_path)
+            try:
+                ids = [r[0] for r in rc.execute("SELECT id FROM image ORDER BY id")]
+            finally:
+                rc.close()
+            # c.png's stale path guard keeps it; a + b go in one transaction.
+            gone = wq.enqueue_write(g_repo.MID, g_repo.DeleteImagesOp(
+                image_ids=ids,
+                paths=[f"{root}/a.png", f"{root}/b.png", f"{root}/moved.png"],
+            )).result(timeout=5)
+            assert sorted(gone) == ids[:2], gone
+        finally:
+            wq.stop()
+        rc = db.connect_read(db_path)
+        try:
+            tags = dict(rc.execute("SELECT name, usage_count FROM tag"))
+            prompts = dict(rc.execute(
+                "SELECT token, usage_count FROM prompt_token"))
+            (links,) = rc.execute(
+                "SELECT COUNT(*) FROM image_tag WHERE image_id != ?",
+                (ids[2],)).fetchone()
+        finally:
+            rc.close()
+        assert tags == {"cat": 1, "dog": 0}, tags
+        assert set(prompts) == {"blue sky"} and set(prompts.values()) == {1}, prompts
+        assert links == 0
+    finally:
+        import shutil
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
 def main() -> None:
     test_audit_configure_and_log()
     print("t25 #1 audit OK")
@@ -295,6 +365,8 @@ def main() -> None:
     print("t25 #3 bulk delete OK")
     test_delta_scan_removes_stale_row()
     print("t25 #4 delta reconcile OK")
+    test_delete_images_op_groups_vocab_deltas()
+    print("t25 #5 set-wise delete OK")
     print("T25 ALL TESTS PASSED")
 
 
@@ -0,0 +1,285 @@
+"""Offline tests for ``bulk_jobs`` (persisted, resumable bulk move / delete)."""
+from __future__ import annotations
+
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+from PIL import Image  # noqa: E402
+
+
+def _seed(scratch: Path, names) -> tuple:
+    from gallery import db
+
+    db_path = scratch / "gallery.sqlite"
+    root_a = scratch / "vol_a"
+    root_b = scratch / "vol_b"
+    root_a.mkdir()
+    root_b.mkdir()
+    conn = db.connect_write(db_path)
+    try:
+        db.migrate(conn)
+        ids = []
+        for kind, root in (("output", root_a), ("custom", root_b)):
+            ids.append(int(conn.execute(
+                "INSERT INTO folder(path, kind, parent_id, display_name, "
+                "removable) VALUES (?, ?, NULL, ?, 0)",
+                (root.resolve().as_posix(), kind, kind),
+            ).lastrowid))
+        image_ids = []
+        for name in names:
+            p = root_a / name
+            Image.new("RGB", (4, 4), "green").save(p, format="PNG")
+            st = p.stat()
+            image_ids.append(int(conn.execute(
+                "INSERT INTO image(path, folder_id, relative_path, filename, "
+                "filename_lc, ext, width, height, file_size, mtime_ns, "
+                "created_at, workflow_present, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, 'png', 4, 4, ?, ?, 1, 0, 1)",
+                (p.resolve().as_posix(), ids[0], name, name, name.lower(),
+                 st.st_size, st.st_mtime_ns),
+            ).lastrowid))
+        conn.commit()
+    finally:
+        conn.close()
+    return db_path, root_a, root_b, ids[1], image_ids
+
+
+def _wait_state(bulk_jobs, db_path: Path, job_id: str, state: str) -> dict:
+    deadline = time.monotonic() + 10.0
+    while time.monotonic() < deadline:
+        job = bulk_jobs.get_job(db_path=db_path, job_id=job_id)
+        if job is not None and job["state"] == state:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(bulk_jobs.get_job(db_path=db_path, job_id=job_id))
+
+
+def test_move_job_resumes_and_delete_job_runs_async() -> None:
+    import gallery as gallery_mod
+    from gallery import bulk_jobs, job_registry, repo, service
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz-bulk-jobs-"))
+    try:
+        db_path, root_a, root_b, id_b, image_ids = _seed(
+            scratch, ["a.png", "b.png", "c.png"])
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        gallery_mod._write_queue = wq
+        job_registry.reset_for_test()
+        try:
+            sel = repo.SelectionSpec(mode="explicit", explicit_ids=tuple(image_ids))
+            plan_id = service.preflight_move(sel, id_b, db_path=db_path)["plan_id"]
+            try:
+                service.submit_move(plan_id, None, db_path=db_path)
+            except RuntimeError as exc:
+                assert "not started" in str(exc)
+            else:
+                raise AssertionError("submit_move without a runner")
+
+            # Persist the job, then "crash" after the first file moved on
+            # disk but before its row was checkpointed.
+            service._prepare_move_job(plan_id, None, db_path=db_path, actor="t")
+            shutil.move(str(root_a / "a.png"), str(root_b / "a.png"))
+            assert bulk_jobs.get_job(
+                db_path=db_path, job_id=plan_id)["state"] == "queued"
+
+            assert bulk_jobs.start(
+                db_path=db_path, write_queue=wq, workers=2) == 1
+            job = _wait_state(bulk_jobs, db_path, plan_id, "done")
+            assert (job["total"], job["done"], job["failed"]) == (3, 3, 0), job
+            assert sorted(p.name for p in root_b.iterdir()) == [
+                "a.png", "b.png", "c.png"]
+            assert not list(root_a.iterdir())
+            u = sqlite3.connect(str(db_path))
+            try:
+                paths = [r[0] for r in u.execute("SELECT path FROM image")]
+                (left,) = u.execute(
+                    "SELECT COUNT(*) FROM bulk_job_row WHERE job_id = ?",
+                    (plan_id,)).fetchone()
+            finally:
+                u.close()
+            assert all("/vol_b/" in p for p in paths), paths
+            assert left == 0
+
+            # Through the pool: the POST path returns before the work is done.
+            dplan = service.preflight_delete(
+                repo.SelectionSpec(mode="explicit", explicit_ids=(image_ids[1],)),
+                db_path=db_path,
+            )["plan_id"]
+            out = service.submit_delete(dplan, db_path=db_path)
+            assert out["job_id"] == dplan and out["status"] == "queued", out
+            _wait_state(bulk_jobs, db_path, dplan, "done")
+            assert not (root_b / "b.png").exists()
+            assert repo.get_image(image_ids[1], db_path=db_path) is None
+            deadline = time.monotonic() + 2.0
+            while job_registry.list_active():
+                assert time.monotonic() < deadline, job_registry.list_active()
+                time.sleep(0.02)
+        finally:
+            bulk_jobs.stop()
+            wq.stop()
+            gallery_mod._write_queue = None
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_failed_job_still_broadcasts_completed() -> None:
+    from unittest import mock
+
+    from gallery import bulk_jobs, job_registry, repo, ws_hub
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz-bulk-jobs-"))
+    try:
+        db_path, _a, _b, _id_b, image_ids = _seed(scratch, ["a.png"])
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        job_registry.reset_for_test()
+
+        def _boom(job, ckpt):
+            raise OSError("disk on fire")
+
+        bulk_jobs.register_runner("t_boom", _boom)
+        try:
+            bulk_jobs.create(
+                job_id="boom1", kind="t_boom", actor="t", params={},
+                rows=[bulk_jobs.JobRow(seq=0, image_id=image_ids[0], src="x")],
+                write_queue=wq,
+            )
+            job_registry.queue_bulk("boom1", kind="t_boom", total=1)
+            with mock.patch.object(ws_hub, "broadcast") as bc:
+                try:
+                    bulk_jobs.run_inline("boom1", db_path=db_path, write_queue=wq)
+                except OSError:
+                    pass
+                else:
+                    raise AssertionError("runner error swallowed")
+            done = [c.args[1] for c in bc.call_args_list
+                    if c.args[0] == ws_hub.BULK_COMPLETED]
+            assert len(done) == 1 and done[0]["job_id"] == "boom1", done
+            assert done[0]["kind"] == "t_boom" and done[0]["total"] == 1
+            assert bulk_jobs.get_job(
+                db_path=db_path, job_id="boom1")["state"] == "failed"
+            assert not job_registry.list_active()
+        finally:
+            bulk_jobs._runners.pop("t_boom", None)
+            wq.stop()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_move_job_survives_chunk_path_update_failure() -> None:
+    from unittest import mock
+
+    import gallery as gallery_mod
+    from gallery import bulk_jobs, job_registry, repo, service
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz-bulk-jobs-"))
+    try:
+        db_path, root_a, root_b, id_b, image_ids = _seed(
+            scratch, ["a.png", "b.png", "c.png"])
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        gallery_mod._write_queue = wq
+        job_registry.reset_for_test()
+        real = repo.UpdateImagePathsOp
+
+        class _Flaky(real):
+            # The chunk op blows up; so does the single-row retry for c.png.
+            def apply(self, conn):
+                if len(self.items) > 1 or self.items[0].filename == "c.png":
+                    raise sqlite3.OperationalError("database is locked")
+                return super().apply(conn)
+
+        try:
+            sel = repo.SelectionSpec(mode="explicit", explicit_ids=tuple(image_ids))
+            plan_id = service.preflight_move(sel, id_b, db_path=db_path)["plan_id"]
+            service._prepare_move_job(plan_id, None, db_path=db_path, actor="t")
+            with mock.patch.object(repo, "UpdateImagePathsOp", _Flaky):
+                out = bulk_jobs.run_inline(plan_id, db_path=db_path, write_queue=wq)
+            assert out["moved"] == 2, out
+            assert [f["id"] for f in out["failed"]] == [image_ids[2]], out
+            # The row that could not be re-pointed had its file moved back.
+            assert sorted(p.name for p in root_b.iterdir()) == ["a.png", "b.png"]
+            assert [p.name for p in root_a.iterdir()] == ["c.png"]
+            assert "/vol_a/" in repo.get_image(image_ids[2], db_path=db_path).path
+            assert "/vol_b/" in repo.get_image(image_ids[0], db_path=db_path).path
+        finally:
+            wq.stop()
+            gallery_mod._write_queue = None
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_move_job_retries_stranded_rows_before_completing() -> None:
+    from unittest import mock
+
+    import gallery as gallery_mod
+    from gallery import bulk_jobs, job_registry, repo, service, ws_hub
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz-bulk-jobs-"))
+    try:
+        db_path, root_a, root_b, id_b, image_ids = _seed(
+            scratch, ["a.png", "b.png"])
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        gallery_mod._write_queue = wq
+        job_registry.reset_for_test()
+        real = repo.UpdateImagePathsOp
+        attempts = {"b.png": 0}
+
+        class _Flaky(real):
+            # b.png's path update fails twice, then lands.
+            def apply(self, conn):
+                if any(it.filename == "b.png" for it in self.items):
+                    attempts["b.png"] += 1
+                    if attempts["b.png"] <= 3:  # chunk + per-row + 1 retry
+                        raise sqlite3.OperationalError("database is locked")
+                return super().apply(conn)
+
+        try:
+            sel = repo.SelectionSpec(mode="explicit", explicit_ids=tuple(image_ids))
+            plan_id = service.preflight_move(sel, id_b, db_path=db_path)["plan_id"]
+            service._prepare_move_job(plan_id, None, db_path=db_path, actor="t")
+            with mock.patch.object(repo, "UpdateImagePathsOp", _Flaky), \
+                    mock.patch.object(service, "_move_file_back", return_value=False), \
+                    mock.patch.object(service, "_STRANDED_RETRY_BASE_SEC", 0.0), \
+                    mock.patch.object(ws_hub, "broadcast") as bc:
+                out = bulk_jobs.run_inline(plan_id, db_path=db_path, write_queue=wq)
+            assert out["moved"] == 2 and out["failed"] == [], out
+            done = [c.args[1] for c in bc.call_args_list
+                    if c.args[0] == ws_hub.BULK_COMPLETED]
+            assert len(done) == 1 and done[0]["failed"] == [], done
+            assert bulk_jobs.get_job(
+                db_path=db_path, job_id=plan_id)["state"] == "done"
+            assert "/vol_b/" in repo.get_image(image_ids[1], db_path=db_path).path
+
+            # Never lands: reported once, as a failed row, and the job ends.
+            plan_id = service.preflight_move(
+                repo.SelectionSpec(mode="explicit", explicit_ids=(image_ids[0],)),
+                1, db_path=db_path)["plan_id"]
+            service._prepare_move_job(plan_id, None, db_path=db_path, actor="t")
+
+            class _Dead(real):
+                def apply(self, conn):
+                    raise sqlite3.OperationalError("disk I/O error")
+
+            with mock.patch.object(repo, "UpdateImagePathsOp", _Dead), \
+                    mock.patch.object(service, "_move_file_back", return_value=False), \
+                    mock.patch.object(service, "_STRANDED_RETRY_BASE_SEC", 0.0):
+                out = bulk_jobs.run_inline(plan_id, db_path=db_path, write_queue=wq)
+            assert [f["code"] for f in out["failed"]] == ["moved_not_indexed"], out
+            job = bulk_jobs.get_job(db_path=db_path, job_id=plan_id)
+            assert (job["state"], job["failed"]) == ("done", 1), job
+        finally:
+            wq.stop()
+            gallery_mod._write_queue = None
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
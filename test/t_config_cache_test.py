@@ -0,0 +1,71 @@
+"""Offline tests for the cached ``gallery_config.json`` reader in ``folders``."""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+
+def _write(p: Path, blob: dict, *, mtime_ns: int) -> None:
+    p.write_text(json.dumps(blob), encoding="utf-8")
+    os.utime(p, ns=(mtime_ns, mtime_ns))
+
+
+def test_config_cache_stamp_copies_and_listeners() -> None:
+    from gallery import folders, indexer
+
+    with tempfile.TemporaryDirectory() as td:
+        d = Path(td)
+        cfg_path = d / folders.CONFIG_FILENAME
+        _write(cfg_path, {"roots": [], "prompt_stopwords": [" Foo ", "bar"]},
+               mtime_ns=1_000_000_000)
+
+        assert folders.prompt_stopwords(d) == frozenset({"foo", "bar"})
+        assert indexer._load_prompt_stopwords(d / "g.sqlite") == frozenset(
+            {"foo", "bar"})
+        # Callers get private copies: mutating one must not leak into the cache.
+        cfg = folders._load_config(d)
+        cfg["roots"].append("/nowhere")
+        cfg["filter_visibility"]["name"] = False
+        again = folders._load_config(d)
+        assert again["roots"] == []
+        assert again["filter_visibility"]["name"] is True
+
+        seen = []
+
+        def _listener(data_dir, blob) -> None:
+            seen.append((Path(data_dir), blob.get("theme"),
+                         list(blob.get("prompt_stopwords", []))))
+
+        folders.add_config_listener(_listener)
+        try:
+            # Outside edit: new stamp → re-read + listeners fire.
+            _write(cfg_path, {"roots": [], "prompt_stopwords": ["baz"]},
+                   mtime_ns=2_000_000_000)
+            assert folders.prompt_stopwords(d) == frozenset({"baz"})
+            assert seen == [(d, "dark", ["baz"])], seen
+            # Unchanged stamp → served from memory, no notification.
+            assert folders.prompt_stopwords(d) == frozenset({"baz"})
+            assert len(seen) == 1
+
+            # In-process write is visible immediately and pushed.
+            out = folders.patch_gallery_preferences(
+                data_dir=d, body={"theme": "light"})
+            assert out["theme"] == "light"
+            assert seen[-1] == (d, "light", ["baz"]), seen
+            assert folders.get_gallery_preferences(data_dir=d)["theme"] == "light"
+            disk = json.loads(cfg_path.read_text(encoding="utf-8"))
+            assert disk["theme"] == "light"
+        finally:
+            folders.remove_config_listener(_listener)
+
+        # Deleted file → defaults (stamp None differs from the cached one).
+        cfg_path.unlink()
+        assert folders.prompt_stopwords(d) == frozenset()
+        assert folders._load_config(d)["theme"] == "dark"
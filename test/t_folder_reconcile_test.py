@@ -98,8 +98,140 @@ def test_reconcile_adds_and_removes_subfolders() -> None:
             pass
 
 
+def test_scan_reuses_listing_of_unchanged_dirs() -> None:
+    from gallery import repo
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_foldscan_"))
+    try:
+        out = scratch / "out"
+        (out / "a" / "b").mkdir(parents=True)
+        (out / "_thumbs").mkdir()
+        root_posix = out.resolve().as_posix()
+        old_ns = time.time_ns() - 60 * 1_000_000_000
+        for d in (out, out / "a", out / "a" / "b"):
+            os.utime(d, ns=(old_ns, old_ns))
+
+        first = repo.scan_folder_dirs(str(out))
+        assert first == {root_posix, root_posix + "/a", root_posix + "/a/b"}, first
+
+        # Same mtime → the cached child list of ``a`` is trusted.
+        (out / "a" / "c").mkdir()
+        os.utime(out / "a", ns=(old_ns, old_ns))
+        assert repo.scan_folder_dirs(str(out)) == first
+
+        os.utime(out / "a", ns=(old_ns + 1, old_ns + 1))
+        assert root_posix + "/a/c" in repo.scan_folder_dirs(str(out))
+        assert repo.scan_folder_dirs(str(scratch / "missing")) is None
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_reconcile_normalises_legacy_rows() -> None:
+    from gallery import db, repo
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_foldnorm_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        out = scratch / "out"
+        (out / "sub").mkdir(parents=True)
+        root_posix = out.resolve().as_posix()
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+            root_id = int(conn.execute(
+                "INSERT INTO folder(path, kind, parent_id, display_name, "
+                "removable) VALUES (?, 'output', NULL, 'out', 0)",
+                (root_posix,),
+            ).lastrowid)
+            legacy_id = int(conn.execute(
+                "INSERT INTO folder(path, kind, parent_id, display_name, "
+                "removable) VALUES (?, 'output', ?, 'sub', 0)",
+                (root_posix + "/./sub", root_id),
+            ).lastrowid)
+            conn.commit()
+        finally:
+            conn.close()
+
+        op = repo.ReconcileFoldersUnderRootOp(
+            root_id=root_id, root_path=root_posix, root_kind="output",
+        )
+        assert op.disk_dirs == {root_posix, root_posix + "/sub"}
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        try:
+            assert wq.enqueue_write(repo.LOW, op).result(timeout=10) is True
+            # Second pass finds the rewritten row through the index range.
+            assert wq.enqueue_write(repo.LOW, repo.ReconcileFoldersUnderRootOp(
+                root_id=root_id, root_path=root_posix, root_kind="output",
+            )).result(timeout=10) is False
+        finally:
+            wq.stop()
+
+        r2 = db.connect_read(db_path)
+        try:
+            rows = r2.execute(
+                "SELECT id, path, parent_id FROM folder ORDER BY id").fetchall()
+        finally:
+            r2.close()
+        assert [tuple(r) for r in rows] == [
+            (root_id, root_posix, None),
+            (legacy_id, root_posix + "/sub", root_id),
+        ], [tuple(r) for r in rows]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_unindex_root_drops_scan_cache() -> None:
+    from gallery import db, repo
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_foldforget_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        out = scratch / "custom"
+        (out / "a").mkdir(parents=True)
+        root_posix = out.resolve().as_posix()
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        try:
+            wq.enqueue_write(repo.HIGH, repo.EnsureFolderOp(
+                path=root_posix, kind="custom", removable=1,
+                display_name="custom",
+            )).result(timeout=5)
+            rconn = db.connect_read(db_path)
+            try:
+                root_id = int(rconn.execute(
+                    "SELECT id FROM folder WHERE path = ?", (root_posix,),
+                ).fetchone()[0])
+            finally:
+                rconn.close()
+            assert repo.scan_folder_dirs(root_posix) is not None
+            assert root_posix in repo._folder_scan_cache
+            wq.enqueue_write(repo.MID, repo.UnindexCustomRootOp(
+                root_id=root_id, root_path=root_posix,
+            )).result(timeout=10)
+            assert root_posix not in repo._folder_scan_cache
+
+            # A root that vanished from disk is not kept either.
+            repo.scan_folder_dirs(root_posix)
+            shutil.rmtree(out)
+            assert repo.scan_folder_dirs(root_posix) is None
+            assert root_posix not in repo._folder_scan_cache
+        finally:
+            wq.stop()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
 def main() -> None:
     test_reconcile_adds_and_removes_subfolders()
+    test_scan_reuses_listing_of_unchanged_dirs()
+    test_reconcile_normalises_legacy_rows()
+    test_unindex_root_drops_scan_cache()
     print("t_folder_reconcile_test: OK")
 
 
@@ -0,0 +1,170 @@
+"""Offline tests for ``hasher`` (lazy content hashes) + ``repo.list_duplicate_groups``."""
+from __future__ import annotations
+
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+
+def _upsert(repo, root_id: int, root_posix: str, rel: str, *,
+            mtime_ns: int = 1) -> object:
+    name = rel.rsplit("/", 1)[-1]
+    return repo.UpsertImageOp(
+        path=f"{root_posix}/{rel}", folder_id=root_id,
+        root_path=root_posix, root_kind="output",
+        relative_path=rel, filename=name, filename_lc=name.lower(),
+        ext="png", width=8, height=8, file_size=10, mtime_ns=mtime_ns,
+        created_at=int(time.time()),
+        positive_prompt=None, negative_prompt=None, model=None, seed=None,
+        cfg=None, sampler=None, scheduler=None, workflow_present=0,
+        favorite=None, tags_csv=None, indexed_at=int(time.time()),
+        prompt_tokens=[], word_tokens=[], normalized_tags=[],
+    )
+
+
+def _hashes(db, db_path: Path) -> dict:
+    conn = db.connect_read(db_path)
+    try:
+        return {r["filename"]: r["content_hash"] for r in conn.execute(
+            "SELECT filename, content_hash FROM image")}
+    finally:
+        conn.close()
+
+
+def test_hasher_fills_hashes_and_groups_duplicates() -> None:
+    from gallery import db, hasher, repo
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_hasher_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        out = scratch / "out"
+        (out / "sub").mkdir(parents=True)
+        files = {"a.png": b"same", "sub/b.png": b"same", "c.png": b"other",
+                 "gone.png": None}
+        for rel, data in files.items():
+            if data is not None:
+                (out / rel).write_bytes(data)
+        root_posix = out.as_posix()
+
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        try:
+            wq.enqueue_write(repo.HIGH, repo.EnsureFolderOp(
+                path=root_posix, kind="output", removable=0,
+                display_name="out",
+            )).result(timeout=5)
+            wq.enqueue_write(repo.HIGH, repo.EnsureFolderOp(
+                path=f"{root_posix}/sub", kind="output", removable=0,
+                display_name="sub", parent_id=1,
+            )).result(timeout=5)
+            for rel in files:
+                wq.enqueue_write(repo.LOW, _upsert(
+                    repo, 1, root_posix, rel)).result(timeout=5)
+
+            h = hasher._Hasher(db_path=db_path, write_queue=wq, mb_per_sec=0)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                assert h.run_pass(pool) == 3
+                got = _hashes(db, db_path)
+                assert got["a.png"] == got["b.png"] == hasher.hash_file(out / "a.png")
+                assert got["c.png"] != got["a.png"] and got["gone.png"] is None
+                # The unreadable row is remembered, not retried every pass.
+                assert h.run_pass(pool) == 0 and len(h._failed) == 1
+
+            dup = repo.list_duplicate_groups(db_path=db_path)
+            assert dup["total_groups"] == 1 and (dup["hashed"], dup["total"]) == (3, 4)
+            group = dup["groups"][0]
+            assert group["count"] == 2 and group["wasted_bytes"] == 10
+            assert sorted(i["filename"] for i in group["images"]) == ["a.png", "b.png"]
+
+            # Folder scope: the group counts because one member is in sub/.
+            scoped = repo.list_duplicate_groups(db_path=db_path, folder_id=2)
+            assert scoped["total_groups"] == 1 and scoped["groups"][0]["count"] == 2
+            try:
+                repo.list_duplicate_groups(db_path=db_path, folder_id=999)
+            except KeyError:
+                pass
+            else:
+                raise AssertionError("unknown folder accepted")
+
+            # A re-index with a new fingerprint drops the stale hash.
+            wq.enqueue_write(repo.LOW, _upsert(
+                repo, 1, root_posix, "a.png", mtime_ns=2)).result(timeout=5)
+            assert _hashes(db, db_path)["a.png"] is None
+            assert repo.list_duplicate_groups(db_path=db_path)["total_groups"] == 0
+            # A hash computed against the old fingerprint is not stored.
+            assert wq.enqueue_write(repo.LOW, repo.SetContentHashesOp(
+                [(1, "x" * 32, 10, 1)])).result(timeout=5) == 0
+        finally:
+            wq.stop()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_throttle_paces_reads() -> None:
+    from gallery import hasher
+
+    t = hasher._Throttle(1000)
+    t0 = time.monotonic()
+    t.consume(1000)
+    t.consume(200)
+    assert time.monotonic() - t0 >= 0.15
+    t.set_rate(0)
+    t0 = time.monotonic()
+    t.consume(10 ** 9)
+    assert time.monotonic() - t0 < 0.05
+
+
+def test_index_many_wakes_the_hasher() -> None:
+    from PIL import Image
+
+    from gallery import db, hasher, indexer, repo
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_hasher_wake_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        out = scratch / "out"
+        out.mkdir()
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        try:
+            wq.enqueue_write(repo.HIGH, repo.EnsureFolderOp(
+                path=out.as_posix(), kind="output", removable=0,
+                display_name="out",
+            )).result(timeout=5)
+            hasher.start_hasher(db_path=db_path, write_queue=wq, mb_per_sec=1000)
+            deadline = time.monotonic() + 5.0
+            while hasher.status().get("last_pass_at") is None:
+                assert time.monotonic() < deadline
+                time.sleep(0.02)
+            # First pass is over: only a wake() beats the 60 s idle poll.
+            Image.new("RGB", (8, 8), (1, 2, 3)).save(out / "a.png")
+            root = {"id": 1, "path": out.as_posix(), "kind": "output"}
+            assert indexer.index_many([out / "a.png"], root=root,
+                                      db_path=db_path, write_queue=wq)
+            deadline = time.monotonic() + 5.0
+            while _hashes(db, db_path)["a.png"] is None:
+                assert time.monotonic() < deadline, "hasher not woken"
+                time.sleep(0.05)
+            assert _hashes(db, db_path)["a.png"] == hasher.hash_file(out / "a.png")
+        finally:
+            hasher.stop_hasher()
+            wq.stop()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
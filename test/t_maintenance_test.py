@@ -0,0 +1,193 @@
+"""Offline tests for ``maintenance`` (idle-time optimize / vacuum / checkpoint) + ``db`` tuning."""
+from __future__ import annotations
+
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+
+class _ChurnOp:
+    """Insert then delete ~8 MiB so the freelist has pages to give back."""
+
+    def apply(self, conn) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS churn (b BLOB)")
+        conn.execute(
+            "INSERT INTO churn SELECT randomblob(4000) FROM ("
+            "WITH RECURSIVE r(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM r "
+            "WHERE i < 2000) SELECT i FROM r)")
+        conn.execute("DELETE FROM churn")
+
+
+def test_v8_converts_legacy_db_to_incremental_auto_vacuum() -> None:
+    from gallery import db
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_maint_mig_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            for v in range(1, 8):
+                db.MIGRATIONS[v](conn)
+            conn.execute("PRAGMA user_version = 7")
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+            db.migrate(conn)
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        finally:
+            conn.close()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_run_reclaims_space_and_scheduler_waits_for_idle() -> None:
+    from gallery import db, maintenance, repo
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_maint_"))
+    saved_idle = maintenance.IDLE_SEC
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        try:
+            wq.enqueue_write(repo.HIGH, _ChurnOp()).result(timeout=30)
+            sched = maintenance._Scheduler(db_path=db_path, write_queue=wq)
+            assert sched.tick() is None  # writer was busy a moment ago
+            assert sched.due() == ["vacuum"]
+
+            maintenance.IDLE_SEC = 0.0
+            report = sched.tick()
+            assert report is not None and report["tasks"] == ["vacuum"], report
+            assert report["steps"]["vacuum"]["freed_pages"] > 0, report
+            assert report["reclaimed_db_bytes"] > 0, report
+            assert report["after"]["free_pages"] < report["before"]["free_pages"]
+
+            report = maintenance.run_now(write_queue=wq)
+            assert report["tasks"] == list(maintenance.TASKS), report
+            assert report["steps"]["optimize"]["analyzed"] is True
+            assert not report["steps"]["checkpoint"]["busy"], report
+            assert report["after"]["wal_bytes"] == 0, report
+            assert maintenance.history()[-1] is report
+            u = sqlite3.connect(str(db_path))
+            try:
+                assert u.execute(
+                    "SELECT COUNT(*) FROM sqlite_master "
+                    "WHERE name = 'sqlite_stat1'").fetchone()[0] == 1
+            finally:
+                u.close()
+            try:
+                maintenance.MaintenanceOp(["defrag"])
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("unknown task accepted")
+        finally:
+            wq.stop()
+    finally:
+        maintenance.IDLE_SEC = saved_idle
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_writer_is_not_idle_while_an_op_runs() -> None:
+    from gallery import db, maintenance, repo
+
+    class _BlockOp:
+        def __init__(self) -> None:
+            self.entered = threading.Event()
+            self.release = threading.Event()
+
+        def apply(self, conn) -> None:
+            self.entered.set()
+            self.release.wait(10)
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_maint_busy_"))
+    saved_idle = maintenance.IDLE_SEC
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        op = _BlockOp()
+        try:
+            fut = wq.enqueue_write(repo.LOW, op)
+            assert op.entered.wait(5)
+            time.sleep(0.05)
+            # Queue is empty, but the popped op is still executing.
+            assert wq.idle_seconds() == 0.0
+            maintenance.IDLE_SEC = 0.01
+            sched = maintenance._Scheduler(db_path=db_path, write_queue=wq)
+            assert sched.tick() is None
+            op.release.set()
+            fut.result(timeout=5)
+            time.sleep(0.05)
+            assert wq.idle_seconds() > 0.0
+        finally:
+            op.release.set()
+            wq.stop()
+    finally:
+        maintenance.IDLE_SEC = saved_idle
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_tuning_profile_validates_and_applies() -> None:
+    from gallery import db
+
+    for bad in ("huge", {"cache_size_mb": 0}, {"page_size": 3000},
+                {"temp_store": "ram"}, {"mmap_mb": 1}, {"cache_size_mb": "8"}, 7):
+        try:
+            db.parse_tuning(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {bad!r}")
+    got = db.parse_tuning({"profile": "small", "mmap_size_mb": 0})
+    assert got["profile"] == "small" and got["mmap_size_mb"] == 0
+    assert got["cache_size_mb"] == db.TUNING_PROFILES["small"]["cache_size_mb"]
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_tuning_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+            conn.execute("CREATE TABLE keep (v)")
+            conn.execute("INSERT INTO keep VALUES ('x')")
+        finally:
+            conn.close()
+        db.set_tuning({"profile": "large", "page_size": 8192,
+                       "temp_store": "file"})
+        conn = db.connect_write(db_path)
+        try:
+            assert db.apply_page_size(conn) is True
+            assert db.apply_page_size(conn) is False
+            assert conn.execute("PRAGMA page_size").fetchone()[0] == 8192
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        finally:
+            conn.close()
+        rc = db.connect_read(db_path)
+        try:
+            assert rc.execute("PRAGMA cache_size").fetchone()[0] == -256 * 1024
+            assert rc.execute("PRAGMA temp_store").fetchone()[0] == 1
+            assert rc.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 4000
+            assert rc.execute("SELECT v FROM keep").fetchone()[0] == "x"
+        finally:
+            rc.close()
+    finally:
+        db.set_tuning("default")
+        shutil.rmtree(scratch, ignore_errors=True)
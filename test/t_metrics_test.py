@@ -0,0 +1,231 @@
+"""Offline tests for ``metrics`` + WriteQueue instrumentation + ``GET /metrics``."""
+from __future__ import annotations
+
+import asyncio
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+
+class _BoomOp:
+    def apply(self, conn) -> None:
+        raise RuntimeError("boom")
+
+
+def _series(snap, kind, name, **labels):
+    return [
+        s for s in snap[kind]
+        if s["name"] == name and all(s["labels"].get(k) == v
+                                     for k, v in labels.items())
+    ]
+
+
+def test_write_queue_records_histograms_and_failures() -> None:
+    import gallery as gallery_mod
+    from gallery import db, metrics, repo, routes
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_metrics_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        metrics.reset_for_test()
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        gallery_mod._write_queue = wq
+        try:
+            for i in range(3):
+                wq.enqueue_write(repo.HIGH, repo.EnsureFolderOp(
+                    path=f"/r{i}", kind="output", removable=0,
+                    display_name=f"r{i}",
+                )).result(timeout=5)
+            fut = wq.enqueue_write(repo.LOW, _BoomOp())
+            try:
+                fut.result(timeout=5)
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError("expected op failure")
+
+            snap = metrics.snapshot()
+            for name in ("xyz_gallery_write_wait_seconds",
+                         "xyz_gallery_write_apply_seconds",
+                         "xyz_gallery_write_commit_seconds"):
+                (h,) = _series(snap, "histograms", name,
+                               op="EnsureFolderOp", priority="high")
+                assert h["count"] == 3 and h["p99"] is not None, h
+            (fail,) = _series(snap, "counters",
+                              "xyz_gallery_write_failures_total",
+                              op="_BoomOp", priority="low")
+            assert fail["value"] == 1
+            assert not _series(snap, "histograms",
+                               "xyz_gallery_write_apply_seconds", op="_BoomOp")
+
+            text = metrics.render_prometheus()
+            assert "# TYPE xyz_gallery_write_apply_seconds histogram" in text
+            assert ('xyz_gallery_write_apply_seconds_count'
+                    '{op="EnsureFolderOp",priority="high"} 3') in text
+            assert ('xyz_gallery_write_apply_seconds_bucket'
+                    '{op="EnsureFolderOp",priority="high",le="+Inf"} 3') in text
+
+            async def _http() -> None:
+                app = web.Application()
+                app.router.add_get("/xyz/gallery/metrics", routes._get_metrics)
+                async with TestServer(app) as srv:
+                    async with TestClient(srv) as client:
+                        r = await client.get("/xyz/gallery/metrics")
+                        assert r.status == 200
+                        body = await r.json()
+                        depth = _series(body, "gauges",
+                                        "xyz_gallery_write_queue_depth")
+                        assert {g["labels"]["priority"] for g in depth} == {
+                            "high", "mid", "low"}, depth
+                        r = await client.get(
+                            "/xyz/gallery/metrics",
+                            headers={"Accept": "text/plain"},
+                        )
+                        assert r.headers["Content-Type"].startswith("text/plain")
+                        assert "xyz_gallery_write_queue_depth{" in await r.text()
+                        r = await client.get("/xyz/gallery/metrics?format=xml")
+                        assert r.status == 400
+
+            asyncio.run(_http())
+        finally:
+            wq.stop()
+            gallery_mod._write_queue = None
+    finally:
+        metrics.reset_for_test()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_route_timing_and_slow_query_log() -> None:
+    from gallery import db, metrics, routes
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_perf_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        metrics.reset_for_test()
+        db.set_slow_query_ms(0.001)
+        try:
+            rconn = db.connect_read(db_path)
+            try:
+                (n,) = rconn.execute(
+                    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL "
+                    "SELECT x + 1 FROM c WHERE x < 20000) "
+                    "SELECT COUNT(*) FROM c").fetchone()
+                assert n == 20000
+                rconn.execute("SELECT id FROM folder WHERE path = 'x'").fetchall()
+            finally:
+                rconn.close()
+        finally:
+            db.set_slow_query_ms(0)
+        slow = db.slow_queries()
+        assert slow and "RECURSIVE" in slow[0]["sql"], slow
+        assert slow[0]["plan"], slow[0]
+        # Off again: new connections are untraced.
+        rconn = db.connect_read(db_path)
+        rconn.close()
+        assert len(db.slow_queries()) == len(slow)
+
+        async def _ping(_request):
+            out = await routes._run(lambda: 7)
+            return web.json_response({"v": out})
+
+        async def _http() -> None:
+            app = web.Application(middlewares=[routes._timing_middleware])
+            app.router.add_get(r"/xyz/gallery/ping/{id:\d+}", _ping)
+            app.router.add_get("/xyz/gallery/admin/perf", routes._get_admin_perf)
+            async with TestServer(app) as srv:
+                async with TestClient(srv) as client:
+                    for i in range(3):
+                        r = await client.get(f"/xyz/gallery/ping/{i}")
+                        assert (await r.json())["v"] == 7
+                    r = await client.get("/xyz/gallery/admin/perf")
+                    body = await r.json()
+            (req,) = _series(body, "histograms",
+                             "xyz_gallery_http_request_seconds",
+                             route=r"/xyz/gallery/ping/{id}", method="GET")
+            assert req["count"] == 3, req
+            (run,) = _series(body, "histograms",
+                             "xyz_gallery_executor_run_seconds")
+            assert run["count"] == 3 and run["labels"]["fn"].endswith(
+                "<lambda>"), run
+            assert _series(body, "histograms",
+                           "xyz_gallery_executor_wait_seconds")[0]["count"] == 3
+            assert body["slow_queries"][0]["sql"] == slow[0]["sql"]
+
+        asyncio.run(_http())
+    finally:
+        metrics.reset_for_test()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_profiler_folds_gallery_thread_stacks() -> None:
+    import threading
+
+    from gallery import profiler, routes
+
+    stop = threading.Event()
+
+    def _spin_here() -> None:
+        while not stop.is_set():
+            sum(range(2000))
+
+    workers = [
+        threading.Thread(target=_spin_here, name="xyz-gallery-bench-spin",
+                         daemon=True),
+        threading.Thread(target=stop.wait, name="not-ours", daemon=True),
+    ]
+    for t in workers:
+        t.start()
+    try:
+        async def _http() -> None:
+            app = web.Application()
+            app.router.add_get("/xyz/gallery/admin/profile",
+                               routes._get_admin_profile)
+            async with TestServer(app) as srv:
+                async with TestClient(srv) as client:
+                    r = await client.get(
+                        "/xyz/gallery/admin/profile?seconds=0.3&hz=200")
+                    body = await r.json()
+                    assert body["threads"].get("xyz-gallery-bench-spin", 0) > 10, body
+                    assert "not-ours" not in body["threads"]
+                    r = await client.get(
+                        "/xyz/gallery/admin/profile?seconds=0.1&format=collapsed"
+                        "&thread=xyz-gallery-bench-spin")
+                    lines = (await r.text()).splitlines()
+                    assert lines and all(
+                        ln.startswith("xyz-gallery-bench-spin;") for ln in lines)
+                    assert any("_spin_here (t_metrics_test.py)" in ln
+                               for ln in lines), lines
+                    assert (await client.get(
+                        "/xyz/gallery/admin/profile?seconds=999")).status == 400
+
+            asyncio.run(_http())
+        with profiler._capture_lock:
+            try:
+                profiler.sample(0.01)
+            except profiler.ProfilerBusy:
+                pass
+            else:
+                raise AssertionError("expected ProfilerBusy")
+    finally:
+        stop.set()
+        for t in workers:
+            t.join(timeout=2)
@@ -0,0 +1,212 @@
+"""Offline tests for move / rename detection (``indexer.pair_moves`` & co.)."""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+
+def _scratch(tmp: Path):
+    from gallery import db, repo
+
+    db_path = tmp / "g.sqlite"
+    conn = db.connect_write(db_path)
+    try:
+        db.migrate(conn)
+    finally:
+        conn.close()
+    (tmp / "r" / "sub").mkdir(parents=True)
+    wq = repo.WriteQueue(db_path)
+    wq.start()
+    wq.enqueue_write(repo.HIGH, repo.EnsureFolderOp(
+        path=(tmp / "r").as_posix(), kind="output", removable=0,
+        display_name="r",
+    )).result(timeout=5)
+    root = {"id": 1, "path": (tmp / "r").as_posix(), "kind": "output"}
+    return db_path, root, wq
+
+
+def _png(path: Path, shade: int) -> None:
+    from PIL import Image
+
+    Image.new("RGB", (16, 16), (shade, 40, 90)).save(path, format="PNG")
+
+
+def _rows(db_path: Path) -> dict:
+    from gallery import db
+
+    conn = db.connect_read(db_path)
+    try:
+        return {r["id"]: r["path"] for r in conn.execute("SELECT id, path FROM image")}
+    finally:
+        conn.close()
+
+
+def test_pair_moves_tie_breaks() -> None:
+    from gallery import hasher, indexer
+
+    tmp = Path(tempfile.mkdtemp(prefix="xyz_moves_"))
+    try:
+        f = tmp / "new.png"
+        f.write_bytes(b"payload")
+        st = os.stat(f)
+        fp = {"file_size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        a = dict(fp, id=1, path="/x/a.png", filename="a.png", content_hash=None)
+        b = dict(fp, id=2, path="/x/new.png", filename="new.png", content_hash=None)
+        other = dict(fp, id=3, path="/x/o.png", filename="o.png", file_size=1)
+        # Same fingerprint twice: the one with the same filename wins.
+        assert [(r["id"], p) for r, p, _ in indexer.pair_moves(
+            [a, b, other], [(str(f), st)])] == [(2, str(f))]
+        # No name hint and no hashes: ambiguous, left unpaired.
+        c = dict(a, id=4, path="/y/a.png")
+        assert indexer.pair_moves([a, c], [(str(f), st)]) == []
+        # Content hash settles it.
+        c["content_hash"] = hasher.hash_file(f)
+        assert [r["id"] for r, _p, _s in indexer.pair_moves(
+            [a, c], [(str(f), st)])] == [4]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_relocate_keeps_row_and_thumbnail() -> None:
+    from gallery import indexer, repo, thumbs
+
+    tmp = Path(tempfile.mkdtemp(prefix="xyz_moves_"))
+    db_path, root, wq = _scratch(tmp)
+    try:
+        src = tmp / "r" / "a.png"
+        _png(src, 10)
+        iid = indexer.index_one(src, root=root, db_path=db_path, write_queue=wq)
+        assert iid
+        thumbs_dir = tmp / "thumbs"
+        assert thumbs.request(iid, db_path=db_path, thumbs_dir=thumbs_dir,
+                              write_queue=wq) is not None
+        dst = tmp / "r" / "sub" / "b.png"
+        os.replace(src, dst)
+        gone = indexer.load_move_candidates([src.as_posix()], db_path=db_path)
+        pairs = indexer.pair_moves(gone, [(str(dst), os.stat(dst))])
+        moved, failed = indexer.relocate_many(
+            pairs, root=root, db_path=db_path, write_queue=wq,
+            thumbs_dir=thumbs_dir,
+        )
+        assert (moved, failed) == ([iid], [])
+        assert _rows(db_path) == {iid: dst.as_posix()}
+        key = thumbs.hash_key_for(dst.as_posix(), os.stat(dst).st_mtime_ns)
+        assert thumbs.thumb_path_for(key, thumbs_dir).is_file()
+    finally:
+        wq.stop(timeout=2.0)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_delta_scan_detects_moves() -> None:
+    from gallery import indexer
+
+    tmp = Path(tempfile.mkdtemp(prefix="xyz_moves_"))
+    db_path, root, wq = _scratch(tmp)
+    try:
+        a, b = tmp / "r" / "a.png", tmp / "r" / "b.png"
+        _png(a, 10)
+        _png(b, 200)
+        ids = [indexer.index_one(p, root=root, db_path=db_path, write_queue=wq)
+               for p in (a, b)]
+        os.replace(a, tmp / "r" / "sub" / "a.png")
+        b.unlink()
+        _png(tmp / "r" / "c.png", 99)
+        st = indexer.delta_scan(root, db_path=db_path, write_queue=wq)
+        assert st["moved"] == 1 and st["moved_ids"] == [ids[0]], st
+        rows = _rows(db_path)
+        assert rows[ids[0]] == (tmp / "r" / "sub" / "a.png").as_posix()
+        assert (tmp / "r" / "c.png").as_posix() in rows.values()
+    finally:
+        wq.stop(timeout=2.0)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_coalescer_pairs_delete_and_create() -> None:
+    from gallery import indexer, watcher
+
+    tmp = Path(tempfile.mkdtemp(prefix="xyz_moves_"))
+    db_path, root, wq = _scratch(tmp)
+
+    class TDelta:
+        def request(self) -> None:
+            pass
+
+    class TCoal(watcher.Coalescer):
+        DEBOUNCE_S = 0.05
+        _TICK_S = 0.04
+        RENAME_WINDOW_S = 0.3
+
+    c = TCoal(root=root, db_path=db_path, write_queue=wq, delta=TDelta())
+    try:
+        src, dst = tmp / "r" / "a.png", tmp / "r" / "sub" / "renamed.png"
+        gone = tmp / "r" / "gone.png"
+        _png(src, 10)
+        _png(gone, 50)
+        iid = indexer.index_one(src, root=root, db_path=db_path, write_queue=wq)
+        gid = indexer.index_one(gone, root=root, db_path=db_path, write_queue=wq)
+        c.start()
+        os.replace(src, dst)
+        gone.unlink()
+        c.add("A", str(src), "d")
+        c.add("G", str(gone), "d")
+        time.sleep(0.15)  # the delete flushes first and parks
+        c.add("B", str(dst), "u")
+        deadline = time.monotonic() + 3.0
+        while gid in _rows(db_path) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        # The rename kept its row; the plain delete lapsed and applied.
+        assert _rows(db_path) == {iid: dst.as_posix()}
+    finally:
+        c.request_stop()
+        c.join_tick(timeout=3.0)
+        wq.stop(timeout=2.0)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_stopping_watchers_applies_parked_deletes() -> None:
+    from gallery import indexer, watcher
+
+    tmp = Path(tempfile.mkdtemp(prefix="xyz_moves_"))
+    db_path, root, wq = _scratch(tmp)
+
+    class TDelta:
+        def request(self) -> None:
+            pass
+
+    class TCoal(watcher.Coalescer):
+        DEBOUNCE_S = 0.05
+        _TICK_S = 0.04
+        RENAME_WINDOW_S = 60.0
+
+    c = TCoal(root=root, db_path=db_path, write_queue=wq, delta=TDelta())
+    try:
+        gone = tmp / "r" / "gone.png"
+        _png(gone, 50)
+        gid = indexer.index_one(gone, root=root, db_path=db_path, write_queue=wq)
+        c.start()
+        gone.unlink()
+        c.add("G", str(gone), "d")
+        deadline = time.monotonic() + 3.0
+        while not watcher._has_parked(1) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert watcher._has_parked(1) and gid in _rows(db_path)
+        # A row parked by a root nobody watches any more is dropped too.
+        watcher._park_deletes(99, [{"path": "/elsewhere/x.png"}], 0.0)
+        watcher._CLS, watcher._WSTARTED = [c], True
+        watcher.stop_file_watchers()
+        assert gid not in _rows(db_path)
+        assert not watcher._has_parked(1) and not watcher._has_parked(99)
+    finally:
+        c.request_stop()
+        c.join_tick(timeout=3.0)
+        watcher._drop_parked()
+        wq.stop(timeout=2.0)
+        shutil.rmtree(tmp, ignore_errors=True)
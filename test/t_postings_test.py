@@ -0,0 +1,154 @@
+"""Offline tests for ``postings`` (in-memory vocab AND index + SQL fallback)."""
+from __future__ import annotations
+
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+
+def _upsert(repo, root_id: int, root_posix: str, name: str, *,
+            tags, prompt: str) -> object:
+    from gallery import vocab
+    return repo.UpsertImageOp(
+        path=f"{root_posix}/{name}", folder_id=root_id,
+        root_path=root_posix, root_kind="output",
+        relative_path=name, filename=name, filename_lc=name.lower(),
+        ext="png", width=8, height=8, file_size=10, mtime_ns=1,
+        created_at=int(time.time()),
+        positive_prompt=prompt, negative_prompt=None, model=None, seed=None,
+        cfg=None, sampler=None, scheduler=None, workflow_present=0,
+        favorite=None, tags_csv=",".join(tags) or None,
+        indexed_at=int(time.time()),
+        prompt_tokens=vocab.normalize_prompt(prompt),
+        word_tokens=list(vocab.split_positive_prompt_words(prompt)),
+        normalized_tags=list(tags),
+    )
+
+
+def _wait_ready(postings, db_path: Path, term) -> None:
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        if postings.intersect(db_path=db_path, terms=[term]) is not None:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"postings never became ready: {postings.stats()}")
+
+
+def _names(repo, db_path: Path, flt) -> set:
+    page = repo.list_images(db_path=db_path, filter=flt, limit=50)
+    return {r.filename for r in page.items}
+
+
+def test_postings_track_commits_and_fall_back() -> None:
+    from gallery import db, postings, repo
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_postings_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        root_posix = (scratch / "out").as_posix()
+
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        try:
+            wq.enqueue_write(repo.HIGH, repo.EnsureFolderOp(
+                path=root_posix, kind="output", removable=0,
+                display_name="out",
+            )).result(timeout=5)
+            root_id = 1
+            for name, tags, prompt in (
+                ("a.png", ["cat", "cute"], "cat, sitting"),
+                ("b.png", ["cat"], "dog, sitting"),
+                ("c.png", ["dog"], "cat, running"),
+            ):
+                wq.enqueue_write(repo.LOW, _upsert(
+                    repo, root_id, root_posix, name, tags=tags, prompt=prompt,
+                )).result(timeout=5)
+
+            both = repo.FilterSpec(tags_and=("cat",), prompts_and=("sitting",))
+            sql_answer = _names(repo, db_path, both)
+            assert sql_answer == {"a.png", "b.png"}, sql_answer
+
+            postings.enable(db_path=db_path)
+            rconn = db.connect_read(db_path)
+            try:
+                (cat_id,) = rconn.execute(
+                    "SELECT id FROM tag WHERE name = 'cat'").fetchone()
+            finally:
+                rconn.close()
+            _wait_ready(postings, db_path, ("tag", cat_id))
+            assert postings.stats()["state"] == "ready"
+            rconn = db.connect_read(db_path)
+            try:
+                where_sql, _ = repo._build_filter(rconn, both, db_path=db_path)
+            finally:
+                rconn.close()
+            assert "json_each" in where_sql, where_sql
+            assert _names(repo, db_path, both) == sql_answer
+            # Over the inline cap: abandoned under the lock, SQL answers.
+            assert postings.intersect(
+                db_path=db_path, terms=[("tag", cat_id)], limit=1) is None
+            assert len(postings.intersect(
+                db_path=db_path, terms=[("tag", cat_id)], limit=2)) == 2
+            with mock.patch.object(repo, "_POSTINGS_INLINE_MAX", 1):
+                rconn = db.connect_read(db_path)
+                try:
+                    where_sql, _ = repo._build_filter(
+                        rconn, repo.FilterSpec(tags_and=("cat",)), db_path=db_path)
+                finally:
+                    rconn.close()
+            assert "json_each" not in where_sql, where_sql
+
+            # Incremental: new image appended, tag removed via UpdateImageOp.
+            wq.enqueue_write(repo.LOW, _upsert(
+                repo, root_id, root_posix, "d.png",
+                tags=["cat"], prompt="sitting",
+            )).result(timeout=5)
+            assert _names(repo, db_path, both) == {"a.png", "b.png", "d.png"}
+            b_id = [
+                r.id for r in repo.list_images(db_path=db_path, limit=50).items
+                if r.filename == "b.png"
+            ][0]
+            wq.enqueue_write(repo.HIGH, repo.UpdateImageOp(
+                image_id=b_id, normalized_tags=["dog"],
+            )).result(timeout=5)
+            assert _names(repo, db_path, both) == {"a.png", "d.png"}
+            wq.enqueue_write(repo.HIGH, repo.DeleteImageOp(
+                path=f"{root_posix}/a.png",
+            )).result(timeout=5)
+            assert _names(repo, db_path, both) == {"d.png"}
+            assert _names(
+                repo, db_path, repo.FilterSpec(tags_and=("cat", "dog"))) == set()
+
+            # A full prompt-vocab rebuild resets the index → SQL until rebuilt.
+            wq.enqueue_write(repo.HIGH, repo.RebuildPromptVocabFullOp(
+                extra_stopwords=frozenset(),
+            )).result(timeout=10)
+            assert postings.stats()["state"] in ("dirty", "building", "ready")
+            assert _names(repo, db_path, both) == {"d.png"}
+
+            # Over the memory cap → stays on SQL with identical answers.
+            postings.enable(db_path=db_path, max_bytes=1)
+            assert postings.intersect(
+                db_path=db_path, terms=[("tag", cat_id)]) is None
+            deadline = time.monotonic() + 5.0
+            while postings.stats()["state"] != "over_cap":
+                assert time.monotonic() < deadline, postings.stats()
+                time.sleep(0.01)
+            assert _names(repo, db_path, both) == {"d.png"}
+        finally:
+            postings.disable()
+            wq.stop()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
@@ -0,0 +1,234 @@
+"""Offline tests for ``similar`` (perceptual hash, multi-index search, clustering)."""
+from __future__ import annotations
+
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+
+def test_multi_index_matches_brute_force() -> None:
+    from gallery import similar
+
+    rng = random.Random(7)
+    base = [rng.getrandbits(64) for _ in range(50)]
+    hashes = {}
+    for i in range(2000):
+        h = base[i % 50]
+        for _ in range(rng.randrange(0, 14)):
+            h ^= 1 << rng.randrange(64)
+        hashes[i] = h
+    index = similar._MultiIndex()
+    for iid, h in hashes.items():
+        index.add(iid, h)
+    for k in (0, 3, 4, 8, 13, similar.MAX_DISTANCE):
+        for probe in base[:5]:
+            want = {i: similar.hamming(h, probe) for i, h in hashes.items()
+                    if similar.hamming(h, probe) <= k}
+            assert index.query(probe, k) == want, k
+
+
+def _gradient(path: Path, *, flip: bool = False, tint: int = 0) -> None:
+    from PIL import Image
+
+    img = Image.new("RGB", (64, 48))
+    img.putdata([
+        ((x * 4 if not flip else 255 - x * 4), (y * 5 + tint) % 256, 90)
+        for y in range(48) for x in range(64)
+    ])
+    img.save(path, format="PNG")
+
+
+def test_thumbs_store_phash_and_find_similar_clusters() -> None:
+    from gallery import db, job_registry, repo, similar, thumbs
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_similar_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        out = scratch / "out"
+        out.mkdir()
+        _gradient(out / "a.png")
+        _gradient(out / "b.png", tint=3)     # near-duplicate of a
+        _gradient(out / "c.png", flip=True)  # mirror image: far away
+        root_posix = out.as_posix()
+        thumbs_dir = scratch / "thumbs"
+
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        job_registry.reset_for_test()
+        try:
+            wq.enqueue_write(repo.HIGH, repo.EnsureFolderOp(
+                path=root_posix, kind="output", removable=0,
+                display_name="out",
+            )).result(timeout=5)
+            for name in ("a.png", "b.png", "c.png"):
+                wq.enqueue_write(repo.LOW, repo.UpsertImageOp(
+                    path=f"{root_posix}/{name}", folder_id=1,
+                    root_path=root_posix, root_kind="output",
+                    relative_path=name, filename=name, filename_lc=name,
+                    ext="png", width=64, height=48, file_size=10, mtime_ns=1,
+                    created_at=int(time.time()),
+                    positive_prompt=None, negative_prompt=None, model=None,
+                    seed=None, cfg=None, sampler=None, scheduler=None,
+                    workflow_present=0, favorite=None, tags_csv=None,
+                    indexed_at=int(time.time()),
+                    prompt_tokens=[], word_tokens=[], normalized_tags=[],
+                )).result(timeout=5)
+
+            similar.enable(db_path=db_path)
+            # Generating the thumbnail records the hash (no second decode),
+            # in the same op as its cache row.
+            sent = []
+            real_enqueue = wq.enqueue_write
+            wq.enqueue_write = lambda prio, op: (sent.append(op),
+                                                 real_enqueue(prio, op))[1]
+            try:
+                assert thumbs.request(1, db_path=db_path, thumbs_dir=thumbs_dir,
+                                      write_queue=wq) is not None
+            finally:
+                del wq.enqueue_write
+            assert [type(op).__name__ for op in sent] == ["InsertThumbCacheOp"]
+            assert sent[0].phash is not None
+            # LOW ops apply in order: an empty one waits out the thumb's write.
+            wq.enqueue_write(repo.LOW, repo.SetPerceptualHashesOp([])).result(timeout=5)
+            rc = db.connect_read(db_path)
+            try:
+                assert rc.execute(
+                    "SELECT phash FROM image WHERE id = 1").fetchone()[0] is not None
+            finally:
+                rc.close()
+
+            # b has no hash yet: find_similar hashes it from its thumbnail.
+            got = similar.find_similar(2, db_path=db_path, thumbs_dir=thumbs_dir,
+                                       write_queue=wq, distance=10)
+            assert [it["id"] for it in got["items"]] == [1], got
+            try:
+                similar.find_similar(99, db_path=db_path, thumbs_dir=thumbs_dir,
+                                     write_queue=wq)
+            except KeyError:
+                pass
+            else:
+                raise AssertionError("unknown image accepted")
+
+            jid = similar.start_cluster_job(db_path=db_path, thumbs_dir=thumbs_dir,
+                                            write_queue=wq, distance=10)
+            deadline = time.monotonic() + 10.0
+            while similar.last_clusters() is None and time.monotonic() < deadline:
+                time.sleep(0.02)
+            result = similar.last_clusters()
+            assert result is not None and result["job_id"] == jid, result
+            assert result["images"] == 3 and result["unhashed"] == 0, result
+            assert [c["ids"] for c in result["clusters"]] == [[1, 2]], result
+            assert not job_registry.list_active()
+
+            deadline = time.monotonic() + 5.0
+            while similar.stats()["state"] != "ready" and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert similar.stats() == {"state": "ready", "hashes": 3}
+            got = similar.find_similar(1, db_path=db_path, thumbs_dir=thumbs_dir,
+                                       write_queue=wq, distance=10)
+            assert got["indexed"] and [it["id"] for it in got["items"]] == [2], got
+
+            # A re-indexed file loses its hash; the index answer is re-checked.
+            wq.enqueue_write(repo.LOW, repo.UpsertImageOp(
+                path=f"{root_posix}/b.png", folder_id=1,
+                root_path=root_posix, root_kind="output",
+                relative_path="b.png", filename="b.png", filename_lc="b.png",
+                ext="png", width=64, height=48, file_size=10, mtime_ns=2,
+                created_at=int(time.time()),
+                positive_prompt=None, negative_prompt=None, model=None,
+                seed=None, cfg=None, sampler=None, scheduler=None,
+                workflow_present=0, favorite=None, tags_csv=None,
+                indexed_at=int(time.time()),
+                prompt_tokens=[], word_tokens=[], normalized_tags=[],
+            )).result(timeout=5)
+            got = similar.find_similar(1, db_path=db_path, thumbs_dir=thumbs_dir,
+                                       write_queue=wq, distance=10)
+            assert got["items"] == [], got
+            # The trigger's clear and a row delete both leave the index.
+            assert similar.stats()["hashes"] == 2
+            assert 2 not in similar._index.hashes
+            wq.enqueue_write(repo.MID, repo.DeleteImageOp(
+                path=f"{root_posix}/c.png")).result(timeout=5)
+            assert similar.stats()["hashes"] == 1
+            assert all(3 not in bucket for table in similar._index.tables
+                       for bucket in table.values())
+        finally:
+            similar.disable()
+            wq.stop()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_phash_is_the_same_from_every_path() -> None:
+    from gallery import db, repo, similar, thumbs
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_similar_"))
+    try:
+        db_path = scratch / "g.sqlite"
+        conn = db.connect_write(db_path)
+        try:
+            db.migrate(conn)
+        finally:
+            conn.close()
+        out = scratch / "out"
+        out.mkdir()
+        # Noise: its dHash moves a bit through a WebP round-trip.
+        from PIL import Image
+
+        rng = random.Random(1)
+        noise = Image.new("RGB", (64, 48))
+        noise.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256))
+                       for _ in range(64 * 48)])
+        noise.save(out / "a.png", format="PNG")
+        root_posix = out.as_posix()
+        thumbs_dir = scratch / "thumbs"
+        wq = repo.WriteQueue(db_path)
+        wq.start()
+        try:
+            wq.enqueue_write(repo.HIGH, repo.EnsureFolderOp(
+                path=root_posix, kind="output", removable=0,
+                display_name="out",
+            )).result(timeout=5)
+            wq.enqueue_write(repo.LOW, repo.UpsertImageOp(
+                path=f"{root_posix}/a.png", folder_id=1,
+                root_path=root_posix, root_kind="output",
+                relative_path="a.png", filename="a.png", filename_lc="a.png",
+                ext="png", width=64, height=48, file_size=10, mtime_ns=1,
+                created_at=int(time.time()),
+                positive_prompt=None, negative_prompt=None, model=None,
+                seed=None, cfg=None, sampler=None, scheduler=None,
+                workflow_present=0, favorite=None, tags_csv=None,
+                indexed_at=int(time.time()),
+                prompt_tokens=[], word_tokens=[], normalized_tags=[],
+            )).result(timeout=5)
+
+            # Fresh thumbnail: the generator's hash is handed back as is.
+            fresh = similar.phash_for(1, db_path=db_path, thumbs_dir=thumbs_dir,
+                                      write_queue=wq, record=False)
+            assert fresh is not None
+            # Cached thumbnail, no stored hash: same value, not the .webp's.
+            cached = thumbs.request_phash(1, db_path=db_path,
+                                          thumbs_dir=thumbs_dir, write_queue=wq)
+            assert cached == fresh, (cached, fresh)
+            with Image.open(thumbs.request(1, db_path=db_path, thumbs_dir=thumbs_dir,
+                                           write_queue=wq)) as webp:
+                assert similar.dhash(webp) != fresh[0]  # what the old path stored
+            wq.enqueue_write(repo.LOW, repo.SetPerceptualHashesOp([])).result(timeout=5)
+            assert similar.phash_for(1, db_path=db_path, thumbs_dir=thumbs_dir,
+                                     write_queue=wq) == fresh
+        finally:
+            wq.stop()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
@@ -0,0 +1,144 @@
+"""Offline tests for ``gallery.setup``'s split start-up (warming → ready)."""
+from __future__ import annotations
+
+import asyncio
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+_PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+if str(_PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PLUGIN_ROOT))
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+
+def test_routes_import_defers_pil_and_watchdog() -> None:
+    out = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, gallery.routes; "
+         "print(sorted({m.split('.')[0] for m in sys.modules} "
+         "& {'PIL', 'watchdog'}))"],
+        cwd=str(_PLUGIN_ROOT / "test"), capture_output=True, text=True,
+        env={"PYTHONPATH": str(_PLUGIN_ROOT)}, timeout=60,
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == "[]", out.stdout
+
+
+def test_bring_up_phases_and_warming_gate() -> None:
+    import gallery as gallery_mod
+    from gallery import routes
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_startup_"))
+    saved = (gallery_mod.DATA_DIR, gallery_mod.DB_PATH, gallery_mod.THUMBS_DIR,
+             routes.DB_PATH)
+    try:
+        gallery_mod.DATA_DIR = scratch
+        gallery_mod.THUMBS_DIR = scratch / "thumbs"
+        gallery_mod.DB_PATH = routes.DB_PATH = scratch / "gallery.sqlite"
+        gallery_mod._ensure_data_layout()
+        gallery_mod._set_startup(state="warming", phase="setup", error=None,
+                                 phases_ms={"setup": 1.0})
+
+        async def _http(expect_ready: bool) -> None:
+            app = web.Application(middlewares=[routes._warming_middleware])
+            app.router.add_get("/xyz/gallery/index/status", routes._get_index_status)
+            app.router.add_get("/xyz/gallery/images", routes._list_images)
+            async with TestServer(app) as srv:
+                async with TestClient(srv) as client:
+                    r = await client.get("/xyz/gallery/images")
+                    if expect_ready:
+                        assert r.status == 200, await r.text()
+                    else:
+                        assert r.status == 503
+                        assert r.headers["Retry-After"] == "1"
+                        body = await r.json()
+                        assert body["error"]["code"] == "warming"
+                        assert body["error"]["details"]["phase"] == "setup"
+                    r = await client.get("/xyz/gallery/index/status")
+                    assert r.status == 200
+                    st = await r.json()
+                    want = "ready" if expect_ready else "warming"
+                    assert st["startup"]["state"] == want, st
+                    assert (st["totals"]["images"] is None) != expect_ready, st
+
+        asyncio.run(_http(expect_ready=False))
+        gallery_mod._bring_up()
+        try:
+            status = gallery_mod.startup_status()
+            assert status["state"] == "ready" and status["phase"] is None, status
+            assert list(status["phases_ms"]) == [
+                "setup", "migrate", "services", "roots", "vocab",
+                "scan_watchers"], status
+            asyncio.run(_http(expect_ready=True))
+        finally:
+            gallery_mod.stop_background_services()
+            gallery_mod._write_queue = None
+    finally:
+        (gallery_mod.DATA_DIR, gallery_mod.DB_PATH, gallery_mod.THUMBS_DIR,
+         routes.DB_PATH) = saved
+        gallery_mod._set_startup(state="idle", phase=None, error=None,
+                                 phases_ms={})
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_failed_phase_gates_only_before_ready() -> None:
+    from unittest import mock
+
+    import gallery as gallery_mod
+    from gallery import routes
+
+    scratch = Path(tempfile.mkdtemp(prefix="xyz_startup_"))
+    saved = (gallery_mod.DATA_DIR, gallery_mod.DB_PATH, gallery_mod.THUMBS_DIR,
+             routes.DB_PATH)
+
+    async def _images_status() -> tuple:
+        app = web.Application(middlewares=[routes._warming_middleware])
+        app.router.add_get("/xyz/gallery/images", routes._list_images)
+        async with TestServer(app) as srv:
+            async with TestClient(srv) as client:
+                r = await client.get("/xyz/gallery/images")
+                return r.status, await r.json()
+
+    def _boom() -> None:
+        raise RuntimeError("boom")
+
+    try:
+        gallery_mod.DATA_DIR = scratch
+        gallery_mod.THUMBS_DIR = scratch / "thumbs"
+        gallery_mod.DB_PATH = routes.DB_PATH = scratch / "gallery.sqlite"
+        gallery_mod._ensure_data_layout()
+
+        # Before ready: a hard failure, not "starting up".
+        gallery_mod._set_startup(state="warming", phase="setup", error=None,
+                                 phases_ms={})
+        with mock.patch.object(gallery_mod, "_migrate", _boom):
+            gallery_mod._bring_up()
+        assert gallery_mod.startup_status()["state"] == "failed"
+        status, body = asyncio.run(_images_status())
+        assert status == 503 and body["error"]["code"] == "startup_failed", body
+
+        # After ready: the gallery keeps serving and reports the error.
+        gallery_mod._set_startup(state="warming", phase="setup", error=None,
+                                 phases_ms={})
+        with mock.patch.object(gallery_mod, "_rebuild_vocab", _boom):
+            gallery_mod._bring_up()
+        try:
+            st = gallery_mod.startup_status()
+            assert (st["state"], st["phase"], st["error"]) == (
+                "ready", "vocab", "boom"), st
+            status, body = asyncio.run(_images_status())
+            assert status == 200, body
+        finally:
+            gallery_mod.stop_background_services()
+            gallery_mod._write_queue = None
+    finally:
+        (gallery_mod.DATA_DIR, gallery_mod.DB_PATH, gallery_mod.THUMBS_DIR,
+         routes.DB_PATH) = saved
+        gallery_mod._set_startup(state="idle", phase=None, error=None,
+                                 phases_ms={})
+        shutil.rmtree(scratch, ignore_errors=True)